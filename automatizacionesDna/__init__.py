@@ -1 +0,0 @@
-from automatizacionesDna import db_signals
\ No newline at end of file
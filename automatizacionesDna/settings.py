@@ -39,6 +39,21 @@ passwordbd=os.getenv("PASSWORDBD")
 puertobd=os.getenv("PUERTOBD")
 dbhost=os.getenv("DBHOST")
 
+# Qué hace una sincronización si ya hay otra de la misma entidad en curso (esperar, omitir o compartir) y cuántos
+# segundos espera como máximo a que termine
+SYNC_CONCURRENCIA = os.getenv("SYNC_CONCURRENCIA", "compartir")
+SYNC_ESPERA_CANDADO = int(os.getenv("SYNC_ESPERA_CANDADO", "3600"))
+
+# Carpeta donde se guardan los perfiles (cProfile y tracemalloc) de las sincronizaciones que se piden con ?perfilar=1
+SYNC_PERFILES_DIR = os.getenv("SYNC_PERFILES_DIR", os.path.join(BASE_DIR, 'perfiles'))
+
+# Carpeta donde auto/cargarArchivos guarda los archivos subidos hasta que el trabajador los carga, debe ser la misma
+# para el servidor web y el trabajador
+CARGAS_DIR = os.getenv("CARGAS_DIR", os.path.join(BASE_DIR, 'cargas'))
+
+# Segundos que dura la cache de llaves de las tablas de referencia (ver sincronizacion/referencias), 0 la desactiva
+SYNC_CACHE_REFERENCIAS = int(os.getenv("SYNC_CACHE_REFERENCIAS", "600"))
+
 # Application definition
 
 INSTALLED_APPS = [
@@ -50,6 +65,7 @@ INSTALLED_APPS = [
     "django.contrib.staticfiles",
     "unidades.administracion.reporteVentas",
     "unidades.produccionLogistica.maxMin",
+    "unidades.sistema.sincronizacion",
 ]
 
 MIDDLEWARE = [
@@ -95,10 +111,25 @@ DATABASES = {
         'PORT' : puertobd,
         'OPTIONS': {
             'connect_timeout': 10,
-        }
+            #El search_path se envía al abrir la conexión, sin una consulta extra por conexión
+            'options': '-c search_path=django_reportes,public',
+        },
+        #Conexiones persistentes, se revisa que sigan vivas antes de reutilizarlas
+        'CONN_MAX_AGE': int(os.getenv("DB_CONN_MAX_AGE", "60")),
+        'CONN_HEALTH_CHECKS': True,
     }
 }
 
+# Con DB_POOL=1 se usa el pool de psycopg (psycopg-pool) en lugar de conexiones persistentes, conviene cuando
+# varios hilos del mismo proceso usan la base (ej. gunicorn con --threads)
+if os.getenv("DB_POOL", "0") == "1":
+    DATABASES['default']['CONN_MAX_AGE'] = 0
+    DATABASES['default']['OPTIONS']['pool'] = {
+        'min_size': int(os.getenv("DB_POOL_MIN", "2")),
+        'max_size': int(os.getenv("DB_POOL_MAX", "10")),
+        'timeout': int(os.getenv("DB_POOL_TIMEOUT", "30")),
+    }
+
 
 # Password validation
 # https://docs.djangoproject.com/en/5.2/ref/settings/#auth-password-validators
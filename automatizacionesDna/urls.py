@@ -18,48 +18,62 @@ from django.contrib import admin
 from django.urls import path
 
 #Rutas agregadas
+from unidades.sistema.sincronizacion.trabajos import enCola
+from unidades.sistema.sincronizacion.views.viewsTrabajos import consultarTrabajo
+from unidades.sistema.sincronizacion.views.viewsMetricas import consultarMetricas
+from unidades.sistema.sincronizacion.views.viewsEjecuciones import consultarEjecuciones, descargarPerfil
 from unidades.produccionLogistica.maxMin.views.viewsProducto import pullProductsOdoo, createProductsOdoo, updateProductsOdoo, pullProductsExcel
 from unidades.produccionLogistica.maxMin.views.viewsInsumo import pullInsumosOdoo, updateInsumosOdoo, createInsumosOdoo, updateMaxMinOdoo
 from unidades.produccionLogistica.maxMin.views.viewsMaterialPI import pullMaterialPIOdoo
 from unidades.administracion.reporteVentas.views.viewsClientes import pullClientesOdoo, pullClientesExcel, createClientesOdoo, updateClientesOdoo
-from unidades.administracion.reporteVentas.views.viewsVentas import pullVentasOdoo, pullVentasExcel, createVentasOdoo
+from unidades.administracion.reporteVentas.views.viewsVentas import pullVentasOdoo, pullVentasExcel, createVentasOdoo, clasificarClientesPSQL
+from unidades.administracion.reporteVentas.views.viewsCargaArchivos import cargarArchivos
 from unidades.administracion.reporteVentas.views.viewsCaducidades import pullCaducidadesOdoo, createCaducidadesOdoo, updateCaducidadesOdoo
 
 urlpatterns = [
     path('admin/', admin.site.urls),
     
     #!Rutas solo iniciales de excel
-    path('auto/pullProductsExcel/', pullProductsExcel),
-    path('auto/pullClientesExcel/', pullClientesExcel),
-    path('auto/pullVentasExcel/', pullVentasExcel),
+    path('auto/pullProductsExcel/', enCola(pullProductsExcel)),
+    path('auto/pullClientesExcel/', enCola(pullClientesExcel)),
+    path('auto/pullVentasExcel/', enCola(pullVentasExcel)),
+    path('auto/cargarArchivos/', cargarArchivos),
 
     #!Rutas de productos e insumos
-    path('auto/pullProductsOdoo/', pullProductsOdoo),
-    path('auto/pullInsumosOdoo/', pullInsumosOdoo),
-    path('auto/createProductsOdoo/', createProductsOdoo),
-    path('auto/createInsumosOdoo/', createInsumosOdoo),
-    path('auto/updateProductsOdoo/', updateProductsOdoo),
-    path('auto/updateInsumosOdoo/', updateInsumosOdoo),
+    path('auto/pullProductsOdoo/', enCola(pullProductsOdoo)),
+    path('auto/pullInsumosOdoo/', enCola(pullInsumosOdoo)),
+    path('auto/createProductsOdoo/', enCola(createProductsOdoo)),
+    path('auto/createInsumosOdoo/', enCola(createInsumosOdoo)),
+    path('auto/updateProductsOdoo/', enCola(updateProductsOdoo)),
+    path('auto/updateInsumosOdoo/', enCola(updateInsumosOdoo)),
     
     #!Rutas para MaterialesPI
-    path('auto/pullMaterialPIOdoo/', pullMaterialPIOdoo),
+    path('auto/pullMaterialPIOdoo/', enCola(pullMaterialPIOdoo)),
     
     #!Rutas para BajaRotación
-    path('auto/pullCaducidadesOdoo/', pullCaducidadesOdoo), #? En el total son menos 2 por que no cumple el formato de fecha para registrarse
-    path('auto/createCaducidadesOdoo/', createCaducidadesOdoo),
-    path('auto/updateCaducidadesOdoo/', updateCaducidadesOdoo),
+    path('auto/pullCaducidadesOdoo/', enCola(pullCaducidadesOdoo)), #? En el total son menos 2 por que no cumple el formato de fecha para registrarse
+    path('auto/createCaducidadesOdoo/', enCola(createCaducidadesOdoo)),
+    path('auto/updateCaducidadesOdoo/', enCola(updateCaducidadesOdoo)),
     
     #!Rutas para Clientes
-    path('auto/pullClientesOdoo/', pullClientesOdoo),
-    path('auto/createClientesOdoo/', createClientesOdoo),
-    path('auto/updateClientesOdoo/', updateClientesOdoo),
+    path('auto/pullClientesOdoo/', enCola(pullClientesOdoo)),
+    path('auto/createClientesOdoo/', enCola(createClientesOdoo)),
+    path('auto/updateClientesOdoo/', enCola(updateClientesOdoo)),
     
     #!Rutas para Ventas
-    path('auto/pullVentasOdoo/', pullVentasOdoo),
-    path('auto/createVentasOdoo/', createVentasOdoo),
-    path('auto/pullVentasExcel/', pullVentasExcel),
-    path('auto/createVentasOdoo/', createVentasOdoo),
+    path('auto/pullVentasOdoo/', enCola(pullVentasOdoo)),
+    path('auto/createVentasOdoo/', enCola(createVentasOdoo)),
+    path('auto/clasificarClientes/', clasificarClientesPSQL),
+    
+    #!Rutas de trabajos en segundo plano
+    path('auto/trabajos/<int:idTrabajo>/', consultarTrabajo),
+    path('auto/ejecuciones/', consultarEjecuciones),
+    path('auto/ejecuciones/<int:idEjecucion>/perfil/', descargarPerfil),
+    path('auto/ejecuciones/<int:idEjecucion>/perfil/<str:archivo>', descargarPerfil),
+    
+    #!Métricas de las sincronizaciones y de Odoo en formato Prometheus
+    path('metrics', consultarMetricas),
     
     #!Rutas Actualizar Max y Min Insumos
-    path('auto/updateMaxMinOdoo/', updateMaxMinOdoo),
+    path('auto/updateMaxMinOdoo/', enCola(updateMaxMinOdoo)),
 ]
@@ -2,6 +2,9 @@ import xmlrpc.client
 import os
 import dotenv
 
+from conexiones.grabacionOdoo import UID_REPRODUCCION, ModelosGrabados, ModelosReproducidos, grabadoraActual
+from conexiones.metricas import ModelosMedidos
+
 # --------------------------------------------------------------------------------------------------
 # * Class: OdooAPI
 # * Descripción: Maneja la conexión a la base de datos Odoo
@@ -14,6 +17,8 @@ import dotenv
 #     - función que establece la conexión a la base de datos de Odoo con las autenticaciones de 
 #       autenticación (common) y con los modelos (object)
 #       En caso de que exista algún error, arroja la excepción correspondiente.
+#       Con ODOO_GRABACION=grabar guarda las respuestas y con ODOO_GRABACION=reproducir no se conecta y responde
+#       con lo grabado (ver conexiones.grabacionOdoo).
 # --------------------------------------------------------------------------------------------------
 class OdooAPI:
     #clase para manejar la conexión con Odoo
@@ -34,16 +39,30 @@ class OdooAPI:
 
     #Funcion connect. 
     def _connect(self):
+        grabadora = grabadoraActual()
+        if grabadora is not None and grabadora.reproduciendo:
+            self.uid = UID_REPRODUCCION
+            self.models = ModelosReproducidos(grabadora)
+            return
+
         try:
             # Conexión para autenticación
             common = xmlrpc.client.ServerProxy(f'{self.url}/xmlrpc/2/common')
 
             self.uid = common.authenticate(self.db, self.user, self.password, {})
             if self.uid:
-                self.models = xmlrpc.client.ServerProxy(f'{self.url}/xmlrpc/2/object')
+                #Cada execute_kw se registra en las métricas de Odoo (conexiones.metricas)
+                self.models = ModelosMedidos(f'{self.url}/xmlrpc/2/object')
+                if grabadora is not None:
+                    self.models = ModelosGrabados(self.models, grabadora)
             else:
                 raise ConnectionRefusedError("Autenticación fallida. Revisa tus credenciales o la configuración del servidor.")
 
         except Exception as e:
             print(f"Error al conectar con Odoo: {e}")
             raise
+
+
+#Filtro de Odoo para traer solo los registros creados o modificados desde una fecha, sin fecha no filtra
+def filtroDesde(campo, desde):
+    return [(campo, '>=', desde.strftime('%Y-%m-%d %H:%M:%S'))] if desde else []
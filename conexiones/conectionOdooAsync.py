@@ -0,0 +1,141 @@
+import asyncio
+import itertools
+import os
+import ssl
+import time
+import xmlrpc.client
+
+import dotenv
+import httpx
+from asgiref.sync import async_to_sync
+
+from conexiones.grabacionOdoo import UID_REPRODUCCION, grabadoraActual, reproducirLlamada
+from conexiones.metricas import registrarLlamadaOdoo
+
+# --------------------------------------------------------------------------------------------------
+# * Class: OdooAPIAsync
+# * Descripción: Cliente asíncrono de Odoo por JSON-RPC (httpx). Permite hacer al mismo tiempo las consultas que no
+# *              dependen entre sí (orderpoints, proveedores, compras y variantes de los insumos, o lineas y
+# *              direcciones de las ventas) en lugar de una después de otra como con OdooAPI.
+#
+# ? Uso:
+#     async with OdooAPIAsync() as odoo:
+#         lineas, direcciones = await asyncio.gather(
+#             odoo.execute_kw('account.move.line', 'search_read', [dominio], {'fields': [...]}),
+#             odoo.execute_kw('res.partner', 'search_read', [dominio], {'fields': [...]}),
+#         )
+#
+# ? Errores:
+#     - Los errores de Odoo se lanzan como xmlrpc.client.Fault, así los controladores los manejan igual que con OdooAPI
+#
+# ? Grabación:
+#     - Igual que OdooAPI, graba o reproduce las llamadas según ODOO_GRABACION (ver conexiones.grabacionOdoo)
+# --------------------------------------------------------------------------------------------------
+class OdooAPIAsync:
+    #uid por (url, db, usuario), se autentica una sola vez por proceso aunque cada event loop abra su cliente
+    _uids = {}
+    #Contexto SSL compartido, crearlo en cada cliente cuesta ~30 ms
+    _ssl = None
+
+    def __init__(self, timeout=600):
+        dotenv.load_dotenv()
+        self.url      = os.getenv("URL_ODOO")
+        self.db       = os.getenv("DATABASE_ODOO")
+        self.user     = os.getenv("USERNAME_ODOO")
+        self.password = os.getenv("PASSWORD_ODOO")
+
+        # Valida que todas las variables de entorno estén presentes
+        if not all([self.url, self.db, self.user, self.password]):
+            raise ValueError("Una o más variables de entorno de Odoo no están definidas.")
+
+        self.uid = None
+        self.grabadora = grabadoraActual()
+        self.timeout = httpx.Timeout(timeout, connect=30)
+        self._cliente = None
+        self._ids = itertools.count(1)
+
+    async def __aenter__(self):
+        if self.grabadora is not None and self.grabadora.reproduciendo:
+            self.uid = UID_REPRODUCCION
+            return self
+        if OdooAPIAsync._ssl is None:
+            OdooAPIAsync._ssl = ssl.create_default_context()
+        self._cliente = httpx.AsyncClient(base_url=self.url, timeout=self.timeout, verify=OdooAPIAsync._ssl)
+        try:
+            await self._connect()
+        except Exception:
+            await self._cliente.aclose()
+            raise
+        return self
+
+    async def __aexit__(self, *excepcion):
+        if self._cliente is not None:
+            await self._cliente.aclose()
+
+    #Funcion connect, autentica con el servicio common
+    async def _connect(self):
+        llave = (self.url, self.db, self.user)
+        if llave not in self._uids:
+            uid = await self._llamar('common', 'authenticate', [self.db, self.user, self.password, {}])
+            if not uid:
+                raise ConnectionRefusedError("Autenticación fallida. Revisa tus credenciales o la configuración del servidor.")
+            self._uids[llave] = uid
+        self.uid = self._uids[llave]
+
+    #Hace una llamada JSON-RPC a /jsonrpc y regresa su result, la registra en las métricas de Odoo
+    async def _llamar(self, servicio, metodo, args):
+        modelo, metodoOdoo = (args[3], args[4]) if servicio == 'object' else (servicio, metodo)
+        inicio = time.perf_counter()
+        enviados = recibidos = 0
+        resultado, fallo = None, True
+        try:
+            respuesta = await self._cliente.post('/jsonrpc', json={
+                'jsonrpc' : '2.0',
+                'method'  : 'call',
+                'params'  : {'service': servicio, 'method': metodo, 'args': args},
+                'id'      : next(self._ids),
+            })
+            enviados, recibidos = len(respuesta.request.content), respuesta.num_bytes_downloaded
+            respuesta.raise_for_status()
+            cuerpo = respuesta.json()
+
+            if cuerpo.get('error'):
+                error = cuerpo['error']
+                data = error.get('data') or {}
+                raise xmlrpc.client.Fault(data.get('name', error.get('code')), data.get('message') or error.get('message'))
+            resultado, fallo = cuerpo['result'], False
+            return resultado
+        finally:
+            registrarLlamadaOdoo('jsonrpc', modelo, metodoOdoo, time.perf_counter() - inicio, enviados, recibidos, resultado, fallo)
+
+    #Mismos parámetros que models.execute_kw de OdooAPI sin db, uid y password
+    async def execute_kw(self, modelo, metodo, args, kwargs=None):
+        if self.grabadora is None:
+            return await self._llamar('object', 'execute_kw', [self.db, self.uid, self.password, modelo, metodo, args, kwargs or {}])
+        if self.grabadora.reproduciendo:
+            return reproducirLlamada(self.grabadora, modelo, metodo, args, kwargs)
+
+        inicio = time.perf_counter()
+        try:
+            resultado = await self._llamar('object', 'execute_kw', [self.db, self.uid, self.password, modelo, metodo, args, kwargs or {}])
+        except xmlrpc.client.Fault as fallo:
+            self.grabadora.grabar(modelo, metodo, args, kwargs, fallo=fallo, segundos=time.perf_counter() - inicio)
+            raise
+        self.grabadora.grabar(modelo, metodo, args, kwargs, resultado, segundos=time.perf_counter() - inicio)
+        return resultado
+
+
+dotenv.load_dotenv()
+
+#? Si es False (ODOO_ASYNC=0) los controladores hacen sus consultas de enriquecimiento una por una con OdooAPI
+ASINCRONO = os.getenv("ODOO_ASYNC", "1") == "1"
+
+
+#Ejecuta una corrutina desde código síncrono (vistas, servicios y el trabajador), no se puede usar dentro de un event loop
+def ejecutarAsync(corrutina, *args, **kwargs):
+    return async_to_sync(corrutina)(*args, **kwargs)
+
+
+#Ejecuta varias consultas execute_kw al mismo tiempo y regresa sus resultados en el mismo orden
+async def consultarConcurrente(odoo, *consultas):
+    return await asyncio.gather(*(odoo.execute_kw(*consulta) for consulta in consultas))
@@ -0,0 +1,177 @@
+import gzip
+import hashlib
+import json
+import os
+import threading
+import time
+import xmlrpc.client
+from pathlib import Path
+
+import dotenv
+
+from conexiones.metricas import registrarLlamadaOdoo
+
+# --------------------------------------------------------------------------------------------------
+# * Módulo: grabacionOdoo
+# * Descripción: Graba las llamadas execute_kw a Odoo (petición y respuesta) en archivos JSON comprimidos y las
+# *              reproduce sin conexión, para perfilar las transformaciones (insertVentas, updateMaxMinOdoo, ...)
+# *              con respuestas reales de producción sin esperar a Odoo en cada iteración.
+#
+# ? Modos (variable de entorno ODOO_GRABACION, se lee al crear OdooAPI/OdooAPIAsync):
+#     - grabar, llama a Odoo normalmente y guarda cada respuesta (o Fault) en ODOO_GRABACION_DIR
+#     - reproducir, no se conecta a Odoo, regresa las respuestas grabadas. Una petición que no se grabó lanza Fault.
+#
+# ? Archivos:
+#     - <ODOO_GRABACION_DIR>/<modelo>/<metodo>-<hash>.json.gz, uno por petición distinta (modelo, método, args y
+#       kwargs, sin db, uid ni password). Si la misma petición se hace varias veces se guardan todas sus respuestas
+#       en orden y se reproducen en el mismo orden (la última se repite).
+#
+# ! Nota: Las peticiones dependen de lo que hay en PostgreSQL (ej. los ids que ya existen en create), para
+#         reproducir una sincronización la base debe estar como cuando se grabó (ej. con --dry-run).
+# --------------------------------------------------------------------------------------------------
+
+MODOS = ('grabar', 'reproducir')
+
+#? uid con el que se responde en reproducir, no forma parte de la llave de las peticiones
+UID_REPRODUCCION = 1
+
+
+#Llave estable de una petición, igual para XML-RPC y JSON-RPC (las tuplas y listas se serializan igual)
+def llavePeticion(modelo, metodo, args, kwargs):
+    texto = json.dumps([modelo, metodo, args, kwargs or {}], sort_keys=True, default=str, ensure_ascii=False)
+    return hashlib.sha256(texto.encode()).hexdigest()[:20]
+
+
+# --------------------------------------------------------------------------------------------------
+# * Class: GrabadoraOdoo
+# * Descripción: Guarda y lee las respuestas de un directorio de grabación
+#
+# ! Parámetros:
+#     - modo, 'grabar' o 'reproducir'
+#     - directorio, carpeta de la grabación
+# --------------------------------------------------------------------------------------------------
+class GrabadoraOdoo:
+    def __init__(self, modo, directorio):
+        if modo not in MODOS:
+            raise ValueError(f'El modo de grabación {modo} no existe, las opciones son {list(MODOS)}')
+        self.modo = modo
+        self.directorio = Path(directorio)
+        self._candado = threading.Lock()
+        #Peticiones grabadas en este proceso (la primera vez se reemplaza la grabación anterior) o veces reproducidas
+        self._vistas = {}
+
+    @property
+    def reproduciendo(self):
+        return self.modo == 'reproducir'
+
+    def _archivo(self, modelo, metodo, llave):
+        return self.directorio / modelo / f'{metodo}-{llave}.json.gz'
+
+    @staticmethod
+    def _leer(archivo):
+        with gzip.open(archivo, 'rt', encoding='utf-8') as contenido:
+            return json.load(contenido)
+
+    #Guarda la respuesta (resultado o Fault) de una petición
+    def grabar(self, modelo, metodo, args, kwargs, resultado=None, fallo=None, segundos=0.0):
+        llave = llavePeticion(modelo, metodo, args, kwargs)
+        archivo = self._archivo(modelo, metodo, llave)
+        respuesta = {'segundos': round(segundos, 3)}
+        if fallo is not None:
+            respuesta['fault'] = {'code': fallo.faultCode, 'string': fallo.faultString}
+        else:
+            respuesta['resultado'] = resultado
+
+        with self._candado:
+            if llave in self._vistas and archivo.exists():
+                grabacion = self._leer(archivo)
+            else:
+                grabacion = {'modelo': modelo, 'metodo': metodo, 'args': args, 'kwargs': kwargs or {}, 'respuestas': []}
+            grabacion['respuestas'].append(respuesta)
+            self._vistas[llave] = len(grabacion['respuestas'])
+
+            archivo.parent.mkdir(parents=True, exist_ok=True)
+            temporal = archivo.with_suffix('.tmp')
+            with gzip.open(temporal, 'wt', encoding='utf-8') as contenido:
+                json.dump(grabacion, contenido, default=str, ensure_ascii=False)
+            os.replace(temporal, archivo)
+
+    #Regresa la respuesta grabada de una petición, lanza el Fault grabado o uno si la petición no se grabó
+    def reproducir(self, modelo, metodo, args, kwargs):
+        llave = llavePeticion(modelo, metodo, args, kwargs)
+        archivo = self._archivo(modelo, metodo, llave)
+        if not archivo.exists():
+            raise xmlrpc.client.Fault('grabacion', f'No hay grabación de {modelo}.{metodo} ({llave}) en {self.directorio}')
+
+        with self._candado:
+            vez = self._vistas.get(llave, 0)
+            self._vistas[llave] = vez + 1
+        respuestas = self._leer(archivo)['respuestas']
+        respuesta = respuestas[min(vez, len(respuestas) - 1)]
+        if 'fault' in respuesta:
+            raise xmlrpc.client.Fault(respuesta['fault']['code'], respuesta['fault']['string'])
+        return respuesta['resultado']
+
+
+# --------------------------------------------------------------------------------------------------
+# * Class: ModelosGrabados
+# * Descripción: Envuelve models de OdooAPI (ModelosMedidos) y graba cada execute_kw
+# --------------------------------------------------------------------------------------------------
+class ModelosGrabados:
+    def __init__(self, modelos, grabadora):
+        self._modelos = modelos
+        self._grabadora = grabadora
+
+    def execute_kw(self, db, uid, password, modelo, metodo, args, kwargs=None):
+        inicio = time.perf_counter()
+        try:
+            resultado = self._modelos.execute_kw(db, uid, password, modelo, metodo, args, *([kwargs] if kwargs is not None else []))
+        except xmlrpc.client.Fault as fallo:
+            self._grabadora.grabar(modelo, metodo, args, kwargs, fallo=fallo, segundos=time.perf_counter() - inicio)
+            raise
+        self._grabadora.grabar(modelo, metodo, args, kwargs, resultado, segundos=time.perf_counter() - inicio)
+        return resultado
+
+    def __getattr__(self, nombre):
+        return getattr(self._modelos, nombre)
+
+
+# --------------------------------------------------------------------------------------------------
+# * Class: ModelosReproducidos
+# * Descripción: Reemplaza a models de OdooAPI en reproducir, responde execute_kw con la grabación y lo registra
+# *              en las métricas de Odoo con el cliente "replay" (así las fases fetch/enrich se siguen midiendo)
+# --------------------------------------------------------------------------------------------------
+class ModelosReproducidos:
+    def __init__(self, grabadora):
+        self._grabadora = grabadora
+
+    def execute_kw(self, db, uid, password, modelo, metodo, args, kwargs=None):
+        return reproducirLlamada(self._grabadora, modelo, metodo, args, kwargs)
+
+
+#Reproduce una llamada y la registra en las métricas (la usan ModelosReproducidos y OdooAPIAsync)
+def reproducirLlamada(grabadora, modelo, metodo, args, kwargs):
+    inicio = time.perf_counter()
+    resultado, error = None, True
+    try:
+        resultado = grabadora.reproducir(modelo, metodo, args, kwargs)
+        error = False
+        return resultado
+    finally:
+        registrarLlamadaOdoo('replay', modelo, metodo, time.perf_counter() - inicio, 0, 0, resultado, error)
+
+
+_grabadoras = {}
+
+
+#Grabadora configurada en el entorno (ODOO_GRABACION y ODOO_GRABACION_DIR) o None, una por proceso y directorio
+def grabadoraActual():
+    dotenv.load_dotenv()
+    modo = os.getenv('ODOO_GRABACION', '').strip().lower()
+    if not modo:
+        return None
+    directorio = os.getenv('ODOO_GRABACION_DIR', 'grabacionesOdoo')
+    llave = (modo, os.path.abspath(directorio))
+    if llave not in _grabadoras:
+        _grabadoras[llave] = GrabadoraOdoo(modo, directorio)
+    return _grabadoras[llave]
@@ -0,0 +1,177 @@
+import time
+
+import openpyxl
+import pandas as pd
+
+#?Tipos de las columnas de cada hoja del Excel de Contpaq, las columnas que no aparecen se dejan como texto
+TIPOS_CONTPAQ = {
+    'Ventas': {'idVenta': 'str', 'Fecha': 'datetime', 'unidad': 'str', 'vendedor': 'str', 'idcliente': 'int'},
+    'pvh': {
+        'idVenta': 'str', 'id_odoo': 'int', 'SKU': 'str', 'marca': 'str', 'nombreProducto': 'str', 'categoria': 'str',
+        'Cantidad facturada': 'int', 'Precio unitario': 'float', 'Total': 'float'
+    },
+    'Clientes': {'idCliente': 'int', 'Cliente': 'str'},
+    'Productos': {'sku': 'str', 'marca': 'str', 'nombre': 'str', 'categoria': 'str', 'id_odooTmp': 'int', 'id_odoo': 'int'},
+}
+
+
+# --------------------------------------------------------------------------------------------------
+# * Función: iterarHoja
+# * Descripción: Lee una hoja de Excel en modo streaming (openpyxl read_only) y la regresa por lotes de filas
+# *              con sus tipos, sin cargar la hoja completa en memoria.
+#
+# ! Parámetros:
+#     - archivo, ruta o archivo abierto del libro de Excel
+#     - hoja, nombre de la hoja ('Ventas', 'pvh', 'Clientes' o 'Productos')
+#     - tamanoLote, cantidad de filas de cada lote
+#     - tipos (opcional), diccionario {columna: 'str' | 'int' | 'float' | 'datetime'}, por default TIPOS_CONTPAQ
+#
+# ? Returns:
+#     - Generador de DataFrames con las columnas de la primera fila de la hoja. El índice de cada lote continúa
+#       el del lote anterior, igual que si se hubiera leído la hoja completa con pd.read_excel.
+#
+# ? Notas:
+#     - Las filas completamente vacías se omiten (Excel suele guardar filas vacías al final de la hoja).
+#     - Las columnas con nombre repetido se renombran como lo hace pandas (idCliente, idCliente.1).
+# --------------------------------------------------------------------------------------------------
+def iterarHoja(archivo, hoja, tamanoLote=5000, tipos=None):
+    tipos = TIPOS_CONTPAQ.get(hoja, {}) if tipos is None else tipos
+    libro = openpyxl.load_workbook(archivo, read_only=True, data_only=True)
+    try:
+        filas = libro[hoja].iter_rows(values_only=True)
+        columnas = _nombresUnicos(next(filas, ()))
+
+        inicio = 0
+        lote = []
+        for fila in filas:
+            if any(valor is not None for valor in fila):
+                lote.append(fila[:len(columnas)])
+            if len(lote) == tamanoLote:
+                yield _tiparLote(lote, columnas, tipos, inicio)
+                inicio += len(lote)
+                lote = []
+        if lote:
+            yield _tiparLote(lote, columnas, tipos, inicio)
+    finally:
+        libro.close()
+
+
+def _nombresUnicos(encabezados):
+    columnas = []
+    for encabezado in encabezados:
+        nombre = str(encabezado) if encabezado is not None else f'Unnamed: {len(columnas)}'
+        base, repetido = nombre, 0
+        while nombre in columnas:
+            repetido += 1
+            nombre = f'{base}.{repetido}'
+        columnas.append(nombre)
+    return columnas
+
+
+#Convierte el lote a DataFrame y aplica los tipos, los textos numéricos (ej. '44467') se convierten a número
+def _tiparLote(lote, columnas, tipos, inicio):
+    df = pd.DataFrame.from_records(lote, columns=columnas, index=range(inicio, inicio + len(lote)))
+    for columna, tipo in tipos.items():
+        if columna not in df:
+            continue
+        if tipo == 'int':
+            df[columna] = pd.to_numeric(df[columna]).astype('int64')
+        elif tipo == 'float':
+            df[columna] = pd.to_numeric(df[columna]).astype('float64')
+        elif tipo == 'datetime':
+            df[columna] = pd.to_datetime(df[columna])
+        else:
+            df[columna] = df[columna].astype('str')
+    return df
+
+
+#?Columnas que no pueden venir vacías ni repetidas en cada hoja
+LLAVES_CONTPAQ = {
+    'Ventas': ['idVenta'],
+    'pvh': [],
+    'Clientes': ['idCliente'],
+    'Productos': ['id_odooTmp'],
+}
+
+
+# --------------------------------------------------------------------------------------------------
+# * Función: leerArchivo
+# * Descripción: Lee una hoja completa de un Excel o un CSV sin convertir tipos (se validan con validarHoja).
+# *              Se ejecuta en los procesos del pool de la carga de archivos, por eso regresa el tiempo de lectura.
+#
+# ! Parámetros:
+#     - ruta, ruta del archivo .xlsx o .csv
+#     - hoja, nombre de la hoja a leer (en un CSV el archivo completo es la hoja)
+#
+# ? Returns:
+#     - Tupla (hoja, DataFrame, segundos)
+# --------------------------------------------------------------------------------------------------
+def leerArchivo(ruta, hoja):
+    inicio = time.perf_counter()
+    if ruta.lower().endswith('.csv'):
+        df = pd.read_csv(ruta, dtype=object)
+    else:
+        df = pd.read_excel(ruta, sheet_name=hoja, dtype=object)
+    df.columns = [str(c).strip() for c in df.columns]
+    return hoja, df, time.perf_counter() - inicio
+
+
+# --------------------------------------------------------------------------------------------------
+# * Función: validarHoja
+# * Descripción: Valida y convierte las columnas de una hoja con operaciones vectorizadas de pandas
+#
+# ! Parámetros:
+#     - hoja, nombre de la hoja ('Ventas', 'pvh', 'Clientes' o 'Productos')
+#     - df, DataFrame leído con leerArchivo
+#
+# ? Returns:
+#     - Tupla (dfValido, errores)
+#       dfValido: solo las filas válidas con los tipos de TIPOS_CONTPAQ, conserva el índice original
+#       errores: lista de textos. Si faltan columnas dfValido es None.
+#
+# ? Reglas:
+#     - Las columnas 'int', 'float' y 'datetime' deben poder convertirse (los enteros sin decimales)
+#     - Las llaves (LLAVES_CONTPAQ) no pueden venir vacías ni repetidas
+#     - Los textos vacíos de las demás columnas se dejan como cadena vacía
+# --------------------------------------------------------------------------------------------------
+def validarHoja(hoja, df, maxErrores=20):
+    tipos = TIPOS_CONTPAQ[hoja]
+    faltantes = [columna for columna in tipos if columna not in df.columns]
+    if faltantes:
+        return None, [f'Faltan las columnas {faltantes} en la hoja {hoja}']
+
+    df = df[list(tipos)].dropna(how='all').copy()
+    invalidas = pd.Series(False, index=df.index)
+    errores = []
+
+    def marcar(mascara, columna, motivo):
+        nonlocal invalidas
+        if mascara.any():
+            filas = (mascara[mascara].index + 2).tolist()
+            errores.append(f'{hoja}.{columna}: {int(mascara.sum())} filas con {motivo} (filas {filas[:maxErrores]})')
+            invalidas |= mascara
+
+    for columna, tipo in tipos.items():
+        if tipo in ('int', 'float'):
+            convertida = pd.to_numeric(df[columna], errors='coerce')
+            marcar(convertida.isna(), columna, 'valor no numérico')
+            if tipo == 'int':
+                marcar(convertida.notna() & (convertida % 1 != 0), columna, 'decimales en un entero')
+            df[columna] = convertida
+        elif tipo == 'datetime':
+            convertida = pd.to_datetime(df[columna], errors='coerce')
+            marcar(convertida.isna(), columna, 'fecha inválida')
+            df[columna] = convertida
+        else:
+            if columna in LLAVES_CONTPAQ[hoja]:
+                marcar(df[columna].isna(), columna, 'valor vacío')
+            df[columna] = df[columna].fillna('').astype('str')
+
+    for columna in LLAVES_CONTPAQ[hoja]:
+        marcar(df[columna].duplicated(keep='first') & ~invalidas, columna, 'valor repetido')
+
+    df = df[~invalidas].copy()
+    for columna, tipo in tipos.items():
+        if tipo in ('int', 'float'):
+            df[columna] = df[columna].astype('int64' if tipo == 'int' else 'float64')
+    return df, errores
@@ -0,0 +1,108 @@
+import hashlib
+import importlib.util
+import os
+import threading
+
+import dotenv
+import pandas as pd
+
+dotenv.load_dotenv()
+
+#?Carpeta donde se guardan las hojas ya convertidas, por default cacheExcel/ dentro del proyecto (no en la carpeta
+#?temporal, que cualquier usuario del servidor puede escribir), se puede cambiar con la variable de entorno CACHE_EXCEL
+CARPETA_CACHE = os.getenv("CACHE_EXCEL", os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "cacheExcel"))
+
+#?El caché en disco es Parquet (pyarrow, en requirements.txt), sin pyarrow las hojas se leen del Excel en cada proceso
+CACHE_DISCO = importlib.util.find_spec("pyarrow") is not None
+
+# --------------------------------------------------------------------------------------------------
+# * Class: LibroExcel
+# * Descripción: Carga perezosa de las hojas de un libro de Excel con caché en memoria y en disco
+#
+# ? Función hoja(nombre):
+#     - Regresa el DataFrame de la hoja. La primera vez que se pide una hoja se lee el Excel y se guarda en
+#       formato Parquet en CARPETA_CACHE, las siguientes veces se lee del caché.
+#     - El caché se identifica con el hash del archivo (sha256), por lo que si el Excel cambia se vuelve a leer.
+#       La fecha de modificación (mtime) y el tamaño sirven para no recalcular el hash en cada llamada.
+#
+# ! Nota: El DataFrame regresado es compartido entre llamadas, no se debe modificar en el mismo lugar.
+# --------------------------------------------------------------------------------------------------
+class LibroExcel:
+    def __init__(self, archivo):
+        self.archivo = archivo
+        self._firma = None
+        self._hash = None
+        self._hojas = {}
+        self._candado = threading.Lock()
+
+    #Calcula el hash del archivo solo si cambió su fecha de modificación o su tamaño
+    def _hashArchivo(self):
+        stat = os.stat(self.archivo)
+        firma = (stat.st_mtime_ns, stat.st_size)
+        if firma != self._firma:
+            sha = hashlib.sha256()
+            with open(self.archivo, "rb") as f:
+                for bloque in iter(lambda: f.read(1 << 20), b""):
+                    sha.update(bloque)
+            self._firma, self._hash = firma, sha.hexdigest()[:16]
+            self._hojas = {}
+        return self._hash
+
+    def _rutaCache(self, nombre, hashArchivo):
+        base = os.path.splitext(os.path.basename(self.archivo))[0]
+        return os.path.join(CARPETA_CACHE, f"{base}-{hashArchivo}-pandas{pd.__version__}-{nombre}.parquet")
+
+    def hoja(self, nombre):
+        with self._candado:
+            hashArchivo = self._hashArchivo()
+            if nombre in self._hojas:
+                return self._hojas[nombre]
+
+            ruta = self._rutaCache(nombre, hashArchivo)
+            df = _leerCache(ruta)
+            if df is None:
+                df = pd.read_excel(self.archivo, sheet_name=nombre)
+                _guardarCache(df, ruta)
+
+            self._hojas[nombre] = df
+            return df
+
+
+def _leerCache(ruta):
+    if not CACHE_DISCO or not os.path.exists(ruta):
+        return None
+    try:
+        return pd.read_parquet(ruta)
+    except Exception as e:
+        print(f"Error en libroExcel | No se pudo leer el caché {ruta}: {e}")
+        return None
+
+
+#Escribe en un archivo temporal y lo renombra para que otro proceso nunca lea un caché a medias
+def _guardarCache(df, ruta):
+    if not CACHE_DISCO:
+        return
+    try:
+        os.makedirs(CARPETA_CACHE, exist_ok=True)
+        temporal = f"{ruta}.{os.getpid()}.tmp"
+        df.to_parquet(temporal)
+        os.replace(temporal, ruta)
+    except Exception as e:
+        print(f"Error en libroExcel | No se pudo guardar el caché {ruta}: {e}")
+
+
+_libros = {}
+_candadoLibros = threading.Lock()
+
+# --------------------------------------------------------------------------------------------------
+# * Función: obtenerLibro
+# * Descripción: Regresa la instancia de LibroExcel del archivo, compartida por todos los controladores
+#
+# ! Parámetros:
+#     - archivo, ruta del libro de Excel (ej. 'static/ContpaqBD.xlsx')
+# --------------------------------------------------------------------------------------------------
+def obtenerLibro(archivo):
+    with _candadoLibros:
+        if archivo not in _libros:
+            _libros[archivo] = LibroExcel(archivo)
+        return _libros[archivo]
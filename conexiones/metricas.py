@@ -0,0 +1,480 @@
+import bisect
+import heapq
+import itertools
+import threading
+import time
+import xmlrpc.client
+from contextlib import contextmanager
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+# --------------------------------------------------------------------------------------------------
+# * Módulo: metricas
+# * Descripción: Métricas en memoria del proceso (contadores e histogramas) de las sincronizaciones y de las
+# *              llamadas a Odoo, en formato de texto de Prometheus. No necesita ningún servicio externo.
+#
+# ? Qué se mide:
+#     - Por modelo/método de Odoo: llamadas, latencia, bytes enviados/recibidos y registros regresados
+#     - Por sincronización (entidad y modo): ejecuciones, duración, registros leídos/insertados/actualizados/
+#       rechazados, tiempo y número de consultas en PostgreSQL
+#
+# ! Nota: Cada proceso tiene sus propias métricas. La ruta /metrics muestra las del proceso web y los comandos
+#         trabajador y orquestar las exponen en su propio puerto con --metricas.
+# --------------------------------------------------------------------------------------------------
+
+_candado = threading.Lock()
+
+#? Métricas registradas {nombre: Contador|Histograma}, en el orden en que se crearon
+METRICAS = {}
+
+#? Límites de las cubetas de los histogramas, en segundos
+LIMITES_ODOO = (0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 120, 300)
+LIMITES_SYNC = (1, 5, 15, 30, 60, 120, 300, 600, 1200, 1800, 3600)
+
+#? Medición de la sincronización que se está ejecutando en el hilo actual y la fase en la que está
+_actual = threading.local()
+
+
+#Escapa el valor de una etiqueta según el formato de texto de Prometheus
+def _escapar(valor):
+    return str(valor).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def _etiquetas(nombres, valores, extra=''):
+    pares = [f'{nombre}="{_escapar(valor)}"' for nombre, valor in zip(nombres, valores)]
+    if extra:
+        pares.append(extra)
+    return '{' + ','.join(pares) + '}' if pares else ''
+
+
+def _numero(valor):
+    return repr(float(valor)) if isinstance(valor, float) else str(valor)
+
+
+class Contador:
+    tipo = 'counter'
+
+    def __init__(self, nombre, ayuda, etiquetas=()):
+        self.nombre = nombre
+        self.ayuda = ayuda
+        self.etiquetas = tuple(etiquetas)
+        self.valores = {}
+        METRICAS[nombre] = self
+
+    def inc(self, valor=1, **etiquetas):
+        llave = tuple(str(etiquetas.get(etiqueta, '')) for etiqueta in self.etiquetas)
+        with _candado:
+            self.valores[llave] = self.valores.get(llave, 0) + valor
+
+    def lineas(self):
+        with _candado:
+            valores = sorted(self.valores.items())
+        for llave, valor in valores:
+            yield f'{self.nombre}{_etiquetas(self.etiquetas, llave)} {_numero(valor)}'
+
+
+class Histograma:
+    tipo = 'histogram'
+
+    def __init__(self, nombre, ayuda, etiquetas=(), limites=LIMITES_ODOO):
+        self.nombre = nombre
+        self.ayuda = ayuda
+        self.etiquetas = tuple(etiquetas)
+        self.limites = tuple(limites)
+        self.valores = {}
+        METRICAS[nombre] = self
+
+    def observar(self, valor, **etiquetas):
+        llave = tuple(str(etiquetas.get(etiqueta, '')) for etiqueta in self.etiquetas)
+        cubeta = bisect.bisect_left(self.limites, valor)
+        with _candado:
+            cubetas, suma, cuenta = self.valores.get(llave) or ([0] * len(self.limites), 0.0, 0)
+            if cubeta < len(self.limites):
+                cubetas[cubeta] += 1
+            self.valores[llave] = (cubetas, suma + valor, cuenta + 1)
+
+    def lineas(self):
+        with _candado:
+            valores = sorted((llave, (list(cubetas), suma, cuenta)) for llave, (cubetas, suma, cuenta) in self.valores.items())
+        for llave, (cubetas, suma, cuenta) in valores:
+            acumulado = 0
+            for limite, enCubeta in zip(self.limites, cubetas):
+                acumulado += enCubeta
+                le = 'le="%s"' % limite
+                yield f'{self.nombre}_bucket{_etiquetas(self.etiquetas, llave, le)} {acumulado}'
+            le = 'le="+Inf"'
+            yield f'{self.nombre}_bucket{_etiquetas(self.etiquetas, llave, le)} {cuenta}'
+            yield f'{self.nombre}_sum{_etiquetas(self.etiquetas, llave)} {_numero(suma)}'
+            yield f'{self.nombre}_count{_etiquetas(self.etiquetas, llave)} {cuenta}'
+
+
+ODOO_LLAMADAS        = Contador('odoo_llamadas_total', 'Llamadas a Odoo', ('cliente', 'modelo', 'metodo', 'resultado'))
+ODOO_LATENCIA        = Histograma('odoo_latencia_segundos', 'Latencia de las llamadas a Odoo', ('modelo', 'metodo'), LIMITES_ODOO)
+ODOO_BYTES_ENVIADOS  = Contador('odoo_bytes_enviados_total', 'Bytes enviados a Odoo', ('modelo', 'metodo'))
+ODOO_BYTES_RECIBIDOS = Contador('odoo_bytes_recibidos_total', 'Bytes recibidos de Odoo', ('modelo', 'metodo'))
+ODOO_FILAS           = Contador('odoo_filas_total', 'Registros regresados por Odoo', ('modelo', 'metodo'))
+
+SYNC_EJECUCIONES     = Contador('sync_ejecuciones_total', 'Sincronizaciones ejecutadas', ('entidad', 'modo', 'status'))
+SYNC_DURACION        = Histograma('sync_duracion_segundos', 'Duración de las sincronizaciones', ('entidad', 'modo'), LIMITES_SYNC)
+SYNC_FILAS           = Contador('sync_filas_total', 'Registros de las sincronizaciones por tipo (leidas, insertadas, actualizadas, rechazadas)', ('entidad', 'modo', 'tipo'))
+SYNC_DB_SEGUNDOS     = Histograma('sync_db_segundos', 'Tiempo de las consultas a PostgreSQL de cada sincronización', ('entidad', 'modo'), LIMITES_SYNC)
+SYNC_DB_CONSULTAS    = Contador('sync_db_consultas_total', 'Consultas a PostgreSQL de las sincronizaciones', ('entidad', 'modo'))
+
+
+#Registra una llamada a Odoo (la usan OdooAPI y OdooAPIAsync)
+def registrarLlamadaOdoo(cliente, modelo, metodo, segundos, enviados=0, recibidos=0, resultado=None, error=False):
+    ODOO_LLAMADAS.inc(cliente=cliente, modelo=modelo, metodo=metodo, resultado='error' if error else 'ok')
+    ODOO_LATENCIA.observar(segundos, modelo=modelo, metodo=metodo)
+    ODOO_BYTES_ENVIADOS.inc(enviados, modelo=modelo, metodo=metodo)
+    ODOO_BYTES_RECIBIDOS.inc(recibidos, modelo=modelo, metodo=metodo)
+    if isinstance(resultado, list):
+        ODOO_FILAS.inc(len(resultado), modelo=modelo, metodo=metodo)
+
+    #Fuera de otra fase (ej. enrich) el tiempo en Odoo es el fetch de la sincronización
+    medicion = medicionActual()
+    if medicion is not None and getattr(_actual, 'fase', None) is None:
+        medicion.sumar('fetch', segundos)
+
+
+#? Medición de la sincronización en curso, se comparte con los hilos que trabajan para ella (ver asociarMedicion)
+class Medicion:
+    def __init__(self, entidad, modo):
+        self.entidad = entidad
+        self.modo = modo
+        self.resultado = None
+        self.fases = {'fetch': 0.0, 'enrich': 0.0}
+        self.rechazados = 0
+        self._candado = threading.Lock()
+
+    def sumar(self, fase, segundos):
+        with self._candado:
+            self.fases[fase] = self.fases.get(fase, 0.0) + segundos
+
+
+#Medición de la sincronización del hilo actual o None
+def medicionActual():
+    return getattr(_actual, 'medicion', None)
+
+
+#Asocia el hilo actual a la medición de otro hilo (ej. el hilo que consulta Odoo en ejecutarPipeline)
+@contextmanager
+def asociarMedicion(medicion):
+    anterior = medicionActual()
+    _actual.medicion = medicion
+    try:
+        yield medicion
+    finally:
+        _actual.medicion = anterior
+
+
+#Suma el tiempo del bloque a una fase de la sincronización actual, las llamadas a Odoo dentro del bloque no cuentan como fetch
+@contextmanager
+def fase(nombre):
+    medicion, anterior = medicionActual(), getattr(_actual, 'fase', None)
+    _actual.fase = nombre
+    inicio = time.perf_counter()
+    try:
+        yield
+    finally:
+        _actual.fase = anterior
+        if medicion is not None:
+            medicion.sumar(nombre, time.perf_counter() - inicio)
+
+
+#Suma registros que no se pudieron escribir en PostgreSQL a la sincronización del hilo actual
+def filasRechazadas(cantidad):
+    if cantidad <= 0:
+        return
+    medicion = medicionActual()
+    if medicion is not None:
+        with medicion._candado:
+            medicion.rechazados += cantidad
+    SYNC_FILAS.inc(cantidad, entidad=getattr(medicion, 'entidad', ''), modo=getattr(medicion, 'modo', ''), tipo='rechazadas')
+
+
+#? Consultas más lentas que guarda TiempoConsultas y caracteres de SQL de cada una
+CONSULTAS_LENTAS = 10
+LARGO_SQL = 500
+
+
+# --------------------------------------------------------------------------------------------------
+# * Class: TiempoConsultas
+# * Descripción: Envoltura de connection.execute_wrapper de Django, suma el tiempo y el número de consultas en
+# *              total, por fase de la sincronización (la de fase(), fuera de una fase cuenta como write) y por tipo
+# *              (select, insert, update, delete, otro), y guarda las más lentas en un heap. No usa
+# *              connection.queries, la memoria no crece con el número de consultas.
+#
+# ! Parámetros:
+#     - lentas (opcional), cuántas consultas lentas se guardan
+# --------------------------------------------------------------------------------------------------
+class TiempoConsultas:
+    def __init__(self, lentas=CONSULTAS_LENTAS):
+        self.segundos = 0.0
+        self.consultas = 0
+        self.porFase = {}
+        self.porTipo = {}
+        self.limiteLentas = lentas
+        #Heap de (segundos, orden, sql, fase), la raíz es la más rápida de las guardadas
+        self._lentas = []
+        self._orden = itertools.count()
+
+    def __call__(self, execute, sql, params, many, context):
+        inicio = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.registrar(sql, time.perf_counter() - inicio, many)
+
+    def registrar(self, sql, segundos, many=False):
+        fase = getattr(_actual, 'fase', None) or 'write'
+        tipo = sql.lstrip().split(None, 1)[0].lower() if sql and sql.strip() else 'otro'
+        if tipo not in ('select', 'insert', 'update', 'delete'):
+            tipo = 'otro'
+
+        self.segundos += segundos
+        self.consultas += 1
+        for totales, llave in ((self.porFase, fase), (self.porTipo, tipo)):
+            consultas, suma = totales.get(llave, (0, 0.0))
+            totales[llave] = (consultas + 1, suma + segundos)
+
+        if self.limiteLentas:
+            elemento = (segundos, next(self._orden), sql[:LARGO_SQL] + (' [executemany]' if many else ''), fase)
+            if len(self._lentas) < self.limiteLentas:
+                heapq.heappush(self._lentas, elemento)
+            elif segundos > self._lentas[0][0]:
+                heapq.heapreplace(self._lentas, elemento)
+
+    #Consultas más lentas de la más lenta a la más rápida
+    def lentas(self):
+        return [
+            {'segundos': round(segundos, 4), 'fase': fase, 'sql': sql}
+            for segundos, _, sql, fase in sorted(self._lentas, reverse=True)
+        ]
+
+    #Resumen para el resultado de la sincronización y el historial (EjecucionSync.consultasDB)
+    def resumen(self):
+        def detalle(totales):
+            return {llave: {'consultas': n, 'segundos': round(s, 4)} for llave, (n, s) in sorted(totales.items())}
+
+        return {
+            'consultas' : self.consultas,
+            'segundos'  : round(self.segundos, 4),
+            'porFase'   : detalle(self.porFase),
+            'porTipo'   : detalle(self.porTipo),
+            'lentas'    : self.lentas(),
+        }
+
+
+# --------------------------------------------------------------------------------------------------
+# * Función: contarConsultas
+# * Descripción: Context manager que cuenta las consultas de la conexión de Django del hilo actual dentro del bloque
+#
+# ? Uso:
+#     with contarConsultas() as consultas:
+#         sincronizacionVentas.create()
+#     consultas.consultas, consultas.segundos, consultas.resumen()
+# --------------------------------------------------------------------------------------------------
+@contextmanager
+def contarConsultas(lentas=CONSULTAS_LENTAS, conexion=None):
+    if conexion is None:
+        from django.db import connection as conexion
+    consultas = TiempoConsultas(lentas)
+    with conexion.execute_wrapper(consultas):
+        yield consultas
+
+
+# --------------------------------------------------------------------------------------------------
+# * Función: medirSincronizacion
+# * Descripción: Context manager que marca la sincronización del hilo actual y registra sus métricas al terminar
+#
+# ! Parámetros:
+#     - entidad y modo de la sincronización
+#     - consultas (opcional), TiempoConsultas instalado con connection.execute_wrapper durante la sincronización
+#
+# ? Uso:
+#     with medirSincronizacion('insumos', 'update', consultas) as medicion:
+#         medicion.resultado = servicio.update()
+#     medicion.fases   ->  {'fetch': segundos en Odoo, 'enrich': segundos completando los registros}
+# --------------------------------------------------------------------------------------------------
+@contextmanager
+def medirSincronizacion(entidad, modo, consultas=None):
+    medicion = Medicion(entidad, modo)
+    inicio = time.perf_counter()
+    try:
+        with asociarMedicion(medicion):
+            yield medicion
+    finally:
+        resultado = medicion.resultado or {'status': 'error'}
+
+        SYNC_EJECUCIONES.inc(entidad=entidad, modo=modo, status=resultado.get('status'))
+        SYNC_DURACION.observar(time.perf_counter() - inicio, entidad=entidad, modo=modo)
+        SYNC_FILAS.inc(resultado.get('leidos', 0), entidad=entidad, modo=modo, tipo='leidas')
+        SYNC_FILAS.inc(resultado.get('escritos', 0), entidad=entidad, modo=modo, tipo='actualizadas' if modo == 'update' else 'insertadas')
+        if consultas is not None:
+            SYNC_DB_SEGUNDOS.observar(consultas.segundos, entidad=entidad, modo=modo)
+            SYNC_DB_CONSULTAS.inc(consultas.consultas, entidad=entidad, modo=modo)
+
+
+#Reinicia el pico de memoria (VmHWM) del proceso, solo en Linux. Es de todo el proceso, no solo del hilo actual
+def reiniciarPicoMemoria():
+    try:
+        with open('/proc/self/clear_refs', 'w') as archivo:
+            archivo.write('5')
+    except OSError:
+        pass
+
+
+#? Mediciones de pico de memoria en curso en el proceso (ver medirPicoMemoria)
+_picosActivos = set()
+
+
+class PicoMemoria:
+    def __init__(self):
+        self.kb = None
+        self.exclusivo = True
+
+
+# --------------------------------------------------------------------------------------------------
+# * Función: medirPicoMemoria
+# * Descripción: Pico de memoria residente de una sincronización. VmHWM es de todo el proceso, por eso solo se
+# *              reinicia y se atribuye a la sincronización si es la única en curso en el proceso (ej. el
+# *              orquestador ejecuta varias en hilos). Si otra corre al mismo tiempo, el pico de las dos queda en None.
+#
+# ? Uso:
+#     with medirPicoMemoria() as pico:
+#         servicio.pull()
+#     pico.kb   ->  KB o None si se traslapó con otra sincronización
+# --------------------------------------------------------------------------------------------------
+@contextmanager
+def medirPicoMemoria():
+    pico = PicoMemoria()
+    with _candado:
+        if _picosActivos:
+            pico.exclusivo = False
+            for otro in _picosActivos:
+                otro.exclusivo = False
+        else:
+            reiniciarPicoMemoria()
+        _picosActivos.add(pico)
+    try:
+        yield pico
+    finally:
+        with _candado:
+            _picosActivos.discard(pico)
+            if pico.exclusivo:
+                pico.kb = picoMemoriaKB()
+
+
+#Pico de memoria residente del proceso en KB desde el último reiniciarPicoMemoria (o desde que inició)
+def picoMemoriaKB():
+    try:
+        with open('/proc/self/status') as archivo:
+            for linea in archivo:
+                if linea.startswith('VmHWM:'):
+                    return int(linea.split()[1])
+    except OSError:
+        pass
+    try:
+        import resource
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    except ImportError:
+        return None
+
+
+#Todas las métricas en formato de texto de Prometheus (text/plain; version=0.0.4)
+def formatoPrometheus():
+    lineas = []
+    for metrica in list(METRICAS.values()):
+        lineas.append(f'# HELP {metrica.nombre} {metrica.ayuda}')
+        lineas.append(f'# TYPE {metrica.nombre} {metrica.tipo}')
+        lineas.extend(metrica.lineas())
+    return '\n'.join(lineas) + '\n'
+
+
+TIPO_CONTENIDO = 'text/plain; version=0.0.4; charset=utf-8'
+
+
+#Expone /metrics en un hilo del proceso actual, para los comandos que no pasan por Django (trabajador, orquestar)
+def servirMetricas(puerto, host='0.0.0.0'):
+    class Manejador(BaseHTTPRequestHandler):
+        def do_GET(self):
+            cuerpo = formatoPrometheus().encode()
+            self.send_response(200)
+            self.send_header('Content-Type', TIPO_CONTENIDO)
+            self.send_header('Content-Length', str(len(cuerpo)))
+            self.end_headers()
+            self.wfile.write(cuerpo)
+
+        def log_message(self, *args):
+            pass
+
+    servidor = ThreadingHTTPServer((host, puerto), Manejador)
+    threading.Thread(target=servidor.serve_forever, name='metricas', daemon=True).start()
+    return servidor
+
+
+# --------------------------------------------------------------------------------------------------
+# * Class: TransporteMedido / TransporteMedidoSeguro
+# * Descripción: Transport de xmlrpc.client que cuenta los bytes enviados y recibidos de la última llamada del hilo
+# --------------------------------------------------------------------------------------------------
+class _LectorContado:
+    def __init__(self, respuesta, contador):
+        self._respuesta = respuesta
+        self._contador = contador
+
+    def read(self, *args):
+        datos = self._respuesta.read(*args)
+        self._contador.recibidos += len(datos)
+        return datos
+
+    def __getattr__(self, nombre):
+        return getattr(self._respuesta, nombre)
+
+
+class _Medido:
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.ultima = threading.local()
+
+    def request(self, host, handler, request_body, verbose=False):
+        self.ultima.enviados = len(request_body)
+        self.ultima.recibidos = 0
+        return super().request(host, handler, request_body, verbose)
+
+    def parse_response(self, response):
+        return super().parse_response(_LectorContado(response, self.ultima))
+
+    def bytesUltima(self):
+        return getattr(self.ultima, 'enviados', 0), getattr(self.ultima, 'recibidos', 0)
+
+
+class TransporteMedido(_Medido, xmlrpc.client.Transport):
+    pass
+
+
+class TransporteMedidoSeguro(_Medido, xmlrpc.client.SafeTransport):
+    pass
+
+
+# --------------------------------------------------------------------------------------------------
+# * Class: ModelosMedidos
+# * Descripción: Envuelve el ServerProxy de /xmlrpc/2/object, cada execute_kw se registra en las métricas de Odoo.
+# *              Se usa igual que el ServerProxy (conn.models.execute_kw(db, uid, password, modelo, metodo, ...)).
+# --------------------------------------------------------------------------------------------------
+class ModelosMedidos:
+    def __init__(self, url):
+        self._transporte = TransporteMedidoSeguro() if url.startswith('https') else TransporteMedido()
+        self._proxy = xmlrpc.client.ServerProxy(url, transport=self._transporte)
+
+    def execute_kw(self, db, uid, password, modelo, metodo, *args):
+        inicio = time.perf_counter()
+        resultado, error = None, True
+        try:
+            resultado = self._proxy.execute_kw(db, uid, password, modelo, metodo, *args)
+            error = False
+            return resultado
+        finally:
+            enviados, recibidos = self._transporte.bytesUltima()
+            registrarLlamadaOdoo('xmlrpc', modelo, metodo, time.perf_counter() - inicio, enviados, recibidos, resultado, error)
+
+    def __getattr__(self, nombre):
+        return getattr(self._proxy, nombre)
@@ -1,2 +1,3 @@
 CREATE SCHEMA IF NOT EXISTS administracion;
-CREATE SCHEMA IF NOT EXISTS produccionLogistica;
\ No newline at end of file
+CREATE SCHEMA IF NOT EXISTS produccionLogistica;
+CREATE SCHEMA IF NOT EXISTS sistema;
\ No newline at end of file
@@ -1,5 +1,5 @@
 import xmlrpc.client
-from conexiones.conectionOdoo import OdooAPI
+from conexiones.conectionOdoo import OdooAPI, filtroDesde
 from datetime import datetime, timedelta
 
 #?Intancia de conexión a Odoo
@@ -54,12 +54,63 @@ def get_allCaducidades():
         })
     
 
+# --------------------------------------------------------------------------------------------------
+# * Función: iter_allCaducidades
+# * Descripción: Generador que obtiene todas las caducidades de Odoo por páginas
+#
+# ! Parámetros:
+#   - tamanoLote, cantidad de caducidades que se piden a Odoo en cada consulta
+#
+# ? Return:
+#   - Por cada página genera un JSON con la misma forma que get_allCaducidades ({ status, caducidades } o { status, message })
+# --------------------------------------------------------------------------------------------------
+def iter_allCaducidades(tamanoLote=5000):
+    #!Determinamos que haya algna conexión con Odoo
+    if not conn.models:
+        yield ({
+            'status'  : 'error',
+            'message' : 'Error en la conexión con Odoo, no hay conexión Activa'
+        })
+        return
+    
+    try:
+        offset = 0
+        while True:
+            #Obtiene una página de caducidades de Odoo ordenada por id para que las páginas no se traslapen
+            caducidades = conn.models.execute_kw(
+                conn.db, conn.uid, conn.password, 
+                'stock.lot', 'search_read', 
+                [[]],
+                { 'fields' : ['name', 'product_id', 'product_qty'], 'order': 'id asc', 'offset': offset, 'limit': tamanoLote}
+            )
+            if not caducidades:
+                break
+            
+            yield ({
+                'status'  : 'success',
+                'caducidades' : caducidades
+            })
+            
+            if len(caducidades) < tamanoLote:
+                break
+            offset += tamanoLote
+            
+    except xmlrpc.client.Fault as e:
+        yield ({
+            'status'       : 'error',
+            'message'      : f'Error al ejecutar la consulta a Odoo: {str(e)}',
+            'fault_code'   : e.faultCode,
+            'fault_string' : e.faultString,
+        })
+    
+
 # --------------------------------------------------------------------------------------------------
 # * Función: get_newCaducidades
 # * Descripción: Obtiene todas las caducidades de Odoo que se crearon un dia antes
 #
 # ! Parámetros:
-#   - No recibe ningún parámetro
+#   - Recibe la lista de IDs que ya existen en PostgreSQL
+#   - desde (opcional), datetime para traer solo los registros creados desde esa fecha (create_date)
 #
 # ? Condiciones para saber que caducidades obtener
 #   1. create_date debe ser de un día anterior
@@ -71,7 +122,7 @@ def get_allCaducidades():
 #   - Caso error: 
 #       En caso de haber ocurrido algun error retorna un JSON con status error y el mensaje del error
 # --------------------------------------------------------------------------------------------------    
-def get_newCaducidades(caducidadesIDs):
+def get_newCaducidades(caducidadesIDs, desde=None):
     #!Determinamos que haya algna conexión con Odoo
     if not conn.models:
         return ({
@@ -87,7 +138,7 @@ def get_newCaducidades(caducidadesIDs):
             'stock.lot', 'search_read', 
             [[
                 ('id', 'not in', caducidadesIDs)    
-            ]],
+            ] + filtroDesde('create_date', desde)],
             { 'fields' : ['name', 'product_id', 'product_qty']}
         )
         
@@ -110,7 +161,8 @@ def get_newCaducidades(caducidadesIDs):
 # * Descripción: Obtiene todas las caducidades de Odoo
 #
 # ! Parámetros:
-#   - No recibe ningún parámetro
+#   - Recibe la lista de IDs que ya existen en PostgreSQL
+#   - desde (opcional), datetime para traer solo los registros modificados desde esa fecha (write_date)
 #
 # ? Condiciones para saber que caducidades obtener
 #   1. ninguna
@@ -122,7 +174,7 @@ def get_newCaducidades(caducidadesIDs):
 #   - Caso error: 
 #       En caso de haber ocurrido algun error retorna un JSON con status error y el mensaje del error
 # -------------------------------------------------------------------------------------------------- 
-def update_Caducidades(caducidadesIDs):
+def update_Caducidades(caducidadesIDs, desde=None):
     #!Determinamos que haya algna conexión con Odoo
     if not conn.models:
         return ({
@@ -138,7 +190,7 @@ def update_Caducidades(caducidadesIDs):
             'stock.lot', 'search_read', 
             [[
                 ('id', 'in', caducidadesIDs)    
-            ]],
+            ] + filtroDesde('write_date', desde)],
             { 'fields' : ['name', 'product_id', 'product_qty']}
         )
         
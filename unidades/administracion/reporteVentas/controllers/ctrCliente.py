@@ -1,13 +1,14 @@
 import xmlrpc.client
-from conexiones.conectionOdoo import OdooAPI
-import pandas as pd
+from conexiones.conectionOdoo import OdooAPI, filtroDesde
+from conexiones.libroExcel import obtenerLibro
 from datetime import datetime, timedelta
 
 #?Intancia de conexión a Odoo
 conn=OdooAPI()
 
-#?Obtiene un archivo mendiante la url y lo abre en la pestaña necesaria para su posterior lectura
+#?Libro de Excel de Contpaq, las hojas se leen hasta que se necesitan y se guardan en caché
 archivo = 'static/ContpaqBD.xlsx'
+libro = obtenerLibro(archivo)
 
 # --------------------------------------------------------------------------------------------------
 # * Función: get_allClients
@@ -79,12 +80,78 @@ def get_allClients():
         })
     
     
+# --------------------------------------------------------------------------------------------------
+# * Función: iter_allClients
+# * Descripción: Generador que obtiene todos los clientes (que hayan hecho alguna compra) de Odoo por lotes
+#
+# ! Parámetros:
+#   - tamanoLote, cantidad de clientes que se piden a Odoo en cada consulta
+#
+# ? Condiciones para saber que clientes obtener
+#   1. Las mismas condiciones de get_allClients
+#
+# ? Return:
+#   - Por cada lote genera un JSON con la misma forma que get_allClients ({ status, clientes } o { status, message })
+# --------------------------------------------------------------------------------------------------
+def iter_allClients(tamanoLote=1000):
+    #!Determinamos que haya algna conexión con Odoo
+    if not conn.models:
+        yield ({
+            'status'  : 'error',
+            'message' : 'Error en la conexión con Odoo, no hay conexión Activa'
+        })
+        return
+    
+    try:
+        #Obtener todos los clientes que aparecen en los invoices
+        partner_invoice = conn.models.execute_kw(
+            conn.db, conn.uid, conn.password, 
+            'account.move', 'read_group', 
+            [[
+                ('state', '=', 'posted'), 
+                '|', ('move_type', '=', 'out_invoice'), ('move_type', '=', 'out_refund'), 
+                ('branch_id', 'not ilike', 'STUDIO'), 
+                ('branch_id', 'not ilike', 'TORRE'),
+                ('team_id', 'not in', [8, 10, 12, 15, 16, 17, 21, 22]),
+                '|', '|', ('name', 'ilike', 'INV/'), ('name', 'ilike', 'MUEST/'), ('name', 'ilike', 'BONIF/')
+            ],['partner_id'],['partner_id']]
+        )
+        
+        partner_ids = [group['partner_id'][0] for group in partner_invoice]
+        
+        #Obtener los clientes de cada lote de ids
+        for i in range(0, len(partner_ids), tamanoLote):
+            res_partner = conn.models.execute_kw(
+                conn.db, conn.uid, conn.password, 
+                'res.partner', 'search_read', 
+                [[
+                    ('id', 'in', partner_ids[i:i + tamanoLote]),
+                    '|', ('active', '=', True), ('active', '=', False)
+                ]],
+                { 'fields' : ['name', 'city', 'state_id', 'country_id']}
+            )
+            
+            yield ({
+                'status'  : 'success',
+                'clientes' : res_partner
+            })
+        
+    except xmlrpc.client.Fault as e:
+        yield ({
+            'status'       : 'error',
+            'message'      : f'Error al ejecutar la consulta a Odoo: {str(e)}',
+            'fault_code'   : e.faultCode,
+            'fault_string' : e.faultString,
+        })
+    
+    
 # --------------------------------------------------------------------------------------------------
 # * Función: get_newClients
 # * Descripción: Obtiene todos los clientes nuevos de un dia antes
 #
 # ! Parámetros:
-#   - No recibe ningún parámetro
+#   - Recibe la lista de IDs que ya existen en PostgreSQL
+#   - desde (opcional), datetime para traer solo los registros creados desde esa fecha (create_date)
 #
 # ? Condiciones para saber que clientes obtener
 #   1. create_date debe ser de un día antes:
@@ -97,7 +164,7 @@ def get_allClients():
 #   - Caso error: 
 #       En caso de haber ocurrido algun error retorna un JSON con status error y el mensaje del error
 # --------------------------------------------------------------------------------------------------
-def get_newClients(clientesIDs):
+def get_newClients(clientesIDs, desde=None):
     #!Determinamos que haya algna conexión con Odoo
     if not conn.models:
         return ({
@@ -131,7 +198,7 @@ def get_newClients(clientesIDs):
                 ('id', 'not in', clientesIDs),
                 ('id', 'in', partner_ids),
                 '|', ('active', '=', True), ('active', '=', False)
-            ]],
+            ] + filtroDesde('create_date', desde)],
             { 'fields' : ['name', 'city', 'state_id', 'country_id']}
         )
         
@@ -155,7 +222,8 @@ def get_newClients(clientesIDs):
 # * Descripción: Obtiene todos los clientes que se hayan actualizado desde hace un día y actualiza sus registros
 #
 # ! Parámetros:
-#   - No recibe ningún parámetro
+#   - Recibe la lista de IDs que ya existen en PostgreSQL
+#   - desde (opcional), datetime para traer solo los registros modificados desde esa fecha (write_date)
 #
 # ? Condiciones para saber que clientes obtener
 #   1. write_date debe ser de un día antes:
@@ -169,7 +237,7 @@ def get_newClients(clientesIDs):
 #   - Caso error: 
 #       En caso de haber ocurrido algun error retorna un JSON con status error y el mensaje del error
 # --------------------------------------------------------------------------------------------------
-def get_updateClients(clientesIDs):
+def get_updateClients(clientesIDs, desde=None):
     #!Determinamos que haya algna conexión con Odoo
     if not conn.models:
         return ({
@@ -203,7 +271,7 @@ def get_updateClients(clientesIDs):
                 ('id', 'in', clientesIDs),
                 ('id', 'in', partner_ids), 
                 '|', ('active', '=', True), ('active', '=', False)
-            ]],
+            ] + filtroDesde('write_date', desde)],
             { 'fields' : ['name', 'city', 'state_id', 'country_id']}
         )
         
@@ -228,6 +296,8 @@ def get_updateClients(clientesIDs):
 #
 # ! Parámetros:
 #   - Rebice idsClientes, una lista de IDs de clientes que ya se encuentran en la BD de Postgres
+#   - df (opcional), DataFrame con las columnas idCliente y Cliente. Por default la hoja 'Clientes' del Excel de Contpaq,
+#     al leer por lotes (lectorExcel.iterarHoja) se envía cada lote
 #
 # ? Condiciones para saber que clientes obtener
 #   1. Debe ser de un ID
@@ -240,7 +310,7 @@ def get_updateClients(clientesIDs):
 #   - Caso error: 
 #       En caso de haber ocurrido algun error retorna un JSON con status error y el mensaje del error
 # --------------------------------------------------------------------------------------------------  
-def get_clientsExcel(idsclientes):
+def get_clientsExcel(idsclientes, df=None):
     #!Determinamos que haya algna conexión con Odoo
     if not conn.models:
         return ({
@@ -251,7 +321,8 @@ def get_clientsExcel(idsclientes):
     #Función try para obteners a todos lo clientes
     try:
         #Abrimos el excel solo en la pagina de clientes
-        df = pd.read_excel(archivo, sheet_name='Clientes')
+        if df is None:
+            df = libro.hoja('Clientes')
         clientes=[]
         ids=[]
         
@@ -1,14 +1,155 @@
 import xmlrpc.client
-from conexiones.conectionOdoo import OdooAPI
-from datetime import datetime, timedelta
-import pandas as pd
+from conexiones import metricas
+from conexiones.conectionOdoo import OdooAPI, filtroDesde
+from conexiones.conectionOdooAsync import ASINCRONO, OdooAPIAsync, consultarConcurrente, ejecutarAsync
+from conexiones.libroExcel import obtenerLibro
+from conexiones import lectorExcel
+from datetime import datetime, timedelta, date
+from dateutil.relativedelta import relativedelta
+from unidades.administracion.reporteVentas.services import excelVentas
 
 #?Intancia de conexión a Odoo
 conn=OdooAPI()
 
-#?Obtiene un archivo mendiante la url y lo abre en la pestaña necesaria para su posterior lectura
+#?Libro de Excel de Contpaq, las hojas se leen hasta que se necesitan y se guardan en caché
 archivo = 'static/ContpaqBD.xlsx'
-dfVenta = pd.read_excel(archivo, sheet_name='pvh')
+libro = obtenerLibro(archivo)
+
+#?Condiciones que deben cumplir las facturas y notas de credito que se traen de Odoo
+DOMINIO_VENTAS = [
+    ('team_id', 'not in', [8, 10, 12, 15, 16, 17, 21, 22]), 
+    ('state', '=', 'posted'), 
+    '|', ('move_type', '=', 'out_invoice'), ('move_type', '=', 'out_refund'), 
+    ('branch_id', 'not ilike', 'STUDIO'), ('branch_id', 'not ilike', 'TORRE'), 
+    '|', '|', ('name', 'ilike', 'INV/'), ('name', 'ilike', 'MUEST/'), ('name', 'ilike', 'BONIF/')
+]
+CAMPOS_VENTAS = ['name', 'invoice_date', 'partner_id', 'invoice_user_id', 'partner_shipping_id', 'branch_id', 'amount_total_signed', 'move_type', 'team_id']
+
+
+# --------------------------------------------------------------------------------------------------
+# * Función: consultasVentas
+# * Descripción: Arma las consultas de Odoo de las lineas de producto (account.move.line) y la dirección de envío
+# *              (res.partner) de las ventas, no dependen una de otra
+#
+# ! Parámetros:
+#   - Recibe la lista de ventas (account.move) obtenidas de Odoo
+#
+# ? Return:
+#   - Diccionario {nombre: (modelo, metodo, args, kwargs)} con las consultas de lineas y direcciones
+# --------------------------------------------------------------------------------------------------
+def consultasVentas(order_sale):
+    #Lista de Ids que se buscaran
+    ordersID=[]
+    shippingID=[]
+    
+    #Obtiene los IDS de la orden y de la dirección para guardarlos en un a lista
+    for order in order_sale:
+        ordersID.append(order['id'])
+        if order['partner_shipping_id']:
+            shippingID.append(order['partner_shipping_id'][0])
+    
+    return {
+        #Hace una unica busqueda donde encuentra todas las lineas de productos que coincidan con el id de la lista de facturas
+        'lineas' : ('account.move.line', 'search_read', 
+            [[
+                ('move_id', 'in', ordersID),
+                ('display_type', '!=', 'line_note'),
+                ('display_type', '!=', 'cogs'),
+                '|', '|', ('account_type', '=', 'income'), ('account_type', '=', 'expense'), ('account_type', '=', False)
+            ]],
+            { 'fields' :['name', 'product_id', 'quantity', 'price_unit', 'price_subtotal', 'move_id', 'move_name']}),
+        #Busca en los contactos la información de cada uno
+        'direcciones' : ('res.partner', 'search_read', 
+            [[
+                ('id', 'in', shippingID)
+                ]],
+            { 'fields' : ['city', 'state_id', 'country_id',]}),
+    }
+
+
+# --------------------------------------------------------------------------------------------------
+# * Función: combinarVentas
+# * Descripción: Agrega a cada venta sus lineas de producto y la dirección de envío
+#
+# ! Parámetros:
+#   - order_sale, lista de ventas (account.move), la lista se modifica en el mismo lugar
+#   - resultados, diccionario {lineas, direcciones} con el resultado de las consultas de consultasVentas
+#
+# ? Return:
+#   - La misma lista de ventas con las propiedades productsLines, country_id, state_id y city
+# --------------------------------------------------------------------------------------------------
+def combinarVentas(order_sale, resultados):
+    products_data={}
+    
+    #Las guarda todas en un objetos junto con el id de la factura como id principal para encontrarla
+    for line in resultados['lineas']:
+        #Crea la propiedad sin ningun producto
+        if line['move_id'][0] not in products_data:
+            products_data[line['move_id'][0]]=[]
+        
+        #Agrega los productos necesarios a esa misma propiedad
+        if line['move_id'][0] in products_data:
+            products_data[line['move_id'][0]].append(line)
+    
+    shipping_data={}
+    
+    #Guarda la informacion del cliente con su id de contacto como propiedad
+    for dir in resultados['direcciones']:
+        shipping_data[dir['id']]=dir
+    
+    #Para cada orden busca la información en los objetos products_data y shipping_data
+    for order in order_sale:
+        #Busca el id de orden en la propiedad que sea el mismo id en move_id
+        products = products_data.get(order['id'], [])
+        
+        #Agrega una propiedad de productLines con los productos de la venta a la orden
+        order['productsLines'] = products
+        order['invoice_date'] =  datetime.strptime(order['invoice_date'], "%Y-%m-%d") + timedelta(hours=6)
+        
+        #Busca en shipping_data aquel id de cliente a donde se envia el producto y si contiene algo, guarda la información, y si no lo contiene guarda la información
+        direccion = shipping_data[order['partner_shipping_id'][0]] if order['partner_shipping_id'][0] in shipping_data else {'country_id': False, 'state_id':False, 'city': False}
+        
+        #Agrega las propiedades country_id, state_id y city a la orden, si es False lo guarda como vacio
+        order['country_id'] = direccion['country_id'][1] if direccion['country_id'] else ""
+        order['state_id'] = direccion['state_id'][1] if direccion['state_id'] else ""
+        order['city'] = direccion['city'] if direccion['city'] else ""
+    
+    return order_sale
+
+
+# --------------------------------------------------------------------------------------------------
+# * Función: enriquecerVentas
+# * Descripción: Agrega a cada venta sus lineas de producto (account.move.line) y la dirección de envío (res.partner).
+# *              Las dos consultas se hacen al mismo tiempo con OdooAPIAsync, o una por una si ODOO_ASYNC=0
+#
+# ! Parámetros:
+#   - Recibe la lista de ventas (account.move) obtenidas de Odoo, la lista se modifica en el mismo lugar
+#
+# ? Return:
+#   - La misma lista de ventas con las propiedades productsLines, country_id, state_id y city
+# --------------------------------------------------------------------------------------------------
+def enriquecerVentas(order_sale):
+    with metricas.fase('enrich'):
+        if ASINCRONO:
+            return ejecutarAsync(enriquecerVentasAsync, order_sale)
+
+        consultas = consultasVentas(order_sale)
+        resultados = {
+            nombre: conn.models.execute_kw(conn.db, conn.uid, conn.password, *consulta)
+            for nombre, consulta in consultas.items()
+        }
+        return combinarVentas(order_sale, resultados)
+
+
+#Versión asíncrona de enriquecerVentas (odoo es un OdooAPIAsync abierto, opcional)
+async def enriquecerVentasAsync(order_sale, odoo=None):
+    if odoo is None:
+        async with OdooAPIAsync() as odoo:
+            return await enriquecerVentasAsync(order_sale, odoo)
+
+    consultas = consultasVentas(order_sale)
+    resultados = await consultarConcurrente(odoo, *consultas.values())
+    return combinarVentas(order_sale, dict(zip(consultas, resultados)))
 
 
 # --------------------------------------------------------------------------------------------------
@@ -53,83 +194,14 @@ def get_allSales():
         order_sale = conn.models.execute_kw(
             conn.db, conn.uid, conn.password, 
             'account.move', 'search_read', 
-            [[
-                ('team_id', 'not in', [8, 10, 12, 15, 16, 17, 21, 22]), 
-                ('state', '=', 'posted'), 
-                '|', ('move_type', '=', 'out_invoice'), ('move_type', '=', 'out_refund'), 
-                ('branch_id', 'not ilike', 'STUDIO'), ('branch_id', 'not ilike', 'TORRE'), 
-                '|', '|', ('name', 'ilike', 'INV/'), ('name', 'ilike', 'MUEST/'), ('name', 'ilike', 'BONIF/')
-            ]],
-            { 'fields' : ['name', 'invoice_date', 'partner_id', 'invoice_user_id', 'partner_shipping_id', 'branch_id', 'amount_total_signed', 'move_type', 'team_id'],
+            [DOMINIO_VENTAS],
+            { 'fields' : CAMPOS_VENTAS,
              'order': 'invoice_date asc'
             }
         )
                 
-        #Lista de Ids que se buscaran
-        ordersID=[]
-        shippingID=[]
-        
-        #Obtiene los IDS de la orden y de la dirección para guardarlos en un a lista
-        for order in order_sale:
-            ordersID.append(order['id'])
-            if order['partner_shipping_id']:
-                shippingID.append(order['partner_shipping_id'][0])
-        
-        #Hace una unica busqueda donde encuentra todas las lineas de productos que coincidan con el id de la lista de facturas
-        products_data={}
-        all_product_line = conn.models.execute_kw(
-            conn.db, conn.uid, conn.password, 
-            'account.move.line', 'search_read', 
-            [[
-                ('move_id', 'in', ordersID),
-                ('display_type', '!=', 'line_note'),
-                ('display_type', '!=', 'cogs'),
-                '|', '|', ('account_type', '=', 'income'), ('account_type', '=', 'expense'), ('account_type', '=', False)
-            ]],
-            { 'fields' :['name', 'product_id', 'quantity', 'price_unit', 'price_subtotal', 'move_id', 'move_name']}
-        )
-        
-        #Las guarda todas en un objetos junto con el id de la factura como id principal para encontrarla
-        for line in all_product_line:
-            #Crea la propiedad sin ningun producto
-            if line['move_id'][0] not in products_data:
-                products_data[line['move_id'][0]]=[]
-            
-            #Agrega los productos necesarios a esa misma propiedad
-            if line['move_id'][0] in products_data:
-                products_data[line['move_id'][0]].append(line)
-        
-        shipping_data={}
-        #Busca en los contactos la información de cada uno
-        all_shippings=conn.models.execute_kw(
-            conn.db, conn.uid, conn.password, 
-            'res.partner', 'search_read', 
-            [[
-                ('id', 'in', shippingID)
-                ]],
-            { 'fields' : ['city', 'state_id', 'country_id',]}
-        )
-        
-        #Guarda la informacion del cliente con su id de contacto como propiedad
-        for dir in all_shippings:
-            shipping_data[dir['id']]=dir
-        
-        #Para cada orden busca la información en los objetos products_data y shipping_data
-        for order in order_sale:
-            #Busca el id de orden en la propiedad que sea el mismo id en move_id
-            products = products_data[order['id']]
-            
-            #Agrega una propiedad de productLines con los productos de la venta a la orden
-            order['productsLines'] = products
-            order['invoice_date'] =  datetime.strptime(order['invoice_date'], "%Y-%m-%d") + timedelta(hours=6)
-            
-            #Busca en shipping_data aquel id de cliente a donde se envia el producto y si contiene algo, guarda la información, y si no lo contiene guarda la información
-            direccion = shipping_data[order['partner_shipping_id'][0]] if order['partner_shipping_id'][0] in shipping_data else {'country_id': False, 'state_id':False, 'city': False}
-            
-            #Agrega las propiedades country_id, state_id y city a la orden, si es False lo guarda como vacio
-            order['country_id'] = direccion['country_id'][1] if direccion['country_id'] else ""
-            order['state_id'] = direccion['state_id'][1] if direccion['state_id'] else ""
-            order['city'] = direccion['city'] if direccion['city'] else ""
+        #Agrega las lineas de producto y la dirección de envío a cada venta
+        enriquecerVentas(order_sale)
         
         #Retorna las ventas con toda la información necesaria
         return ({
@@ -151,7 +223,8 @@ def get_allSales():
 # * Descripción: Obtiene todos las Ventas/Facturas y notas de credito de Odoo desde el día anterior
 #
 # ! Parámetros:
-#   - No recibe ningún parámetro
+#   - Recibe la lista de IDs que ya existen en PostgreSQL
+#   - desde (opcional), datetime para traer solo las ventas modificadas (publicadas) desde esa fecha (write_date)
 #
 # ? Condiciones para saber que ventas obtener
 #   1. El "status" debe ser:
@@ -175,7 +248,7 @@ def get_allSales():
 #   - Caso error: 
 #       En caso de haber ocurrido algun error retorna un JSON con status error y el mensaje del error
 # -------------------------------------------------------------------------------------------------- 
-def get_newSales(ventasIDs):
+def get_newSales(ventasIDs, desde=None):
     #!Determinamos que haya algna conexión con Odoo
     if not conn.models:
         return ({
@@ -189,86 +262,150 @@ def get_newSales(ventasIDs):
         order_sale = conn.models.execute_kw(
             conn.db, conn.uid, conn.password, 
             'account.move', 'search_read', 
-            [[
-                ('name', 'not in', ventasIDs),
-                ('team_id', 'not in', [8, 10, 12, 15, 16, 17, 21, 22]), 
-                ('state', '=', 'posted'), 
-                '|', ('move_type', '=', 'out_invoice'), ('move_type', '=', 'out_refund'), 
-                ('branch_id', 'not ilike', 'STUDIO'), ('branch_id', 'not ilike', 'TORRE'), 
-                '|', '|', ('name', 'ilike', 'INV/'), ('name', 'ilike', 'MUEST/'), ('name', 'ilike', 'BONIF/')
-            ]],
-            { 'fields' : ['name', 'invoice_date', 'partner_id', 'invoice_user_id', 'partner_shipping_id', 'branch_id', 'amount_total_signed', 'move_type', 'team_id'],
+            [[('name', 'not in', ventasIDs)] + DOMINIO_VENTAS + filtroDesde('write_date', desde)],
+            { 'fields' : CAMPOS_VENTAS,
              'order': 'invoice_date asc'
             }
         )
                 
-        #Lista de Ids que se buscaran
-        ordersID=[]
-        shippingID=[]
+        #Agrega las lineas de producto y la dirección de envío a cada venta
+        enriquecerVentas(order_sale)
         
-        #Obtiene los IDS de la orden y de la dirección para guardarlos en un a lista
-        for order in order_sale:
-            ordersID.append(order['id'])
-            if order['partner_shipping_id']:
-                shippingID.append(order['partner_shipping_id'][0])
-        
-        #Hace una unica busqueda donde encuentra todas las lineas de productos que coincidan con el id de la lista de facturas
-        products_data={}
-        all_product_line = conn.models.execute_kw(
+        #Retorna las ventas con toda la información necesaria
+        return ({
+            'status'  : 'success',
+            'ventas' : order_sale
+        })
+    
+    except xmlrpc.client.Fault as e:
+        return ({
+            'status'       : 'error',
+            'message'      : f'Error al ejecutar la consulta a Odoo: {str(e)}',
+            'fault_code'   : e.faultCode,
+            'fault_string' : e.faultString,
+        })
+
+
+# --------------------------------------------------------------------------------------------------
+# * Función: get_salesWindow
+# * Descripción: Obtiene las Ventas/Facturas y notas de credito de Odoo de una ventana de fechas
+#
+# ! Parámetros:
+#   - inicio, fecha (date) desde la que se buscan las ventas, incluida
+#   - fin, fecha (date) hasta la que se buscan las ventas, no incluida
+#
+# ? Condiciones para saber que ventas obtener
+#   1. Las mismas condiciones de get_allSales (DOMINIO_VENTAS)
+#   2. El "invoice_date" debe estar dentro de la ventana [inicio, fin)
+#
+# ? Return:
+#   - Caso success:
+#       Retorna un JSON con el status success y la lista de ventas de la ventana con la misma forma que get_allSales
+#   - Caso error: 
+#       En caso de haber ocurrido algun error retorna un JSON con status error y el mensaje del error
+# --------------------------------------------------------------------------------------------------
+def get_salesWindow(inicio, fin):
+    #!Determinamos que haya algna conexión con Odoo
+    if not conn.models:
+        return ({
+            'status'  : 'error',
+            'message' : 'Error en la conexión con Odoo, no hay conexión Activa'
+        })
+    
+    #función try para obtener las facturas
+    try:
+        order_sale = conn.models.execute_kw(
             conn.db, conn.uid, conn.password, 
-            'account.move.line', 'search_read', 
-            [[
-                ('move_id', 'in', ordersID),
-                ('display_type', '!=', 'line_note'),
-                ('display_type', '!=', 'cogs'),
-                '|', '|', ('account_type', '=', 'income'), ('account_type', '=', 'expense'), ('account_type', '=', False)
-            ]],
-            { 'fields' :['name', 'product_id', 'quantity', 'price_unit', 'price_subtotal', 'move_id', 'move_name']}
+            'account.move', 'search_read', 
+            [[('invoice_date', '>=', inicio.isoformat()), ('invoice_date', '<', fin.isoformat())] + DOMINIO_VENTAS],
+            { 'fields' : CAMPOS_VENTAS,
+             'order': 'invoice_date asc'
+            }
         )
         
-        #Las guarda todas en un objetos junto con el id de la factura como id principal para encontrarla
-        for line in all_product_line:
-            #Crea la propiedad sin ningun producto
-            if line['move_id'][0] not in products_data:
-                products_data[line['move_id'][0]]=[]
-            
-            #Agrega los productos necesarios a esa misma propiedad
-            if line['move_id'][0] in products_data:
-                products_data[line['move_id'][0]].append(line)
+        #Agrega las lineas de producto y la dirección de envío a cada venta
+        enriquecerVentas(order_sale)
         
-        shipping_data={}
-        #Busca en los contactos la información de cada uno
-        all_shippings=conn.models.execute_kw(
-            conn.db, conn.uid, conn.password, 
-            'res.partner', 'search_read', 
-            [[
-                ('id', 'in', shippingID)
-                ]],
-            { 'fields' : ['city', 'state_id', 'country_id',]}
-        )
-        
-        #Guarda la informacion del cliente con su id de contacto como propiedad
-        for dir in all_shippings:
-            shipping_data[dir['id']]=dir
+        return ({
+            'status'  : 'success',
+            'ventas' : order_sale
+        })
+    
+    except xmlrpc.client.Fault as e:
+        return ({
+            'status'       : 'error',
+            'message'      : f'Error al ejecutar la consulta a Odoo: {str(e)}',
+            'fault_code'   : e.faultCode,
+            'fault_string' : e.faultString,
+        })
+
+
+# --------------------------------------------------------------------------------------------------
+# * Función: iter_salesByMonth
+# * Descripción: Generador que recorre las ventas de Odoo mes por mes, desde la primera factura hasta hoy
+#
+# ! Parámetros:
+#   - desde (opcional), fecha (date) del primer mes a recorrer. Si no se envía se usa el mes de la primera factura
+#   - omitir (opcional), conjunto de fechas de inicio de mes que ya se cargaron y no se deben volver a traer
+#
+# ? Return:
+#   - Por cada mes genera una tupla (inicio, fin, ventasOdoo) donde ventasOdoo es la respuesta de get_salesWindow.
+#     Solo un mes de ventas vive en memoria a la vez.
+# --------------------------------------------------------------------------------------------------
+def iter_salesByMonth(desde=None, omitir=()):
+    if desde is None:
+        try:
+            primera = conn.models.execute_kw(
+                conn.db, conn.uid, conn.password, 
+                'account.move', 'search_read', 
+                [[('invoice_date', '!=', False)] + DOMINIO_VENTAS],
+                { 'fields' : ['invoice_date'], 'order': 'invoice_date asc', 'limit': 1 }
+            )
+        except xmlrpc.client.Fault as e:
+            yield None, None, {
+                'status'       : 'error',
+                'message'      : f'Error al ejecutar la consulta a Odoo: {str(e)}',
+                'fault_code'   : e.faultCode,
+                'fault_string' : e.faultString,
+            }
+            return
         
-        #Para cada orden busca la información en los objetos products_data y shipping_data
-        for order in order_sale:
-            #Busca el id de orden en la propiedad que sea el mismo id en move_id
-            products = products_data[order['id']]
-            
-            #Agrega una propiedad de productLines con los productos de la venta a la orden
-            order['productsLines'] = products
-            order['invoice_date'] =  datetime.strptime(order['invoice_date'], "%Y-%m-%d") + timedelta(hours=6)
-            
-            #Busca en shipping_data aquel id de cliente a donde se envia el producto y si contiene algo, guarda la información, y si no lo contiene guarda la información
-            direccion = shipping_data[order['partner_shipping_id'][0]] if order['partner_shipping_id'][0] in shipping_data else {'country_id': False, 'state_id':False, 'city': False}
-            
-            #Agrega las propiedades country_id, state_id y city a la orden, si es False lo guarda como vacio
-            order['country_id'] = direccion['country_id'][1] if direccion['country_id'] else ""
-            order['state_id'] = direccion['state_id'][1] if direccion['state_id'] else ""
-            order['city'] = direccion['city'] if direccion['city'] else ""
+        if not primera:
+            return
+        desde = datetime.strptime(primera[0]['invoice_date'], "%Y-%m-%d").date()
+    
+    inicio = desde.replace(day=1)
+    hoy = date.today()
+    while inicio <= hoy:
+        fin = inicio + relativedelta(months=1)
+        if inicio not in omitir:
+            yield inicio, fin, get_salesWindow(inicio, fin)
+        inicio = fin
+
+
+# --------------------------------------------------------------------------------------------------
+# * Función: get_ventasAsync
+# * Descripción: Versión asíncrona (OdooAPIAsync) de get_allSales, get_newSales y get_salesWindow. Las lineas y
+# *              las direcciones de las ventas se piden al mismo tiempo.
+#
+# ! Parámetros:
+#   - Recibe el dominio de account.move, se le agrega DOMINIO_VENTAS
+#
+# ? Return:
+#   - El mismo JSON de get_allSales
+# --------------------------------------------------------------------------------------------------
+async def get_ventasAsync(dominio=()):
+    try:
+        async with OdooAPIAsync() as odoo:
+            order_sale = await odoo.execute_kw(
+                'account.move', 'search_read', 
+                [list(dominio) + DOMINIO_VENTAS],
+                { 'fields' : CAMPOS_VENTAS,
+                 'order': 'invoice_date asc'
+                }
+            )
+            await enriquecerVentasAsync(order_sale, odoo)
         
-        #Retorna las ventas con toda la información necesaria
         return ({
             'status'  : 'success',
             'ventas' : order_sale
@@ -283,12 +420,47 @@ def get_newSales(ventasIDs):
         })
 
 
+async def get_allSalesAsync():
+    return await get_ventasAsync()
+
+
+async def get_newSalesAsync(ventasIDs, desde=None):
+    return await get_ventasAsync([('name', 'not in', ventasIDs)] + filtroDesde('write_date', desde))
+
+
+async def get_salesWindowAsync(inicio, fin):
+    return await get_ventasAsync([('invoice_date', '>=', inicio.isoformat()), ('invoice_date', '<', fin.isoformat())])
+
+
+# --------------------------------------------------------------------------------------------------
+# * Función: get_direccionesClientes
+# * Descripción: Obtiene de Odoo la dirección (res.partner) de los clientes, activos o archivados
+#
+# ! Parámetros:
+#   - clients_ids, lista de ids de clientes
+#
+# ? Return:
+#   - Lista de res.partner con los campos id, city, state_id y country_id
+# --------------------------------------------------------------------------------------------------
+def get_direccionesClientes(clients_ids):
+    return conn.models.execute_kw(
+        conn.db, conn.uid, conn.password, 
+        'res.partner', 'search_read', 
+        [[
+            ('id', 'in', [int(c) for c in clients_ids]), 
+            '|', ('active', '=', True), ('active', '=', False)
+        ]],
+        { 'fields' : ['city', 'state_id', 'country_id']}
+    )
+
+
 # --------------------------------------------------------------------------------------------------
 # * Función: pullVentasExcel
 # * Descripción: Obtiene todos las Ventas/Facturas y notas de credito de un excel
 #
 # ! Parámetros:
-#   - No recibe ningún parámetro
+#   - df y dfPVH (opcionales), DataFrames con las hojas 'Ventas' y 'pvh'. Si no se envía df se usan las hojas del
+#     Excel de Contpaq. Si se envía df sin dfPVH las ventas quedan sin lineas y con total 0
 #
 # ? Condiciones para saber que productos obtener
 #   1. Debe estar en la página de ventas:
@@ -301,7 +473,7 @@ def get_newSales(ventasIDs):
 #   - Caso error: 
 #       En caso de haber ocurrido algun error retorna un JSON con status error y el mensaje del error
 # -------------------------------------------------------------------------------------------------- 
-def get_VentasExcel():
+def get_VentasExcel(df=None, dfPVH=None):
     #!Determinamos que haya algna conexión con Odoo
     if not conn.models:
         return ({
@@ -312,70 +484,15 @@ def get_VentasExcel():
     #función try para obtener las facturas
     try:
         #Llamamos al excel en la página de ventas
-        df = pd.read_excel(archivo, sheet_name='Ventas')
-        order_sale=[]
-        
-        #Obtenemos los ids de clientes unicos
-        clients_ids= df['idcliente'].unique().tolist()
-        
-        #Buscamos la direccion de cada cliente que este en clients_ids
-        direccion = conn.models.execute_kw(
-            conn.db, conn.uid, conn.password, 
-            'res.partner', 'search_read', 
-            [[
-                ('id', 'in', clients_ids), 
-                '|', ('active', '=', True), ('active', '=', False)
-            ]],
-            { 'fields' : ['city', 'state_id', 'country_id']}
-        )
+        if df is None:
+            df = libro.hoja('Ventas')
+            dfPVH = libro.hoja('pvh')
         
-        shipping_data = {}
-        #Para cada direccion encontrada se guarda como valor y como propiedad le ponemos el id del cliente
-        for dir in direccion:
-            shipping_data[dir['id']]=dir
+        #Buscamos la direccion de cada cliente unico de las ventas
+        direccion = get_direccionesClientes(df['idcliente'].unique().tolist())
         
-        #Recorrer cada linea que hay en el excel
-        for index, venta in df.iterrows():
-            
-            #Obtenemos todos los productos del excel en la pagina de pvh que coincidad con el idVenta
-            productos=dfVenta[dfVenta['idVenta']==venta['idVenta']]
-            productList=[]
-            total=0
-            
-            #Para cada linea de producto obtenido obtenemos sus valores que seran guardados en productList y ademas sumamos sus subtotales para saber el total de la venta
-            for indexP, prod in productos.iterrows():
-                productList.append({
-                    'id': prod['id_odoo'], 
-                    'name': prod['nombreProducto'], 
-                    'product_id': [prod['id_odoo'], ''],
-                    'quantity': prod['Cantidad facturada'], 
-                    'price_unit': prod['Precio unitario'], 
-                    'price_subtotal': prod['Total'],
-                    'move_name': prod['idVenta']
-                })
-                ##'name', 'product_id', 'quantity', 'price_unit', 'price_subtotal', 'move_id'
-                total=total+prod['Total']
-            
-            #Si el idcliente de nuestra venta en excel se encuentra en shipping_data, agrega los valores encontrados y si no setea los valores necesarios como false
-            direccion = shipping_data[venta['idcliente']] if venta['idcliente'] in shipping_data else {'country_id': False, 'state_id':False, 'city': False}
-            
-            #Si se encontro seteo la direccion añade todos los valores recolectados a order_sale
-            if direccion:
-                order_sale.append({
-                    'id': index,
-                    'name': venta["idVenta"],
-                    'invoice_date': datetime.strptime(venta["Fecha"].strftime('%Y-%m-%d'), "%Y-%m-%d") + timedelta(hours=6),
-                    'partner_id': [venta["idcliente"]],
-                    'invoice_user_id': [None, venta["vendedor"]],
-                    'partner_shipping_id': venta["idcliente"],
-                    'branch_id': [None, venta["unidad"]],
-                    'amount_total_signed': total,
-                    'move_type': 'out_invoice',
-                    'productsLines': productList,
-                    'country_id': direccion['country_id'][1] if direccion['country_id'] else "",
-                    'state_id': direccion['state_id'][1] if direccion['state_id'] else "",
-                    'city': direccion['city'] if direccion['city'] != False else ""
-                })
+        #Agrupa las lineas de pvh por venta y une los totales y direcciones sin recorrer fila por fila
+        order_sale = excelVentas.transformarVentasExcel(df, dfPVH, direccion)
                     
         #Retorna todas las ventas   
         return ({
@@ -389,4 +506,59 @@ def get_VentasExcel():
             'message'      : f'Error al ejecutar la consulta a Odoo: {str(e)}',
             'fault_code'   : e.faultCode,
             'fault_string' : e.faultString,
-        })
\ No newline at end of file
+        })
+
+
+# --------------------------------------------------------------------------------------------------
+# * Función: iter_VentasExcel
+# * Descripción: Generador que lee la hoja 'Ventas' del Excel por lotes (streaming) sin cargarla completa en memoria
+#
+# ! Parámetros:
+#   - archivo, ruta del Excel (por default el de Contpaq)
+#   - tamanoLote, cantidad de filas de cada lote
+#
+# ? Return:
+#   - Por cada lote genera un JSON con la misma forma que get_VentasExcel ({ status, ventas } o { status, message }).
+#     Las ventas van sin lineas de producto y con total 0, las lineas se leen después con iter_LineasExcel.
+# --------------------------------------------------------------------------------------------------
+def iter_VentasExcel(archivo=archivo, tamanoLote=5000):
+    #!Determinamos que haya algna conexión con Odoo
+    if not conn.models:
+        yield ({
+            'status'  : 'error',
+            'message' : 'Error en la conexión con Odoo, no hay conexión Activa'
+        })
+        return
+    
+    try:
+        for df in lectorExcel.iterarHoja(archivo, 'Ventas', tamanoLote):
+            #Solo se buscan las direcciones de los clientes del lote
+            direccion = get_direccionesClientes(df['idcliente'].unique().tolist())
+            yield ({
+                'status'  : 'success',
+                'ventas' : excelVentas.transformarVentasExcel(df, None, direccion)
+            })
+            
+    except xmlrpc.client.Fault as e:
+        yield ({
+            'status'       : 'error',
+            'message'      : f'Error al ejecutar la consulta a Odoo: {str(e)}',
+            'fault_code'   : e.faultCode,
+            'fault_string' : e.faultString,
+        })
+
+
+# --------------------------------------------------------------------------------------------------
+# * Función: iter_LineasExcel
+# * Descripción: Generador que lee la hoja 'pvh' del Excel por lotes (streaming)
+#
+# ! Parámetros:
+#   - archivo, ruta del Excel (por default el de Contpaq)
+#   - tamanoLote, cantidad de filas de cada lote
+#
+# ? Return:
+#   - Por cada lote genera la lista de lineas de producto con el formato que recibe insertLineaVentaOdoo
+# --------------------------------------------------------------------------------------------------
+def iter_LineasExcel(archivo=archivo, tamanoLote=5000):
+    for df in lectorExcel.iterarHoja(archivo, 'pvh', tamanoLote):
+        yield excelVentas.lineasExcel(df)
@@ -0,0 +1,130 @@
+import math
+import random
+import time
+from datetime import datetime, timedelta
+
+import pandas as pd
+from django.core.management.base import BaseCommand
+
+from unidades.administracion.reporteVentas.services import excelVentas
+
+# --------------------------------------------------------------------------------------------------
+# * Comando: benchventasexcel
+# * Descripción: Compara el tiempo de la transformación de ventas del Excel de Contpaq con groupby/merge contra
+# *              la implementación anterior con iterrows, y valida que ambas den el mismo resultado.
+#
+# ? Uso:
+#     py manage.py benchventasexcel --archivo static/ContpaqBD.xlsx --ventas 5000
+#
+# ! Nota: No consulta Odoo, las direcciones de los clientes se generan a partir de la hoja 'Clientes'.
+# --------------------------------------------------------------------------------------------------
+class Command(BaseCommand):
+    help = "Benchmark de la importación de ventas del Excel de Contpaq (groupby contra iterrows)"
+    requires_system_checks = []
+
+    def add_arguments(self, parser):
+        parser.add_argument('--archivo', default='static/ContpaqBD.xlsx')
+        parser.add_argument('--ventas', type=int, default=0, help='Limita las ventas de la hoja (0 = todas)')
+        parser.add_argument('--repeticiones', type=int, default=3)
+
+    def handle(self, *args, **options):
+        inicio = time.perf_counter()
+        hojas = pd.read_excel(options['archivo'], sheet_name=['Ventas', 'pvh', 'Clientes'])
+        self.stdout.write(f'Lectura del Excel: {time.perf_counter() - inicio:.2f} s')
+
+        dfVentas, dfPVH = hojas['Ventas'], hojas['pvh']
+        if options['ventas']:
+            dfVentas = dfVentas.head(options['ventas'])
+        direcciones = self.generarDirecciones(hojas['Clientes'])
+        self.stdout.write(f'{len(dfVentas)} ventas, {len(dfPVH)} lineas, {len(direcciones)} direcciones')
+
+        tiempos = {}
+        resultados = {}
+        for modo, funcion in [('groupby', excelVentas.transformarVentasExcel), ('iterrows', ventasExcelIterrows)]:
+            mejor = math.inf
+            for _ in range(options['repeticiones'] if modo == 'groupby' else 1):
+                inicio = time.perf_counter()
+                resultados[modo] = funcion(dfVentas, dfPVH, direcciones)
+                mejor = min(mejor, time.perf_counter() - inicio)
+            tiempos[modo] = mejor
+            self.stdout.write(f'{modo:>9}: {mejor:.3f} s')
+
+        self.stdout.write(f'Speedup: {tiempos["iterrows"]/tiempos["groupby"]:.1f}x')
+
+        diferencias = compararVentas(resultados['groupby'], resultados['iterrows'])
+        if diferencias:
+            self.stderr.write(self.style.ERROR(f'{len(diferencias)} ventas distintas, primera: {diferencias[0]}'))
+            return
+        self.stdout.write(self.style.SUCCESS('Ambas implementaciones producen el mismo resultado'))
+
+    #Simula la respuesta de res.partner de Odoo, algunos clientes quedan sin dirección
+    def generarDirecciones(self, dfClientes):
+        aleatorio = random.Random(7)
+        return [
+            {'id': int(idCliente), 'city': aleatorio.choice(['Guadalajara', 'Monterrey', False]), 'state_id': [1, 'Jalisco'] if aleatorio.random() < 0.9 else False, 'country_id': [156, 'México']}
+            for idCliente in dfClientes['idCliente']
+            if aleatorio.random() < 0.95
+        ]
+
+
+#Compara dos listas de ventas, los totales se comparan con tolerancia porque groupby().sum() usa suma compensada
+#y la suma acumulada de iterrows puede diferir en el último bit (ej. 1608.145 contra 1608.1450000000002)
+def compararVentas(nuevas, anteriores):
+    if len(nuevas) != len(anteriores):
+        return [f'{len(nuevas)} contra {len(anteriores)} ventas']
+
+    diferencias = []
+    for nueva, anterior in zip(nuevas, anteriores):
+        nueva, anterior = dict(nueva), dict(anterior)
+        if not math.isclose(nueva.pop('amount_total_signed'), anterior.pop('amount_total_signed'), abs_tol=1e-6) or nueva != anterior:
+            diferencias.append(anterior['name'])
+    return diferencias
+
+
+# --------------------------------------------------------------------------------------------------
+# * Función: ventasExcelIterrows
+# * Descripción: Implementación anterior de get_VentasExcel (sin la consulta a Odoo), se conserva solo como
+# *              referencia del benchmark. Filtra toda la hoja pvh por cada venta.
+# --------------------------------------------------------------------------------------------------
+def ventasExcelIterrows(df, dfVenta, direccion):
+    order_sale=[]
+    shipping_data = {}
+    for dir in direccion:
+        shipping_data[dir['id']]=dir
+
+    for index, venta in df.iterrows():
+        productos=dfVenta[dfVenta['idVenta']==venta['idVenta']]
+        productList=[]
+        total=0
+
+        for indexP, prod in productos.iterrows():
+            productList.append({
+                'id': prod['id_odoo'],
+                'name': prod['nombreProducto'],
+                'product_id': [prod['id_odoo'], ''],
+                'quantity': prod['Cantidad facturada'],
+                'price_unit': prod['Precio unitario'],
+                'price_subtotal': prod['Total'],
+                'move_name': prod['idVenta']
+            })
+            total=total+prod['Total']
+
+        direccion = shipping_data[venta['idcliente']] if venta['idcliente'] in shipping_data else {'country_id': False, 'state_id':False, 'city': False}
+
+        if direccion:
+            order_sale.append({
+                'id': index,
+                'name': venta["idVenta"],
+                'invoice_date': datetime.strptime(venta["Fecha"].strftime('%Y-%m-%d'), "%Y-%m-%d") + timedelta(hours=6),
+                'partner_id': [venta["idcliente"]],
+                'invoice_user_id': [None, venta["vendedor"]],
+                'partner_shipping_id': venta["idcliente"],
+                'branch_id': [None, venta["unidad"]],
+                'amount_total_signed': total,
+                'move_type': 'out_invoice',
+                'productsLines': productList,
+                'country_id': direccion['country_id'][1] if direccion['country_id'] else "",
+                'state_id': direccion['state_id'][1] if direccion['state_id'] else "",
+                'city': direccion['city'] if direccion['city'] != False else ""
+            })
+    return order_sale
@@ -0,0 +1,43 @@
+from datetime import date
+
+from django.core.management.base import BaseCommand, CommandError
+
+from unidades.administracion.reporteVentas.services import particionesVentas
+
+# --------------------------------------------------------------------------------------------------
+# * Comando: particiones
+# * Descripción: Mantenimiento de las particiones mensuales de ventas y ventaspvh. Crea las de los meses siguientes
+# *              (insertVentas también las crea, así la primera sincronización del mes no lo hace) y desconecta
+# *              los meses viejos para respaldarlos o borrarlos sin bloquear los meses actuales.
+#
+# ? Uso:
+#     py manage.py particiones                                   (crea los 3 meses siguientes y lista las particiones)
+#     py manage.py particiones --meses 6
+#     py manage.py particiones --desconectar-antes 2022-01-01    (desconecta los meses que terminan antes de esa fecha)
+#
+# ! Nota: Las ventas desconectadas dejan de contar en los acumulados de los clientes. Con la partición default
+#         PostgreSQL no permite DETACH CONCURRENTLY, la desconexión bloquea la tabla un momento.
+# --------------------------------------------------------------------------------------------------
+class Command(BaseCommand):
+    help = "Crea las particiones mensuales siguientes de ventas y ventaspvh y desconecta las anteriores a una fecha"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--meses', type=int, default=particionesVentas.MESES_ADELANTE, help='Meses siguientes al actual que se crean')
+        parser.add_argument('--desconectar-antes', help='Fecha YYYY-MM-DD, desconecta los meses que terminan antes')
+
+    def handle(self, *args, **options):
+        creados = particionesVentas.crearSiguientes(options['meses'])
+        for mes in creados:
+            self.stdout.write(self.style.SUCCESS(f'Partición creada: {mes:%Y-%m}'))
+
+        if options['desconectar_antes']:
+            try:
+                antesDe = date.fromisoformat(options['desconectar_antes'])
+            except ValueError:
+                raise CommandError(f'--desconectar-antes debe ser una fecha YYYY-MM-DD, se recibió {options["desconectar_antes"]}')
+            for tabla in particionesVentas.desconectarAnteriores(antesDe):
+                self.stdout.write(self.style.WARNING(f'Desconectada: {tabla}'))
+
+        for tabla, meses in particionesVentas.particiones().items():
+            rango = f'{meses[0][0]:%Y-%m} a {meses[-1][0]:%Y-%m}' if meses else 'sin particiones mensuales'
+            self.stdout.write(f'{tabla}: {len(meses)} meses ({rango}), {sum(filas for _, _, filas in meses)} filas estimadas')
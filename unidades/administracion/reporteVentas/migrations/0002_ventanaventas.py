@@ -0,0 +1,26 @@
+# Generated by Django 5.2.4 on 2026-10-19 11:02
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("reporteVentas", "0001_initial"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="VentanaVentas",
+            fields=[
+                ("inicio", models.DateField(primary_key=True, serialize=False)),
+                ("fin", models.DateField()),
+                ("ventas", models.IntegerField(default=0)),
+                ("notas", models.IntegerField(default=0)),
+                ("fechaTerminada", models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                "db_table": '"administracion"."ventanasventas"',
+            },
+        ),
+    ]
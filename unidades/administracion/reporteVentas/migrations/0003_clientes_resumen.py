@@ -0,0 +1,28 @@
+# Generated by Django 5.2.4 on 2026-10-19 11:06
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("reporteVentas", "0002_ventanaventas"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="clientes",
+            name="primeraCompra",
+            field=models.DateTimeField(null=True),
+        ),
+        migrations.AddField(
+            model_name="clientes",
+            name="totalVendido",
+            field=models.DecimalField(decimal_places=2, default=0, max_digits=20),
+        ),
+        migrations.AddField(
+            model_name="clientes",
+            name="ultimaCompra",
+            field=models.DateTimeField(null=True),
+        ),
+    ]
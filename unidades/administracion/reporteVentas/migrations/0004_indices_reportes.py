@@ -0,0 +1,37 @@
+# Generated by Django 5.2.4 on 2026-10-19 11:57
+
+from django.contrib.postgres.operations import AddIndexConcurrently
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    #Los índices se crean sin bloquear las escrituras a las tablas, CREATE INDEX CONCURRENTLY no corre en una transacción
+    atomic = False
+
+    dependencies = [
+        ("maxMin", "0002_indices_reportes"),
+        ("reporteVentas", "0003_clientes_resumen"),
+    ]
+
+    operations = [
+        AddIndexConcurrently(
+            model_name="caducidades",
+            index=models.Index(fields=["fechaCaducidad"], name="caducidades_fecha_idx"),
+        ),
+        AddIndexConcurrently(
+            model_name="ventas",
+            index=models.Index(
+                condition=models.Q(("idVenta__startswith", "R"), _negated=True),
+                fields=["fecha"],
+                name="ventas_fecha_sin_notas_idx",
+            ),
+        ),
+        AddIndexConcurrently(
+            model_name="ventaspvh",
+            index=models.Index(
+                fields=["producto", "venta"],
+                include=("cantidad",),
+                name="ventaspvh_producto_venta_idx",
+            ),
+        ),
+    ]
@@ -0,0 +1,150 @@
+from django.db import migrations, models
+import django.db.models.deletion
+
+#Las tablas particionadas se crean con otro nombre, se copian los datos y se reemplazan las originales. En PostgreSQL
+#16 una tabla particionada no puede tener columnas identity ni una llave única sin la columna de la partición, por
+#eso idPVH usa una secuencia y las llaves primarias incluyen la fecha
+SQL_PARTICIONAR = r"""
+CREATE TABLE "administracion"."ventas_nueva" (LIKE "administracion"."ventas" INCLUDING DEFAULTS)
+    PARTITION BY RANGE (fecha);
+CREATE TABLE "administracion"."ventaspvh_nueva" (
+    "idPVH" bigint NOT NULL,
+    cantidad bigint NOT NULL,
+    "precioUnitario" numeric(20,2) NOT NULL,
+    subtotal numeric(20,2) NOT NULL,
+    producto_id bigint,
+    venta_id varchar(20) NOT NULL,
+    fecha timestamp with time zone NOT NULL
+) PARTITION BY RANGE (fecha);
+
+CREATE TABLE "administracion"."ventas_default" PARTITION OF "administracion"."ventas_nueva" DEFAULT;
+CREATE TABLE "administracion"."ventaspvh_default" PARTITION OF "administracion"."ventaspvh_nueva" DEFAULT;
+
+--Un mes por partición desde la venta más antigua hasta 3 meses después del actual
+DO $$
+DECLARE
+    mes date := date_trunc('month', COALESCE((SELECT min(fecha) FROM "administracion"."ventas"), now()) AT TIME ZONE 'UTC');
+    ultimo date := date_trunc('month', now() AT TIME ZONE 'UTC') + interval '3 months';
+    sufijo text;
+BEGIN
+    WHILE mes <= ultimo LOOP
+        sufijo := to_char(mes, 'YYYY_MM');
+        EXECUTE format(
+            'CREATE TABLE "administracion".%I PARTITION OF "administracion"."ventas_nueva" FOR VALUES FROM (%L) TO (%L)',
+            'ventas_' || sufijo, mes || ' 00:00:00+00', (mes + interval '1 month')::date || ' 00:00:00+00'
+        );
+        EXECUTE format(
+            'CREATE TABLE "administracion".%I PARTITION OF "administracion"."ventaspvh_nueva" FOR VALUES FROM (%L) TO (%L)',
+            'ventaspvh_' || sufijo, mes || ' 00:00:00+00', (mes + interval '1 month')::date || ' 00:00:00+00'
+        );
+        mes := mes + interval '1 month';
+    END LOOP;
+END $$;
+
+INSERT INTO "administracion"."ventas_nueva" SELECT * FROM "administracion"."ventas";
+INSERT INTO "administracion"."ventaspvh_nueva"
+    ("idPVH", cantidad, "precioUnitario", subtotal, producto_id, venta_id, fecha)
+SELECT pvh."idPVH", pvh.cantidad, pvh."precioUnitario", pvh.subtotal, pvh.producto_id, pvh.venta_id, v.fecha
+FROM "administracion"."ventaspvh" pvh
+JOIN "administracion"."ventas" v ON v."idVenta" = pvh.venta_id;
+
+DROP TABLE "administracion"."ventaspvh";
+DROP TABLE "administracion"."ventas";
+ALTER TABLE "administracion"."ventas_nueva" RENAME TO "ventas";
+ALTER TABLE "administracion"."ventaspvh_nueva" RENAME TO "ventaspvh";
+
+CREATE SEQUENCE "administracion"."ventaspvh_idPVH_seq" OWNED BY "administracion"."ventaspvh"."idPVH";
+ALTER TABLE "administracion"."ventaspvh" ALTER COLUMN "idPVH" SET DEFAULT nextval('"administracion"."ventaspvh_idPVH_seq"');
+SELECT setval('"administracion"."ventaspvh_idPVH_seq"', COALESCE(max("idPVH"), 0) + 1, false) FROM "administracion"."ventaspvh";
+
+--Mismos nombres de índices y llaves que creó Django
+ALTER TABLE "administracion"."ventas" ADD CONSTRAINT "ventas_pkey" PRIMARY KEY ("idVenta", fecha);
+CREATE INDEX "ventas_cliente_id_30fc3b9d" ON "administracion"."ventas" (cliente_id);
+CREATE INDEX "ventas_idVenta_9ac2e024_like" ON "administracion"."ventas" ("idVenta" varchar_pattern_ops);
+CREATE INDEX "ventas_fecha_sin_notas_idx" ON "administracion"."ventas" (fecha) WHERE NOT ("idVenta"::text LIKE 'R%');
+ALTER TABLE "administracion"."ventas" ADD CONSTRAINT "ventas_cliente_id_30fc3b9d_fk_clientes_idCliente"
+    FOREIGN KEY (cliente_id) REFERENCES "administracion"."clientes" ("idCliente") DEFERRABLE INITIALLY DEFERRED;
+
+ALTER TABLE "administracion"."ventaspvh" ADD CONSTRAINT "ventaspvh_pkey" PRIMARY KEY ("idPVH", fecha);
+CREATE INDEX "ventaspvh_producto_id_71947c4b" ON "administracion"."ventaspvh" (producto_id);
+CREATE INDEX "ventaspvh_venta_id_a2adc0e6" ON "administracion"."ventaspvh" (venta_id);
+CREATE INDEX "ventaspvh_venta_id_a2adc0e6_like" ON "administracion"."ventaspvh" (venta_id varchar_pattern_ops);
+CREATE INDEX "ventaspvh_producto_venta_idx" ON "administracion"."ventaspvh" (producto_id, venta_id) INCLUDE (cantidad);
+ALTER TABLE "administracion"."ventaspvh" ADD CONSTRAINT "ventaspvh_producto_id_71947c4b_fk_productos_idProductoTmp"
+    FOREIGN KEY (producto_id) REFERENCES "produccionlogistica"."productos" ("idProductoTmp") DEFERRABLE INITIALLY DEFERRED;
+"""
+
+#Regresa a las tablas sin particiones de 0004_indices_reportes. Falla si un idVenta se repite en dos fechas o si una
+#linea no tiene venta. Las particiones desconectadas con el comando particiones no se tocan, sus filas no regresan
+SQL_DESPARTICIONAR = r"""
+CREATE TABLE "administracion"."ventas_nueva" (LIKE "administracion"."ventas" INCLUDING DEFAULTS);
+CREATE TABLE "administracion"."ventaspvh_nueva" (
+    "idPVH" bigint NOT NULL GENERATED BY DEFAULT AS IDENTITY,
+    cantidad bigint NOT NULL,
+    "precioUnitario" numeric(20,2) NOT NULL,
+    subtotal numeric(20,2) NOT NULL,
+    producto_id bigint,
+    venta_id varchar(20) NOT NULL
+);
+
+INSERT INTO "administracion"."ventas_nueva" SELECT * FROM "administracion"."ventas";
+INSERT INTO "administracion"."ventaspvh_nueva" ("idPVH", cantidad, "precioUnitario", subtotal, producto_id, venta_id)
+SELECT "idPVH", cantidad, "precioUnitario", subtotal, producto_id, venta_id FROM "administracion"."ventaspvh";
+SELECT setval(pg_get_serial_sequence('"administracion"."ventaspvh_nueva"', 'idPVH'), COALESCE(max("idPVH"), 0) + 1, false)
+FROM "administracion"."ventaspvh_nueva";
+
+--Borra también las particiones conectadas y la secuencia de idPVH
+DROP TABLE "administracion"."ventaspvh";
+DROP TABLE "administracion"."ventas";
+ALTER TABLE "administracion"."ventas_nueva" RENAME TO "ventas";
+ALTER TABLE "administracion"."ventaspvh_nueva" RENAME TO "ventaspvh";
+ALTER SEQUENCE "administracion"."ventaspvh_nueva_idPVH_seq" RENAME TO "ventaspvh_idPVH_seq";
+
+ALTER TABLE "administracion"."ventas" ADD CONSTRAINT "ventas_pkey" PRIMARY KEY ("idVenta");
+CREATE INDEX "ventas_cliente_id_30fc3b9d" ON "administracion"."ventas" (cliente_id);
+CREATE INDEX "ventas_idVenta_9ac2e024_like" ON "administracion"."ventas" ("idVenta" varchar_pattern_ops);
+CREATE INDEX "ventas_fecha_sin_notas_idx" ON "administracion"."ventas" (fecha) WHERE NOT ("idVenta"::text LIKE 'R%');
+ALTER TABLE "administracion"."ventas" ADD CONSTRAINT "ventas_cliente_id_30fc3b9d_fk_clientes_idCliente"
+    FOREIGN KEY (cliente_id) REFERENCES "administracion"."clientes" ("idCliente") DEFERRABLE INITIALLY DEFERRED;
+
+ALTER TABLE "administracion"."ventaspvh" ADD CONSTRAINT "ventaspvh_pkey" PRIMARY KEY ("idPVH");
+CREATE INDEX "ventaspvh_producto_id_71947c4b" ON "administracion"."ventaspvh" (producto_id);
+CREATE INDEX "ventaspvh_venta_id_a2adc0e6" ON "administracion"."ventaspvh" (venta_id);
+CREATE INDEX "ventaspvh_venta_id_a2adc0e6_like" ON "administracion"."ventaspvh" (venta_id varchar_pattern_ops);
+CREATE INDEX "ventaspvh_producto_venta_idx" ON "administracion"."ventaspvh" (producto_id, venta_id) INCLUDE (cantidad);
+ALTER TABLE "administracion"."ventaspvh" ADD CONSTRAINT "ventaspvh_producto_id_71947c4b_fk_productos_idProductoTmp"
+    FOREIGN KEY (producto_id) REFERENCES "produccionlogistica"."productos" ("idProductoTmp") DEFERRABLE INITIALLY DEFERRED;
+ALTER TABLE "administracion"."ventaspvh" ADD CONSTRAINT "ventaspvh_venta_id_a2adc0e6_fk_ventas_idVenta"
+    FOREIGN KEY (venta_id) REFERENCES "administracion"."ventas" ("idVenta") DEFERRABLE INITIALLY DEFERRED;
+"""
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("maxMin", "0002_indices_reportes"),
+        ("reporteVentas", "0004_indices_reportes"),
+    ]
+
+    operations = [
+        migrations.SeparateDatabaseAndState(
+            database_operations=[migrations.RunSQL(SQL_PARTICIONAR, reverse_sql=SQL_DESPARTICIONAR)],
+            state_operations=[
+                migrations.AddField(
+                    model_name="ventaspvh",
+                    name="fecha",
+                    field=models.DateTimeField(),
+                ),
+                migrations.AlterField(
+                    model_name="ventaspvh",
+                    name="venta",
+                    field=models.ForeignKey(
+                        db_constraint=False,
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="ventasPVHVenta",
+                        to="reporteVentas.ventas",
+                    ),
+                ),
+            ],
+        ),
+    ]
@@ -0,0 +1,82 @@
+from django.db import migrations
+
+#En ventas particionada la llave primaria es ("idVenta", fecha) y ventaspvh no tiene llave foránea a ventas (ver
+#0005_particiones_ventas). ventas_ids guarda el idVenta y la fecha de cada venta con una llave primaria de idVenta
+#en una sola tabla (sin partición):
+#   - Un idVenta repetido aunque tenga otra fecha falla por ventas_ids_pkey (unique_violation)
+#   - ventaspvh tiene llave foránea (venta_id, fecha) a ventas_ids, una linea sin venta o borrar una venta con
+#     lineas falla al terminar la transacción, igual que la llave foránea a ventas de antes de particionar
+#Los triggers son por sentencia en la tabla padre, no se copian a las particiones, así las filas que
+#particionesVentas.crearParticion mueve directo entre particiones no cambian ventas_ids. TRUNCATE de ventas no
+#pasa por los triggers, hay que vaciar también ventas_ids
+SQL_INTEGRIDAD = r"""
+CREATE TABLE "administracion"."ventas_ids" (
+    "idVenta" varchar(20) NOT NULL,
+    fecha timestamp with time zone NOT NULL,
+    CONSTRAINT "ventas_ids_pkey" PRIMARY KEY ("idVenta"),
+    CONSTRAINT "ventas_ids_idventa_fecha_uniq" UNIQUE ("idVenta", fecha)
+);
+INSERT INTO "administracion"."ventas_ids" SELECT "idVenta", fecha FROM "administracion"."ventas";
+
+ALTER TABLE "administracion"."ventaspvh" ADD CONSTRAINT "ventaspvh_venta_fecha_fk_ventas_ids"
+    FOREIGN KEY (venta_id, fecha) REFERENCES "administracion"."ventas_ids" ("idVenta", fecha) DEFERRABLE INITIALLY DEFERRED;
+
+CREATE FUNCTION "administracion"."ventas_registrar_ids"() RETURNS trigger LANGUAGE plpgsql AS $$
+BEGIN
+    IF TG_OP = 'INSERT' THEN
+        INSERT INTO "administracion"."ventas_ids" SELECT "idVenta", fecha FROM nuevas;
+    ELSIF TG_OP = 'DELETE' THEN
+        DELETE FROM "administracion"."ventas_ids" i USING anteriores a WHERE i."idVenta" = a."idVenta";
+    ELSE
+        --Solo cambian las ventas a las que se les modificó el idVenta o la fecha
+        DELETE FROM "administracion"."ventas_ids" i
+        USING anteriores a
+        WHERE i."idVenta" = a."idVenta"
+          AND NOT EXISTS (SELECT 1 FROM nuevas n WHERE n."idVenta" = a."idVenta" AND n.fecha = a.fecha);
+        INSERT INTO "administracion"."ventas_ids"
+        SELECT n."idVenta", n.fecha FROM nuevas n
+        WHERE NOT EXISTS (SELECT 1 FROM anteriores a WHERE a."idVenta" = n."idVenta" AND a.fecha = n.fecha);
+    END IF;
+    RETURN NULL;
+END $$;
+
+--Una tabla de transición solo se puede usar en triggers de un solo evento
+CREATE TRIGGER "ventas_ids_insert" AFTER INSERT ON "administracion"."ventas"
+    REFERENCING NEW TABLE AS nuevas FOR EACH STATEMENT EXECUTE FUNCTION "administracion"."ventas_registrar_ids"();
+CREATE TRIGGER "ventas_ids_update" AFTER UPDATE ON "administracion"."ventas"
+    REFERENCING OLD TABLE AS anteriores NEW TABLE AS nuevas FOR EACH STATEMENT EXECUTE FUNCTION "administracion"."ventas_registrar_ids"();
+CREATE TRIGGER "ventas_ids_delete" AFTER DELETE ON "administracion"."ventas"
+    REFERENCING OLD TABLE AS anteriores FOR EACH STATEMENT EXECUTE FUNCTION "administracion"."ventas_registrar_ids"();
+"""
+
+SQL_QUITAR_INTEGRIDAD = r"""
+DROP TRIGGER "ventas_ids_insert" ON "administracion"."ventas";
+DROP TRIGGER "ventas_ids_update" ON "administracion"."ventas";
+DROP TRIGGER "ventas_ids_delete" ON "administracion"."ventas";
+DROP FUNCTION "administracion"."ventas_registrar_ids"();
+ALTER TABLE "administracion"."ventaspvh" DROP CONSTRAINT "ventaspvh_venta_fecha_fk_ventas_ids";
+DROP TABLE "administracion"."ventas_ids";
+"""
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("reporteVentas", "0005_particiones_ventas"),
+    ]
+
+    operations = [
+        #Ninguna consulta filtra ventas por fecha sin notas de crédito, los reportes por fecha usan ventaspvh.fecha.
+        #RemoveIndex borra el índice sin el esquema y no lo encuentra, por eso se borra con SQL
+        migrations.SeparateDatabaseAndState(
+            database_operations=[migrations.RunSQL(
+                'DROP INDEX "administracion"."ventas_fecha_sin_notas_idx";',
+                reverse_sql='CREATE INDEX "ventas_fecha_sin_notas_idx" ON "administracion"."ventas" (fecha) WHERE NOT ("idVenta"::text LIKE \'R%\');'
+            )],
+            state_operations=[migrations.RemoveIndex(
+                model_name="ventas",
+                name="ventas_fecha_sin_notas_idx",
+            )],
+        ),
+        migrations.RunSQL(SQL_INTEGRIDAD, reverse_sql=SQL_QUITAR_INTEGRIDAD),
+    ]
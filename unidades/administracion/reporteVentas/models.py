@@ -10,11 +10,18 @@ class Clientes(models.Model):
     ciudad = models.CharField(max_length=200)
     tipoCliente=models.CharField(max_length=20, default="Cliente Nuevo")
     numTransacciones=models.BigIntegerField(default=0)
+    primeraCompra=models.DateTimeField(null=True)
+    ultimaCompra=models.DateTimeField(null=True)
+    totalVendido=models.DecimalField(decimal_places=2, max_digits=20, default=0)
     
     class Meta:
         db_table = '"administracion"."clientes"'
 
-#? Tabla de ventas en el esquema de administracion
+#? Tabla de ventas en el esquema de administracion, particionada por mes de fecha (ver services/particionesVentas)
+#? Para Django la llave primaria es idVenta, en PostgreSQL es ("idVenta", fecha) porque la llave de una tabla
+#? particionada debe incluir la columna de la partición. Las consultas y actualizaciones por venta deben usar
+#? también la fecha, así PostgreSQL solo revisa la partición de su mes (ej. clasificacionClientes,
+#? sincronizacionVentas.sumarTotalesVentas). ventas_ids mantiene único el idVenta (0006_integridad_ventas)
 class Ventas(models.Model):
     idVenta = models.CharField(max_length=20, primary_key=True)
     fecha = models.DateTimeField()
@@ -30,17 +37,23 @@ class Ventas(models.Model):
     class Meta:
         db_table = '"administracion"."ventas"'
 
-#? Tabla de ventasPVH en el esquema de administracion
+#? Tabla de ventasPVH en el esquema de administracion, particionada por mes de la fecha de su venta
 class VentasPVH(models.Model):
     idPVH = models.BigAutoField(primary_key=True)
-    venta = models.ForeignKey(Ventas, related_name="ventasPVHVenta", on_delete=models.CASCADE)
+    #Sin llave foránea a ventas, ventas particionada no puede tener una llave única solo de idVenta. En PostgreSQL la llave
+    #foránea (venta_id, fecha) es a ventas_ids (ver la migración 0006_integridad_ventas)
+    venta = models.ForeignKey(Ventas, related_name="ventasPVHVenta", on_delete=models.CASCADE, db_constraint=False)
     producto = models.ForeignKey(Productos, related_name="ventasPVHProducto", on_delete=models.CASCADE, null=True)
     cantidad = models.BigIntegerField()
     precioUnitario = models.DecimalField(decimal_places=2, max_digits=20)
     subtotal = models.DecimalField(decimal_places=2, max_digits=20)
+    #Copia de la fecha de la venta, llave de la partición
+    fecha = models.DateTimeField()
     
     class Meta:
         db_table = '"administracion"."ventaspvh"'
+        #Suma de cantidades por producto (updateMaxMinOdoo) sin leer la tabla
+        indexes = [models.Index(fields=['producto', 'venta'], include=['cantidad'], name='ventaspvh_producto_venta_idx')]
 
 #? Tabla de ventasPVA en el esquema de produccionLogistica
 class Caducidades(models.Model):
@@ -50,4 +63,16 @@ class Caducidades(models.Model):
     producto = models.ForeignKey(Productos, related_name="productoCaducidad", on_delete=models.CASCADE)
     
     class Meta:
-        db_table = '"produccionlogistica"."caducidades"'
\ No newline at end of file
+        db_table = '"produccionlogistica"."caducidades"'
+        indexes = [models.Index(fields=['fechaCaducidad'], name='caducidades_fecha_idx')]
+
+#? Tabla de control de las ventanas mensuales de ventas ya cargadas desde Odoo en el esquema de administracion
+class VentanaVentas(models.Model):
+    inicio = models.DateField(primary_key=True)
+    fin = models.DateField()
+    ventas = models.IntegerField(default=0)
+    notas = models.IntegerField(default=0)
+    fechaTerminada = models.DateTimeField(auto_now=True)
+    
+    class Meta:
+        db_table = '"administracion"."ventanasventas"'
@@ -0,0 +1,85 @@
+from django.db import connection
+
+from unidades.administracion.reporteVentas.models import Ventas, Clientes
+
+# --------------------------------------------------------------------------------------------------
+# * Módulo: clasificacionClientes
+# * Descripción: Calcula el tipo de cliente de cada venta (Nuevo, Recuperado o Cartera) directamente en
+# *              PostgreSQL con funciones de ventana sobre toda la tabla de ventas, sin depender del orden
+# *              en que se cargaron las ventas (Odoo, Excel, por meses, etc).
+#
+# ? Reglas, recorriendo las ventas de cada cliente por fecha (y idVenta para desempatar):
+#     - transacciones: cantidad de facturas (las notas de crédito empiezan con "R" y no cuentan) hasta la venta actual
+#     - Cliente Nuevo: si tiene menos de 2 transacciones o si la venta es del mismo mes que la última venta
+#       que tuvo con menos de 2 transacciones (compras del mismo mes de alta siguen siendo de cliente nuevo)
+#     - Cliente Recuperado: si pasaron más de 180 días desde su venta anterior (LAG(fecha))
+#     - Cliente Cartera: en cualquier otro caso
+#     - El tipo del cliente en la tabla de clientes es el tipo de su venta más reciente
+# --------------------------------------------------------------------------------------------------
+
+SQL_CLASIFICAR_VENTAS = f"""
+    WITH base AS (
+        SELECT "idVenta", cliente_id, fecha,
+               SUM(CASE WHEN "idVenta" LIKE 'R%%' THEN 0 ELSE 1 END) OVER w AS transacciones,
+               LAG(fecha) OVER w AS anterior
+        FROM {Ventas._meta.db_table}
+        WHERE %(todos)s OR cliente_id = ANY(%(clientes)s)
+        WINDOW w AS (PARTITION BY cliente_id ORDER BY fecha, "idVenta")
+    ), altas AS (
+        SELECT base.*,
+               MAX(CASE WHEN transacciones < 2 THEN fecha END) OVER (PARTITION BY cliente_id) AS ultimaAlta
+        FROM base
+    ), tipos AS (
+        SELECT "idVenta", fecha,
+               CASE
+                   WHEN transacciones < 2 OR date_trunc('month', fecha) = date_trunc('month', ultimaAlta) THEN 'Cliente Nuevo'
+                   WHEN fecha::date - anterior::date > 180 THEN 'Cliente Recuperado'
+                   ELSE 'Cliente Cartera'
+               END AS tipo
+        FROM altas
+    )
+    UPDATE {Ventas._meta.db_table} AS v
+    SET "tipoCliente" = tipos.tipo
+    FROM tipos
+    WHERE v."idVenta" = tipos."idVenta" AND v.fecha = tipos.fecha AND v."tipoCliente" IS DISTINCT FROM tipos.tipo
+"""
+
+SQL_CLASIFICAR_CLIENTES = f"""
+    UPDATE {Clientes._meta.db_table} AS c
+    SET "tipoCliente" = ultima."tipoCliente"
+    FROM (
+        SELECT DISTINCT ON (cliente_id) cliente_id, "tipoCliente"
+        FROM {Ventas._meta.db_table}
+        WHERE %(todos)s OR cliente_id = ANY(%(clientes)s)
+        ORDER BY cliente_id, fecha DESC, "idVenta" DESC
+    ) AS ultima
+    WHERE c."idCliente" = ultima.cliente_id AND c."tipoCliente" IS DISTINCT FROM ultima."tipoCliente"
+"""
+
+
+# --------------------------------------------------------------------------------------------------
+# * Función: clasificarClientes
+# * Descripción: Recalcula el tipo de cliente de las ventas y de los clientes
+#
+# ! Parámetros:
+#     - clientes (opcional), lista de idCliente a recalcular. Se recalcula todo el historial de esos clientes,
+#       por lo que basta con enviar los clientes que tuvieron ventas nuevas. Si no se envía se recalculan todos.
+#
+# ? Returns:
+#     - Diccionario con la cantidad de ventas y de clientes que cambiaron de tipo
+# --------------------------------------------------------------------------------------------------
+def clasificarClientes(clientes=None):
+    parametros = {
+        'todos': clientes is None,
+        'clientes': [int(c) for c in clientes] if clientes is not None else [],
+    }
+    if clientes is not None and not parametros['clientes']:
+        return {'ventas': 0, 'clientes': 0}
+
+    with connection.cursor() as cursor:
+        cursor.execute(SQL_CLASIFICAR_VENTAS, parametros)
+        ventas = cursor.rowcount
+        cursor.execute(SQL_CLASIFICAR_CLIENTES, parametros)
+        clientesActualizados = cursor.rowcount
+
+    return {'ventas': ventas, 'clientes': clientesActualizados}
@@ -0,0 +1,107 @@
+import pandas as pd
+
+# --------------------------------------------------------------------------------------------------
+# * Módulo: excelVentas
+# * Descripción: Transforma las hojas 'Ventas' y 'pvh' del Excel de Contpaq al mismo formato de ventas que
+# *              regresa Odoo (account.move con productsLines), sin recorrer los DataFrames con iterrows.
+#
+# ? Estrategia:
+#     - Las lineas de pvh se agrupan por idVenta en una sola pasada (antes se filtraba toda la hoja por cada venta)
+#     - Los totales de cada venta se obtienen con groupby().sum()
+#     - Las direcciones de los clientes se unen a las ventas con un merge
+#
+# ! Nota: Este módulo no consulta Odoo ni la base de datos, recibe las direcciones ya consultadas.
+# --------------------------------------------------------------------------------------------------
+
+COLUMNAS_DIRECCION = ['country_id', 'state_id', 'city']
+
+
+# --------------------------------------------------------------------------------------------------
+# * Función: lineasExcel
+# * Descripción: Convierte la hoja pvh (o un lote de ella) a lineas de producto (account.move.line)
+#
+# ! Parámetros:
+#     - dfPVH, DataFrame de la hoja 'pvh' con las columnas idVenta, id_odoo, nombreProducto,
+#       'Cantidad facturada', 'Precio unitario' y Total
+#
+# ? Returns:
+#     - Lista de lineas con los campos id, name, product_id, quantity, price_unit, price_subtotal y move_name
+# --------------------------------------------------------------------------------------------------
+def lineasExcel(dfPVH):
+    lineas = pd.DataFrame({
+        'id': dfPVH['id_odoo'],
+        'name': dfPVH['nombreProducto'],
+        'quantity': dfPVH['Cantidad facturada'],
+        'price_unit': dfPVH['Precio unitario'],
+        'price_subtotal': dfPVH['Total'],
+        'move_name': dfPVH['idVenta'],
+    }).to_dict('records')
+
+    for linea in lineas:
+        linea['product_id'] = [linea['id'], '']
+    return lineas
+
+
+#Agrupa las lineas de pvh por idVenta en una sola pasada, conservando el orden de la hoja
+def agruparLineas(dfPVH):
+    productsLines = {}
+    for linea in lineasExcel(dfPVH):
+        productsLines.setdefault(linea['move_name'], []).append(linea)
+    return productsLines
+
+
+# --------------------------------------------------------------------------------------------------
+# * Función: transformarVentasExcel
+# * Descripción: Construye la lista de ventas del Excel con sus lineas, total y dirección del cliente
+#
+# ! Parámetros:
+#     - dfVentas, DataFrame de la hoja 'Ventas' con las columnas idVenta, Fecha, unidad, vendedor e idcliente
+#     - dfPVH, DataFrame de la hoja 'pvh' (ver lineasExcel). Si es None las ventas quedan sin lineas y con total 0,
+#       se usa al leer por lotes donde las lineas se cargan después (ver ctrVentas.iter_VentasExcel)
+#     - direcciones, lista de res.partner de Odoo con los campos id, city, state_id y country_id
+#
+# ? Returns:
+#     - Lista de ventas con el formato que recibe insertVentas, en el mismo orden que la hoja 'Ventas'
+# --------------------------------------------------------------------------------------------------
+def transformarVentasExcel(dfVentas, dfPVH, direcciones):
+    if dfPVH is not None:
+        productsLines = agruparLineas(dfPVH)
+        totales = dfPVH.groupby('idVenta', sort=False)['Total'].sum()
+    else:
+        productsLines = {}
+        totales = pd.Series(dtype='float64')
+
+    #Direcciones ya en texto, los clientes que no se encuentren quedan con cadenas vacías
+    dfDirecciones = pd.DataFrame(
+        [{
+            'idcliente': d['id'],
+            'country_id': d['country_id'][1] if d['country_id'] else "",
+            'state_id': d['state_id'][1] if d['state_id'] else "",
+            'city': d['city'] if d['city'] != False else "",
+        } for d in direcciones],
+        columns=['idcliente'] + COLUMNAS_DIRECCION,
+    ).drop_duplicates('idcliente').astype({'idcliente': dfVentas['idcliente'].dtype})
+
+    ventas = dfVentas.reset_index(names='id').merge(dfDirecciones, on='idcliente', how='left')
+    ventas[COLUMNAS_DIRECCION] = ventas[COLUMNAS_DIRECCION].fillna("")
+    ventas['total'] = ventas['idVenta'].map(totales).fillna(0)
+    ventas['fecha'] = pd.to_datetime(ventas['Fecha']).dt.normalize() + pd.Timedelta(hours=6)
+
+    return [
+        {
+            'id': venta['id'],
+            'name': venta['idVenta'],
+            'invoice_date': venta['fecha'].to_pydatetime(),
+            'partner_id': [venta['idcliente']],
+            'invoice_user_id': [None, venta['vendedor']],
+            'partner_shipping_id': venta['idcliente'],
+            'branch_id': [None, venta['unidad']],
+            'amount_total_signed': venta['total'],
+            'move_type': 'out_invoice',
+            'productsLines': productsLines.get(venta['idVenta'], []),
+            'country_id': venta['country_id'],
+            'state_id': venta['state_id'],
+            'city': venta['city'],
+        }
+        for venta in ventas[['id', 'idVenta', 'fecha', 'idcliente', 'vendedor', 'unidad', 'total'] + COLUMNAS_DIRECCION].to_dict('records')
+    ]
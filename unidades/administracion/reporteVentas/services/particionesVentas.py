@@ -0,0 +1,196 @@
+import re
+import threading
+from datetime import date, datetime
+
+from django.db import connection, transaction
+
+from unidades.administracion.reporteVentas.models import Ventas, VentasPVH
+
+# --------------------------------------------------------------------------------------------------
+# * Módulo: particionesVentas
+# * Descripción: Particiones mensuales por fecha de factura de ventas y ventaspvh (ver la migración
+# *              0005_particiones_ventas). Cada mes tiene una partición por tabla, ej. ventas_2025_01 y
+# *              ventaspvh_2025_01, y una partición default (ventas_default, ventaspvh_default) recibe las
+# *              fechas que todavía no tienen partición, así una inserción nunca falla por la fecha.
+#
+# ? Uso:
+#     - insertVentas llama a asegurarMeses con los meses de cada lote antes de insertar
+#     - El comando "particiones" crea los meses siguientes y desconecta los años viejos
+#
+# ! Nota: En las tablas particionadas la llave primaria incluye la fecha ("idVenta", fecha) y ("idPVH", fecha), por
+#         eso ventaspvh ya no tiene llave foránea a ventas (db_constraint=False). Django sigue usando idVenta
+#         como llave. La tabla ventas_ids de la migración 0006_integridad_ventas rechaza un idVenta repetido y
+#         ventaspvh tiene llave foránea a ella, y todas las escrituras de ventas (sincronizaciones, pullVentasExcel
+#         y cargarArchivos) usan el candado de la entidad ventas.
+# --------------------------------------------------------------------------------------------------
+
+#? Tablas particionadas, la partición de cada mes de las dos tablas se crea y desconecta al mismo tiempo
+TABLAS = (Ventas, VentasPVH)
+
+#? idVenta y fecha de las ventas conectadas y llave foránea de ventaspvh a esa tabla (ver la migración 0006_integridad_ventas)
+TABLA_IDS = '"administracion"."ventas_ids"'
+LLAVE_LINEAS = 'ventaspvh_venta_fecha_fk_ventas_ids'
+
+#? Meses siguientes al actual que se crean por adelantado
+MESES_ADELANTE = 3
+
+#Meses que ya tienen partición en este proceso, evita revisar el catálogo en cada lote
+_meses = set()
+_candado = threading.Lock()
+
+
+#Esquema y nombre sin comillas de la tabla de un modelo ('"administracion"."ventas"' -> ('administracion', 'ventas'))
+def _esquemaTabla(modelo):
+    return tuple(parte.strip('"') for parte in modelo._meta.db_table.split('.'))
+
+
+def _nombre(modelo, sufijo):
+    esquema, tabla = _esquemaTabla(modelo)
+    return f'"{esquema}"."{tabla}_{sufijo}"'
+
+
+#Primer día del mes de una fecha (date, datetime o texto 'YYYY-MM-DD...' como llega de Odoo)
+def mesDe(fecha):
+    if isinstance(fecha, (date, datetime)):
+        return date(fecha.year, fecha.month, 1)
+    return datetime.strptime(str(fecha)[:7], '%Y-%m').date()
+
+
+def _siguienteMes(mes):
+    return date(mes.year + mes.month // 12, mes.month % 12 + 1, 1)
+
+
+# --------------------------------------------------------------------------------------------------
+# * Función: crearParticion
+# * Descripción: Crea la partición de un mes en ventas y ventaspvh si no existe. Las filas de ese mes que ya
+# *              estaban en la partición default se mueven a la nueva antes de conectarla.
+#
+# ! Parámetros:
+#     - mes, date de cualquier día del mes
+#
+# ? Returns:
+#     - True si se creó, False si ya existía
+# --------------------------------------------------------------------------------------------------
+def crearParticion(mes):
+    mes = mesDe(mes)
+    sufijo = f'{mes.year}_{mes.month:02d}'
+    inicio, fin = f"'{mes.isoformat()} 00:00:00+00'", f"'{_siguienteMes(mes).isoformat()} 00:00:00+00'"
+
+    with connection.cursor() as cursor:
+        cursor.execute('SELECT to_regclass(%s)', [_nombre(Ventas, sufijo)])
+        if cursor.fetchone()[0] is not None:
+            return False
+
+    with transaction.atomic(), connection.cursor() as cursor:
+        for modelo in TABLAS:
+            tabla, particion, default = modelo._meta.db_table, _nombre(modelo, sufijo), _nombre(modelo, 'default')
+            cursor.execute(f'CREATE TABLE {particion} (LIKE {tabla} INCLUDING DEFAULTS)')
+            cursor.execute(
+                f'WITH movidas AS (DELETE FROM {default} WHERE fecha >= {inicio} AND fecha < {fin} RETURNING *) '
+                f'INSERT INTO {particion} SELECT * FROM movidas'
+            )
+            cursor.execute(f'ALTER TABLE {tabla} ATTACH PARTITION {particion} FOR VALUES FROM ({inicio}) TO ({fin})')
+    return True
+
+
+# --------------------------------------------------------------------------------------------------
+# * Función: asegurarMeses
+# * Descripción: Crea las particiones que falten de los meses de un lote, consulta el catálogo solo la primera vez
+# *              que ve cada mes en el proceso
+#
+# ! Parámetros:
+#     - fechas, fechas de las ventas del lote
+#
+# ? Returns:
+#     - Lista de meses (date) cuyas particiones se crearon
+# --------------------------------------------------------------------------------------------------
+def asegurarMeses(fechas):
+    with _candado:
+        nuevos = {mesDe(fecha) for fecha in fechas} - _meses
+    creados = [mes for mes in sorted(nuevos) if crearParticion(mes)]
+    #Si la transacción que creó la partición se revierte, las filas caen en la partición default
+    with _candado:
+        _meses.update(nuevos)
+    return creados
+
+
+#Crea las particiones desde el mes actual hasta MESES_ADELANTE meses después
+def crearSiguientes(mesesAdelante=MESES_ADELANTE):
+    mes = mesDe(date.today())
+    meses = [mes]
+    for _ in range(mesesAdelante):
+        mes = _siguienteMes(mes)
+        meses.append(mes)
+    return asegurarMeses(meses)
+
+
+# --------------------------------------------------------------------------------------------------
+# * Función: particiones
+# * Descripción: Particiones mensuales conectadas de cada tabla
+#
+# ? Returns:
+#     - Diccionario { tabla: [(mes, nombre, filas estimadas), ...] } ordenado por mes, sin la partición default
+# --------------------------------------------------------------------------------------------------
+def particiones():
+    resultado = {}
+    with connection.cursor() as cursor:
+        for modelo in TABLAS:
+            esquema, tabla = _esquemaTabla(modelo)
+            cursor.execute(
+                """
+                SELECT hija.relname, GREATEST(hija.reltuples, 0)::bigint
+                FROM pg_inherits
+                JOIN pg_class padre ON padre.oid = pg_inherits.inhparent
+                JOIN pg_class hija ON hija.oid = pg_inherits.inhrelid
+                JOIN pg_namespace ON pg_namespace.oid = padre.relnamespace
+                WHERE pg_namespace.nspname = %s AND padre.relname = %s
+                """,
+                [esquema, tabla]
+            )
+            meses = []
+            for nombre, filas in cursor.fetchall():
+                coincidencia = re.fullmatch(rf'{tabla}_(\d{{4}})_(\d{{2}})', nombre)
+                if coincidencia:
+                    meses.append((date(int(coincidencia[1]), int(coincidencia[2]), 1), nombre, filas))
+            resultado[tabla] = sorted(meses)
+    return resultado
+
+
+# --------------------------------------------------------------------------------------------------
+# * Función: desconectarAnteriores
+# * Descripción: Desconecta (DETACH PARTITION) los meses anteriores a una fecha. Las particiones quedan como tablas
+# *              normales con el mismo nombre, se pueden respaldar y borrar o volver a conectar. Sus ventas se quitan
+# *              de ventas_ids y sus lineas pierden la llave foránea y el default de idPVH, para volver a conectar un
+# *              mes hay que insertar antes sus ventas en ventas_ids.
+#
+# ! Parámetros:
+#     - antesDe, date, se desconectan los meses que terminan antes o en esa fecha
+#
+# ? Returns:
+#     - Lista de tablas desconectadas
+#
+# ! Nota: Las ventas desconectadas ya no cuentan en los acumulados de clientes (resumirClientes) ni en su
+#         clasificación la siguiente vez que se recalculen.
+# --------------------------------------------------------------------------------------------------
+def desconectarAnteriores(antesDe):
+    desconectadas = {}
+    actuales = particiones()
+    with transaction.atomic(), connection.cursor() as cursor:
+        for modelo in TABLAS:
+            esquema, tabla = _esquemaTabla(modelo)
+            desconectadas[modelo] = []
+            for mes, nombre, _ in actuales[tabla]:
+                if _siguienteMes(mes) <= antesDe:
+                    cursor.execute(f'ALTER TABLE {modelo._meta.db_table} DETACH PARTITION "{esquema}"."{nombre}"')
+                    desconectadas[modelo].append(f'"{esquema}"."{nombre}"')
+
+        #Sin el default de idPVH la secuencia de ventaspvh no depende de las tablas desconectadas. El DELETE de ventas_ids
+        #va al final, después PostgreSQL no permite alterar ventas_ids (DROP CONSTRAINT) porque quedan revisiones de la
+        #llave foránea pendientes
+        for particion in desconectadas[VentasPVH]:
+            cursor.execute(f'ALTER TABLE {particion} DROP CONSTRAINT "{LLAVE_LINEAS}", ALTER COLUMN "idPVH" DROP DEFAULT')
+        for particion in desconectadas[Ventas]:
+            cursor.execute(f'DELETE FROM {TABLA_IDS} i USING {particion} d WHERE i."idVenta" = d."idVenta"')
+    with _candado:
+        _meses.clear()
+    return [particion.replace('"', '') for modelo in TABLAS for particion in desconectadas[modelo]]
@@ -0,0 +1,61 @@
+from django.db import connection
+
+from unidades.administracion.reporteVentas.models import Ventas, Clientes
+
+# --------------------------------------------------------------------------------------------------
+# * Módulo: resumenClientes
+# * Descripción: Mantiene los acumulados de cada cliente (número de transacciones, primera y última compra y
+# *              total vendido) con una sola agregación en PostgreSQL sobre sus ventas.
+#
+# ? Notas:
+#     - Las notas de crédito (idVenta empieza con "R") no cuentan como transacción, pero sí restan en el total
+#       vendido porque su total ya viene negativo (amount_total_signed).
+#     - Siempre se recalcula desde la tabla de ventas, así los acumulados no se desfasan si un lote falla a la
+#       mitad o si las ventas llegan de Excel y de Odoo.
+# --------------------------------------------------------------------------------------------------
+
+SQL_RESUMIR_CLIENTES = f"""
+    UPDATE {Clientes._meta.db_table} AS c
+    SET "numTransacciones" = resumen.transacciones,
+        "primeraCompra"    = resumen.primera,
+        "ultimaCompra"     = resumen.ultima,
+        "totalVendido"     = resumen.total
+    FROM (
+        SELECT cl."idCliente",
+               COUNT(v."idVenta") FILTER (WHERE v."idVenta" NOT LIKE 'R%%') AS transacciones,
+               MIN(v.fecha) AS primera,
+               MAX(v.fecha) AS ultima,
+               COALESCE(SUM(v.total), 0) AS total
+        FROM {Clientes._meta.db_table} AS cl
+        LEFT JOIN {Ventas._meta.db_table} AS v ON v.cliente_id = cl."idCliente"
+        WHERE %(todos)s OR cl."idCliente" = ANY(%(clientes)s)
+        GROUP BY cl."idCliente"
+    ) AS resumen
+    WHERE c."idCliente" = resumen."idCliente"
+      AND (c."numTransacciones", c."primeraCompra", c."ultimaCompra", c."totalVendido")
+          IS DISTINCT FROM (resumen.transacciones, resumen.primera, resumen.ultima, resumen.total)
+"""
+
+
+# --------------------------------------------------------------------------------------------------
+# * Función: resumirClientes
+# * Descripción: Recalcula los acumulados de ventas de los clientes
+#
+# ! Parámetros:
+#     - clientes (opcional), lista de idCliente a recalcular, normalmente los clientes con ventas del lote
+#       recién cargado. Si no se envía se recalculan todos.
+#
+# ? Returns:
+#     - Cantidad de clientes que cambiaron
+# --------------------------------------------------------------------------------------------------
+def resumirClientes(clientes=None):
+    parametros = {
+        'todos': clientes is None,
+        'clientes': [int(c) for c in clientes] if clientes is not None else [],
+    }
+    if clientes is not None and not parametros['clientes']:
+        return 0
+
+    with connection.cursor() as cursor:
+        cursor.execute(SQL_RESUMIR_CLIENTES, parametros)
+        return cursor.rowcount
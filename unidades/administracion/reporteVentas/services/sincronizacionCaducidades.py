@@ -0,0 +1,167 @@
+from datetime import datetime
+
+from unidades.administracion.reporteVentas.controllers import ctrCaducidades
+from unidades.administracion.reporteVentas.models import Productos, Caducidades
+from unidades.sistema.sincronizacion.pipeline import ejecutarPipeline
+from unidades.sistema.sincronizacion.busquedas import existentes, enBloque
+from unidades.sistema.sincronizacion.escrituras import insertarEnBloque, actualizarEnBloque
+from unidades.sistema.sincronizacion.referencias import incrementarVersion, llavesTabla, mapaTabla
+
+# --------------------------------------------------------------------------------------------------
+# * Módulo: sincronizacionCaducidades
+# * Descripción: Sincronización de lotes/caducidades de Odoo a PostgreSQL sin depender de una petición HTTP.
+# *              La usan las vistas (auto/pullCaducidadesOdoo, ...) y el comando "sync caducidades".
+#
+# ? Parámetros y returns: los mismos de sincronizacionClientes
+# --------------------------------------------------------------------------------------------------
+
+
+# --------------------------------------------------------------------------------------------------
+# * Función: insertCaducidades
+# * Descripción: Inserta las caducidades en la base de datos PostgreSQL.
+#
+# ! Parámetros:
+#     - Recibe una lista (array) de caducidades que deben tener:
+#           { id, name, product_id, product_qty }
+#     - tamanoLote (opcional), tamaño de cada bulk_create
+#
+# ? Condiciones para insertar un producto en la base de datos:
+#     1. Que su producto exista en PostgreSQL
+#     2. Que su nombre sea convertible a fecha válida
+# --------------------------------------------------------------------------------------------------
+def insertCaducidades(caducidades, tamanoLote=1000):
+    caducidadesPSQL = existentes(Caducidades, [caducidad['id'] for caducidad in caducidades])
+
+    #idProducto de Odoo -> llave primaria de Productos (cache del proceso)
+    productosIds = mapaTabla(Productos, 'idProducto')
+    caducidadesCreate = []
+    newCaducidad=0
+    for caducidad in caducidades:
+
+        if caducidad['product_id'][0] in productosIds and caducidad['id'] not in caducidadesPSQL:
+            #Convierte el nombre en una fecha válida
+            try:
+                fecha = datetime.strptime(caducidad['name'].strip().replace('–', '-').replace('—', '-').replace('‑', '-'), "%d-%m-%Y")
+                #Inserta la informacion en la tabla Caducidades
+                caducidadesCreate.append(
+                    Caducidades(
+                        idCaducidad = caducidad['id'],
+                        fechaCaducidad = fecha,
+                        cantidad = caducidad['product_qty'],
+                        producto_id = productosIds.get(caducidad['product_id'][0])
+                    )
+                )
+            except:
+                pass
+
+    newCaducidad += len(insertarEnBloque(Caducidades, caducidadesCreate, tamanoLote))
+    if caducidadesCreate:
+        incrementarVersion(Caducidades)
+
+    return({
+        'status': 'success',
+        'message': newCaducidad
+    })
+
+
+# --------------------------------------------------------------------------------------------------
+# * Función: pull
+# * Descripción: Obtiene todos los lotes/caducidades de los productos de Odoo por páginas. La consulta de la
+# *              siguiente página a Odoo se hace mientras se inserta la anterior (ejecutarPipeline).
+# --------------------------------------------------------------------------------------------------
+def pull(tamanoLote=5000):
+    try:
+        resultado = {'nuevas': 0, 'odoo': 0, 'error': None}
+
+        #Inserta cada página de caducidades mientras se pide la siguiente a Odoo
+        def escribir(caducidadesOdoo):
+            if caducidadesOdoo['status'] != 'success':
+                resultado['error'] = caducidadesOdoo['message']
+                return False
+
+            #Llama a la funcion insert caducidades y le pasa las caducidades de Odoo
+            response=insertCaducidades(caducidadesOdoo['caducidades'], tamanoLote)
+            resultado['nuevas'] += response['message']
+            resultado['odoo'] += len(caducidadesOdoo['caducidades'])
+
+        tiempos = ejecutarPipeline(ctrCaducidades.iter_allCaducidades(tamanoLote), escribir)
+
+        if resultado['error']:
+            return {'status': 'error', 'message': resultado['error']}
+
+        return {
+            'status'   : 'success',
+            'message'  : f'Se registraron {resultado["nuevas"]} caducidades de {resultado["odoo"]}',
+            'leidos'   : resultado['odoo'],
+            'escritos' : resultado['nuevas'],
+            'tiempos'  : tiempos
+        }
+
+    except Exception as e:
+        return {'status': 'error', 'message': f'Ha ocurrido un error al tratar de insertar los datos: {e}'}
+
+
+# --------------------------------------------------------------------------------------------------
+# * Función: create
+# * Descripción: Obtiene de Odoo solo las caducidades que no existen en PostgreSQL y las inserta
+# --------------------------------------------------------------------------------------------------
+def create(tamanoLote=1000, desde=None):
+    try:
+        caducidadesIDs = llavesTabla(Caducidades)
+
+        #Obtiene todas las caducidades que hay en Odoo
+        caducidadesOdoo=ctrCaducidades.get_newCaducidades(list(caducidadesIDs), desde)
+        if caducidadesOdoo['status'] != 'success':
+            return {'status': 'error', 'message': caducidadesOdoo['message']}
+
+        #Llama a la funcion insert caducidades y le pasa las caducidades de Odoo
+        response=insertCaducidades(caducidadesOdoo['caducidades'], tamanoLote)
+        if response['status'] != 'success':
+            return {'status': 'error', 'message': response['message']}
+
+        return {
+            'status'   : 'success',
+            'message'  : f'Se registraron {response["message"]} nuevas caducidades de {len(caducidadesOdoo["caducidades"])}',
+            'leidos'   : len(caducidadesOdoo['caducidades']),
+            'escritos' : response['message']
+        }
+
+    except Exception as e:
+        return {'status': 'error', 'message': f'Ha ocurrido un error al tratar de insertar los datos: {e}'}
+
+
+# --------------------------------------------------------------------------------------------------
+# * Función: update
+# * Descripción: Actualiza la cantidad de las caducidades de PostgreSQL con los datos de Odoo
+# --------------------------------------------------------------------------------------------------
+def update(tamanoLote=1000, desde=None):
+    try:
+        caducidadesIDs = llavesTabla(Caducidades)
+        #Obtiene todas las caducidades que hay en Odoo
+        caducidadesOdoo=ctrCaducidades.update_Caducidades(list(caducidadesIDs), desde)
+        if caducidadesOdoo['status'] != 'success':
+            return {'status': 'error', 'message': caducidadesOdoo['message']}
+
+        caducidadesObj = enBloque(Caducidades, [caducidad['id'] for caducidad in caducidadesOdoo['caducidades']])
+        caducidadesUpdate = []
+        updatedCaducidades = 0
+
+        for caducidad in caducidadesOdoo['caducidades']:
+            #Busca la caducidad mediante su id
+            caducidadObj = caducidadesObj.get(caducidad['id'])
+            #Modifica los campos que necesitamos
+            caducidadObj.cantidad = caducidad['product_qty']
+
+            caducidadesUpdate.append(caducidadObj)
+
+        updatedCaducidades += len(actualizarEnBloque(Caducidades, caducidadesUpdate, ['cantidad'], tamanoLote))
+
+        return {
+            'status'   : 'success',
+            'message'  : f'Se modificaron {updatedCaducidades} de {len(caducidadesOdoo["caducidades"])}',
+            'leidos'   : len(caducidadesOdoo['caducidades']),
+            'escritos' : updatedCaducidades
+        }
+
+    except Exception as e:
+        return {'status': 'error', 'message': f'Ha ocurrido un error al tratar de insertar los datos: {e}'}
@@ -0,0 +1,176 @@
+from unidades.administracion.reporteVentas.models import Clientes
+from unidades.administracion.reporteVentas.controllers import ctrCliente
+from unidades.sistema.sincronizacion.pipeline import ejecutarPipeline
+from unidades.sistema.sincronizacion.busquedas import enBloque
+from unidades.sistema.sincronizacion.escrituras import insertarEnBloque, actualizarEnBloque
+from unidades.sistema.sincronizacion.referencias import incrementarVersion, llavesTabla
+
+# --------------------------------------------------------------------------------------------------
+# * Módulo: sincronizacionClientes
+# * Descripción: Sincronización de clientes de Odoo a PostgreSQL sin depender de una petición HTTP.
+# *              La usan las vistas (auto/pullClientesOdoo, ...) y el comando "sync clientes".
+#
+# ? Parámetros comunes:
+#     - tamanoLote, cantidad de registros por lote de Odoo y por bulk_create/bulk_update
+#     - desde (opcional en create/update), datetime para pedir a Odoo solo los registros creados/modificados desde esa fecha
+#
+# ? Returns comunes:
+#     - { status, message, leidos, escritos } donde leidos son los registros que regresó Odoo y escritos los
+#       registros insertados o actualizados en PostgreSQL
+# --------------------------------------------------------------------------------------------------
+
+
+# --------------------------------------------------------------------------------------------------
+# * Función: insertClients
+# * Descripción: Inserta clientes en la base de datos PostgreSQL.
+#
+# ! Parámetros:
+#     - Recibe una lista (array) de clientes. Cada cliente debe contener los siguientes campos:
+#       { id, name, city, state_id, country_id }
+#     - Nota: Solo el campo "id" es obligatorio; los demás son opcionales.
+#     - tamanoLote (opcional), tamaño de cada bulk_create
+#
+# ? Condiciones para insertar un cliente en la base de datos:
+#     1. El cliente debe un id único.
+# --------------------------------------------------------------------------------------------------
+def insertClients(clients, tamanoLote=1000):
+    #Obtenemos los ids de los clientes del lote que ya existen en Postgres
+    clientesPSQL = set(Clientes.objects.filter(idCliente__in=[int(cliente['id']) for cliente in clients]).values_list('idCliente', flat=True))
+
+    clientesCreate = []
+    newClientes = 0
+
+    for cliente in clients:
+
+        #Si el id no esta en la base de datos lo agrega
+        if cliente['id'] not in clientesPSQL:
+
+                #Asignamos la distribución de la información en sus respectivas variables
+                clientesCreate.append(
+                    Clientes(
+                        idCliente           = cliente['id'],
+                        nombre              = cliente['name'] if cliente['name']!=False else "",
+                        ciudad              = cliente['city'] if cliente['city']!=False else "",
+                        estado              = cliente['state_id'][1] if cliente['state_id']!=False else "",
+                        pais                = cliente['country_id'][1] if cliente['country_id']!=False else "",
+                        tipoCliente         = "Cliente Nuevo",
+                        numTransacciones    = 0
+                    )
+                )
+
+    newClientes += len(insertarEnBloque(Clientes, clientesCreate, tamanoLote))
+    if clientesCreate:
+        incrementarVersion(Clientes)
+
+    return ({
+        'status'  : 'success',
+        'message' : newClientes
+    })
+
+
+# --------------------------------------------------------------------------------------------------
+# * Función: pull
+# * Descripción: Obtiene todos los clientes de Odoo por lotes y los inserta. La consulta del siguiente lote a
+# *              Odoo se hace mientras se inserta el anterior (ejecutarPipeline), regresa también sus tiempos.
+# --------------------------------------------------------------------------------------------------
+def pull(tamanoLote=1000):
+    try:
+        resultado = {'nuevos': 0, 'odoo': 0, 'error': None}
+
+        #Inserta cada lote de clientes mientras se pide el siguiente a Odoo
+        def escribir(clientesOdoo):
+            if clientesOdoo['status'] != 'success':
+                resultado['error'] = clientesOdoo['message']
+                return False
+
+            #Llama a insertClientes y le envia el lote de clientes que obtuvo de Odoo
+            response=insertClients(clientesOdoo['clientes'], tamanoLote)
+            resultado['nuevos'] += response['message']
+            resultado['odoo'] += len(clientesOdoo['clientes'])
+
+        tiempos = ejecutarPipeline(ctrCliente.iter_allClients(tamanoLote), escribir)
+
+        if resultado['error']:
+            return {'status': 'error', 'message': resultado['error']}
+
+        return {
+            'status'   : 'success',
+            'message'  : f'Se han agregado correctamente {resultado["nuevos"]} clientes de {resultado["odoo"]}',
+            'leidos'   : resultado['odoo'],
+            'escritos' : resultado['nuevos'],
+            'tiempos'  : tiempos
+        }
+
+    except Exception as e:
+        return {'status': 'error', 'message': f'Ha ocurrido un error al tratar de insertar los datos: {e}'}
+
+
+# --------------------------------------------------------------------------------------------------
+# * Función: create
+# * Descripción: Obtiene de Odoo solo los clientes que no existen en PostgreSQL y los inserta
+# --------------------------------------------------------------------------------------------------
+def create(tamanoLote=1000, desde=None):
+    try:
+        clientesIDs = llavesTabla(Clientes)
+        #Traer todos los clientes de Odoo
+        clientesOdoo=ctrCliente.get_newClients(list(clientesIDs), desde)
+        if clientesOdoo['status'] != 'success':
+            return {'status': 'error', 'message': clientesOdoo['message']}
+
+        #Llama a insertClientes y le envia todos lo clientes que obtuvo de Odoo
+        response=insertClients(clientesOdoo['clientes'], tamanoLote)
+        if response['status'] != "success":
+            return {'status': 'error', 'message': response['message']}
+
+        return {
+            'status'   : 'success',
+            'message'  : f'Se han agregado correctamente {response["message"]} clientes nuevos de {len(clientesOdoo["clientes"])}',
+            'leidos'   : len(clientesOdoo['clientes']),
+            'escritos' : response['message']
+        }
+
+    except Exception as e:
+        return {'status': 'error', 'message': f'Ha ocurrido un error al tratar de insertar los datos de los nuevos clientes: {e}'}
+
+
+# --------------------------------------------------------------------------------------------------
+# * Función: update
+# * Descripción: Actualiza el nombre y la dirección de los clientes de PostgreSQL con los datos de Odoo
+# --------------------------------------------------------------------------------------------------
+def update(tamanoLote=1000, desde=None):
+    try:
+        clientesIDs = llavesTabla(Clientes)
+        #Traer todos los clientes de Odoo que se actualizaron
+        clientesOdoo=ctrCliente.get_updateClients(list(clientesIDs), desde)
+        if clientesOdoo['status'] != 'success':
+            return {'status': 'error', 'message': clientesOdoo['message']}
+
+        #Solo se cargan los clientes que regresó Odoo
+        clientesObj = enBloque(Clientes, [cliente['id'] for cliente in clientesOdoo['clientes']])
+        clientesUpdate = []
+        updatedClientes = 0
+
+        for cliente in clientesOdoo['clientes']:
+
+            #Busca el ID del cliente en Postgres
+            clienteObj = clientesObj.get(cliente['id'])
+
+            #Cambia los valores de la Postgres por los nuevos valores que hay en odoo
+            clienteObj.nombre              = cliente['name'] if cliente['name']!=False else ""
+            clienteObj.ciudad              = cliente['city'] if cliente['city']!=False else ""
+            clienteObj.estado              = cliente['state_id'][1] if cliente['state_id']!=False else ""
+            clienteObj.pais                = cliente['country_id'][1] if cliente['country_id']!=False else ""
+
+            clientesUpdate.append(clienteObj)
+
+        updatedClientes += len(actualizarEnBloque(Clientes, clientesUpdate, ['nombre', 'ciudad', 'estado', 'pais'], tamanoLote))
+
+        return {
+            'status'   : 'success',
+            'message'  : f'Se han modificados {updatedClientes} clientes de {len(clientesOdoo["clientes"])}',
+            'leidos'   : len(clientesOdoo['clientes']),
+            'escritos' : updatedClientes
+        }
+
+    except Exception as e:
+        return {'status': 'error', 'message': f'Ha ocurrido un error al tratar de insertar los datos: {e}'}
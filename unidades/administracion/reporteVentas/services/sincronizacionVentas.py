@@ -0,0 +1,328 @@
+from datetime import date
+
+from django.db import connection
+
+from unidades.administracion.reporteVentas.models import Ventas, VentasPVH, Clientes, VentanaVentas
+from unidades.administracion.reporteVentas.controllers import ctrVentas
+from unidades.administracion.reporteVentas.services.clasificacionClientes import clasificarClientes
+from unidades.administracion.reporteVentas.services.resumenClientes import resumirClientes
+from unidades.administracion.reporteVentas.services.particionesVentas import asegurarMeses
+from unidades.sistema.sincronizacion.pipeline import ejecutarPipeline
+from unidades.sistema.sincronizacion.busquedas import existentes, mapaLlaves
+from unidades.sistema.sincronizacion.escrituras import insertarEnBloque
+from unidades.produccionLogistica.maxMin.models import Productos
+from unidades.sistema.sincronizacion.referencias import incrementarVersion, llavesTabla, mapaTabla
+from conexiones import metricas
+
+# --------------------------------------------------------------------------------------------------
+# * Módulo: sincronizacionVentas
+# * Descripción: Sincronización de ventas y sus lineas de Odoo a PostgreSQL sin depender de una petición HTTP.
+# *              La usan las vistas (auto/pullVentasOdoo, auto/createVentasOdoo) y el comando "sync ventas".
+#
+# ? Parámetros y returns: los mismos de sincronizacionClientes. En pull, "desde" es la fecha (date) del primer mes.
+# --------------------------------------------------------------------------------------------------
+
+
+# --------------------------------------------------------------------------------------------------
+# * Función: insertVentas
+# * Descripción: Obtiene las ventas de la base de datos de Odoo o de excel y los inserta en la base de datos de PostgreSQL
+#
+# ! Parámetros:
+#     - Recibe un array de ventas, donde cada indice del array debe contener la siguiente informacion:
+#           {  id, nombre, fechaCreacion, cliente, vendedor, direccionEnvio, unidad, totalVenta, tipoFactura, lineaProducto {[idProducto, nombreProducto, cantidad, precioUnitario, precioSubtotal, marca, categoria], ...}, pais, estado, ciudad  }
+#     - tamanoLote (opcional), tamaño de cada bulk_create
+#
+# ? Condiciones para insertar una venta:
+#     1. La venta debe tener un idVenta o nombre disponible en la base de datos de PostgreSQL.
+#     2. Su cliente debe existir en PostgreSQL, si no la venta no se inserta y cuenta como rechazada (se vuelve a
+#        intentar en la siguiente sincronización, cuando ya se haya cargado el cliente).
+#
+# ? Lógica para determinar el venta:
+#     - Si "move_type" es igual a "out_invoice", significa que es una venta completada.
+#     - Si "move_type" es igual a "out_refund", significa que es una nota de crédito.
+#
+# ? Errores:
+#     - Si el bulk_create falla se insertan una por una (insertarEnBloque), las ventas que no se pudieron insertar y
+#       sus lineas no cuentan en el resultado y se regresan en "rechazadas" (ventas más lineas)
+#
+# ? Tipo de cliente y acumulados:
+#     - Después de insertar, se recalcula en PostgreSQL el tipo de cliente (Nuevo, Recuperado o Cartera) de todo el
+#       historial de los clientes del lote con clasificarClientes, así no depende del orden de carga.
+#     - Con resumirClientes se actualizan numTransacciones, primeraCompra, ultimaCompra y totalVendido solo de
+#       los clientes del lote.
+#
+# ? Particiones:
+#     - Antes de insertar se crean las particiones mensuales que falten de las fechas del lote (asegurarMeses).
+#     - La llave primaria de ventas incluye la fecha, PostgreSQL ya no revisa que idVenta sea único, por eso solo
+#       se insertan las ventas que no existen.
+# --------------------------------------------------------------------------------------------------
+def insertVentas(ventas, tamanoLote=1000):
+    #Llamar solo a las ventas y clientes del lote que ya existen en Postgres
+    ventasPSQL = set(Ventas.objects.filter(idVenta__in=[venta['name'] for venta in ventas]).values_list('idVenta', flat=True))
+
+    clientesPSQL = existentes(Clientes, {int(venta['partner_id'][0]) for venta in ventas})
+
+    ventasCreate = []
+    sinCliente = 0
+    #Lineas y tipo de factura de cada venta, se usan solo para las ventas que sí se insertaron
+    lineasVenta = {}
+    tiposVenta = {}
+
+    for venta in ventas:
+        if venta['name'] not in ventasPSQL:
+            #Asignamos la distribución de la información en sus respectivas variables
+            #Obtenemos al cliente, se asigna su id sin cargar la instancia
+            idCliente = int(venta['partner_id'][0])
+            if idCliente not in clientesPSQL:
+                sinCliente += 1
+                continue
+
+            lineasVenta[venta['name']] = venta['productsLines']
+            tiposVenta[venta['name']] = venta['move_type']
+
+            ventasCreate.append(
+                Ventas(
+                    idVenta         = venta['name'],
+                    fecha           = venta['invoice_date'],
+                    ciudadVenta     = venta['city'],
+                    estadoVenta     = venta['state_id'],
+                    paisVenta       = venta['country_id'],
+                    unidad          = venta['branch_id'][1] if venta['branch_id'] else "",
+                    vendedor        = venta['invoice_user_id'][1],
+                    total           = venta['amount_total_signed'],
+                    cliente_id      = idCliente
+                )
+            )
+
+    if sinCliente:
+        print(f'sincronizacionVentas.insertVentas | {sinCliente} ventas sin su cliente en Postgres no se insertaron')
+        metricas.filasRechazadas(sinCliente)
+
+    if ventasCreate:
+        asegurarMeses(venta.fecha for venta in ventasCreate)
+
+    insertadas = insertarEnBloque(Ventas, ventasCreate, tamanoLote)
+    rechazadas = sinCliente + len(ventasCreate) - len(insertadas)
+    ventasCreate = insertadas
+
+    #Llamamos a pull linea ventas para registrar todos los productos en Postgres
+    ventasPVCreate = [linea for venta in ventasCreate for linea in lineasVenta[venta.idVenta]]
+    if ventasPVCreate:
+        rechazadas += insertLineaVentaOdoo(ventasPVCreate, tamanoLote)['rechazadas']
+    if ventasCreate:
+        incrementarVersion(Ventas)
+
+    #Factura (out_invoice) o nota de credito (out_refund)
+    newVentas = sum(1 for venta in ventasCreate if tiposVenta[venta.idVenta] == 'out_invoice')
+    newNota = sum(1 for venta in ventasCreate if tiposVenta[venta.idVenta] == 'out_refund')
+
+    #Clasifica y actualiza los acumulados de los clientes del lote con todo su historial de ventas
+    clientesLote = {venta.cliente_id for venta in ventasCreate}
+    clasificarClientes(clientesLote)
+    resumirClientes(clientesLote)
+
+    return({
+        'status'  : 'success',
+        'message'    : [newVentas, newNota, (newVentas + newNota)],
+        'creadas'    : [venta.idVenta for venta in ventasCreate],
+        'rechazadas' : rechazadas
+    })
+
+
+# --------------------------------------------------------------------------------------------------
+# * Función: insertLineaVentaOdoo
+# * Descripción: Obtiene las lineas ventas de la base de datos de Odoo o de excel y los inserta en la base de datos de PostgreSQL
+#
+# ! Parámetros:
+#     - Recibe un array de linea de venta, donde cada indice del array debe contener la siguiente informacion:
+#           {  idProducto, nombreProducto, cantidad, precioUnitario, precioSubtotal, marca, categoria  }
+#     - Recibe el idVenta de donde vienen los productos
+#     - Recobe la fecha en que se hizo la venta
+#     - Recibe la lista de Productos disponibles en odoo y la de insumos disponibles
+#     - tamanoLote (opcional), tamaño de cada bulk_create
+#
+# ? Condiciones para insertar una venta:
+#     1. Para PVH la venta debe existir en Postgres, si no la linea no se registra. La linea toma la fecha de su venta
+#        para quedar en la misma partición mensual
+#     2. Para PVA la primera condicion es que el id del producto exista en la base de datos de Postgres o si es de un excel que el sku exista en la BD, si no se encuentra no lo registra
+#     3. Además si encuentra el Id en ambos casos intenta registrarlo con la llave foranea de Productos y si no lo encuentra en la tabla de productos lo intenta registrar en la llave foranea de Insumos, si no puede no lo registra
+#
+#
+# ? Lógica para determinar el venta:
+#     - Si "move_type" es igual a "out_invoice", significa que es una venta completada.
+#     - Si "move_type" es igual a "out_refund", significa que es una nota de crédito.
+# --------------------------------------------------------------------------------------------------
+def insertLineaVentaOdoo(productos, tamanoLote=1000):
+    #Solo se consultan las ventas del lote y los productos salen de la cache, se asignan sus ids sin cargar las instancias
+    fechasVentas = mapaLlaves(Ventas, 'idVenta', {producto['move_name'] for producto in productos}, valor='fecha')
+    productosIds = mapaTabla(Productos, 'idProducto')
+
+    lineasCreate=[]
+    sinVenta = 0
+    #Para cada producto lo intentara registrar en VentasPVH y Ventas PVA
+    for producto in productos:
+        idVenta = producto['move_name']
+        if idVenta not in fechasVentas:
+            sinVenta += 1
+            continue
+
+        #Lo registra en ventasPVH, si no tiene producto o no existe en Postgres queda sin producto
+        lineasCreate.append(
+            VentasPVH(
+                cantidad        = producto['quantity'],
+                precioUnitario  = producto['price_unit'],
+                subtotal        = producto['price_subtotal'] if idVenta[0] != 'R' else (producto['price_subtotal']*(-1)),
+                venta_id        = idVenta,
+                fecha           = fechasVentas[idVenta],
+                producto_id     = productosIds.get(producto['product_id'][0]) if producto['product_id'] else None
+            )
+        )
+    if sinVenta:
+        print(f'sincronizacionVentas.insertLineaVentaOdoo | {sinVenta} lineas sin su venta en Postgres no se insertaron')
+        metricas.filasRechazadas(sinVenta)
+    insertadas = insertarEnBloque(VentasPVH, lineasCreate, tamanoLote)
+
+    #Retorna un exito, "rechazadas" son las lineas sin venta o que no se pudieron insertar
+    return({
+        'status'     : 'success',
+        'message'    : f'Se registraron {len(insertadas)} lineas',
+        'rechazadas' : sinVenta + len(lineasCreate) - len(insertadas)
+    })
+
+
+#Suma a cada venta el subtotal de sus lineas, la venta se busca con la llave primaria de la base ("idVenta", fecha)
+#para que PostgreSQL solo revise la partición de su mes
+SQL_SUMAR_TOTALES = f"""
+    UPDATE {Ventas._meta.db_table} AS v
+    SET total = v.total + sumas.suma
+    FROM unnest(%s::varchar[], %s::timestamptz[], %s::numeric[]) AS sumas("idVenta", fecha, suma)
+    WHERE v."idVenta" = sumas."idVenta" AND v.fecha = sumas.fecha
+"""
+
+
+# --------------------------------------------------------------------------------------------------
+# * Función: sumarTotalesVentas
+# * Descripción: Suma al total de las ventas el subtotal de sus lineas en una sola consulta, para las ventas que
+# *              se insertan sin total y reciben sus lineas por lotes (ver viewsVentas.pullVentasExcelStreaming)
+#
+# ! Parámetros:
+#     - totales, diccionario {(idVenta, fecha): suma de los subtotales}
+#
+# ? Returns:
+#     - Cantidad de ventas actualizadas
+# --------------------------------------------------------------------------------------------------
+def sumarTotalesVentas(totales):
+    if not totales:
+        return 0
+
+    llaves = list(totales)
+    with connection.cursor() as cursor:
+        cursor.execute(SQL_SUMAR_TOTALES, [
+            [idVenta for idVenta, _ in llaves],
+            [fecha for _, fecha in llaves],
+            [float(totales[llave]) for llave in llaves],
+        ])
+        return cursor.rowcount
+
+
+# --------------------------------------------------------------------------------------------------
+# * Función: pull
+# * Descripción: Obtiene todos las ventas de Odoo mes por mes y las inserta con sus lineas
+#
+# ! Parámetros:
+#     - reiniciar (opcional), si es True borra el avance guardado y vuelve a recorrer todos los meses
+#     - desde (opcional), date del primer mes a cargar, por default el mes de la primera venta en Odoo
+#
+# ? Carga por ventanas:
+#     - Cada mes se trae y enriquece en un hilo mientras el mes anterior se clasifica y guarda (ejecutarPipeline),
+#       la cola acotada hace que solo unos pocos meses de ventas vivan en memoria.
+#     - Al terminar un mes se registra en VentanaVentas. Si la carga se interrumpe, la siguiente llamada continúa
+#       desde el primer mes que no se haya terminado. El mes en curso nunca se marca como terminado, tampoco un mes
+#       con ventas o lineas rechazadas, así la siguiente llamada lo vuelve a intentar.
+# --------------------------------------------------------------------------------------------------
+def pull(tamanoLote=1000, desde=None, reiniciar=False):
+    try:
+        if reiniciar:
+            VentanaVentas.objects.all().delete()
+
+        #Meses que ya se terminaron de cargar en una ejecución anterior
+        terminadas = set(VentanaVentas.objects.values_list('inicio', flat=True))
+
+        resultado = {'ventas': 0, 'notas': 0, 'odoo': 0, 'meses': 0, 'incompletos': [], 'error': None}
+
+        #Clasifica y guarda las ventas de un mes mientras se pide el siguiente mes a Odoo
+        def escribir(ventana):
+            inicio, fin, ventasOdoo = ventana
+
+            if ventasOdoo['status'] != 'success':
+                resultado['error'] = f'Error en el mes {inicio}, se guardaron {resultado["meses"]} meses: {ventasOdoo["message"]}'
+                return False
+
+            #Llama a insertVentas y le envia las ventas del mes que obtuvo de Odoo
+            response=insertVentas(ventasOdoo['ventas'], tamanoLote)
+
+            if response['status'] != "success":
+                resultado['error'] = response['message']
+                return False
+
+            resultado['ventas'] += response["message"][0]
+            resultado['notas'] += response["message"][1]
+            resultado['odoo'] += len(ventasOdoo['ventas'])
+            resultado['meses'] += 1
+
+            if response['rechazadas']:
+                resultado['incompletos'].append(str(inicio))
+
+            #Solo los meses cerrados y sin rechazos se marcan como terminados
+            elif fin <= date.today():
+                VentanaVentas.objects.update_or_create(
+                    inicio=inicio,
+                    defaults={'fin': fin, 'ventas': response["message"][0], 'notas': response["message"][1]}
+                )
+
+        desde = desde.date() if hasattr(desde, 'date') else desde
+        tiempos = ejecutarPipeline(ctrVentas.iter_salesByMonth(desde=desde, omitir=terminadas), escribir)
+
+        if resultado['error']:
+            return {'status': 'error', 'message': resultado['error']}
+
+        incompletos = f', con rechazos en {", ".join(resultado["incompletos"])} (se reintentan en el siguiente pull)' if resultado['incompletos'] else ''
+        return {
+            'status'   : 'success',
+            'message'  : f'Se han agregado correctamente {resultado["ventas"]} ventas, {resultado["notas"]} notas de credito dando un total de {resultado["ventas"] + resultado["notas"]} de {resultado["odoo"]} en {resultado["meses"]} meses{incompletos}',
+            'leidos'   : resultado['odoo'],
+            'escritos' : resultado['ventas'] + resultado['notas'],
+            'tiempos'  : tiempos
+        }
+
+    except Exception as e:
+        return {'status': 'error', 'message': f'Ha ocurrido un error en pull Ventas: {e}'}
+
+
+# --------------------------------------------------------------------------------------------------
+# * Función: create
+# * Descripción: Obtiene de Odoo solo las ventas que no existen en PostgreSQL y las inserta con sus lineas
+# --------------------------------------------------------------------------------------------------
+def create(tamanoLote=1000, desde=None):
+    try:
+        ventasIDs = llavesTabla(Ventas)
+
+        #Traer todos los clientes de Odoo
+        ventasOdoo=ctrVentas.get_newSales(list(ventasIDs), desde)
+        if ventasOdoo['status'] != 'success':
+            return {'status': 'error', 'message': ventasOdoo['message']}
+
+        #Llama a insertVentas y le envia todos las ventas que obtuvo de Odoo
+        response=insertVentas(ventasOdoo['ventas'], tamanoLote)
+        if response['status'] != "success":
+            return {'status': 'error', 'message': response['message']}
+
+        return {
+            'status'   : 'success',
+            'message'  : f'Se han agregado correctamente {response["message"][0]} ventas nuevas, {response["message"][1]} notas de credito nuevas dando un total de {response["message"][2]} de {len(ventasOdoo["ventas"])}',
+            'leidos'   : len(ventasOdoo['ventas']),
+            'escritos' : response['message'][2]
+        }
+
+    except Exception as e:
+        return {'status': 'error', 'message': f'Ha ocurrido un error en pull Ventas: {e}'}
@@ -1,3 +1,276 @@
+import os
+from datetime import date, timedelta
+from importlib import import_module
+from unittest import SkipTest
+
+from django.db import IntegrityError, connection, transaction
 from django.test import TestCase
 
-# Create your tests here.
+from conexiones.metricas import contarConsultas, medirPicoMemoria
+from unidades.administracion.reporteVentas.models import Clientes, Ventas, VentasPVH
+from unidades.administracion.reporteVentas.services.particionesVentas import asegurarMeses
+from unidades.sistema.sincronizacion.odooFalso import DatosOdoo, OdooFalso
+from unidades.sistema.sincronizacion.referencias import incrementarVersion, limpiarCache, llavesTabla
+
+#? Servicio de cada sincronización
+SERVICIOS = {
+    'productos'   : 'unidades.produccionLogistica.maxMin.services.sincronizacionProductos',
+    'insumos'     : 'unidades.produccionLogistica.maxMin.services.sincronizacionInsumos',
+    'clientes'    : 'unidades.administracion.reporteVentas.services.sincronizacionClientes',
+    'materialPI'  : 'unidades.produccionLogistica.maxMin.services.sincronizacionMaterialPI',
+    'caducidades' : 'unidades.administracion.reporteVentas.services.sincronizacionCaducidades',
+    'ventas'      : 'unidades.administracion.reporteVentas.services.sincronizacionVentas',
+}
+
+#? Consultas máximas a PostgreSQL de cada sincronización con los datos del Odoo falso de la prueba. Si un cambio
+#? hace más consultas la prueba falla, si hace menos hay que bajar el límite. Cada etapa viene después de escribir,
+#? así que incluyen la carga de la cache de referencias. Cada bulk_create y bulk_update va en un savepoint (ver
+#? escrituras), dentro de la transacción de la prueba son 2 consultas más por tabla.
+LIMITES_CONSULTAS = {
+    ('productos', 'pull')     : 6,
+    ('insumos', 'pull')       : 6,
+    ('clientes', 'pull')      : 5,
+    ('materialPI', 'pull')    : 5,
+    ('caducidades', 'pull')   : 7,
+    ('ventas', 'pull')        : 15,
+    ('productos', 'create')   : 7,
+    ('insumos', 'create')     : 7,
+    ('clientes', 'create')    : 7,
+    ('caducidades', 'create') : 9,
+    ('ventas', 'create')      : 16,
+    ('productos', 'update')   : 6,
+    ('insumos', 'update')     : 5,
+    ('clientes', 'update')    : 6,
+    ('caducidades', 'update') : 6,
+}
+
+#El Odoo falso se inicia al importar el módulo, antes de que las revisiones del runner importen las urls y con ellas
+#los controladores, que crean su conexión a Odoo al importarse. Con meses=0 todas las facturas son de hoy, así pull
+#ventas siempre recorre una sola ventana mensual y sus consultas no dependen de la fecha
+DATOS = DatosOdoo(productos=60, insumos=40, clientes=80, facturas=300, lotes=150, bom=100, meses=0, semilla=7)
+ODOO = OdooFalso(DATOS)
+ODOO.iniciar()
+os.environ.update({'URL_ODOO': ODOO.url, 'DATABASE_ODOO': 'pruebas', 'USERNAME_ODOO': 'pruebas', 'PASSWORD_ODOO': 'pruebas'})
+
+
+# --------------------------------------------------------------------------------------------------
+# * Class: ConsultasSincronizacionTest
+# * Descripción: Ejecuta las sincronizaciones contra un Odoo falso (ver odooFalso) y falla si alguna hace más
+# *              consultas a PostgreSQL que su límite en LIMITES_CONSULTAS
+# --------------------------------------------------------------------------------------------------
+class ConsultasSincronizacionTest(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        from unidades.administracion.reporteVentas.controllers import ctrVentas
+        if ctrVentas.conn.url != ODOO.url:
+            raise SkipTest('Los controladores se importaron antes con la conexión a otro Odoo')
+        cls.servicios = {entidad: import_module(modulo) for entidad, modulo in SERVICIOS.items()}
+        super().setUpClass()
+
+    #Las facturas nuevas del create pueden ser del mes anterior, su partición se crea una vez por proceso y no
+    #cuenta en las consultas de cada sincronización
+    @classmethod
+    def setUpTestData(cls):
+        asegurarMeses([date.today(), date.today() - timedelta(days=31)])
+
+    def sincronizar(self, entidad, modo):
+        with contarConsultas() as consultas:
+            resultado = getattr(self.servicios[entidad], modo)()
+        self.assertEqual(resultado['status'], 'success', f'{entidad} {modo}: {resultado.get("message")}')
+        return resultado, consultas
+
+    def test_consultas_por_sincronizacion(self):
+        for modo in ('pull', 'create', 'update'):
+            if modo == 'create':
+                DATOS.agregarNuevos(0.1)
+            elif modo == 'update':
+                DATOS.modificar(0.3)
+
+            for entidad in SERVICIOS:
+                if (entidad, modo) not in LIMITES_CONSULTAS:
+                    continue
+                with self.subTest(entidad=entidad, modo=modo):
+                    resultado, consultas = self.sincronizar(entidad, modo)
+                    self.assertGreater(resultado['leidos'], 0)
+                    self.assertLessEqual(
+                        consultas.consultas, LIMITES_CONSULTAS[(entidad, modo)],
+                        f'{entidad} {modo} hizo {consultas.consultas} consultas: {consultas.resumen()["porTipo"]}'
+                    )
+
+
+# --------------------------------------------------------------------------------------------------
+# * Class: CacheReferenciasTest
+# * Descripción: La cache de referencias solo lee la tabla completa cuando cambia su versión
+# --------------------------------------------------------------------------------------------------
+class CacheReferenciasTest(TestCase):
+    def setUp(self):
+        limpiarCache()
+        Clientes.objects.create(idCliente=1, nombre='Uno')
+
+    def test_recarga_solo_al_cambiar_version(self):
+        self.assertEqual(llavesTabla(Clientes), {1})
+
+        #Sin cambios solo se consulta la versión
+        with contarConsultas() as consultas:
+            self.assertEqual(llavesTabla(Clientes), {1})
+        self.assertEqual(consultas.consultas, 1)
+
+        Clientes.objects.create(idCliente=2, nombre='Dos')
+        incrementarVersion(Clientes)
+        with contarConsultas() as consultas:
+            self.assertEqual(llavesTabla(Clientes), {1, 2})
+        self.assertEqual(consultas.consultas, 2)
+
+
+# --------------------------------------------------------------------------------------------------
+# * Class: PicoMemoriaTest
+# * Descripción: El pico de memoria solo se atribuye a una sincronización si no se traslapó con otra del proceso
+# --------------------------------------------------------------------------------------------------
+class PicoMemoriaTest(TestCase):
+    def test_sin_pico_si_se_traslapan(self):
+        with medirPicoMemoria() as primera:
+            with medirPicoMemoria() as segunda:
+                pass
+        self.assertIsNone(primera.kb)
+        self.assertIsNone(segunda.kb)
+
+        with medirPicoMemoria() as sola:
+            pass
+        if sola.exclusivo and os.path.exists('/proc/self/status'):
+            self.assertGreater(sola.kb, 0)
+
+
+# --------------------------------------------------------------------------------------------------
+# * Class: InsertVentasTest
+# * Descripción: Si el bulk_create falla, insertVentas inserta las demás ventas una por una y regresa las rechazadas.
+# *              Las ventas sin su cliente en PostgreSQL no se insertan
+# --------------------------------------------------------------------------------------------------
+class InsertVentasTest(TestCase):
+    def setUp(self):
+        Clientes.objects.create(idCliente=1, nombre='Uno')
+
+    def venta(self, nombre, vendedor='Vendedor'):
+        return {
+            'name': nombre, 'invoice_date': date.today().isoformat(), 'city': '', 'state_id': '', 'country_id': '',
+            'branch_id': False, 'invoice_user_id': [1, vendedor], 'amount_total_signed': 100, 'partner_id': [1, 'Uno'],
+            'move_type': 'out_invoice',
+            'productsLines': [{'move_name': nombre, 'quantity': 1, 'price_unit': 100, 'price_subtotal': 100, 'product_id': False}],
+        }
+
+    def test_fila_mala_no_detiene_el_lote(self):
+        from unidades.administracion.reporteVentas.services.sincronizacionVentas import insertVentas
+
+        #El vendedor de la segunda venta no cabe en la columna (200 caracteres)
+        resultado = insertVentas([self.venta('F1'), self.venta('F2', 'x' * 300), self.venta('F3')])
+        self.assertEqual(resultado['creadas'], ['F1', 'F3'])
+        self.assertEqual(resultado['message'], [2, 0, 2])
+        self.assertEqual(resultado['rechazadas'], 1)
+        self.assertEqual(VentasPVH.objects.filter(venta_id__in=['F1', 'F3']).count(), 2)
+
+    def test_venta_sin_cliente_se_rechaza(self):
+        from unidades.administracion.reporteVentas.services.sincronizacionVentas import insertVentas
+
+        sinCliente = dict(self.venta('F4'), partner_id=[99, 'No existe'])
+        resultado = insertVentas([self.venta('F5'), sinCliente])
+        self.assertEqual(resultado['creadas'], ['F5'])
+        self.assertEqual(resultado['message'], [1, 0, 1])
+        self.assertEqual(resultado['rechazadas'], 1)
+
+
+# --------------------------------------------------------------------------------------------------
+# * Class: EscriturasEnBloqueTest
+# * Descripción: Dentro de transaction.atomic (como "sync --dry-run") una fila mala no aborta la transacción, las
+# *              demás se insertan o actualizan una por una
+# --------------------------------------------------------------------------------------------------
+class EscriturasEnBloqueTest(TestCase):
+    def cliente(self, idCliente, nombre='Cliente'):
+        return {'id': idCliente, 'name': nombre, 'city': False, 'state_id': False, 'country_id': False}
+
+    def test_fila_mala_en_transaccion(self):
+        from unidades.administracion.reporteVentas.services.sincronizacionClientes import insertClients
+        from unidades.sistema.sincronizacion.escrituras import actualizarEnBloque
+
+        with transaction.atomic():
+            #El nombre no acepta nulos, solo el segundo cliente falla
+            resultado = insertClients([self.cliente(1), self.cliente(2, None), self.cliente(3)])
+            self.assertEqual(resultado['message'], 2)
+
+            clientes = list(Clientes.objects.order_by('idCliente'))
+            clientes[0].nombre, clientes[1].nombre = None, 'Tres'
+            self.assertEqual(actualizarEnBloque(Clientes, clientes, ['nombre'], 1000), [clientes[1]])
+            self.assertEqual(list(Clientes.objects.order_by('idCliente').values_list('nombre', flat=True)), ['Cliente', 'Tres'])
+
+
+# --------------------------------------------------------------------------------------------------
+# * Class: IntegridadVentasTest
+# * Descripción: ventas_ids (0006_integridad_ventas) rechaza un idVenta repetido en otro mes, una linea sin venta y
+# *              cambiar la fecha de una venta con lineas
+# --------------------------------------------------------------------------------------------------
+class IntegridadVentasTest(TestCase):
+    def setUp(self):
+        Clientes.objects.create(idCliente=1, nombre='Uno')
+        self.fecha = date.today()
+        Ventas.objects.create(idVenta='F1', fecha=self.fecha, cliente_id=1, total=100)
+
+    def test_idventa_repetido_en_otro_mes(self):
+        with self.assertRaises(IntegrityError), transaction.atomic():
+            Ventas.objects.create(idVenta='F1', fecha=self.fecha - timedelta(days=62), cliente_id=1, total=100)
+
+    def test_linea_sin_venta(self):
+        VentasPVH.objects.create(venta_id='F1', fecha=self.fecha, cantidad=1, precioUnitario=100, subtotal=100)
+        #La llave foránea se revisa al terminar la transacción, check_constraints la revisa antes
+        with self.assertRaises(IntegrityError), transaction.atomic():
+            VentasPVH.objects.create(venta_id='F2', fecha=self.fecha, cantidad=1, precioUnitario=100, subtotal=100)
+            connection.check_constraints()
+        with self.assertRaises(IntegrityError), transaction.atomic():
+            #Dejaría la linea sin su venta ("idVenta", fecha)
+            Ventas.objects.filter(idVenta='F1').update(fecha=self.fecha - timedelta(days=62))
+            connection.check_constraints()
+
+
+# --------------------------------------------------------------------------------------------------
+# * Class: VentasExcelStreamingTest
+# * Descripción: La carga del Excel por lotes suma el total de cada venta nueva con sus lineas aunque queden en dos
+# *              lotes, no toca las ventas que ya tenían lineas y regresa las ventas rechazadas
+# --------------------------------------------------------------------------------------------------
+class VentasExcelStreamingTest(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        from unidades.administracion.reporteVentas.controllers import ctrVentas
+        if ctrVentas.conn.url != ODOO.url:
+            raise SkipTest('Los controladores se importaron antes con la conexión a otro Odoo')
+        super().setUpClass()
+
+    def setUp(self):
+        Clientes.objects.create(idCliente=1, nombre='Uno')
+        asegurarMeses([date.today()])
+        Ventas.objects.create(idVenta='F0', fecha=date.today(), cliente_id=1, total=50)
+        VentasPVH.objects.create(venta_id='F0', fecha=date.today(), cantidad=1, precioUnitario=50, subtotal=50)
+
+    def test_totales_por_lote(self):
+        import pandas as pd
+        from tempfile import TemporaryDirectory
+        from unidades.administracion.reporteVentas.views.viewsVentas import pullVentasExcelStreaming
+
+        ventas = pd.DataFrame({
+            'idVenta': ['F0', 'F1', 'F2', 'F3'], 'Fecha': [pd.Timestamp(date.today())] * 4,
+            'unidad': 'U', 'vendedor': 'Vendedor', 'idcliente': [1, 1, 1, 99],
+        })
+        #Con lotes de 3 lineas, las lineas de F2 quedan en dos lotes
+        lineas = pd.DataFrame({
+            'idVenta': ['F0', 'F1', 'F1', 'F2', 'F2', 'F3'], 'id_odoo': 0, 'nombreProducto': 'Producto',
+            'Cantidad facturada': 1, 'Precio unitario': [50, 10, 20, 5, 7, 1], 'Total': [50, 10, 20, 5, 7, 1],
+        })
+        with TemporaryDirectory() as carpeta:
+            archivo = os.path.join(carpeta, 'ventas.xlsx')
+            with pd.ExcelWriter(archivo) as libro:
+                ventas.to_excel(libro, sheet_name='Ventas', index=False)
+                lineas.to_excel(libro, sheet_name='pvh', index=False)
+            resultado = pullVentasExcelStreaming(3, archivo)
+
+        self.assertEqual(resultado['status'], 'success', resultado['message'])
+        self.assertEqual(resultado['rechazados'], 1)
+        self.assertIn('rechazadas', resultado['message'])
+        self.assertEqual({idVenta: int(total) for idVenta, total in Ventas.objects.values_list('idVenta', 'total')}, {'F0': 50, 'F1': 30, 'F2': 12})
+        self.assertEqual(VentasPVH.objects.filter(venta_id='F0').count(), 1)
+        self.assertEqual(int(Clientes.objects.get(idCliente=1).totalVendido), 92)
@@ -0,0 +1,250 @@
+import json
+import os
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import openpyxl
+from django.conf import settings
+from django.http import JsonResponse
+from django.views.decorators.csrf import csrf_exempt
+
+from conexiones import lectorExcel
+from unidades.administracion.reporteVentas.models import Clientes
+from unidades.administracion.reporteVentas.controllers import ctrCliente, ctrVentas
+from unidades.administracion.reporteVentas.services.sincronizacionClientes import insertClients
+from unidades.administracion.reporteVentas.services.sincronizacionVentas import insertVentas
+from unidades.produccionLogistica.maxMin.controllers import ctrProducto
+from unidades.produccionLogistica.maxMin.services.sincronizacionProductos import insertProducts
+from unidades.sistema.sincronizacion.candados import ejecutarConCandado
+from unidades.sistema.sincronizacion.sincronizaciones import parsearProcesos
+from unidades.sistema.sincronizacion.trabajos import encolar, ejecutarVista, registrarTarea, reportarProgreso, respuestaTrabajo
+
+#?Hojas que se pueden cargar en el orden en que se insertan (las ventas necesitan a sus clientes y productos)
+HOJAS_CARGA = ['Productos', 'Clientes', 'Ventas', 'pvh']
+
+#?Entidad de cada hoja, la carga toma el mismo candado que las sincronizaciones de esa entidad
+ENTIDADES_HOJA = {'Productos': 'productos', 'Clientes': 'clientes', 'Ventas': 'ventas'}
+
+
+# --------------------------------------------------------------------------------------------------
+# * Función: cargarArchivos
+# * Descripción: Recibe archivos de Excel (.xlsx) o CSV con las hojas del formato de Contpaq, los guarda en
+# *              settings.CARGAS_DIR y encola el trabajo procesarArchivos que los lee, valida e inserta en el
+# *              trabajador, así la petición no espera la lectura ni la carga.
+#
+# ! Parámetros:
+#     - request. Petición POST multipart con uno o varios archivos:
+#           - Un .xlsx con una o varias de las hojas Productos, Clientes, Ventas y pvh (el nombre del campo no importa)
+#           - Un .csv por hoja, la hoja se toma del nombre del campo o del nombre del archivo (ej. Ventas=@ventas.csv)
+#     - request.GET['procesos'] (opcional), número de procesos para leer las hojas, de 1 al número de CPUs (default)
+#     - request.GET['sincrono'] (opcional), si es "1" procesa los archivos dentro de la petición como las rutas de enCola
+#
+# ? Returns:
+#     - Caso error (status 400):
+#           La petición no es POST o no trae archivos
+#           procesos no es un número
+#           Algún archivo no tiene ninguna hoja reconocida
+#           Ocurre una excepción al guardar o leer los archivos
+#     - Caso success (status 202):
+#           Id del trabajo, el resultado de cada hoja se consulta en auto/trabajos/<id>/ (ver procesarArchivos)
+# --------------------------------------------------------------------------------------------------
+@csrf_exempt
+def cargarArchivos(request):
+    if request.method != 'POST' or not request.FILES:
+        return JsonResponse({
+            'status'  : 'error',
+            'message' : 'Se debe enviar por POST al menos un archivo .xlsx o .csv'
+        }, status=400)
+
+    try:
+        procesos = parsearProcesos(request.GET.get('procesos'), os.cpu_count() or 1)
+    except ValueError as e:
+        return JsonResponse({
+            'status'  : 'error',
+            'message' : str(e)
+        }, status=400)
+
+    tareas = []
+    try:
+        for campo, archivo in request.FILES.items():
+            ruta = guardarArchivo(archivo)
+            tareas.append((ruta, None))
+            hojas = hojasArchivo(ruta, campo, archivo.name)
+            if not hojas:
+                borrarArchivos(tareas)
+                return JsonResponse({
+                    'status'  : 'error',
+                    'message' : f'El archivo {archivo.name} no tiene ninguna de las hojas {HOJAS_CARGA}'
+                }, status=400)
+            tareas.pop()
+            tareas.extend((ruta, hoja) for hoja in hojas)
+
+    except Exception as e:
+        borrarArchivos(tareas)
+        return JsonResponse({
+            'status'  : 'error',
+            'message' : f'Ha ocurrido un error en cargarArchivos: {e}'
+        }, status=400)
+
+    #Los parámetros se guardan como los GET de las demás tareas, procesarArchivos los recibe en request.GET
+    parametros = {'tareas': json.dumps(tareas), 'procesos': str(procesos)}
+    if request.GET.get('sincrono') == '1':
+        return JsonResponse(ejecutarVista(procesarArchivos.__name__, parametros))
+    return respuestaTrabajo(encolar(procesarArchivos.__name__, parametros))
+
+
+# --------------------------------------------------------------------------------------------------
+# * Función: procesarArchivos
+# * Descripción: Tarea del trabajador que encola cargarArchivos. Lee las hojas en paralelo (un proceso por hoja),
+# *              valida sus columnas y las inserta con las mismas funciones que pullProductsExcel, pullClientesExcel
+# *              y pullVentasExcel, cada hoja con el candado de su entidad. Al terminar borra los archivos.
+#
+# ! Parámetros:
+#     - request.GET['tareas'], JSON con la lista [ruta, hoja] de cada hoja
+#     - request.GET['procesos'], número de procesos para leer las hojas
+#
+# ? Returns:
+#     - Caso error:
+#           Ocurre una excepción en la ejecución del código
+#     - Caso success:
+#           Por cada hoja envía las filas leídas y válidas, los errores de validación, el resultado de la carga y los
+#           tiempos de lectura, validación y carga
+#
+# ! Nota: La hoja pvh se carga junto con la hoja Ventas, las lineas de ventas que ya existían no se agregan.
+# --------------------------------------------------------------------------------------------------
+@registrarTarea
+def procesarArchivos(request):
+    tareas = [tuple(tarea) for tarea in json.loads(request.GET['tareas'])]
+    try:
+        inicio = time.perf_counter()
+        reporte = {}
+        dataframes = {}
+        for hoja, df, segundos in leerHojas(tareas, parsearProcesos(request.GET.get('procesos'), os.cpu_count() or 1)):
+            inicioValidacion = time.perf_counter()
+            dfValido, errores = lectorExcel.validarHoja(hoja, df)
+            reporte[hoja] = {
+                'filas'      : len(df),
+                'validas'    : len(dfValido) if dfValido is not None else 0,
+                'errores'    : errores,
+                'lectura'    : round(segundos, 3),
+                'validacion' : round(time.perf_counter() - inicioValidacion, 3),
+            }
+            if dfValido is not None:
+                dataframes[hoja] = dfValido
+
+        for hoja in HOJAS_CARGA:
+            if hoja in dataframes:
+                reportarProgreso(cadaSegundos=0, hoja=hoja, mensaje=f'Cargando la hoja {hoja}')
+                inicioCarga = time.perf_counter()
+                reporte[hoja]['resultado'] = cargarHojaConCandado(hoja, dataframes)['message']
+                reporte[hoja]['carga'] = round(time.perf_counter() - inicioCarga, 3)
+
+        return JsonResponse({
+            'status' : 'success',
+            'hojas'  : reporte,
+            'total'  : round(time.perf_counter() - inicio, 3)
+        })
+
+    except Exception as e:
+        return JsonResponse({
+            'status'  : 'error',
+            'message' : f'Ha ocurrido un error en procesarArchivos: {e}'
+        })
+
+    finally:
+        borrarArchivos(tareas)
+
+
+#Guarda el archivo subido en CARGAS_DIR para que el trabajador y los procesos del pool lo puedan abrir por su ruta
+def guardarArchivo(archivo):
+    os.makedirs(settings.CARGAS_DIR, exist_ok=True)
+    extension = os.path.splitext(archivo.name)[1].lower()
+    with tempfile.NamedTemporaryFile(dir=settings.CARGAS_DIR, suffix=extension if extension in ('.xlsx', '.csv') else '.xlsx', delete=False) as temporal:
+        for bloque in archivo.chunks():
+            temporal.write(bloque)
+        return temporal.name
+
+
+#Borra los archivos de las tareas, un archivo con varias hojas aparece varias veces
+def borrarArchivos(tareas):
+    for ruta in {ruta for ruta, _ in tareas}:
+        if os.path.exists(ruta):
+            os.remove(ruta)
+
+
+#Regresa las hojas reconocidas del archivo, en un CSV la hoja es el nombre del campo o del archivo
+def hojasArchivo(ruta, campo, nombre):
+    if ruta.endswith('.csv'):
+        for hoja in (campo, os.path.splitext(os.path.basename(nombre))[0]):
+            if hoja in HOJAS_CARGA:
+                return [hoja]
+        return []
+
+    libro = openpyxl.load_workbook(ruta, read_only=True)
+    try:
+        return [hoja for hoja in libro.sheetnames if hoja in HOJAS_CARGA]
+    finally:
+        libro.close()
+
+
+#Lee cada hoja en un proceso distinto (se ejecuta en el trabajador, no en el servidor web), con un solo proceso o una
+#sola hoja se lee en el proceso actual
+def leerHojas(tareas, procesos):
+    rutas, hojas = zip(*tareas)
+    if procesos <= 1 or len(tareas) == 1:
+        return list(map(lectorExcel.leerArchivo, rutas, hojas))
+
+    with ProcessPoolExecutor(max_workers=min(procesos, len(tareas))) as pool:
+        return list(pool.map(lectorExcel.leerArchivo, rutas, hojas))
+
+
+# --------------------------------------------------------------------------------------------------
+# * Función: cargarHoja
+# * Descripción: Inserta una hoja ya validada con las mismas funciones de las cargas del Excel de Contpaq
+#
+# ! Parámetros:
+#     - hoja, nombre de la hoja
+#     - dataframes, diccionario {hoja: DataFrame} con todas las hojas válidas (Ventas usa también pvh)
+#
+# ? Returns:
+#     - Diccionario { status, message } con el resultado de la carga
+# --------------------------------------------------------------------------------------------------
+def cargarHoja(hoja, dataframes):
+    df = dataframes[hoja]
+
+    if hoja == 'Productos':
+        productsOdoo = ctrProducto.get_allProductsExcel([], df)
+        if productsOdoo['status'] != 'success':
+            return productsOdoo
+        response = insertProducts(productsOdoo['products'])
+        return {'status': 'success', 'message': f'Se han agregado correctamente {response["message"]} nuevos productos de {len(productsOdoo["products"])}'}
+
+    if hoja == 'Clientes':
+        clientesPSQL = set(Clientes.objects.filter(idCliente__in=df['idCliente'].tolist()).values_list('idCliente', flat=True))
+        clientesOdoo = ctrCliente.get_clientsExcel(clientesPSQL, df)
+        if clientesOdoo['status'] != 'success':
+            return clientesOdoo
+        response = insertClients(clientesOdoo['clientes'])
+        return {'status': 'success', 'message': f'Se han agregado correctamente {response["message"]} clientes de {len(clientesOdoo["clientes"])}'}
+
+    if hoja == 'Ventas':
+        ventasExcel = ctrVentas.get_VentasExcel(df, dataframes.get('pvh'))
+        if ventasExcel['status'] != 'success':
+            return ventasExcel
+        response = insertVentas(ventasExcel['ventas'])
+        return {'status': 'success', 'message': f'Se han agregado correctamente {response["message"][0]} ventas de {len(ventasExcel["ventas"])}'}
+
+    if 'Ventas' in dataframes:
+        return {'status': 'success', 'message': 'Las lineas se cargaron junto con la hoja Ventas'}
+    return {'status': 'success', 'message': 'La hoja pvh solo se carga junto con la hoja Ventas'}
+
+
+#Carga la hoja con el candado de su entidad (ver ENTIDADES_HOJA), espera si hay una sincronización de la entidad en curso
+def cargarHojaConCandado(hoja, dataframes):
+    if hoja not in ENTIDADES_HOJA:
+        return cargarHoja(hoja, dataframes)
+    return ejecutarConCandado(
+        ENTIDADES_HOJA[hoja], 'excel', {'hoja': hoja}, False,
+        lambda ejecucion: cargarHoja(hoja, dataframes), concurrencia='esperar'
+    )
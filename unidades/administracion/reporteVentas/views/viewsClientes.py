@@ -1,231 +1,46 @@
 from django.http import JsonResponse
 from unidades.administracion.reporteVentas.models import Clientes
 from unidades.administracion.reporteVentas.controllers import ctrCliente
+from unidades.administracion.reporteVentas.services.sincronizacionClientes import insertClients
+from unidades.sistema.sincronizacion.sincronizaciones import sincronizarPeticion
+from unidades.sistema.sincronizacion.referencias import llavesTabla
+from conexiones import lectorExcel
 
 
-# --------------------------------------------------------------------------------------------------
-# * Función: insertProducts
-# * Descripción: Inserta productos en la base de datos PostgreSQL.
-#
-# ! Parámetros:
-#     - Recibe una lista (array) de clientes. Cada cliente debe contener los siguientes campos:
-#       { id, name, city, state_id, country_id }
-#     - Nota: Solo el campo "id" es obligatorio; los demás son opcionales.
-#
-# ? Condiciones para insertar un producto en la base de datos:
-#     1. El cliente debe un id único.
-#
-# --------------------------------------------------------------------------------------------------
-def insertClients(clients):
-    #Obtenemos todos los ids de clientes de Postgres
-    clientesPSQL = Clientes.objects.all().values_list('idCliente', flat=True)
-    
-    clientesCreate = []
-    newClientes = 0
-    
-    for cliente in clients:
-        
-        #Si el id no esta en la base de datos lo agrega
-        if cliente['id'] not in clientesPSQL:
-            
-                #Asignamos la distribución de la información en sus respectivas variables
-                clientesCreate.append(
-                    Clientes(
-                        idCliente           = cliente['id'],
-                        nombre              = cliente['name'] if cliente['name']!=False else "",
-                        ciudad              = cliente['city'] if cliente['city']!=False else "",
-                        estado              = cliente['state_id'][1] if cliente['state_id']!=False else "",
-                        pais                = cliente['country_id'][1] if cliente['country_id']!=False else "",
-                        tipoCliente         = "Cliente Nuevo",
-                        numTransacciones    = 0
-                    )
-                )
-                    
-    try:
-        Clientes.objects.bulk_create(clientesCreate, batch_size=1000)
-        newClientes+=len(clientesCreate)
-    except:
-        try:
-            for cliente in clientesCreate:
-                cliente.save()
-                newClientes+=1
-        except Exception as e:
-            print("Error en viewsClientes.insertClients | Cliente no se inserto: ", e, cliente)
-    
-    return ({
-        'status'  : 'success',
-        'message' : newClientes
-    })
-    
-
 # --------------------------------------------------------------------------------------------------
 # * Función: pullClientesOdoo
-# * Descripción: Obtiene todos los clientes de Odoo y llama a la función de insertar datos
+# * Descripción: Obtiene todos los clientes de Odoo por lotes e inserta los que no existen en PostgreSQL
+# *              La lógica está en sincronizacionClientes.pull, también se ejecuta con "py manage.py sync clientes --mode pull"
 #
 # ! Parámetros:
-#     - request. Como se utiliza para URLS, recibe la información de la consulta
-#
-# ? Returns:
-#     - Caso error:
-#           Ocurre algún error en traer a los clientes de Odoo
-#           La función insertClients retorna mensaje de error
-#           Ocurre una excepción en la ejecución del código
-#     - Caso success:
-#           La función insertClients retorna mensaje success y envía mensaje con la cantidad de clientes agregados
+#     - request. Como se utiliza para URLS, acepta ?lote= y ?desde= (ver sincronizaciones.sincronizarPeticion)
 # --------------------------------------------------------------------------------------------------
 def pullClientesOdoo(request):
-    try:
-        
-        #Trae todos los clientes de la base de datos
-        clientesOdoo=ctrCliente.get_allClients()
-        
-        if clientesOdoo['status'] == 'success':
-            
-            #Llama a insertClientes y le envia todos lo clientes que obtuvo de Odoo
-            response=insertClients(clientesOdoo['clientes'])
-            if response['status'] == "success":
-                message = response['message']
-                return JsonResponse({
-                    'status'  : 'success',
-                    'message' : f'Se han agregado correctamente {message} clientes de {len(clientesOdoo["clientes"])}'
-                })
-            return JsonResponse({
-                'status'  : 'error',
-                'message' : response['message']
-            })
-            
-        else:
-            return JsonResponse({
-                'status'  : 'error',
-                'message' : clientesOdoo['message']
-            })
-        
-    except Exception as e:
-        return JsonResponse({
-            'status'  : 'error',
-            'message' : f'Ha ocurrido un error al tratar de insertar los datos: {e}'
-        })
+    return sincronizarPeticion('clientes', 'pull', request)
 
 
 # --------------------------------------------------------------------------------------------------
 # * Función: createClientesOdoo
-# * Descripción: Obtiene todos los clientes de Odoo que se haya creado desde un dia antes
+# * Descripción: Crea en PostgreSQL los clientes nuevos de Odoo
+# *              La lógica está en sincronizacionClientes.create, también se ejecuta con "py manage.py sync clientes --mode create"
 #
 # ! Parámetros:
-#     - request. Como se utiliza para URLS, recibe la información de la consulta
-#
-# ? Returns:
-#     - Caso error:
-#           Ocurre algún error en traer a los clientes de Odoo
-#           La función insertClients retorna mensaje de error
-#           Ocurre una excepción en la ejecución del código
-#     - Caso success:
-#           La función insertClients retorna mensaje success y envía mensaje con la cantidad de clientes agregados
+#     - request. Como se utiliza para URLS, acepta ?lote= y ?desde= (ver sincronizaciones.sincronizarPeticion)
 # --------------------------------------------------------------------------------------------------
 def createClientesOdoo(request):
-    try:
-        clientesIDs = Clientes.objects.all().values_list('idCliente', flat=True)
-        #Traer todos los clientes de Odoo
-        clientesOdoo=ctrCliente.get_newClients(list(clientesIDs))
-        
-        if clientesOdoo['status'] == 'success':
-            
-            #Llama a insertClientes y le envia todos lo clientes que obtuvo de Odoo
-            response=insertClients(clientesOdoo['clientes'])
-            if response['status'] == "success":
-                message = response['message']
-                return JsonResponse({
-                    'status'  : 'success',
-                    'message' : f'Se han agregado correctamente {message} clientes nuevos de {len(clientesOdoo["clientes"])}'
-                })
-            return JsonResponse({
-                'status'  : 'error',
-                'message' : response['message']
-            })
-            
-        else:
-            return JsonResponse({
-                'status'  : 'error',
-                'message' : clientesOdoo['message']
-            })
-        
-    except Exception as e:
-        return JsonResponse({
-            'status'  : 'error',
-            'message' : f'Ha ocurrido un error al tratar de insertar los datos de los nuevos clientes: {e}'
-        })
+    return sincronizarPeticion('clientes', 'create', request)
 
 
 # --------------------------------------------------------------------------------------------------
 # * Función: updateClientesOdoo
-# * Descripción: Obtiene todos los clientes de Odoo que se haya creado desde un dia antes
+# * Descripción: Actualiza el nombre y la dirección de los clientes con los datos de Odoo
+# *              La lógica está en sincronizacionClientes.update, también se ejecuta con "py manage.py sync clientes --mode update"
 #
 # ! Parámetros:
-#     - request. Como se utiliza para URLS, recibe la información de la consulta
-#
-# ? Returns:
-#     - Caso error:
-#           Ocurre algún error en traer a los clientes de Odoo
-#           La función insertClients retorna mensaje de error
-#           Ocurre una excepción en la ejecución del código
-#     - Caso success:
-#           La función retorna mensaje success y envía mensaje con la cantidad de clientes modificados
+#     - request. Como se utiliza para URLS, acepta ?lote= y ?desde= (ver sincronizaciones.sincronizarPeticion)
 # --------------------------------------------------------------------------------------------------
 def updateClientesOdoo(request):
-    try:
-        clientesIDs = Clientes.objects.all().values_list('idCliente', flat=True)
-        #Traer todos los clientes de Odoo que se actualizaron
-        clientesOdoo=ctrCliente.get_updateClients(list(clientesIDs))
-        
-        clientesObj = {c.idCliente: c for c in Clientes.objects.all()}
-        clientesUpdate = []
-        updatedClientes = 0
-        
-        if clientesOdoo['status'] == 'success':
-            
-            for cliente in clientesOdoo['clientes']:
-                
-                #Busca el ID del cliente en Postgres
-                clienteObj = clientesObj.get(cliente['id'])
-                
-                #Cambia los valores de la Postgres por los nuevos valores que hay en odoo
-                clienteObj.nombre              = cliente['name'] if cliente['name']!=False else ""
-                clienteObj.ciudad              = cliente['city'] if cliente['city']!=False else ""
-                clienteObj.estado              = cliente['state_id'][1] if cliente['state_id']!=False else ""
-                clienteObj.pais                = cliente['country_id'][1] if cliente['country_id']!=False else ""
-                
-                clientesUpdate.append(clienteObj)
-            
-            try:
-                Clientes.objects.bulk_update(
-                    clientesUpdate,
-                    ['nombre', 'ciudad', 'estado', 'pais'],
-                    batch_size=1000
-                )
-                updatedClientes+=len(clientesUpdate)
-            except:
-                try:
-                    for cliente in clientesUpdate:
-                        cliente.save()
-                        updatedClientes+=1
-                except Exception as e:
-                    print("Error en viewsClientes.insertClients | Cliente no se actualizo: ", e, cliente)
-            
-            return JsonResponse({
-                'status'  : 'success',
-                'message' : f'Se han modificados {updatedClientes} clientes de {len(clientesOdoo["clientes"])}'
-            })
-        else:
-            return JsonResponse({
-                'status'  : 'error',
-                'message' : clientesOdoo['message']
-            })
-        
-    except Exception as e:
-        return JsonResponse({
-            'status'  : 'error',
-            'message' : f'Ha ocurrido un error al tratar de insertar los datos: {e}'
-        })
+    return sincronizarPeticion('clientes', 'update', request)
 
 
 # --------------------------------------------------------------------------------------------------
@@ -234,6 +49,8 @@ def updateClientesOdoo(request):
 #
 # ! Parámetros:
 #     - request. Como se utiliza para URLS, recibe la información de la consulta
+#     - request.GET['streaming'] (opcional), si es "1" lee el Excel por lotes con lectorExcel sin cargar la hoja completa
+#     - request.GET['lote'] (opcional), cantidad de filas por lote en modo streaming (default 5000)
 #
 # ? Returns:
 #     - Caso error:
@@ -245,7 +62,10 @@ def updateClientesOdoo(request):
 # --------------------------------------------------------------------------------------------------
 def pullClientesExcel(request):
     try:
-        clientesPSQL = Clientes.objects.all().values_list('idCliente', flat=True)
+        if request.GET.get('streaming') == '1':
+            return pullClientesExcelStreaming(int(request.GET.get('lote', 5000)))
+        
+        clientesPSQL = llavesTabla(Clientes)
         #Traer todos los clientes de Odoo
         clientesOdoo=ctrCliente.get_clientsExcel(clientesPSQL)
         
@@ -274,4 +94,34 @@ def pullClientesExcel(request):
         return JsonResponse({
             'status'  : 'error',
             'message' : f'Ha ocurrido un error al tratar de insertar los datos de los nuevos clientes: {e}'
-        })
\ No newline at end of file
+        })
+
+# --------------------------------------------------------------------------------------------------
+# * Función: pullClientesExcelStreaming
+# * Descripción: Modo streaming de pullClientesExcel, lee la hoja 'Clientes' por lotes y solo consulta en Postgres
+# *              y en Odoo los clientes de cada lote, por lo que la memoria no depende del tamaño del Excel
+#
+# ! Parámetros:
+#     - tamanoLote, cantidad de filas de cada lote
+# --------------------------------------------------------------------------------------------------
+def pullClientesExcelStreaming(tamanoLote):
+    nuevos = 0
+    excel = 0
+    for df in lectorExcel.iterarHoja(ctrCliente.archivo, 'Clientes', tamanoLote):
+        clientesPSQL = set(Clientes.objects.filter(idCliente__in=df['idCliente'].tolist()).values_list('idCliente', flat=True))
+        clientesOdoo = ctrCliente.get_clientsExcel(clientesPSQL, df)
+        
+        if clientesOdoo['status'] != 'success':
+            return JsonResponse({
+                'status'  : 'error',
+                'message' : clientesOdoo['message']
+            })
+        
+        response = insertClients(clientesOdoo['clientes'])
+        nuevos += response['message']
+        excel += len(clientesOdoo['clientes'])
+    
+    return JsonResponse({
+        'status'  : 'success',
+        'message' : f'Se han agregado correctamente {nuevos} clientes Excel de {excel}'
+    })
@@ -1,260 +1,208 @@
+from django.db import transaction
 from django.http import JsonResponse
-from unidades.administracion.reporteVentas.models import Ventas, Clientes
-from unidades.administracion.reporteVentas.views.viewsLineaPV import insertLineaVentaOdoo
+from unidades.administracion.reporteVentas.models import Ventas, VentasPVH
 from unidades.administracion.reporteVentas.controllers import ctrVentas
-from unidades.produccionLogistica.maxMin.models import Productos
-from datetime import datetime
+from unidades.administracion.reporteVentas.services.clasificacionClientes import clasificarClientes
+from unidades.administracion.reporteVentas.services.resumenClientes import resumirClientes
+from unidades.administracion.reporteVentas.services.sincronizacionVentas import insertVentas, insertLineaVentaOdoo, sumarTotalesVentas
+from unidades.sistema.sincronizacion.candados import ejecutarConCandado
+from unidades.sistema.sincronizacion.pipeline import ejecutarPipeline
+from unidades.sistema.sincronizacion.sincronizaciones import sincronizarPeticion
 
 # --------------------------------------------------------------------------------------------------
-# * Función: insertVentas
-# * Descripción: Obtiene las ventas de la base de datos de Odoo o de excel y los inserta en la base de datos de PostgreSQL
+# * Función: pullVentasOdoo
+# * Descripción: Obtiene todas las ventas de Odoo mes por mes y las inserta con sus lineas, acepta ?reiniciar=1
+# *              La lógica está en sincronizacionVentas.pull, también se ejecuta con "py manage.py sync ventas --mode pull"
 #
 # ! Parámetros:
-#     - Recibe un array de ventas, donde cada indice del array debe contener la siguiente informacion:
-#           {  id, nombre, fechaCreacion, cliente, vendedor, direccionEnvio, unidad, totalVenta, tipoFactura, lineaProducto {[idProducto, nombreProducto, cantidad, precioUnitario, precioSubtotal, marca, categoria], ...}, pais, estado, ciudad  }
-#
-# ? Condiciones para insertar una venta:
-#     1. La venta debe tener un idVenta o nombre disponible en la base de datos de PostgreSQL.
-#
-# ? Lógica para determinar el venta:
-#     - Si "move_type" es igual a "out_invoice", significa que es una venta completada.
-#     - Si "move_type" es igual a "out_refund", significa que es una nota de crédito.
+#     - request. Como se utiliza para URLS, acepta ?lote= y ?desde= (ver sincronizaciones.sincronizarPeticion)
 # --------------------------------------------------------------------------------------------------
-def insertVentas(ventas):
-    #Llamar a las ventas, productos e insumos ya existentes en Postgres
-    ventasPSQL = Ventas.objects.all().values_list('idVenta', flat=True)
-    
-    clientesObj = {c.idCliente: c for c in Clientes.objects.all()}
-    
-    ultimasVentas = {}
-            
-    ventasCreate = []
-    clientesUpdate = []
-    ventasPVCreate= []
-    
-    newVentas = 0
-    newNota = 0
-    
-    for venta in ventas:
-        if venta['name'] not in ventasPSQL:
-            #Asignamos la distribución de la información en sus respectivas variables
-            #Obtenemos al cliente
-            clienteObj = clientesObj.get(venta['partner_id'][0])
-            
-            #Factura
-            if venta['move_type'] == 'out_invoice':
-                newVentas=newVentas+1
-                clienteObj.numTransacciones+=1
-            #Nota de credito
-            if venta['move_type'] == 'out_refund':
-                newNota=newNota+1
+def pullVentasOdoo(request):
+    return sincronizarPeticion('ventas', 'pull', request)
 
-        
-            ventaRec = ultimasVentas.get(clienteObj.idCliente)['invoice_date'] if ultimasVentas.get(clienteObj.idCliente) else None
-            ventaAct = venta['invoice_date']
-            
-            if clienteObj.numTransacciones < 2:
-                clienteObj.tipoCliente = 'Cliente Nuevo'
-            else:
-                if ventaRec:
-                    if clienteObj.tipoCliente == 'Cliente Nuevo' and ventaAct.month == ventaRec.month and ventaAct.year == ventaRec.year:
-                        clienteObj.tipoCliente = 'Cliente Nuevo'
-                    elif (ventaAct - ventaRec).days >180:
-                        clienteObj.tipoCliente = 'Cliente Recuperado'
-                    else:
-                        if clienteObj.tipoCliente == 'Cliente Recuperado' and ventaAct.month == ventaRec.month and ventaAct.year == ventaRec.year:
-                            clienteObj.tipoCliente = 'Cliente Recuperado'
-                        clienteObj.tipoCliente = 'Cliente Cartera'
-                
-            ventasCreate.append(
-                Ventas(
-                    idVenta         = venta['name'],
-                    fecha           = venta['invoice_date'],
-                    ciudadVenta     = venta['city'],
-                    estadoVenta     = venta['state_id'],
-                    paisVenta       = venta['country_id'],
-                    unidad          = venta['branch_id'][1] if venta['branch_id'] else "",
-                    vendedor        = venta['invoice_user_id'][1],
-                    total           = venta['amount_total_signed'],
-                    cliente         = clienteObj,
-                    tipoCliente     = clienteObj.tipoCliente
-                )
-            )
-            
-            ventasPVCreate.extend(venta['productsLines'])
-            
-            clientesUpdate.append(clienteObj)
-            
-            ultimasVentas[clienteObj.idCliente] = venta
 
-    try:
-        Ventas.objects.bulk_create(ventasCreate, batch_size=1000)
-        Clientes.objects.bulk_update(
-            clientesUpdate,
-            ['tipoCliente', 'numTransacciones'],
-            batch_size=1000
-        )
-        #Llamamos a pull linea ventas para registrar todos los productos en Postgres
-        insertLineaVentaOdoo(ventasPVCreate)
-    except:
-        try:
-            for venta in ventasCreate:
-                venta.save()       
-        except Exception as e:
-            print("Error en viewsVentas.insertLVentas | Venta no se inserto: ", e, venta)
+# --------------------------------------------------------------------------------------------------
+# * Función: createVentasOdoo
+# * Descripción: Crea en PostgreSQL las ventas nuevas de Odoo con sus lineas
+# *              La lógica está en sincronizacionVentas.create, también se ejecuta con "py manage.py sync ventas --mode create"
+#
+# ! Parámetros:
+#     - request. Como se utiliza para URLS, acepta ?lote= y ?desde= (ver sincronizaciones.sincronizarPeticion)
+# --------------------------------------------------------------------------------------------------
+def createVentasOdoo(request):
+    return sincronizarPeticion('ventas', 'create', request)
+
 
-    return({
-        'status'  : 'success',
-        'message' : [newVentas, newNota, (newVentas + newNota)]
-    })
-                    
-                    
 # --------------------------------------------------------------------------------------------------
-# * Función: pullVentasOdoo
-# * Descripción: Obtiene todos las ventas de Odoo y llama a la función de insertarVentas e intertarLinea
+# * Función: createSalesExcel
+# * Descripción: Obtiene todos las ventas de Excel que se hayan hecho hace un dia y llama a la función de insertarVentas e intertarLinea
+# *              Se ejecuta con el candado de ventas, espera si hay una sincronización o carga de ventas en curso
 #
 # ! Parámetros:
 #     - request. Como se utiliza para URLS, recibe la información de la consulta
+#     - request.GET['streaming'] (opcional), si es "1" lee el Excel por lotes con lectorExcel sin cargar las hojas completas
+#     - request.GET['lote'] (opcional), cantidad de filas por lote en modo streaming (default 5000)
 #
 # ? Returns:
 #     - Caso error:
-#           Ocurre algún error en traer a los clientes de Odoo
+#           Ocurre algún error en traer a los clientes de Excel
 #           La función insertClients retorna mensaje de error
 #           Ocurre una excepción en la ejecución del código
 #     - Caso success:
 #           La función insertarVentas retorna mensaje success y envía mensaje con la cantidad de facturas y notas de credito agregadas
-# --------------------------------------------------------------------------------------------------
-def pullVentasOdoo(request):
+# --------------------------------------------------------------------------------------------------  
+def pullVentasExcel(request):
     try:
+        streaming = request.GET.get('streaming') == '1'
+        tamanoLote = int(request.GET.get('lote', 5000))
         
-        #Traer todos los clientes de Odoo
-        ventasOdoo=ctrVentas.get_allSales()
-        
-        if ventasOdoo['status'] == 'success':
-            
-            #Llama a insertVentas y le envia todos las ventas que obtuvo de Odoo
-            response=insertVentas(ventasOdoo['ventas'])
-            
-            if response['status'] == "success":
-                return JsonResponse({
-                    'status'  : 'success',
-                    'message' : f'Se han agregado correctamente {response["message"][0]} ventas, {response["message"][1]} notas de credito dando un total de {response["message"][2]} de {len(ventasOdoo["ventas"])}'
-                })
-                
-            return JsonResponse({
-                'status'  : 'error',
-                'message' : response['message']
-            })
-        
-        else:
-            return JsonResponse({
-                'status'  : 'error',
-                'message' : ventasOdoo['message']
-            })
+        return JsonResponse(ejecutarConCandado(
+            'ventas', 'excel', {'streaming': streaming, 'lote': tamanoLote}, False,
+            lambda ejecucion: pullVentasExcelStreaming(tamanoLote) if streaming else insertVentasExcel(),
+            concurrencia='esperar'
+        ))
         
     except Exception as e:
         return JsonResponse({
             'status'  : 'error',
-            'message' : f'Ha ocurrido un error en pull Ventas: {e}'
+            'message' : f'Ha ocurrido un error en createSalesExcel: {e}'
         })
 
 
+#Inserta las ventas del Excel completo con sus lineas, regresa el diccionario de respuesta de pullVentasExcel
+def insertVentasExcel():
+    #Traer todos los clientes de Odoo
+    ventasOdoo=ctrVentas.get_VentasExcel()
+    
+    if ventasOdoo['status'] != 'success':
+        return {
+            'status'  : 'error',
+            'message' : ventasOdoo['message']
+        }
+    
+    #Llama a insertVentas y le envia todos las ventas que obtuvo de Odoo
+    response=insertVentas(ventasOdoo['ventas'])
+    
+    if response['status'] == "success":
+        rechazadas = f', con {response["rechazadas"]} ventas o lineas rechazadas' if response['rechazadas'] else ''
+        return {
+            'status'     : 'success',
+            'message'    : f'Se han agregado correctamente {response["message"][0]} ventas de Excel, {response["message"][1]} notas de credito de Excel dando un total de {response["message"][2]} de {len(ventasOdoo["ventas"])}{rechazadas}',
+            'rechazados' : response['rechazadas']
+        }
+        
+    return {
+        'status'  : 'error',
+        'message' : response['message']
+    }
+
+
 # --------------------------------------------------------------------------------------------------
-# * Función: createVentasOdoo
-# * Descripción: Obtiene todos las ventas de Odoo que se hayan hecho hace un dia y llama a la función de insertarVentas e intertarLinea
+# * Función: pullVentasExcelStreaming
+# * Descripción: Modo streaming de pullVentasExcel, la memoria no depende del tamaño del Excel. Regresa el diccionario
+# *              de respuesta de pullVentasExcel
 #
 # ! Parámetros:
-#     - request. Como se utiliza para URLS, recibe la información de la consulta
+#     - tamanoLote, cantidad de filas de cada lote
+#     - archivo (opcional), ruta del Excel, por default el de Contpaq
 #
-# ? Returns:
-#     - Caso error:
-#           Ocurre algún error en traer a los clientes de Odoo
-#           La función insertClients retorna mensaje de error
-#           Ocurre una excepción en la ejecución del código
-#     - Caso success:
-#           La función insertarVentas retorna mensaje success y envía mensaje con la cantidad de facturas y notas de credito agregadas
-# --------------------------------------------------------------------------------------------------        
-def createVentasOdoo(request):
-    try:
-        ventasIDs = Ventas.objects.all().values_list('idVenta', flat=True)
+# ? Etapas:
+#     1. Lee la hoja 'Ventas' por lotes e inserta las ventas sin lineas y con total 0
+#     2. Lee la hoja 'pvh' por lotes, inserta las lineas de las ventas que todavía no tienen lineas y les suma su
+#        subtotal al total en la misma transacción, así el total de cada venta siempre es el de sus lineas guardadas
+#        aunque la carga se interrumpa. Solo se guardan en memoria las ventas del lote anterior
+#
+# ! Nota: La hoja 'pvh' está agrupada por venta, las lineas de una venta pueden quedar al final de un lote y al
+#         inicio del siguiente, pero no en lotes más separados
+# --------------------------------------------------------------------------------------------------
+def pullVentasExcelStreaming(tamanoLote, archivo=ctrVentas.archivo):
+    resultado = {'ventas': 0, 'notas': 0, 'excel': 0, 'rechazadas': 0, 'error': None}
+    
+    #Inserta cada lote de ventas mientras se lee el siguiente lote del Excel
+    def escribirVentas(ventasExcel):
+        if ventasExcel['status'] != 'success':
+            resultado['error'] = ventasExcel['message']
+            return False
         
-        #Traer todos los clientes de Odoo
-        ventasOdoo=ctrVentas.get_newSales(list(ventasIDs))
+        response = insertVentas(ventasExcel['ventas'])
+        resultado['ventas'] += response['message'][0]
+        resultado['notas'] += response['message'][1]
+        resultado['excel'] += len(ventasExcel['ventas'])
+        resultado['rechazadas'] += response['rechazadas']
+    
+    tiempos = ejecutarPipeline(ctrVentas.iter_VentasExcel(archivo, tamanoLote=tamanoLote), escribirVentas)
+    
+    if resultado['error']:
+        return {
+            'status'  : 'error',
+            'message' : resultado['error']
+        }
+    
+    #{idVenta: (fecha, idCliente)} de las ventas que recibieron lineas en el lote anterior
+    anteriores = {}
+    
+    #Inserta las lineas de las ventas nuevas y suma su subtotal al total de cada venta
+    def escribirLineas(lineas):
+        nombres = {linea['move_name'] for linea in lineas}
+        ventasLote = {nombre: anteriores[nombre] for nombre in nombres if nombre in anteriores}
+        ventasLote.update(
+            (idVenta, (fecha, idCliente))
+            for idVenta, fecha, idCliente in Ventas.objects
+                .filter(idVenta__in=nombres)
+                .exclude(idVenta__in=VentasPVH.objects.filter(venta_id__in=nombres).values('venta_id'))
+                .values_list('idVenta', 'fecha', 'cliente_id')
+        )
+        lineas = [linea for linea in lineas if linea['move_name'] in ventasLote]
         
-        if ventasOdoo['status'] == 'success':
-            
-            #Llama a insertVentas y le envia todos las ventas que obtuvo de Odoo
-            response=insertVentas(ventasOdoo['ventas'])
-            
-            if response['status'] == "success":
-                return JsonResponse({
-                    'status'  : 'success',
-                    'message' : f'Se han agregado correctamente {response["message"][0]} ventas nuevas, {response["message"][1]} notas de credito nuevas dando un total de {response["message"][2]} de {len(ventasOdoo["ventas"])}'
-                })
-                
-            return JsonResponse({
-                'status'  : 'error',
-                'message' : response['message']
-            })
+        totales = {}
+        for linea in lineas:
+            llave = (linea['move_name'], ventasLote[linea['move_name']][0])
+            totales[llave] = totales.get(llave, 0) + linea['price_subtotal']
         
-        else:
-            return JsonResponse({
-                'status'  : 'error',
-                'message' : ventasOdoo['message']
-            })
+        with transaction.atomic():
+            if lineas:
+                resultado['rechazadas'] += insertLineaVentaOdoo(lineas)['rechazadas']
+            sumarTotalesVentas(totales)
+            resumirClientes({idCliente for _, idCliente in ventasLote.values()})
         
-    except Exception as e:
-        return JsonResponse({
-            'status'  : 'error',
-            'message' : f'Ha ocurrido un error en pull Ventas: {e}'
-        })
-
+        anteriores.clear()
+        anteriores.update(ventasLote)
+    
+    tiemposLineas = ejecutarPipeline(ctrVentas.iter_LineasExcel(archivo, tamanoLote=tamanoLote), escribirLineas)
+    
+    rechazadas = f', con {resultado["rechazadas"]} ventas o lineas rechazadas' if resultado['rechazadas'] else ''
+    return {
+        'status'     : 'success',
+        'message'    : f'Se han agregado correctamente {resultado["ventas"]} ventas de Excel, {resultado["notas"]} notas de credito de Excel dando un total de {resultado["ventas"] + resultado["notas"]} de {resultado["excel"]}{rechazadas}',
+        'rechazados' : resultado['rechazadas'],
+        'tiempos'    : {'ventas': tiempos, 'lineas': tiemposLineas}
+    }
 
 # --------------------------------------------------------------------------------------------------
-# * Función: createSalesExcel
-# * Descripción: Obtiene todos las ventas de Excel que se hayan hecho hace un dia y llama a la función de insertarVentas e intertarLinea
+# * Función: clasificarClientesPSQL
+# * Descripción: Recalcula en PostgreSQL el tipo de cliente de todas las ventas y de todos los clientes, así
+# *              como los acumulados de ventas de cada cliente
 #
 # ! Parámetros:
-#     - request. Como se utiliza para URLS, recibe la información de la consulta
+#     - request. Petición HTTP
 #
 # ? Returns:
 #     - Caso error:
-#           Ocurre algún error en traer a los clientes de Excel
-#           La función insertClients retorna mensaje de error
 #           Ocurre una excepción en la ejecución del código
 #     - Caso success:
-#           La función insertarVentas retorna mensaje success y envía mensaje con la cantidad de facturas y notas de credito agregadas
-# --------------------------------------------------------------------------------------------------  
-def pullVentasExcel(request):
+#           Envía la cantidad de ventas y de clientes que cambiaron de tipo y de clientes con acumulados actualizados
+# --------------------------------------------------------------------------------------------------
+def clasificarClientesPSQL(request):
     try:
-        
-        #Traer todos los clientes de Odoo
-        ventasOdoo=ctrVentas.get_VentasExcel()
-        
-        if ventasOdoo['status'] == 'success':
-            
-            #Llama a insertVentas y le envia todos las ventas que obtuvo de Odoo
-            response=insertVentas(ventasOdoo['ventas'])
-            
-            if response['status'] == "success":
-                return JsonResponse({
-                    'status'  : 'success',
-                    'message' : f'Se han agregado correctamente {response["message"][0]} ventas de Excel, {response["message"][1]} notas de credito de Excel dando un total de {response["message"][2]} de {len(ventasOdoo["ventas"])}'
-                })
-                
-            return JsonResponse({
-                'status'  : 'error',
-                'message' : response['message']
-            })
-        
-        else:
-            return JsonResponse({
-                'status'  : 'error',
-                'message' : ventasOdoo['message']
-            })
-        
+        response = clasificarClientes()
+        resumidos = resumirClientes()
+        return JsonResponse({
+            'status'  : 'success',
+            'message' : f'Se reclasificaron {response["ventas"]} ventas y {response["clientes"]} clientes, se actualizaron los acumulados de {resumidos} clientes'
+        })
+
     except Exception as e:
         return JsonResponse({
             'status'  : 'error',
-            'message' : f'Ha ocurrido un error en createSalesExcel: {e}'
-        })
\ No newline at end of file
+            'message' : f'Ha ocurrido un error en clasificarClientesPSQL: {e}'
+        })
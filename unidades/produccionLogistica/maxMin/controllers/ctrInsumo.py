@@ -1,11 +1,148 @@
 import xmlrpc.client
 from datetime import datetime, timedelta
 
-from conexiones.conectionOdoo import OdooAPI
+from conexiones import metricas
+from conexiones.conectionOdoo import OdooAPI, filtroDesde
+from conexiones.conectionOdooAsync import ASINCRONO, OdooAPIAsync, consultarConcurrente, ejecutarAsync
 
 #? Instania de coneción a Odoo
 conOdoo = OdooAPI()
 
+#?Condiciones que deben cumplir los productos para ser insumos
+DOMINIO_INSUMOS = [
+    '|', ('active', '=', True), ('active', '=', False), 
+    ('categ_id', 'ilike', 'INSUMO'), 
+    ('categ_id.parent_id', 'not ilike', 'AGENCIA DIGITAL'), 
+    ('default_code', 'not ilike', 'STUDIO'), 
+    ('default_code', 'not ilike', 'T-S'), 
+    ('default_code', 'not ilike', 'T-T')
+]
+CAMPOS_INSUMOS = ['id', 'name', 'default_code', 'qty_available', 'product_brand_id', 'categ_id', 'route_ids', 'product_variant_id', 'purchase_ok', 'create_date', 'active']
+
+
+# --------------------------------------------------------------------------------------------------
+# * Función: consultasInsumos
+# * Descripción: Arma las consultas de Odoo que completan la información de los insumos, ninguna depende de otra
+#
+# ! Parámetros:
+#   - Recibe la lista de insumos (product.template) obtenidos de Odoo
+#
+# ? Return:
+#   - Diccionario {nombre: (modelo, metodo, args, kwargs)} con las consultas de variantes (solo si hay insumos
+#     archivados), orderpoints, proveedores y lineas de compra
+# --------------------------------------------------------------------------------------------------
+def consultasInsumos(insumosOdoo):
+    insumosNoID = [insumo['id'] for insumo in insumosOdoo if not insumo['active']]
+    idsT = [insumo['id'] for insumo in insumosOdoo]
+
+    consultas = {
+        # Reglas de maximos y minimos
+        'orderpoints' : ('stock.warehouse.orderpoint', 'search_read', 
+            [[('product_tmpl_id', 'in', idsT)]],
+            {  'fields' : ['product_tmpl_id', 'product_min_qty', 'product_max_qty']  }),
+        # Reglas de proveedores
+        'proveedores' : ('product.supplierinfo', 'search_read', 
+            [[('product_tmpl_id', 'in', idsT)]],
+            {  'fields' : ['product_tmpl_id', 'partner_id', 'delay'] }),
+        # Piezas pendientes de recibir en órdenes de compra
+        'compras' : ('purchase.order.line', 'search_read',
+            [[
+                ('display_type', 'not in', ['line_note', 'line_section']),
+                ('state', '!=', 'done'),
+                ('order_id.state', 'not in', ['draft', 'sent']),
+                ('order_id.receipt_status', '!=', 'full'),
+                ('order_id.user_id', '=', 46)
+            ]],
+            {  'fields' : ['product_id', 'product_qty', 'qty_received', 'display_type']}),
+    }
+    # Variantes de los insumos archivados
+    if insumosNoID:
+        consultas['variantes'] = ('product.product', 'search_read',
+            [[
+                ('active', '=', False), 
+                ('product_tmpl_id', 'in', insumosNoID)
+            ]],
+            {'fields': ['id', 'product_tmpl_id']})
+    return consultas
+
+
+# --------------------------------------------------------------------------------------------------
+# * Función: combinarInsumos
+# * Descripción: Agrega a cada insumo el resultado de las consultas de consultasInsumos
+#
+# ! Parámetros:
+#   - insumosOdoo, lista de insumos, se modifica en el mismo lugar
+#   - resultados, diccionario {nombre: lista de registros} con las mismas llaves de consultasInsumos
+#
+# ? Return:
+#   - La misma lista de insumos con las propiedades product_min_qty, product_max_qty, provider, delay y oc
+# --------------------------------------------------------------------------------------------------
+def combinarInsumos(insumosOdoo, resultados):
+    variants = {v['product_tmpl_id'][0]: v['id'] for v in resultados.get('variantes', [])}
+
+    # Asignar variants faltantes
+    for insumo in insumosOdoo:
+        if not insumo.get('product_variant_id') and insumo['id'] in variants:
+            insumo['product_variant_id'] = [variants[insumo['id']], '']
+
+    orderpoints = {op['product_tmpl_id'][0]: op for op in resultados['orderpoints']}
+    providers = {prov['product_tmpl_id'][0]: prov for prov in resultados['proveedores']}
+
+    existenciasOC = {}
+    for oc in resultados['compras']:
+        number = oc['product_qty'] - oc['qty_received']
+        if oc['product_id'][0] not in existenciasOC and number > 0:
+            existenciasOC[oc['product_id'][0]] = number
+            
+        elif oc['product_id'][0] in existenciasOC:
+            existenciasOC[oc['product_id'][0]] += number
+    
+    # Por cada producto encontrado que cumpla las reglas, relaciona los valores con las 
+    # reglas de maximos y minimos (orderpoints) y los proveedores (poviders)
+    for insumo in insumosOdoo:
+        insumo_id = insumo['id']
+        variant_id = insumo['product_variant_id'][0] if insumo.get('product_variant_id') else 0
+        
+        orderpoint = orderpoints.get(insumo_id, {})
+        insumo['product_min_qty'] = orderpoint.get('product_min_qty', 0)
+        insumo['product_max_qty'] = orderpoint.get('product_max_qty', 0)
+
+        provider = providers.get(insumo_id, {})
+        insumo['provider'] = provider.get('partner_id', ['None', 'Sin proveedor'])[1]
+        insumo['delay'] = provider.get('delay', 0)
+        
+        oc = existenciasOC.get(variant_id, 0)
+
+        insumo['oc'] = oc if oc > 0 else 0
+
+    return insumosOdoo
+
+
+#Completa los insumos con las consultas de consultasInsumos, al mismo tiempo con OdooAPIAsync o una por una si ODOO_ASYNC=0
+def enriquecerInsumos(insumosOdoo):
+    with metricas.fase('enrich'):
+        if ASINCRONO:
+            return ejecutarAsync(enriquecerInsumosAsync, insumosOdoo)
+
+        consultas = consultasInsumos(insumosOdoo)
+        resultados = {
+            nombre: conOdoo.models.execute_kw(conOdoo.db, conOdoo.uid, conOdoo.password, *consulta)
+            for nombre, consulta in consultas.items()
+        }
+        return combinarInsumos(insumosOdoo, resultados)
+
+
+#Versión asíncrona de enriquecerInsumos, las consultas se hacen al mismo tiempo (odoo es un OdooAPIAsync abierto, opcional)
+async def enriquecerInsumosAsync(insumosOdoo, odoo=None):
+    if odoo is None:
+        async with OdooAPIAsync() as odoo:
+            return await enriquecerInsumosAsync(insumosOdoo, odoo)
+
+    consultas = consultasInsumos(insumosOdoo)
+    resultados = await consultarConcurrente(odoo, *consultas.values())
+    return combinarInsumos(insumosOdoo, dict(zip(consultas, resultados)))
+
+
 # --------------------------------------------------------------------------------------------------
 # * Función: get_allInsumos
 # * Descripción: Obtiene todos los productos (que únicamente sean insumos) de Odoo
@@ -44,96 +181,12 @@ def get_allInsumos():
         insumosOdoo = conOdoo.models.execute_kw(
             conOdoo.db, conOdoo.uid, conOdoo.password,
             'product.template', 'search_read', 
-            [[
-                '|', ('active', '=', True), ('active', '=', False), 
-                ('categ_id', 'ilike', 'INSUMO'), 
-                ('categ_id.parent_id', 'not ilike', 'AGENCIA DIGITAL'), 
-                ('default_code', 'not ilike', 'STUDIO'), 
-                ('default_code', 'not ilike', 'T-S'), 
-                ('default_code', 'not ilike', 'T-T')
-            ]],
-            {  'fields' : ['id', 'name', 'default_code', 'qty_available', 'product_brand_id', 'categ_id', 'route_ids', 'product_variant_id', 'purchase_ok', 'create_date', 'active'] }
-        )
-        
-        insumosNoID = [insumo['id'] for insumo in insumosOdoo if not insumo['active']]             
-        
-        variants = {}
-        if insumosNoID:
-            variantIDs = conOdoo.models.execute_kw(
-                conOdoo.db, conOdoo.uid, conOdoo.password,
-                'product.product', 'search_read',
-                [[
-                    ('active', '=', False), 
-                    ('product_tmpl_id', 'in', insumosNoID)
-                ]],
-                {'fields': ['id', 'product_tmpl_id']}
-            )
-            variants = {v['product_tmpl_id'][0]: v['id'] for v in variantIDs}
-            
-            # Asignar variants faltantes
-            for insumo in insumosOdoo:
-                if not insumo.get('product_variant_id') and insumo['id'] in variants:
-                    insumo['product_variant_id'] = [variants[insumo['id']], '']
-                
-        idsT = [insumo['id'] for insumo in insumosOdoo]
-            
-        # Obtener reglas de maximos y minimos
-        orderpointsOdoo = conOdoo.models.execute_kw(
-            conOdoo.db, conOdoo.uid, conOdoo.password, 
-            'stock.warehouse.orderpoint', 'search_read', 
-            [[('product_tmpl_id', 'in', idsT)]],
-            {  'fields' : ['product_tmpl_id', 'product_min_qty', 'product_max_qty']  }
-        )
-        orderpoints = {op['product_tmpl_id'][0]: op for op in orderpointsOdoo}
-            
-        # Obtener reglas de proveedores
-        providersOdoo = conOdoo.models.execute_kw(
-            conOdoo.db, conOdoo.uid, conOdoo.password,
-            'product.supplierinfo', 'search_read', 
-            [[('product_tmpl_id', 'in', idsT)]],
-            {  'fields' : ['product_tmpl_id', 'partner_id', 'delay'] }
-        )
-        providers = {prov['product_tmpl_id'][0]: prov for prov in providersOdoo}
-        
-        existenciasOCOdoo = conOdoo.models.execute_kw(
-            conOdoo.db, conOdoo.uid, conOdoo.password,
-            'purchase.order.line', 'search_read',
-            [[
-                ('display_type', 'not in', ['line_note', 'line_section']),
-                ('state', '!=', 'done'),
-                ('order_id.state', 'not in', ['draft', 'sent']),
-                ('order_id.receipt_status', '!=', 'full'),
-                ('order_id.user_id', '=', 46)
-            ]],
-            {  'fields' : ['product_id', 'product_qty', 'qty_received', 'display_type']}
+            [DOMINIO_INSUMOS],
+            {  'fields' : CAMPOS_INSUMOS }
         )
-        existenciasOC = {}
         
-        for oc in existenciasOCOdoo:
-            number = oc['product_qty'] - oc['qty_received']
-            if oc['product_id'][0] not in existenciasOC and number > 0:
-                existenciasOC[oc['product_id'][0]] = number
-                
-            elif oc['product_id'][0] in existenciasOC:
-                existenciasOC[oc['product_id'][0]] += number
-        
-        # Por cada producto encontrado que cumpla las reglas, relaciona los valores con las 
-        # reglas de maximos y minimos (orderpoints) y los proveedores (poviders)
-        for insumo in insumosOdoo:
-            insumo_id = insumo['id']
-            variant_id = insumo['product_variant_id'][0] if insumo.get('product_variant_id') else 0
-            
-            orderpoint = orderpoints.get(insumo_id, {})
-            insumo['product_min_qty'] = orderpoint.get('product_min_qty', 0)
-            insumo['product_max_qty'] = orderpoint.get('product_max_qty', 0)
-
-            provider = providers.get(insumo_id, {})
-            insumo['provider'] = provider.get('partner_id', ['None', 'Sin proveedor'])[1]
-            insumo['delay'] = provider.get('delay', 0)
-            
-            oc = existenciasOC.get(variant_id, 0)
-    
-            insumo['oc'] = oc if oc > 0 else 0
+        #Agrega a cada insumo sus reglas de máximos y mínimos, proveedor y piezas en órdenes de compra
+        enriquecerInsumos(insumosOdoo)
 
         return ({
             'status'   : 'success',
@@ -154,7 +207,8 @@ def get_allInsumos():
 # * Descripción: Obtiene los productos nuevos (que únicamente sean insumos) de Odoo
 #
 # ! Parámetros:
-#   - No recibe ningún parámetro
+#   - Recibe la lista de IDs que ya existen en PostgreSQL
+#   - desde (opcional), datetime para traer solo los registros creados desde esa fecha (create_date)
 #
 # ? Condiciones para saber que productos obtener
 #   1. La categoría del producto no debe de contener:
@@ -174,7 +228,7 @@ def get_allInsumos():
 #   - Caso error: 
 #       En caso de haber ocurrido algun error retorna un JSON con status error y el mensaje del error
 # --------------------------------------------------------------------------------------------------
-def get_newInsumos(insumosIDs):
+def get_newInsumos(insumosIDs, desde=None):
     #!Determinamos si existe conexión con odoo
     if not conOdoo.models:
         return ({
@@ -188,97 +242,12 @@ def get_newInsumos(insumosIDs):
         insumosOdoo = conOdoo.models.execute_kw(
             conOdoo.db, conOdoo.uid, conOdoo.password,
             'product.template', 'search_read', 
-            [[
-                ('id', 'not in', insumosIDs),
-                '|', ('active', '=', True), ('active', '=', False), 
-                ('categ_id', 'ilike', 'INSUMO'), 
-                ('categ_id.parent_id', 'not ilike', 'AGENCIA DIGITAL'), 
-                ('default_code', 'not ilike', 'STUDIO'), 
-                ('default_code', 'not ilike', 'T-S'), 
-                ('default_code', 'not ilike', 'T-T')
-            ]],
-            {  'fields' : ['id', 'name', 'default_code', 'qty_available', 'product_brand_id', 'categ_id', 'route_ids', 'product_variant_id', 'purchase_ok', 'create_date', 'active'] }
+            [[('id', 'not in', insumosIDs)] + DOMINIO_INSUMOS + filtroDesde('create_date', desde)],
+            {  'fields' : CAMPOS_INSUMOS }
         )
         
-        insumosNoID = [insumo['id'] for insumo in insumosOdoo if not insumo['active']]             
-        
-        variants = {}
-        if insumosNoID:
-            variantIDs = conOdoo.models.execute_kw(
-                conOdoo.db, conOdoo.uid, conOdoo.password,
-                'product.product', 'search_read',
-                [[
-                    ('active', '=', False), 
-                    ('product_tmpl_id', 'in', insumosNoID)
-                ]],
-                {'fields': ['id', 'product_tmpl_id']}
-            )
-            variants = {v['product_tmpl_id'][0]: v['id'] for v in variantIDs}
-            
-            # Asignar variants faltantes
-            for insumo in insumosOdoo:
-                if not insumo.get('product_variant_id') and insumo['id'] in variants:
-                    insumo['product_variant_id'] = [variants[insumo['id']], '']
-                
-        idsT = [insumo['id'] for insumo in insumosOdoo]
-            
-        # Obtener reglas de maximos y minimos
-        orderpointsOdoo = conOdoo.models.execute_kw(
-            conOdoo.db, conOdoo.uid, conOdoo.password, 
-            'stock.warehouse.orderpoint', 'search_read', 
-            [[('product_tmpl_id', 'in', idsT)]],
-            {  'fields' : ['product_tmpl_id', 'product_min_qty', 'product_max_qty']  }
-        )
-        orderpoints = {op['product_tmpl_id'][0]: op for op in orderpointsOdoo}
-            
-        # Obtener reglas de proveedores
-        providersOdoo = conOdoo.models.execute_kw(
-            conOdoo.db, conOdoo.uid, conOdoo.password,
-            'product.supplierinfo', 'search_read', 
-            [[('product_tmpl_id', 'in', idsT)]],
-            {  'fields' : ['product_tmpl_id', 'partner_id', 'delay'] }
-        )
-        providers = {prov['product_tmpl_id'][0]: prov for prov in providersOdoo}
-        
-        existenciasOCOdoo = conOdoo.models.execute_kw(
-            conOdoo.db, conOdoo.uid, conOdoo.password,
-            'purchase.order.line', 'search_read',
-            [[
-                ('display_type', 'not in', ['line_note', 'line_section']),
-                ('state', '!=', 'done'),
-                ('order_id.state', 'not in', ['draft', 'sent']),
-                ('order_id.receipt_status', '!=', 'full'),
-                ('order_id.user_id', '=', 46)
-            ]],
-            {  'fields' : ['product_id', 'product_qty', 'qty_received', 'display_type']}
-        )
-        existenciasOC = {}
-        
-        for oc in existenciasOCOdoo:
-            number = oc['product_qty'] - oc['qty_received']
-            if oc['product_id'][0] not in existenciasOC and number > 0:
-                existenciasOC[oc['product_id'][0]] = number
-                
-            elif oc['product_id'][0] in existenciasOC:
-                existenciasOC[oc['product_id'][0]] += number
-        
-        # Por cada producto encontrado que cumpla las reglas, relaciona los valores con las 
-        # reglas de maximos y minimos (orderpoints) y los proveedores (poviders)
-        for insumo in insumosOdoo:
-            insumo_id = insumo['id']
-            variant_id = insumo['product_variant_id'][0] if insumo.get('product_variant_id') else 0
-            
-            orderpoint = orderpoints.get(insumo_id, {})
-            insumo['product_min_qty'] = orderpoint.get('product_min_qty', 0)
-            insumo['product_max_qty'] = orderpoint.get('product_max_qty', 0)
-
-            provider = providers.get(insumo_id, {})
-            insumo['provider'] = provider.get('partner_id', ['None', 'Sin proveedor'])[1]
-            insumo['delay'] = provider.get('delay', 0)
-            
-            oc = existenciasOC.get(variant_id, 0)
-    
-            insumo['oc'] = oc if oc > 0 else 0
+        #Agrega a cada insumo sus reglas de máximos y mínimos, proveedor y piezas en órdenes de compra
+        enriquecerInsumos(insumosOdoo)
 
         return ({
             'status'   : 'success',
@@ -303,6 +272,7 @@ def get_newInsumos(insumosIDs):
 #
 # ! Parámetros:
 #   - Recibe la lista de IDs de todos los productos existentes en Postgres
+#   - desde (opcional), datetime para traer solo los registros modificados desde esa fecha (write_date)
 #
 # ? Condiciones para saber que productos obtener
 #   1. La categoría del producto no debe de contener:
@@ -322,7 +292,7 @@ def get_newInsumos(insumosIDs):
 #   - Caso error: 
 #       En caso de haber ocurrido algun error retorna un JSON con status error y el mensaje del error
 # --------------------------------------------------------------------------------------------------        
-def get_updateInsumos(insumosIDs):
+def get_updateInsumos(insumosIDs, desde=None):
     #!Determinamos si existe conexión con odoo
     if not conOdoo.models:
         return ({
@@ -336,97 +306,47 @@ def get_updateInsumos(insumosIDs):
         insumosOdoo = conOdoo.models.execute_kw(
             conOdoo.db, conOdoo.uid, conOdoo.password,
             'product.template', 'search_read', 
-            [[
-                ('id', 'in', insumosIDs),
-                '|', ('active', '=', True), ('active', '=', False), 
-                ('categ_id', 'ilike', 'INSUMO'), 
-                ('categ_id.parent_id', 'not ilike', 'AGENCIA DIGITAL'), 
-                ('default_code', 'not ilike', 'STUDIO'), 
-                ('default_code', 'not ilike', 'T-S'), 
-                ('default_code', 'not ilike', 'T-T')
-            ]],
-            {  'fields' : ['id', 'name', 'default_code', 'qty_available', 'product_brand_id', 'categ_id', 'route_ids', 'product_variant_id', 'purchase_ok', 'create_date', 'active'] }
-        )
-        
-        insumosNoID = [insumo['id'] for insumo in insumosOdoo if not insumo['active']]             
-        
-        variants = {}
-        if insumosNoID:
-            variantIDs = conOdoo.models.execute_kw(
-                conOdoo.db, conOdoo.uid, conOdoo.password,
-                'product.product', 'search_read',
-                [[
-                    ('active', '=', False), 
-                    ('product_tmpl_id', 'in', insumosNoID)
-                ]],
-                {'fields': ['id', 'product_tmpl_id']}
-            )
-            variants = {v['product_tmpl_id'][0]: v['id'] for v in variantIDs}
-            
-            # Asignar variants faltantes
-            for insumo in insumosOdoo:
-                if not insumo.get('product_variant_id') and insumo['id'] in variants:
-                    insumo['product_variant_id'] = [variants[insumo['id']], '']
-                
-        idsT = [insumo['id'] for insumo in insumosOdoo]
-            
-        # Obtener reglas de maximos y minimos
-        orderpointsOdoo = conOdoo.models.execute_kw(
-            conOdoo.db, conOdoo.uid, conOdoo.password, 
-            'stock.warehouse.orderpoint', 'search_read', 
-            [[('product_tmpl_id', 'in', idsT)]],
-            {  'fields' : ['product_tmpl_id', 'product_min_qty', 'product_max_qty']  }
-        )
-        orderpoints = {op['product_tmpl_id'][0]: op for op in orderpointsOdoo}
-            
-        # Obtener reglas de proveedores
-        providersOdoo = conOdoo.models.execute_kw(
-            conOdoo.db, conOdoo.uid, conOdoo.password,
-            'product.supplierinfo', 'search_read', 
-            [[('product_tmpl_id', 'in', idsT)]],
-            {  'fields' : ['product_tmpl_id', 'partner_id', 'delay'] }
-        )
-        providers = {prov['product_tmpl_id'][0]: prov for prov in providersOdoo}
-        
-        existenciasOCOdoo = conOdoo.models.execute_kw(
-            conOdoo.db, conOdoo.uid, conOdoo.password,
-            'purchase.order.line', 'search_read',
-            [[
-                ('display_type', 'not in', ['line_note', 'line_section']),
-                ('state', '!=', 'done'),
-                ('order_id.state', 'not in', ['draft', 'sent']),
-                ('order_id.receipt_status', '!=', 'full'),
-                ('order_id.user_id', '=', 46)
-            ]],
-            {  'fields' : ['product_id', 'product_qty', 'qty_received', 'display_type']}
+            [[('id', 'in', insumosIDs)] + DOMINIO_INSUMOS + filtroDesde('write_date', desde)],
+            {  'fields' : CAMPOS_INSUMOS }
         )
-        existenciasOC = {}
         
-        for oc in existenciasOCOdoo:
-            number = oc['product_qty'] - oc['qty_received']
-            if oc['product_id'][0] not in existenciasOC and number > 0:
-                existenciasOC[oc['product_id'][0]] = number
-                
-            elif oc['product_id'][0] in existenciasOC:
-                existenciasOC[oc['product_id'][0]] += number
-        
-        # Por cada producto encontrado que cumpla las reglas, relaciona los valores con las 
-        # reglas de maximos y minimos (orderpoints) y los proveedores (poviders)
-        for insumo in insumosOdoo:
-            insumo_id = insumo['id']
-            variant_id = insumo['product_variant_id'][0] if insumo.get('product_variant_id') else 0
-            
-            orderpoint = orderpoints.get(insumo_id, {})
-            insumo['product_min_qty'] = orderpoint.get('product_min_qty', 0)
-            insumo['product_max_qty'] = orderpoint.get('product_max_qty', 0)
+        #Agrega a cada insumo sus reglas de máximos y mínimos, proveedor y piezas en órdenes de compra
+        enriquecerInsumos(insumosOdoo)
 
-            provider = providers.get(insumo_id, {})
-            insumo['provider'] = provider.get('partner_id', ['None', 'Sin proveedor'])[1]
-            insumo['delay'] = provider.get('delay', 0)
-            
-            oc = existenciasOC.get(variant_id, 0)
-    
-            insumo['oc'] = oc if oc > 0 else 0
+        return ({
+            'status'   : 'success',
+            'products' : insumosOdoo
+        })
+
+    except xmlrpc.client.Fault as e:
+        return ({
+            'status'       : 'error',
+            'message'      : f'Error al ejecutar la consulta a Odoo: {str(e)}',
+            'fault_code'   : e.faultCode,
+            'fault_string' : e.faultString,
+        })
+
+
+# --------------------------------------------------------------------------------------------------
+# * Función: get_insumosAsync
+# * Descripción: Versión asíncrona (OdooAPIAsync) de get_allInsumos, get_newInsumos y get_updateInsumos. Las
+# *              consultas de enriquecimiento se hacen al mismo tiempo.
+#
+# ! Parámetros:
+#   - Recibe el dominio de product.template, se le agrega DOMINIO_INSUMOS
+#
+# ? Return:
+#   - El mismo JSON de get_allInsumos
+# --------------------------------------------------------------------------------------------------
+async def get_insumosAsync(dominio=()):
+    try:
+        async with OdooAPIAsync() as odoo:
+            insumosOdoo = await odoo.execute_kw(
+                'product.template', 'search_read', 
+                [list(dominio) + DOMINIO_INSUMOS],
+                {  'fields' : CAMPOS_INSUMOS }
+            )
+            await enriquecerInsumosAsync(insumosOdoo, odoo)
 
         return ({
             'status'   : 'success',
@@ -440,7 +360,20 @@ def get_updateInsumos(insumosIDs):
             'fault_code'   : e.faultCode,
             'fault_string' : e.faultString,
         })
-        
+
+
+async def get_allInsumosAsync():
+    return await get_insumosAsync()
+
+
+async def get_newInsumosAsync(insumosIDs, desde=None):
+    return await get_insumosAsync([('id', 'not in', insumosIDs)] + filtroDesde('create_date', desde))
+
+
+async def get_updateInsumosAsync(insumosIDs, desde=None):
+    return await get_insumosAsync([('id', 'in', insumosIDs)] + filtroDesde('write_date', desde))
+
+
 def update_maxMin():
     return ({
             'status'   : "success",
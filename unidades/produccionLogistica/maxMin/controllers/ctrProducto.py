@@ -1,13 +1,13 @@
 import xmlrpc.client
-from conexiones.conectionOdoo import OdooAPI
-import pandas as pd
+from conexiones.conectionOdoo import OdooAPI, filtroDesde
+from conexiones.libroExcel import obtenerLibro
 
 #?Instancia de conexión a Odoo
 conOdoo = OdooAPI()
 
-#?Obtiene un archivo mendiante la url y lo abre en la pestaña necesaria para su posterior lectura
+#?Libro de Excel de Contpaq, las hojas se leen hasta que se necesitan y se guardan en caché
 archivo = 'static/ContpaqBD.xlsx'
-dfProducto = pd.read_excel(archivo, sheet_name='Productos')
+libro = obtenerLibro(archivo)
 
 # --------------------------------------------------------------------------------------------------
 # * Función: get_allProducts
@@ -105,7 +105,8 @@ def get_allProducts():
 # * Descripción: Obtiene los productos nuevos (que no sean insumos) de Odoo
 #
 # ! Parámetros:
-#   - No recibe ningún parámetro
+#   - Recibe la lista de IDs que ya existen en PostgreSQL
+#   - desde (opcional), datetime para traer solo los registros creados desde esa fecha (create_date)
 #
 # ? Condiciones para saber que productos obtener
 #   1. La categoría del producto no debe de contener:
@@ -124,7 +125,7 @@ def get_allProducts():
 #   - Caso error: 
 #       En caso de haber ocurrido algun error retorna un JSON con status error y el mensaje del error
 # --------------------------------------------------------------------------------------------------
-def get_newProducts(productosIDs):
+def get_newProducts(productosIDs, desde=None):
     #!Determinamos si existe conexión con odoo
     if not conOdoo.models:
         return ({
@@ -146,7 +147,7 @@ def get_newProducts(productosIDs):
                 ('default_code', 'not ilike', 'STUDIO'), 
                 ('default_code', 'not ilike', 'T-S'), 
                 ('default_code', 'not ilike', 'T-T')
-            ]],
+            ] + filtroDesde('create_date', desde)],
             {  'fields' : ['id', 'name', 'default_code', 'qty_available', 'product_brand_id', 'categ_id', 'route_ids', 'product_variant_id', 'sale_ok', 'create_date', 'active'] }
         )
         
@@ -199,7 +200,8 @@ def get_newProducts(productosIDs):
 # * Descripción: Obtiene los productos nuevos (que no sean insumos) de Odoo
 #
 # ! Parámetros:
-#   - No recibe ningún parámetro
+#   - Recibe la lista de IDs que ya existen en PostgreSQL
+#   - desde (opcional), datetime para traer solo los registros modificados desde esa fecha (write_date)
 #
 # ? Condiciones para saber que productos obtener
 #   1. La categoría del producto no debe de contener:
@@ -218,7 +220,7 @@ def get_newProducts(productosIDs):
 #   - Caso error: 
 #       En caso de haber ocurrido algun error retorna un JSON con status error y el mensaje del error
 # --------------------------------------------------------------------------------------------------
-def get_updateProducts(productosIDs):
+def get_updateProducts(productosIDs, desde=None):
     #!Determinamos si existe conexión con odoo
     if not conOdoo.models:
         return ({
@@ -240,7 +242,7 @@ def get_updateProducts(productosIDs):
                 ('default_code', 'not ilike', 'STUDIO'), 
                 ('default_code', 'not ilike', 'T-S'), 
                 ('default_code', 'not ilike', 'T-T')
-            ]],
+            ] + filtroDesde('write_date', desde)],
             {  'fields' : ['id', 'name', 'default_code', 'qty_available', 'product_brand_id', 'categ_id', 'route_ids', 'product_variant_id', 'sale_ok', 'create_date', 'active'] }
         )
 
@@ -285,7 +287,7 @@ def get_updateProducts(productosIDs):
             'fault_string' : e.faultString,
         })
         
-def get_allProductsExcel(productosIDs):
+def get_allProductsExcel(productosIDs, dfProducto=None):
     #!Determinamos que haya algna conexión con Odoo
     if not conOdoo.models:
         return ({
@@ -296,6 +298,8 @@ def get_allProductsExcel(productosIDs):
     #función try para obtener las facturas
     try:
         #Obtenemos los ids de clientes unicos
+        if dfProducto is None:
+            dfProducto = libro.hoja('Productos')
         productosTmp = dfProducto['id_odooTmp'].unique().tolist()
         
         productsOdoo = conOdoo.models.execute_kw(
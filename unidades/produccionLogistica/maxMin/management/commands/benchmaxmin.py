@@ -0,0 +1,86 @@
+import os
+import random
+import time
+
+from django.core.management.base import BaseCommand
+
+from unidades.produccionLogistica.maxMin.services import calculoMaxMin
+
+# --------------------------------------------------------------------------------------------------
+# * Comando: benchmaxmin
+# * Descripción: Mide el tiempo del cálculo de máximos y mínimos en modo serial y paralelo por marca
+# *              con datos sintéticos, y valida que todos los modos den el mismo resultado.
+#
+# ? Uso:
+#     py manage.py benchmaxmin --padres 20000 --marcas 40 --procesos 1,2,4,8
+# --------------------------------------------------------------------------------------------------
+class Command(BaseCommand):
+    help = "Curva de escalamiento del cálculo de máximos y mínimos por número de procesos"
+    requires_system_checks = []
+
+    def add_arguments(self, parser):
+        parser.add_argument('--padres', type=int, default=20000)
+        parser.add_argument('--materiales', type=int, default=6, help='Materiales promedio por padre')
+        parser.add_argument('--insumos', type=int, default=15000)
+        parser.add_argument('--marcas', type=int, default=40)
+        parser.add_argument('--procesos', default=','.join(str(p) for p in [1, 2, 4, 8] if p <= (os.cpu_count() or 1)))
+        parser.add_argument('--repeticiones', type=int, default=3)
+        parser.add_argument('--semilla', type=int, default=7)
+
+    def handle(self, *args, **options):
+        materiales, compartidos, ventasLastYear, ventasThisYear = self.generarDatos(options)
+        self.stdout.write(f'{len(materiales)} filas de materiales, {options["marcas"]} marcas, {len(compartidos)} insumos compartidos')
+
+        referencia = None
+        base = None
+        self.stdout.write(f'{"procesos":>9} {"mejor (s)":>10} {"speedup":>8}')
+        for procesos in [int(p) for p in options['procesos'].split(',')]:
+            tiempos = []
+            for _ in range(options['repeticiones']):
+                inicio = time.perf_counter()
+                resultado = calculoMaxMin.calcularMaxMin(materiales, compartidos, ventasLastYear, ventasThisYear, procesos)
+                tiempos.append(time.perf_counter() - inicio)
+
+            if referencia is None:
+                referencia = resultado
+            elif resultado != referencia or list(resultado) != list(referencia):
+                self.stderr.write(self.style.ERROR(f'El resultado con {procesos} procesos es distinto al serial'))
+                return
+
+            mejor = min(tiempos)
+            base = base or mejor
+            self.stdout.write(f'{procesos:>9} {mejor:>10.3f} {base/mejor:>7.2f}x')
+
+        self.stdout.write(self.style.SUCCESS('Todos los modos producen el mismo resultado'))
+
+    #Genera filas con la misma forma que MaterialPI.values() usado en updateMaxMinOdoo
+    def generarDatos(self, options):
+        aleatorio = random.Random(options['semilla'])
+        marcas = [f'MARCA {m}' for m in range(options['marcas'])]
+        insumos = {
+            i: {'nombre': f'INSUMO {i}', 'sku': f'IN{i:06d}', 'existencia': aleatorio.randint(0, 5000), 'oc': aleatorio.randint(0, 500), 'marca': aleatorio.choice(marcas)}
+            for i in range(1, options['insumos'] + 1)
+        }
+
+        materiales = []
+        usos = {}
+        for p in range(options['padres']):
+            padreId = 10**6 + p
+            padre = {'nombre': f'PRODUCTO {p:06d}', 'sku': f'PT{p:06d}', 'existencia': aleatorio.randint(0, 800), 'marca': aleatorio.choice(marcas), 'tipo': 'RESURTIBLE'}
+            for hijoId in aleatorio.sample(range(1, options['insumos'] + 1), aleatorio.randint(1, options['materiales'] * 2 - 1)):
+                cantidad = aleatorio.choice([0, 0.5, 1, 1, 2, 3])
+                usos.setdefault(hijoId, []).append(cantidad * padre['existencia'])
+                materiales.append({
+                    'padre_id': padreId, 'padre__nombre': padre['nombre'], 'padre__sku': padre['sku'],
+                    'padre__existenciaActual': padre['existencia'], 'padre__marca': padre['marca'], 'padre__tipo': padre['tipo'],
+                    'hijo_id': hijoId, 'hijo__nombre': insumos[hijoId]['nombre'], 'cantidad': cantidad,
+                    'hijo__sku': insumos[hijoId]['sku'], 'hijo__existenciaActual': insumos[hijoId]['existencia'],
+                    'hijo__existenciaOC': insumos[hijoId]['oc'], 'hijo__marca': insumos[hijoId]['marca'],
+                })
+        materiales.sort(key=lambda m: m['padre__nombre'])
+
+        compartidos = {h: {'hijo_id': h, 'total': len(u), 'sumaCantidad': sum(u)} for h, u in usos.items() if len(u) > 1}
+        padres = {m['padre_id'] for m in materiales}
+        ventasLastYear = {p: {'cantidad': aleatorio.randint(0, 9000), 'mesesVendidos': aleatorio.randint(1, 12)} for p in padres if aleatorio.random() < 0.7}
+        ventasThisYear = {p: {'cantidad': aleatorio.randint(0, 4000), 'mesesVendidos': aleatorio.randint(1, 10)} for p in padres if aleatorio.random() < 0.5}
+        return materiales, compartidos, ventasLastYear, ventasThisYear
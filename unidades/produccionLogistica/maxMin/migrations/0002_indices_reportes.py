@@ -0,0 +1,28 @@
+# Generated by Django 5.2.4 on 2026-10-19 11:57
+
+from django.contrib.postgres.operations import AddIndexConcurrently
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    #Los índices se crean sin bloquear las escrituras a las tablas, CREATE INDEX CONCURRENTLY no corre en una transacción
+    atomic = False
+
+    dependencies = [
+        ("maxMin", "0001_initial"),
+    ]
+
+    operations = [
+        AddIndexConcurrently(
+            model_name="productos",
+            index=models.Index(fields=["idProducto"], name="productos_idproducto_idx"),
+        ),
+        AddIndexConcurrently(
+            model_name="productos",
+            index=models.Index(fields=["sku"], name="productos_sku_idx"),
+        ),
+        AddIndexConcurrently(
+            model_name="productos",
+            index=models.Index(fields=["tipo"], name="productos_tipo_idx"),
+        ),
+    ]
@@ -20,6 +20,11 @@ class Productos(models.Model):
     
     class Meta:
         db_table = '"produccionlogistica"."productos"'
+        indexes = [
+            models.Index(fields=['idProducto'], name='productos_idproducto_idx'),
+            models.Index(fields=['sku'], name='productos_sku_idx'),
+            models.Index(fields=['tipo'], name='productos_tipo_idx'),
+        ]
     
     
 #? Tabla de los insumos que ocupa cada producto en el eschema de produccionLogistica
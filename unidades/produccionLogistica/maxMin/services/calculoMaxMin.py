@@ -0,0 +1,189 @@
+import math
+from concurrent.futures import ProcessPoolExecutor
+
+# --------------------------------------------------------------------------------------------------
+# * Módulo: calculoMaxMin
+# * Descripción: Motor de cálculo de máximos y mínimos de insumos a partir de los materiales (BOM)
+# *              de cada producto y de su promedio de ventas.
+#
+# ? Modos de ejecución:
+#     - Serial: recorre todas las filas de materiales en un solo proceso.
+#     - Paralelo: divide las filas por la marca del producto padre y procesa cada marca en un
+#       proceso distinto (map). Como los insumos compartidos cruzan marcas, las aportaciones a
+#       promVCompartidas se juntan después en un solo diccionario (reduce) respetando el orden
+#       original de las filas, por lo que el resultado es idéntico al del modo serial.
+#
+# ! Nota: Este módulo no debe importar modelos de Django, los procesos del pool solo reciben
+#   listas y diccionarios ya consultados de la base de datos.
+# --------------------------------------------------------------------------------------------------
+
+
+# --------------------------------------------------------------------------------------------------
+# * Función: agruparMateriales
+# * Descripción: Agrupa las filas de MaterialPI por producto padre y calcula los valores de cada insumo
+#
+# ! Parámetros:
+#     - filas, lista de tuplas (indice, material) donde material es el diccionario de MaterialPI.values()
+#     - insumosCompartidos, diccionario {hijo_id: {total, sumaCantidad}} de insumos usados por más de un producto
+#     - ventasLastYear y ventasThisYear, diccionarios {idProductoTmp: {cantidad, mesesVendidos}}
+#
+# ? Returns:
+#     - materialesHijos, diccionario {padre_id: padre} con la lista de materiales de cada padre
+#     - aportaciones, lista de tuplas (indice, hijo_id, promV) de los insumos compartidos
+# --------------------------------------------------------------------------------------------------
+def agruparMateriales(filas, insumosCompartidos, ventasLastYear, ventasThisYear):
+    materialesHijos = {}
+    aportaciones = []
+
+    for indice, material in filas:
+        piezasArmar = round((material["hijo__existenciaActual"] / (material["cantidad"] if material["cantidad"] > 0 else 1)), 2)
+        pt = round(insumosCompartidos.get(material["hijo_id"], {}).get("sumaCantidad", 0) or material["padre__existenciaActual"] * material["cantidad"], 2)
+        promVData = ventasLastYear.get(material["padre_id"], {}) or ventasThisYear.get(material["padre_id"], {})
+        promV = round(promVData.get('cantidad', 0)/promVData.get('mesesVendidos', 1), 2)
+
+        if insumosCompartidos.get(material["hijo_id"]):
+            aportaciones.append((indice, material["hijo_id"], promV))
+
+        materialHijo = {
+            'id': material["hijo_id"],
+            'nombre': material["hijo__nombre"],
+            'cantidad': material["cantidad"],
+            'sku': material["hijo__sku"],
+            'existenciaActual': material["hijo__existenciaActual"],
+            'piezasArmar': piezasArmar,
+            'existenciasPT': pt,
+            'existenciaOC': material["hijo__existenciaOC"],
+            'totalPiezas': material["hijo__existenciaActual"] + pt + material["hijo__existenciaOC"],
+            'promedioVentas': promV,
+            'min': 0,
+            'max': 0,
+            'sugerido': 0,
+            'total': 0,
+            'mesesInventario':0,
+            'marca': material["hijo__marca"]
+        }
+
+        if materialesHijos.get(material["padre_id"]):
+            materialesHijos[material["padre_id"]]["materiales"].append(materialHijo)
+            materialesHijos[material["padre_id"]]["piezasArmar"] = min(materialesHijos[material["padre_id"]]["piezasArmar"], piezasArmar)
+
+        else:
+            materialesHijos[material["padre_id"]]={
+                'id': material["padre_id"],
+                'nombre': material["padre__nombre"],
+                'sku': material["padre__sku"],
+                'existenciaActual': material["padre__existenciaActual"],
+                'piezasArmar': piezasArmar,
+                'existenciasPT': material["padre__existenciaActual"],
+                'totalPiezas': material["padre__existenciaActual"],
+                'promedioVentas': promV,
+                'mesesInventario': 0,
+                'marca': material["padre__marca"],
+                'tipo': material['padre__tipo'],
+                'materiales': [materialHijo]
+            }
+
+    return materialesHijos, aportaciones
+
+
+# --------------------------------------------------------------------------------------------------
+# * Función: reducirCompartidas
+# * Descripción: Suma las aportaciones de promedio de venta de los insumos compartidos
+#
+# ! Parámetros:
+#     - aportaciones, lista de tuplas (indice, hijo_id, promV) de una o varias marcas
+#
+# ? Nota: Se ordenan por el índice de la fila para sumar los flotantes en el mismo orden que el
+#   modo serial y obtener exactamente los mismos valores.
+# --------------------------------------------------------------------------------------------------
+def reducirCompartidas(aportaciones):
+    promVCompartidas = {}
+    for indice, hijoId, promV in sorted(aportaciones, key=lambda a: a[0]):
+        promVCompartidas[hijoId] = promVCompartidas.get(hijoId, 0)+promV
+    return promVCompartidas
+
+
+# --------------------------------------------------------------------------------------------------
+# * Función: calcularPadres
+# * Descripción: Calcula existencias, mínimos, máximos y sugeridos de cada padre y sus materiales
+#
+# ! Parámetros:
+#     - materialesHijos, diccionario resultado de agruparMateriales
+#     - promVCompartidas, diccionario resultado de reducirCompartidas
+# --------------------------------------------------------------------------------------------------
+def calcularPadres(materialesHijos, promVCompartidas):
+    for padre in materialesHijos.values():
+        padre["existenciasPT"] = padre["piezasArmar"] + padre["existenciaActual"]
+        padre["totalPiezas"] = padre["existenciaActual"] + padre["existenciasPT"]
+        padre["mesesInventario"] = round(padre["totalPiezas"]/padre['promedioVentas'] if padre['promedioVentas'] > 0 else 0, 2)
+        for hijo in padre["materiales"]:
+            if promVCompartidas.get(hijo["id"]):
+                hijo["promedioVentas"] = round(hijo["cantidad"]*promVCompartidas[hijo["id"]], 2)
+            hijo["min"] = math.ceil(hijo["promedioVentas"]*3)
+            hijo["max"] = math.ceil(hijo["promedioVentas"]*6)
+            hijo["sugerido"] = math.ceil(hijo["max"]-hijo["totalPiezas"] if hijo["totalPiezas"] < hijo["max"] else 0)
+            hijo["total"]= hijo["sugerido"] + hijo["totalPiezas"]
+            hijo["mesesInventario"] = round(hijo["total"]/hijo['promedioVentas'] if hijo['promedioVentas'] != 0 else 0, 2)
+    return materialesHijos
+
+
+# Punto de entrada de cada proceso del pool, recibe las filas completas de una o varias marcas
+def _procesarMarca(args):
+    filas, insumosCompartidos, ventasLastYear, ventasThisYear = args
+    return agruparMateriales(filas, insumosCompartidos, ventasLastYear, ventasThisYear)
+
+
+# --------------------------------------------------------------------------------------------------
+# * Función: calcularMaxMin
+# * Descripción: Ejecuta el cálculo completo de máximos y mínimos en modo serial o paralelo por marca
+#
+# ! Parámetros:
+#     - materiales, lista de diccionarios de MaterialPI.values() ordenada por padre__nombre
+#     - insumosCompartidos, ventasLastYear, ventasThisYear, ver agruparMateriales
+#     - procesos, número de procesos a utilizar. Con 1 (default) se ejecuta en modo serial
+#
+# ? Returns:
+#     - Diccionario {padre_id: padre} en el mismo orden y con los mismos valores en ambos modos
+# --------------------------------------------------------------------------------------------------
+def calcularMaxMin(materiales, insumosCompartidos, ventasLastYear, ventasThisYear, procesos=1):
+    filas = list(enumerate(materiales))
+
+    if procesos <= 1 or not filas:
+        materialesHijos, aportaciones = agruparMateriales(filas, insumosCompartidos, ventasLastYear, ventasThisYear)
+        return calcularPadres(materialesHijos, reducirCompartidas(aportaciones))
+
+    #Divide las filas por marca del padre y guarda el orden en que aparece cada padre
+    marcas = {}
+    ordenPadres = {}
+    for indice, material in filas:
+        marcas.setdefault(material["padre__marca"], []).append((indice, material))
+        ordenPadres.setdefault(material["padre_id"], indice)
+
+    #Reparte las marcas en un grupo por proceso, asignando primero las más grandes al grupo con menos filas
+    grupos = [[] for _ in range(min(procesos, len(marcas)))]
+    for filasMarca in sorted(marcas.values(), key=len, reverse=True):
+        min(grupos, key=len).extend(filasMarca)
+
+    #Map: cada grupo se procesa en un proceso del pool y solo recibe las ventas e insumos compartidos que usa
+    tareas = []
+    for grupo in grupos:
+        padresGrupo = {material["padre_id"] for indice, material in grupo}
+        hijosGrupo = {material["hijo_id"] for indice, material in grupo}
+        tareas.append((
+            grupo,
+            {h: insumosCompartidos[h] for h in hijosGrupo if h in insumosCompartidos},
+            {p: ventasLastYear[p] for p in padresGrupo if p in ventasLastYear},
+            {p: ventasThisYear[p] for p in padresGrupo if p in ventasThisYear},
+        ))
+    with ProcessPoolExecutor(max_workers=len(tareas)) as pool:
+        resultados = list(pool.map(_procesarMarca, tareas))
+
+    #Reduce: junta los padres de cada marca y suma las ventas de los insumos compartidos
+    padres = {}
+    aportaciones = []
+    for materialesMarca, aportacionesMarca in resultados:
+        padres.update(materialesMarca)
+        aportaciones.extend(aportacionesMarca)
+
+    materialesHijos = {padreId: padres[padreId] for padreId in ordenPadres}
+    return calcularPadres(materialesHijos, reducirCompartidas(aportaciones))
@@ -0,0 +1,210 @@
+from unidades.produccionLogistica.maxMin.models import Productos
+from unidades.produccionLogistica.maxMin.controllers import ctrInsumo
+from unidades.sistema.sincronizacion.busquedas import enBloque
+from unidades.sistema.sincronizacion.escrituras import insertarEnBloque, actualizarEnBloque
+from unidades.sistema.sincronizacion.referencias import incrementarVersion, llavesTabla
+
+# --------------------------------------------------------------------------------------------------
+# * Módulo: sincronizacionInsumos
+# * Descripción: Sincronización de insumos de Odoo a PostgreSQL sin depender de una petición HTTP.
+# *              La usan las vistas (auto/pullInsumosOdoo, ...) y el comando "sync insumos".
+#
+# ? Parámetros y returns: los mismos de sincronizacionProductos
+# --------------------------------------------------------------------------------------------------
+
+
+# --------------------------------------------------------------------------------------------------
+# * Función: insertInsumos
+# * Descripción: Inserta INSUMOS en la base de datos PostgreSQL.
+#
+# ! Parámetros:
+#     - Recibe una lista (array) de insumos. Cada producto debe contener los siguientes campos:
+#       { id, name, sku, maxActual, minActual, existenciaActual, marca, categoría, proveedor }
+#     - Nota: Solo el campo "id" es obligatorio; los demás son opcionales. No todos los insumos tienen proveedor
+#     - tamanoLote (opcional), tamaño de cada bulk_create
+#
+# ? Condiciones para insertar un insumo en la base de datos:
+#     1. El producto debe tener un SKU válido (no vacío).
+#     2. El producto no debe existir previamente en la base de datos PostgreSQL.
+# --------------------------------------------------------------------------------------------------
+def insertInsumos(insumos, tamanoLote=1000):
+    #Traemos los insumos dentro de postgreSQL (cache del proceso)
+    insumosPSQL = llavesTabla(Productos)
+
+    #Añadimos las insumos a la base de datos PosgreSQL
+    insumosCreate = []
+    newInsumos = 0
+
+    for insumo in insumos:
+
+        if insumo['id'] not in insumosPSQL:
+
+            sku = insumo['default_code'] if insumo['default_code'] else ""
+            marca = insumo['product_brand_id'][1] if insumo['product_brand_id'] else ""
+            categoria = insumo['categ_id'][1]
+            rutas = len(insumo['route_ids'])
+
+            if insumo['active']==False:
+                tipo = "DESCONTINUADO"
+            else:
+                if "MAQUILA" in categoria or "MT" in sku:
+                    tipo = "MAQUILAS"
+                elif rutas > 0 and insumo['purchase_ok'] == True and insumo['active'] == True:
+                    tipo = "RESURTIBLE"
+                elif rutas == 0 or insumo['purchase_ok'] == False or insumo['active'] == False:
+                    tipo = "NO RESURTIBLE"
+                else:
+                    tipo = "OTROS"
+
+            insumosCreate.append(
+                Productos(
+                    idProductoTmp = insumo['id'],
+                    idProducto = insumo['product_variant_id'][0] if insumo['product_variant_id'] else 0,
+                    nombre = insumo['name'],
+                    sku = sku,
+                    marca = marca,
+                    maxActual = insumo['product_max_qty'],
+                    minActual = insumo['product_min_qty'],
+                    existenciaActual = insumo['qty_available'],
+                    existenciaOC = insumo['oc'],
+                    categoria = categoria,
+                    tipo = tipo,
+                    fechaCreacion = insumo['create_date'],
+                    proveedor = insumo['provider'],
+                    tiempoEntrega = insumo['delay']
+                )
+            )
+
+    newInsumos += len(insertarEnBloque(Productos, insumosCreate, tamanoLote))
+    if insumosCreate:
+        incrementarVersion(Productos)
+
+    return ({
+        'status'  : 'success',
+        'message' : newInsumos
+    })
+
+
+# --------------------------------------------------------------------------------------------------
+# * Función: pull
+# * Descripción: Obtiene todos los insumos de Odoo e inserta los que no existen en PostgreSQL
+# --------------------------------------------------------------------------------------------------
+def pull(tamanoLote=1000):
+    try:
+        #Traemos los insumos de Odoo
+        insumosOdoo = ctrInsumo.get_allInsumos()
+        if insumosOdoo['status'] != 'success':
+            return {'status': 'error', 'message': insumosOdoo['message']}
+
+        response = insertInsumos(insumosOdoo['products'], tamanoLote)
+        if response['status'] != "success":
+            return {'status': 'error', 'message': response['message']}
+
+        return {
+            'status'   : 'success',
+            'message'  : f'Se han agregado correctamente {response["message"]} insumos de {len(insumosOdoo["products"])}',
+            'leidos'   : len(insumosOdoo['products']),
+            'escritos' : response['message']
+        }
+
+    except Exception as e:
+        return {'status': 'error', 'message': f'Ha ocurrido un error al tratar de insertar los datos {str(e)}'}
+
+
+# --------------------------------------------------------------------------------------------------
+# * Función: create
+# * Descripción: Obtiene de Odoo solo los insumos que no existen en PostgreSQL y los inserta
+# --------------------------------------------------------------------------------------------------
+def create(tamanoLote=1000, desde=None):
+    try:
+        insumosIDs = llavesTabla(Productos)
+        #traemos los productos nuevos de odoo
+        insumosOdoo = ctrInsumo.get_newInsumos(list(insumosIDs), desde)
+        if insumosOdoo['status'] != 'success':
+            return {'status': 'error', 'message': insumosOdoo['message']}
+
+        response = insertInsumos(insumosOdoo['products'], tamanoLote)
+        if response['status'] != "success":
+            return {'status': 'error', 'message': response['message']}
+
+        return {
+            'status'   : 'success',
+            'message'  : f'Se han agregado correctamente {response["message"]} nuevos insumos de {len(insumosOdoo["products"])}',
+            'leidos'   : len(insumosOdoo['products']),
+            'escritos' : response['message']
+        }
+
+    except Exception as e:
+        return {'status': 'error', 'message': f'Ha ocurrido un error al tratar de insertar los datos: {str(e)}'}
+
+
+# --------------------------------------------------------------------------------------------------
+# * Función: update
+# * Descripción: Actualiza los insumos registrados de PostgreSQL conforme a los datos de Odoo
+#
+# ? Condiciones de la actualización
+#     - Sin "desde" actualizará todos los insumos registrados en Odoo y que existan en la base de datos PostgreSQL
+#     - La función modificará todos los campos del producto en cuestión a excepción del ID
+# --------------------------------------------------------------------------------------------------
+def update(tamanoLote=1000, desde=None):
+    try:
+        insumosIDs = llavesTabla(Productos)
+        # Traemos los insumos de odoo
+        insumosOdoo = ctrInsumo.get_updateInsumos(list(insumosIDs), desde)
+        if insumosOdoo['status'] != 'success':
+            return {'status': 'error', 'message': f'Error en realizar la consulta a Odoo: {insumosOdoo["message"]}'}
+
+        #Solo se cargan los insumos que regresó Odoo
+        insumosObj = enBloque(Productos, [insumo['id'] for insumo in insumosOdoo['products']])
+        insumosUpdate = []
+        updatedInsumos = 0
+
+        for insumo in insumosOdoo['products']:
+            #Busca el ID del insumo en Postgres
+            insumoObj = insumosObj.get(insumo['id'])
+
+            sku = insumo['default_code'] if insumo['default_code'] else ""
+            marca = insumo['product_brand_id'][1] if insumo['product_brand_id'] else ""
+            categoria = insumo['categ_id'][1]
+            rutas = len(insumo['route_ids'])
+
+            if insumo['active']==False:
+                tipo = "DESCONTINUADO"
+            else:
+                if "MAQUILAS" in categoria or "MT" in sku:
+                    tipo = "MAQUILAS"
+                elif "PC" in sku:
+                    tipo = "PRODUCTO COMERCIAL"
+                elif "PT" in sku and rutas > 0 and insumo['purchase_ok'] == True and insumo['active'] == True:
+                    tipo = "RESURTIBLE"
+                elif "PT" in sku and (rutas == 0 or insumo['purchase_ok'] == False or insumo['active'] == False):
+                    tipo = "NO RESURTIBLE"
+                else:
+                    tipo = "OTROS"
+
+            # Asigna los nuevos valores de Odoo a los insumos de PostgreSQL
+            insumoObj.nombre           = insumo['name']
+            insumoObj.sku              = sku
+            insumoObj.marca            = marca
+            insumoObj.maxActual        = insumo['product_max_qty']
+            insumoObj.minActual        = insumo['product_min_qty']
+            insumoObj.existenciaActual = insumo['qty_available']
+            insumoObj.existenciaOC     = insumo['oc']
+            insumoObj.categoria        = categoria
+            insumoObj.tipo             = tipo
+            insumoObj.proveedor        = insumo['provider']
+            insumoObj.tiempoEntrega    = insumo['delay']
+
+            insumosUpdate.append(insumoObj)
+
+        updatedInsumos += len(actualizarEnBloque(Productos, insumosUpdate, ['nombre', 'sku', 'marca', 'maxActual', 'minActual', 'existenciaActual', 'existenciaOC', 'categoria', 'tipo', 'proveedor', 'tiempoEntrega'], tamanoLote))
+
+        return {
+            'status'   : 'success',
+            'message'  : f'Se han actualizado correctamente {updatedInsumos} insumos de {len(insumosOdoo["products"])}',
+            'leidos'   : len(insumosOdoo['products']),
+            'escritos' : updatedInsumos
+        }
+
+    except Exception as e:
+        return {'status': 'error', 'message': f'Ha ocurrido un error al tratar de insertar los datos {str(e)}'}
@@ -0,0 +1,61 @@
+from unidades.produccionLogistica.maxMin.models import MaterialPI, Productos
+from unidades.produccionLogistica.maxMin.controllers import ctrMaterialPI
+from unidades.sistema.sincronizacion.busquedas import existentes
+from unidades.sistema.sincronizacion.escrituras import insertarEnBloque
+
+# --------------------------------------------------------------------------------------------------
+# * Función: pull
+# * Descripción: Agrega los datos de materiales Productos * Insumos. La usan la vista auto/pullMaterialPIOdoo y
+# *              el comando "sync materialPI".
+#
+# ! Parámetros:
+#     - tamanoLote, cantidad de registros por bulk_create
+#
+# ? Condiciones para insertar un MaterialPI en la base de datos:
+#     1. El producto e Insumo deben de existir en sus respectivas tablas
+#     2. Siempre que hace la inserción de materiales, borra los datos ya existentes, esto debido a que no se
+#        se ha encontrado una forma de realizar actualizaciones
+#       !Nota: Está función puede actualizarse y optimizarse resolviendo esta problemática.
+#
+# ? Returns
+#     - { status, message, leidos, escritos } igual que sincronizacionProductos
+# --------------------------------------------------------------------------------------------------
+def pull(tamanoLote=1000):
+    try:
+        materialPI = ctrMaterialPI.getInsumoByProduct()
+        if materialPI['status'] != 'success':
+            return {'status': 'error', 'message': materialPI['materiales']}
+
+        #Productos de la lista de materiales que existen en Postgres, se asignan sus ids sin cargar las instancias
+        materiales = existentes(Productos, [
+            material[campo][0] for material in materialPI['materiales'] for campo in ('parent_product_tmpl_id', 'product_tmpl_id')
+        ])
+        materialesAssign = []
+        assignedMateriales = 0
+
+        MaterialPI.objects.all().delete()
+
+        for material in materialPI['materiales']:
+            padreId = material['parent_product_tmpl_id'][0]
+            hijoId = material['product_tmpl_id'][0]
+
+            materialesAssign.append(
+                MaterialPI(
+                    idMaterialPI = material['id'],
+                    padre_id = padreId if padreId in materiales else None,
+                    hijo_id = hijoId if hijoId in materiales else None,
+                    cantidad = material['product_qty']
+                )
+            )
+
+        assignedMateriales += len(insertarEnBloque(MaterialPI, materialesAssign, tamanoLote))
+
+        return {
+            'status'   : 'success',
+            'message'  : f'Se han cargado {assignedMateriales} materiales de productos de {len(materialPI["materiales"])}',
+            'leidos'   : len(materialPI['materiales']),
+            'escritos' : assignedMateriales
+        }
+
+    except Exception as e:
+        return {'status': 'error', 'message': f'Ha ocurrido un error al tratar de insertar los datos: {str(e)}'}
@@ -0,0 +1,217 @@
+from unidades.produccionLogistica.maxMin.models import Productos
+from unidades.produccionLogistica.maxMin.controllers import ctrProducto
+from unidades.sistema.sincronizacion.busquedas import enBloque
+from unidades.sistema.sincronizacion.escrituras import insertarEnBloque, actualizarEnBloque
+from unidades.sistema.sincronizacion.referencias import incrementarVersion, llavesTabla
+
+# --------------------------------------------------------------------------------------------------
+# * Módulo: sincronizacionProductos
+# * Descripción: Sincronización de productos de Odoo a PostgreSQL sin depender de una petición HTTP.
+# *              La usan las vistas (auto/pullProductsOdoo, ...) y el comando "sync productos".
+#
+# ? Parámetros comunes:
+#     - tamanoLote, cantidad de registros por bulk_create/bulk_update
+#     - desde (opcional en create/update), datetime para pedir a Odoo solo los registros creados/modificados desde esa fecha
+#
+# ? Returns comunes:
+#     - { status, message, leidos, escritos } donde leidos son los registros que regresó Odoo y escritos los
+#       registros insertados o actualizados en PostgreSQL
+# --------------------------------------------------------------------------------------------------
+
+
+# --------------------------------------------------------------------------------------------------
+# * Función: insertProducts
+# * Descripción: Inserta productos en la base de datos PostgreSQL.
+#
+# ! Parámetros:
+#     - Recibe una lista (array) de productos. Cada producto debe contener los siguientes campos:
+#       { id, name, sku, existenciaActual, marca, categoría, rutas, fechaCreacion }
+#     - Nota: Solo el campo "id" es obligatorio; los demás son opcionales.
+#     - tamanoLote (opcional), tamaño de cada bulk_create
+#
+# ? Condiciones para insertar un producto en la base de datos:
+#     1. El producto debe tener un SKU válido (no vacío).
+#     2. El producto no debe existir previamente en la base de datos PostgreSQL.
+#
+# ? Lógica para determinar el tipo de producto:
+#     - Si la categoría contiene "MAQUILAS" o el SKU contiene "MT" → Tipo: MAQUILAS.
+#     - Si el SKU contiene "PC" → Tipo: PRODUCTO COMERCIAL.
+#     - Si el SKU contiene "PT":
+#         · Si contiene una o más rutas → Tipo: INTERNO RESURTIBLE.
+#         · Si no contiene rutas → Tipo: INTERNO NO RESURTIBLE.
+#     - Si no cumple con ninguna de las condiciones anteriores → Tipo: OTROS.
+# --------------------------------------------------------------------------------------------------
+def insertProducts(productos, tamanoLote=1000):
+    #traemos los productos existentes de PostgreSQL (cache del proceso)
+    productsPSQL = llavesTabla(Productos)
+
+    #añadir los productos a la base de datos de PostgreSQL
+    productosCreate = []
+    newProducts = 0
+
+    for producto in productos:
+
+        if producto['id'] not in productsPSQL:
+
+            sku = producto['default_code'] if producto['default_code'] else ""
+            marca = producto['product_brand_id'][1] if producto['product_brand_id'] else ""
+            categoria = producto['categ_id'][1]
+            rutas = len(producto['route_ids'])
+
+            if producto['active']==False:
+                tipo = "DESCONTINUADO"
+            else:
+                if "MAQUILAS" in categoria or "MT" in sku:
+                    tipo = "MAQUILAS"
+                elif "PC" in sku:
+                    tipo = "PRODUCTO COMERCIAL"
+                elif "PT" in sku and rutas > 0 and producto['sale_ok'] == True and producto['active'] == True:
+                    tipo = "RESURTIBLE"
+                elif "PT" in sku and (rutas == 0 or producto['sale_ok'] == False or producto['active'] == False):
+                    tipo = "NO RESURTIBLE"
+                else:
+                    tipo = "OTROS"
+
+            productosCreate.append(
+                Productos(
+                    idProductoTmp = producto['id'],
+                    idProducto = producto['product_variant_id'][0] if producto['product_variant_id'] != False else 0,
+                    sku = sku,
+                    nombre = producto['name'],
+                    existenciaActual =  producto['qty_available'],
+                    marca = marca,
+                    categoria = categoria,
+                    tipo = tipo,
+                    fechaCreacion = producto['create_date']
+                )
+            )
+
+    newProducts += len(insertarEnBloque(Productos, productosCreate, tamanoLote))
+    if productosCreate:
+        incrementarVersion(Productos)
+
+    return ({
+        'status'  : 'success',
+        'message' : newProducts
+    })
+
+
+# --------------------------------------------------------------------------------------------------
+# * Función: pull
+# * Descripción: Obtiene todos los productos de Odoo e inserta los que no existen en PostgreSQL
+# --------------------------------------------------------------------------------------------------
+def pull(tamanoLote=1000):
+    try:
+        #Prductos de Odoo
+        productsOdoo = ctrProducto.get_allProducts()
+        if productsOdoo['status'] != 'success':
+            return {'status': 'error', 'message': productsOdoo['message']}
+
+        #Realiza inserción de los datos
+        response = insertProducts(productsOdoo['products'], tamanoLote)
+        if response['status'] != "success":
+            return {'status': 'error', 'message': response['message']}
+
+        return {
+            'status'   : 'success',
+            'message'  : f'Se han agregado correctamente {response["message"]} productos de {len(productsOdoo["products"])}',
+            'leidos'   : len(productsOdoo['products']),
+            'escritos' : response['message']
+        }
+
+    except Exception as e:
+        return {'status': 'error', 'message': f'Ha ocurrido un error al tratar de insertar los datos: {str(e)}'}
+
+
+# --------------------------------------------------------------------------------------------------
+# * Función: create
+# * Descripción: Obtiene de Odoo solo los productos que no existen en PostgreSQL y los inserta
+# --------------------------------------------------------------------------------------------------
+def create(tamanoLote=1000, desde=None):
+    try:
+        productosIDs = llavesTabla(Productos)
+        #Traer los productos que existen de odoo
+        productsOdoo = ctrProducto.get_newProducts(list(productosIDs), desde)
+        if productsOdoo['status'] != "success":
+            return {'status': 'error', 'message': productsOdoo['message']}
+
+        response = insertProducts(productsOdoo['products'], tamanoLote)
+        if response['status'] != "success":
+            return {'status': 'error', 'message': response['message']}
+
+        return {
+            'status'   : 'success',
+            'message'  : f'Se han agregado correctamente {response["message"]} nuevos productos de {len(productsOdoo["products"])}',
+            'leidos'   : len(productsOdoo['products']),
+            'escritos' : response['message']
+        }
+
+    except Exception as e:
+        return {'status': 'error', 'message': f'Ha ocurrido un error al tratar de insertar los datos: {str(e)}'}
+
+
+# --------------------------------------------------------------------------------------------------
+# * Función: update
+# * Descripción: Actualiza los productos registrados de PostgreSQL conforme a los datos de Odoo
+#
+# ? Condiciones de la actualización
+#     - Sin "desde" actualizará todos los productos registrados en Odoo y que existan en la base de datos PostgreSQL
+#     - Debe de cumplir con la lógica y las condiciones de la función insertProducts
+#     - La función modificará todos los campos del producto en cuestión a excepción del ID
+# --------------------------------------------------------------------------------------------------
+def update(tamanoLote=1000, desde=None):
+    try:
+        productosIDs = llavesTabla(Productos)
+        # Productos de Odoo
+        productsOdoo = ctrProducto.get_updateProducts(list(productosIDs), desde)
+        if productsOdoo['status'] != 'success':
+            return {'status': 'error', 'message': f'Error en realizar la consulta a Odoo: {productsOdoo["message"]}'}
+
+        #Solo se cargan los productos que regresó Odoo
+        productosObj = enBloque(Productos, [product['id'] for product in productsOdoo['products']])
+        productosUpdate = []
+        updatedProducts=0
+
+        for product in productsOdoo['products']:
+            #Busca el ID del producto en Postgres
+            productoObj = productosObj.get(product['id'])
+
+            sku = product['default_code'] if product['default_code'] else ""
+            categoria = product['categ_id'][1] if product['categ_id'] else ""
+            rutas = len(product['route_ids'])
+
+            if product['active']==False:
+                tipo = "DESCONTINUADO"
+            else:
+                if "MAQUILAS" in categoria or "MT" in sku:
+                    tipo = "MAQUILAS"
+                elif "PC" in sku:
+                    tipo = "PRODUCTO COMERCIAL"
+                elif "PT" in sku and rutas > 0 and product['sale_ok'] == True and product['active'] == True:
+                    tipo = "RESURTIBLE"
+                elif "PT" in sku and (rutas == 0 or product['sale_ok'] == False or product['active'] == False):
+                    tipo = "NO RESURTIBLE"
+                else:
+                    tipo = "OTROS"
+
+            # Asigna los nuevos valores de Odoo a los productos de PostgreSQL
+            productoObj.nombre           = product['name']
+            productoObj.sku              = sku
+            productoObj.marca            = product['product_brand_id'][1] if product['product_brand_id'] else ''
+            productoObj.existenciaActual = product['qty_available']
+            productoObj.categoria        = categoria
+            productoObj.tipo             = tipo
+
+            productosUpdate.append(productoObj)
+
+        updatedProducts += len(actualizarEnBloque(Productos, productosUpdate, ['nombre', 'sku', 'marca', 'existenciaActual', 'categoria', 'tipo'], tamanoLote))
+
+        return {
+            'status'   : 'success',
+            'message'  : f'Se han actualizado correctamente {updatedProducts} productos de {len(productsOdoo["products"])}',
+            'leidos'   : len(productsOdoo['products']),
+            'escritos' : updatedProducts
+        }
+
+    except Exception as e:
+        return {'status': 'error', 'message': f'Ha ocurrido un error al tratar de insertar los datos: {str(e)}'}
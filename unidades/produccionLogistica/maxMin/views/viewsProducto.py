@@ -2,6 +2,10 @@ from django.http import JsonResponse
 
 from unidades.produccionLogistica.maxMin.models import Productos
 from unidades.produccionLogistica.maxMin.controllers import ctrProducto
+from unidades.produccionLogistica.maxMin.services.sincronizacionProductos import insertProducts
+from unidades.sistema.sincronizacion.sincronizaciones import sincronizarPeticion
+from unidades.sistema.sincronizacion.referencias import llavesTabla
+from conexiones import lectorExcel
 
 #? Consultas a Base de datos PostgreSQL
 #* Controlador para traer todos los productos de la base de datos
@@ -12,296 +16,41 @@ def getProductsPSQL(request):
 
 
 
-# --------------------------------------------------------------------------------------------------
-# * Función: insertProducts
-# * Descripción: Inserta productos en la base de datos PostgreSQL.
-#
-# ! Parámetros:
-#     - Recibe una lista (array) de productos. Cada producto debe contener los siguientes campos:
-#       { id, name, sku, existenciaActual, marca, categoría, rutas, fechaCreacion }
-#     - Nota: Solo el campo "id" es obligatorio; los demás son opcionales.
-#
-# ? Condiciones para insertar un producto en la base de datos:
-#     1. El producto debe tener un SKU válido (no vacío).
-#     2. El producto no debe existir previamente en la base de datos PostgreSQL.
-#
-# ? Lógica para determinar el tipo de producto:
-#     - Si la categoría contiene "MAQUILAS" o el SKU contiene "MT" → Tipo: MAQUILAS.
-#     - Si el SKU contiene "PC" → Tipo: PRODUCTO COMERCIAL.
-#     - Si el SKU contiene "PT":
-#         · Si contiene una o más rutas → Tipo: INTERNO RESURTIBLE.
-#         · Si no contiene rutas → Tipo: INTERNO NO RESURTIBLE.
-#     - Si no cumple con ninguna de las condiciones anteriores → Tipo: OTROS.
-# --------------------------------------------------------------------------------------------------
-def insertProducts(productos):
-    #traemos los productos existentes de PostgreSQL
-    productsPSQL = Productos.objects.all().values_list('idProductoTmp', flat=True)
-
-    #añadir los productos a la base de datos de PostgreSQL
-    productosCreate = []
-    newProducts = 0
-    
-    for producto in productos:
-        
-        if producto['id'] not in productsPSQL:
-        
-            sku = producto['default_code'] if producto['default_code'] else ""
-            marca = producto['product_brand_id'][1] if producto['product_brand_id'] else ""
-            categoria = producto['categ_id'][1]
-            rutas = len(producto['route_ids'])
-
-            if producto['active']==False:
-                tipo = "DESCONTINUADO"
-            else:
-                if "MAQUILAS" in categoria or "MT" in sku: 
-                    tipo = "MAQUILAS"
-                elif "PC" in sku:
-                    tipo = "PRODUCTO COMERCIAL"
-                elif "PT" in sku and rutas > 0 and producto['sale_ok'] == True and producto['active'] == True:
-                    tipo = "RESURTIBLE"
-                elif "PT" in sku and (rutas == 0 or producto['sale_ok'] == False or producto['active'] == False):
-                    tipo = "NO RESURTIBLE"
-                else:
-                    tipo = "OTROS"
-            
-            productosCreate.append(
-                Productos(
-                    idProductoTmp = producto['id'],
-                    idProducto = producto['product_variant_id'][0] if producto['product_variant_id'] != False else 0,
-                    sku = sku,
-                    nombre = producto['name'],
-                    existenciaActual =  producto['qty_available'],
-                    marca = marca,
-                    categoria = categoria,
-                    tipo = tipo,
-                    fechaCreacion = producto['create_date']
-                )
-            )
-                
-    try:
-        Productos.objects.bulk_create(productosCreate, batch_size=1000)
-        newProducts+=len(productosCreate)
-    except:
-        try:
-            for producto in productosCreate:
-                producto.save()
-                newProducts+=1
-        except Exception as e:
-            print("Error en viewsProducto.insertProducto | Producto no se inserto: ", e, producto)
-
-    return ({
-        'status'  : 'success',
-        'message' : newProducts
-    })
-
-
-
-
-
 # --------------------------------------------------------------------------------------------------
 # * Función: pullProductsOdoo
-# * Descripción: Obtiene todos los productos de Odoo y llama a la función correspondiente para insertart datos
-# * Maneja posibles excepciones
+# * Descripción: Obtiene todos los productos de Odoo e inserta los que no existen en PostgreSQL
+# *              La lógica está en sincronizacionProductos.pull, también se ejecuta con "py manage.py sync productos --mode pull"
 #
 # ! Parámetros:
-#     - request. Como se utiliza para URLS, recibe la información de la consulta
-#
-# ? Returns:
-#     - Caso error:
-#           Ocurre algún error en traer los productos de Odoo
-#           La función insertProducts retorna mensaje de error
-#           Ocurre una excepción en la ejecución del código
-#     - Caso succes:
-#           La función insertProducts retorna mensaje success y envía mensaje con la cantidad de productos agregados
+#     - request. Como se utiliza para URLS, acepta ?lote= y ?desde= (ver sincronizaciones.sincronizarPeticion)
 # --------------------------------------------------------------------------------------------------
 def pullProductsOdoo(request):
-    try:
-        #Prductos de Odoo
-        productsOdoo = ctrProducto.get_allProducts()
-        #Realiza inserción de los datos
-        
-        if productsOdoo['status'] == 'success':
-            response = insertProducts(productsOdoo['products'])
-
-            if response['status'] == "success":
-                totalRows = response['message']
-                return JsonResponse({
-                    'status'  : 'success',
-                    'message' : f'Se han agregado correctamente {totalRows} productos de {len(productsOdoo["products"])}'
-                })
-
-            return JsonResponse({
-                'status'  : 'error',
-                'message' : response['message']
-            })
-        
-        return JsonResponse({
-            'status'  : 'error',
-            'message' : productsOdoo['message']
-        })
-    
-    except Exception as e:
-        return JsonResponse({
-            'status'  : 'error',
-            'message' : f'Ha ocurrido un error al tratar de insertar los datos: {str(e)}'
-        })
-
-
-
+    return sincronizarPeticion('productos', 'pull', request)
 
 
 # --------------------------------------------------------------------------------------------------
-# * Función: createNewProductsFromOdoo
-# * Descripción: Crea nuevos productos registrados en Odoo a PostgreSQL
+# * Función: createProductsOdoo
+# * Descripción: Crea en PostgreSQL los productos nuevos de Odoo
+# *              La lógica está en sincronizacionProductos.create, también se ejecuta con "py manage.py sync productos --mode create"
 #
 # ! Parámetros:
-#     - request. Como se utiliza para URLS, recibe la información de la consulta
-# 
-# ? Diferencia con la función pullProductsOdoo
-#     - Esta hace llamada a get_newProducts del controlador, solo obteniendo los productos que se han creado 
-#           el día anterior a la ejecución del código
-#
-# ? Returns:
-#     - Caso error:
-#           Ocurre error al obtener los nuevos productos
-#           La función insertProducts retorna mensaje de error
-#           Ocurre una excepción en la ejecución del código
-#     - Caso succes:
-#           La función insertProducts retorna mensaje success y envía mensaje con la cantidad de productos actualizados
+#     - request. Como se utiliza para URLS, acepta ?lote= y ?desde= (ver sincronizaciones.sincronizarPeticion)
 # --------------------------------------------------------------------------------------------------
 def createProductsOdoo(request):
-    try:
-        productosIDs = Productos.objects.all().values_list('idProductoTmp', flat=True)
-        #Traer los productos que existen de odoo        
-        productsOdoo = ctrProducto.get_newProducts(list(productosIDs))
-        if productsOdoo['status'] == "success":
+    return sincronizarPeticion('productos', 'create', request)
 
-            response = insertProducts(productsOdoo['products'])
 
-            if response['status'] == "success":
-                totalRows = response['message']
-                return JsonResponse({
-                    'status'  : 'success',
-                    'message' : f'Se han agregado correctamente {totalRows} nuevos productos de {len(productsOdoo["products"])}'
-                })
-
-            return JsonResponse({
-                'status'  : 'error',
-                'message' : response['message']
-            })
-
-        return JsonResponse({
-            'status'  : 'error',
-            'message' : productsOdoo['message']
-        })
-    
-    except Exception as e:
-        return JsonResponse({
-            'status'  : 'error',
-            'message' : f'Ha ocurrido un error al tratar de insertar los datos: {str(e)}'
-        })
-        
-        
-        
-        
-        
-        
 # --------------------------------------------------------------------------------------------------
-# * Función: updateProducts
+# * Función: updateProductsOdoo
 # * Descripción: Actualiza los productos registrados de PostgreSQL conforme a los datos de Odoo
+# *              La lógica está en sincronizacionProductos.update, también se ejecuta con "py manage.py sync productos --mode update"
 #
 # ! Parámetros:
-#     - request. Como se utiliza para URLS, recibe la información de la consulta
-#
-# ? Condiciones de la actualización
-#     - Siempre actualizará todos los productos registrados en Odoo y que existan en la base de datos PostgreSQL, 
-#       esto debido a que no hay una forma clara de obtener la información necesaria de Odoo de los campos 
-#       actualizados y qué productos han sido actualizados y cuáles no
-#       !Nota: Está función puede actualizarse y optimizarse resolviendo esta problemática.
-#     - Debe de cumplir con la lógica y las condiciones de la función insertProducts
-#     - La función modificará todos los campos del producto en cuestión a excepción del ID
-#
-# ? Returns:
-#     - Caso error:
-#           La función insertProducts retorna mensaje de error
-#           Ocurre una excepción en la ejecución del código
-#     - Caso success:
-#           La función insertProducts retorna mensaje success y envía mensaje con la cantidad de productos actualizados
+#     - request. Como se utiliza para URLS, acepta ?lote= y ?desde= (ver sincronizaciones.sincronizarPeticion)
 # --------------------------------------------------------------------------------------------------
 def updateProductsOdoo(request):
-    try:
-        productosIDs = Productos.objects.all().values_list('idProductoTmp', flat=True)
-        # Productos de Odoo
-        productsOdoo = ctrProducto.get_updateProducts(list(productosIDs))
-        
-        productosObj = {p.idProductoTmp: p for p in Productos.objects.all()}
-        productosUpdate = []
-        updatedProducts=0
-
-        if productsOdoo['status'] == 'success':
-            
-            for product in productsOdoo['products']:
-                #Busca el ID del producto en Postgres
-                productoObj = productosObj.get(product['id'])
-                
-                sku = product['default_code'] if product['default_code'] else ""
-                categoria = product['categ_id'][1] if product['categ_id'] else ""
-                rutas = len(product['route_ids'])
-
-                if product['active']==False:
-                    tipo = "DESCONTINUADO"
-                else:
-                    if "MAQUILAS" in categoria or "MT" in sku: 
-                        tipo = "MAQUILAS"
-                    elif "PC" in sku:
-                        tipo = "PRODUCTO COMERCIAL"
-                    elif "PT" in sku and rutas > 0 and product['sale_ok'] == True and product['active'] == True:
-                        tipo = "RESURTIBLE"
-                    elif "PT" in sku and (rutas == 0 or product['sale_ok'] == False or product['active'] == False):
-                        tipo = "NO RESURTIBLE"
-                    else:
-                        tipo = "OTROS"
-
-                # Asigna los nuevos valores de Odoo a los productos de PostgreSQL
-                productoObj.nombre           = product['name']
-                productoObj.sku              = sku
-                productoObj.marca            = product['product_brand_id'][1] if product['product_brand_id'] else ''
-                productoObj.existenciaActual = product['qty_available']
-                productoObj.categoria        = categoria
-                productoObj.tipo             = tipo
-                
-                productosUpdate.append(productoObj)
-            
-            try:
-                Productos.objects.bulk_update(
-                    productosUpdate,
-                    ['nombre', 'sku', 'marca', 'existenciaActual', 'categoria', 'tipo'],
-                    batch_size=1000
-                )
-                updatedProducts+=len(productosUpdate)
-            except:
-                try:
-                    for producto in productosUpdate:
-                        producto.save()
-                        updatedProducts+=1
-                except Exception as e:
-                    print("Error en viewsProducto.updateProducto | Producto no se actulizo: ", e, product)
-                    
-            return JsonResponse({
-                'status'  : 'success',
-                'message' : f'Se han actualizado correctamente {updatedProducts} productos de {len(productsOdoo["products"])}'
-            })
+    return sincronizarPeticion('productos', 'update', request)
 
-        return JsonResponse({
-            'status'  : 'error',
-            'message' : f'Error en realizar la consulta a Odoo: {productsOdoo["message"]}'
-        })
-    except Exception as e:
-        return JsonResponse({
-            'status'  : 'error',
-            'message' : f'Ha ocurrido un error al tratar de insertar los datos: {str(e)}'
-        })
-        
 
     # --------------------------------------------------------------------------------------------------
 # * Función: pullProductsOdoo
@@ -310,6 +59,8 @@ def updateProductsOdoo(request):
 #
 # ! Parámetros:
 #     - request. Como se utiliza para URLS, recibe la información de la consulta
+#     - request.GET['streaming'] (opcional), si es "1" lee el Excel por lotes con lectorExcel sin cargar la hoja completa
+#     - request.GET['lote'] (opcional), cantidad de filas por lote en modo streaming (default 5000)
 #
 # ? Returns:
 #     - Caso error:
@@ -321,7 +72,10 @@ def updateProductsOdoo(request):
 # --------------------------------------------------------------------------------------------------
 def pullProductsExcel(request):
     try:
-        productosIDs = Productos.objects.all().values_list('idProductoTmp', flat=True)
+        if request.GET.get('streaming') == '1':
+            return pullProductsExcelStreaming(int(request.GET.get('lote', 5000)))
+        
+        productosIDs = llavesTabla(Productos)
         #Traer los productos que existen de odoo        
         productsOdoo = ctrProducto.get_allProductsExcel(list(productosIDs))
         if productsOdoo['status'] == "success":
@@ -349,4 +103,34 @@ def pullProductsExcel(request):
         return JsonResponse({
             'status'  : 'error',
             'message' : f'Ha ocurrido un error al tratar de insertar los datos: {str(e)}'
-        })
\ No newline at end of file
+        })
+
+
+# --------------------------------------------------------------------------------------------------
+# * Función: pullProductsExcelStreaming
+# * Descripción: Modo streaming de pullProductsExcel, lee la hoja 'Productos' por lotes y consulta en Odoo solo
+# *              los productos de cada lote, por lo que la memoria no depende del tamaño del Excel
+#
+# ! Parámetros:
+#     - tamanoLote, cantidad de filas de cada lote
+# --------------------------------------------------------------------------------------------------
+def pullProductsExcelStreaming(tamanoLote):
+    nuevos = 0
+    excel = 0
+    for df in lectorExcel.iterarHoja(ctrProducto.archivo, 'Productos', tamanoLote):
+        productsOdoo = ctrProducto.get_allProductsExcel([], df)
+        
+        if productsOdoo['status'] != 'success':
+            return JsonResponse({
+                'status'  : 'error',
+                'message' : productsOdoo['message']
+            })
+        
+        response = insertProducts(productsOdoo['products'])
+        nuevos += response['message']
+        excel += len(productsOdoo['products'])
+    
+    return JsonResponse({
+        'status'  : 'success',
+        'message' : f'Se han agregado correctamente {nuevos} nuevos productos de {excel}'
+    })
@@ -0,0 +1,20 @@
+from django.apps import AppConfig
+from django.conf import settings
+from django.db import connections
+from django.db.models.signals import pre_migrate
+
+
+#Crea los esquemas de postgres-init antes de las migraciones (las tablas usan "esquema"."tabla"), así migrate
+#funciona en una base nueva como la de pruebas o la del benchmark
+def crearEsquemas(sender, using, **kwargs):
+    script = settings.BASE_DIR / 'postgres-init' / 'init-schemas.sql'
+    with connections[using].cursor() as cursor:
+        cursor.execute(script.read_text())
+
+
+class SincronizacionConfig(AppConfig):
+    default_auto_field = "django.db.models.BigAutoField"
+    name = "unidades.sistema.sincronizacion"
+
+    def ready(self):
+        pre_migrate.connect(crearEsquemas, sender=self, dispatch_uid='sincronizacion_esquemas')
@@ -0,0 +1,60 @@
+from itertools import islice
+
+# --------------------------------------------------------------------------------------------------
+# * Módulo: busquedas
+# * Descripción: Resuelve las llaves foráneas de un lote de Odoo consultando en PostgreSQL solo las llaves que
+# *              trae el lote, por bloques. Así la memoria y el tiempo dependen del tamaño del lote y no de todo
+# *              el historial de la tabla (ej. todas las ventas o todos los productos).
+#
+# ? Uso:
+#     - existentes, cuando la llave de Odoo es la llave primaria y basta con asignar <campo>_id
+#     - mapaLlaves, cuando la llave de Odoo es otro campo (ej. idProducto -> idProductoTmp de Productos)
+#     - enBloque, cuando se necesitan las instancias para modificarlas (bulk_update)
+# --------------------------------------------------------------------------------------------------
+
+#? Llaves por consulta, evita un IN enorme cuando el lote es muy grande
+TAMANO_BLOQUE = 5000
+
+
+def _bloques(llaves, tamanoBloque):
+    llaves = iter({llave for llave in llaves if llave is not None})
+    while bloque := list(islice(llaves, tamanoBloque)):
+        yield bloque
+
+
+# --------------------------------------------------------------------------------------------------
+# * Función: mapaLlaves
+# * Descripción: Relaciona los valores de un campo con otro campo (por default la llave primaria) sin crear
+# *              instancias del modelo
+#
+# ! Parámetros:
+#     - modelo, modelo de Django donde se buscan las llaves
+#     - campo, campo por el que se busca (ej. 'idProducto')
+#     - llaves, valores del campo que trae el lote, se ignoran los repetidos y los None
+#     - valor (opcional), campo que se regresa, por default 'pk'
+#     - tamanoBloque (opcional), llaves por consulta
+#
+# ? Returns:
+#     - Diccionario { llave: valor } solo con las llaves que existen en PostgreSQL
+# --------------------------------------------------------------------------------------------------
+def mapaLlaves(modelo, campo, llaves, valor='pk', tamanoBloque=TAMANO_BLOQUE):
+    mapa = {}
+    for bloque in _bloques(llaves, tamanoBloque):
+        mapa.update(modelo.objects.filter(**{f'{campo}__in': bloque}).values_list(campo, valor))
+    return mapa
+
+
+#Llaves primarias del lote que existen en PostgreSQL
+def existentes(modelo, llaves, tamanoBloque=TAMANO_BLOQUE):
+    encontradas = set()
+    for bloque in _bloques(llaves, tamanoBloque):
+        encontradas.update(modelo.objects.filter(pk__in=bloque).values_list('pk', flat=True))
+    return encontradas
+
+
+#Instancias { pk: instancia } de las llaves del lote, como in_bulk pero por bloques
+def enBloque(modelo, llaves, tamanoBloque=TAMANO_BLOQUE):
+    instancias = {}
+    for bloque in _bloques(llaves, tamanoBloque):
+        instancias.update(modelo.objects.in_bulk(bloque))
+    return instancias
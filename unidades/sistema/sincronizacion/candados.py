@@ -0,0 +1,152 @@
+import time
+import zlib
+
+from django.conf import settings
+from django.db import connection
+from django.utils import timezone
+
+from unidades.sistema.sincronizacion.models import EjecucionSync
+
+# --------------------------------------------------------------------------------------------------
+# * Módulo: candados
+# * Descripción: Evita que dos sincronizaciones de la misma entidad corran al mismo tiempo (dos llamadas a
+# *              auto/updateInsumosOdoo, o el cron y una ejecución manual) con un advisory lock de PostgreSQL
+# *              por entidad. El candado es de sesión, si el proceso muere PostgreSQL lo libera solo.
+#
+# ? Concurrencia (qué hace una sincronización que encuentra el candado ocupado):
+#     - esperar, espera a que termine la que está en curso y después se ejecuta
+#     - omitir, no se ejecuta y regresa de inmediato con omitido=True
+#     - compartir, si la que está en curso es del mismo modo y con los mismos parámetros espera a que termine y
+#       regresa su resultado (compartido=True) en lugar de ejecutar otra, si no se comporta como esperar
+# --------------------------------------------------------------------------------------------------
+
+CONCURRENCIAS = ('esperar', 'omitir', 'compartir')
+
+#? Primera llave del advisory lock, separa los candados de las sincronizaciones de otros usos de pg_advisory_lock
+ESPACIO_CANDADOS = 4038
+
+#? Segundos entre cada intento de tomar el candado mientras se espera
+INTERVALO_ESPERA = 1
+
+
+#Llave de 32 bits del candado de la entidad
+def llaveCandado(entidad):
+    llave = zlib.crc32(entidad.encode())
+    return llave - 2**32 if llave >= 2**31 else llave
+
+
+#Intenta tomar el candado de la entidad sin esperar, regresa True si lo tomó
+def tomarCandado(entidad):
+    with connection.cursor() as cursor:
+        cursor.execute("SELECT pg_try_advisory_lock(%s, %s)", [ESPACIO_CANDADOS, llaveCandado(entidad)])
+        return cursor.fetchone()[0]
+
+
+def soltarCandado(entidad):
+    with connection.cursor() as cursor:
+        cursor.execute("SELECT pg_advisory_unlock(%s, %s)", [ESPACIO_CANDADOS, llaveCandado(entidad)])
+
+
+#Espera hasta que el candado de la entidad se libere y lo toma, regresa False si se cumplió la espera máxima
+def esperarCandado(entidad, espera):
+    limite = time.monotonic() + espera
+    while not tomarCandado(entidad):
+        if time.monotonic() >= limite:
+            return False
+        time.sleep(INTERVALO_ESPERA)
+    return True
+
+
+#Guarda el resultado, tiempos, registros y memoria de una ejecución terminada
+def guardarEjecucion(ejecucion, resultado):
+    exito = resultado.get('status') == 'success'
+    ejecucion.estado = EjecucionSync.TERMINADO if exito else EjecucionSync.ERROR
+    ejecucion.resultado = resultado
+    ejecucion.segundos = resultado.get('segundos')
+    ejecucion.fases = resultado.get('fases', {})
+    ejecucion.leidos = resultado.get('leidos', 0)
+    ejecucion.escritos = resultado.get('escritos', 0)
+    ejecucion.rechazados = resultado.get('rechazados', 0)
+    ejecucion.dbConsultas = resultado.get('dbConsultas', 0)
+    ejecucion.consultasDB = resultado.get('consultasDB', {})
+    ejecucion.rssPicoKB = resultado.get('rssPicoKB')
+    ejecucion.error = '' if exito else str(resultado.get('message', ''))[:2000]
+    ejecucion.fechaFin = timezone.now()
+    ejecucion.save()
+
+
+# --------------------------------------------------------------------------------------------------
+# * Función: ejecutarConCandado
+# * Descripción: Ejecuta una sincronización con el candado de su entidad y la registra en EjecucionSync
+#
+# ! Parámetros:
+#     - entidad y modo, ver sincronizaciones.ejecutarSincronizacion
+#     - parametros, diccionario con las opciones del servicio (solo se comparan para compartir el resultado)
+#     - simular, las ejecuciones simuladas no comparten su resultado ni usan el de otra
+#     - ejecutar, función que recibe el EjecucionSync creado, hace la sincronización y regresa su diccionario
+#     - concurrencia (opcional), ver CONCURRENCIAS, por default settings.SYNC_CONCURRENCIA
+#     - espera (opcional), segundos máximos esperando el candado, por default settings.SYNC_ESPERA_CANDADO
+#
+# ? Returns:
+#     - El diccionario de ejecutar más { ejecucion } con el id de EjecucionSync, o el resultado de la ejecución en
+#       curso con { compartido: True }, o { omitido: True } si la concurrencia es omitir
+# --------------------------------------------------------------------------------------------------
+def ejecutarConCandado(entidad, modo, parametros, simular, ejecutar, concurrencia=None, espera=None):
+    concurrencia = concurrencia or settings.SYNC_CONCURRENCIA
+    espera = settings.SYNC_ESPERA_CANDADO if espera is None else espera
+    if concurrencia not in CONCURRENCIAS:
+        raise ValueError(f'La concurrencia {concurrencia} no existe, las opciones son {list(CONCURRENCIAS)}')
+
+    if not tomarCandado(entidad):
+        enCurso = EjecucionSync.objects.filter(entidad=entidad, estado=EjecucionSync.EJECUTANDO).order_by('-id').first()
+
+        if concurrencia == 'omitir':
+            return {
+                'status'    : 'success',
+                'message'   : f'Se omitió la sincronización {entidad} {modo} porque ya hay una en curso',
+                'leidos'    : 0,
+                'escritos'  : 0,
+                'omitido'   : True,
+                'ejecucion' : enCurso.id if enCurso else None
+            }
+
+        #Solo se comparte el resultado si la que está en curso hace exactamente lo mismo
+        compartible = (
+            concurrencia == 'compartir' and enCurso is not None and not simular and not enCurso.simulado
+            and enCurso.modo == modo and enCurso.parametros == parametros
+        )
+
+        if not esperarCandado(entidad, espera):
+            return {
+                'status'  : 'error',
+                'message' : f'La sincronización {entidad} {modo} esperó {espera} s a que terminara la que está en curso'
+            }
+
+        #La ejecución en curso guarda su resultado antes de soltar el candado
+        if compartible:
+            enCurso.refresh_from_db()
+            if enCurso.estado != EjecucionSync.EJECUTANDO:
+                soltarCandado(entidad)
+                return dict(enCurso.resultado or {}, compartido=True, ejecucion=enCurso.id)
+
+    try:
+        #Con el candado tomado ninguna otra puede estar en curso, las que siguen como ejecutando son de un proceso
+        #que murió sin terminarlas (PostgreSQL liberó su candado)
+        EjecucionSync.objects.filter(entidad=entidad, estado=EjecucionSync.EJECUTANDO).update(
+            estado=EjecucionSync.ERROR, resultado={'status': 'error', 'message': 'La ejecución se interrumpió'}, fechaFin=timezone.now()
+        )
+        ejecucion = EjecucionSync.objects.create(entidad=entidad, modo=modo, parametros=parametros, simulado=simular)
+        resultado = {'status': 'error', 'message': 'La sincronización terminó con una excepción'}
+        try:
+            resultado = ejecutar(ejecucion)
+        except Exception as e:
+            resultado = {'status': 'error', 'message': f'La sincronización terminó con una excepción: {e!r}'}
+            raise
+        finally:
+            guardarEjecucion(ejecucion, resultado)
+
+        resultado['ejecucion'] = ejecucion.id
+        return resultado
+
+    finally:
+        soltarCandado(entidad)
@@ -0,0 +1,84 @@
+from django.db import transaction
+
+from conexiones import metricas
+
+# --------------------------------------------------------------------------------------------------
+# * Módulo: escrituras
+# * Descripción: bulk_create y bulk_update de las sincronizaciones en un savepoint. Si el bloque falla se escribe una
+# *              fila por una, cada fila en su propio savepoint, así una fila mala no aborta la transacción (ej. en
+# *              "sync --dry-run", que ejecuta todo dentro de transaction.atomic) ni detiene a las demás.
+#
+# ? Uso:
+#     - insertarEnBloque, en lugar de bulk_create
+#     - actualizarEnBloque, en lugar de bulk_update
+#
+# ? Returns comunes:
+#     - Lista de las instancias que sí se escribieron, las demás se cuentan con metricas.filasRechazadas
+# --------------------------------------------------------------------------------------------------
+
+
+# --------------------------------------------------------------------------------------------------
+# * Función: insertarEnBloque
+# * Descripción: bulk_create en un savepoint, si falla inserta una por una
+#
+# ! Parámetros:
+#     - modelo, modelo de Django
+#     - instancias, instancias sin guardar
+#     - tamanoLote, tamaño de cada bulk_create
+# --------------------------------------------------------------------------------------------------
+def insertarEnBloque(modelo, instancias, tamanoLote):
+    try:
+        with transaction.atomic():
+            modelo.objects.bulk_create(instancias, batch_size=tamanoLote)
+        return instancias
+    except Exception as e:
+        print(f'Error en escrituras.insertarEnBloque | bulk_create de {modelo.__name__} falló, se insertan una por una: ', e)
+
+    #Los lotes que se insertaron antes del error traen el id autoincremental que se revirtió
+    autoincremental = modelo._meta.pk.get_internal_type() in ('AutoField', 'BigAutoField')
+    insertadas = []
+    for instancia in instancias:
+        if autoincremental:
+            instancia.pk = None
+        try:
+            with transaction.atomic():
+                instancia.save(force_insert=True)
+            insertadas.append(instancia)
+        except Exception as e:
+            print(f'Error en escrituras.insertarEnBloque | {modelo.__name__} no se inserto: ', e, instancia.__dict__)
+
+    if len(insertadas) < len(instancias):
+        metricas.filasRechazadas(len(instancias) - len(insertadas))
+    return insertadas
+
+
+# --------------------------------------------------------------------------------------------------
+# * Función: actualizarEnBloque
+# * Descripción: bulk_update en un savepoint, si falla actualiza una por una solo los campos indicados
+#
+# ! Parámetros:
+#     - modelo, modelo de Django
+#     - instancias, instancias ya modificadas
+#     - campos, lista de campos que se actualizan
+#     - tamanoLote, tamaño de cada bulk_update
+# --------------------------------------------------------------------------------------------------
+def actualizarEnBloque(modelo, instancias, campos, tamanoLote):
+    try:
+        with transaction.atomic():
+            modelo.objects.bulk_update(instancias, campos, batch_size=tamanoLote)
+        return instancias
+    except Exception as e:
+        print(f'Error en escrituras.actualizarEnBloque | bulk_update de {modelo.__name__} falló, se actualizan una por una: ', e)
+
+    actualizadas = []
+    for instancia in instancias:
+        try:
+            with transaction.atomic():
+                instancia.save(update_fields=campos)
+            actualizadas.append(instancia)
+        except Exception as e:
+            print(f'Error en escrituras.actualizarEnBloque | {modelo.__name__} no se actualizo: ', e, instancia.__dict__)
+
+    if len(actualizadas) < len(instancias):
+        metricas.filasRechazadas(len(instancias) - len(actualizadas))
+    return actualizadas
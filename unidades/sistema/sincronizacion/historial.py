@@ -0,0 +1,139 @@
+from datetime import timedelta
+from statistics import median
+
+from django.db.models import Avg, Count, FloatField, Max, Q, Sum
+from django.db.models.fields.json import KeyTextTransform
+from django.db.models.functions import Cast, TruncDate
+from django.utils import timezone
+
+from unidades.sistema.sincronizacion.models import EjecucionSync
+
+# --------------------------------------------------------------------------------------------------
+# * Módulo: historial
+# * Descripción: Consultas sobre el historial de ejecuciones (EjecucionSync) para ver la tendencia de cada
+# *              sincronización y detectar el día que una fase (fetch, enrich, transform, write) se hace más lenta.
+# *              Las ejecuciones simuladas (dry run) no cuentan.
+# --------------------------------------------------------------------------------------------------
+
+FASES = ('fetch', 'enrich', 'transform', 'write')
+
+
+#Ejecuciones reales de los últimos días, opcionalmente de una entidad y modo
+def ejecucionesRecientes(dias=30, entidad=None, modo=None):
+    ejecuciones = EjecucionSync.objects.filter(simulado=False, fechaInicio__gte=timezone.now() - timedelta(days=dias))
+    if entidad:
+        ejecuciones = ejecuciones.filter(entidad=entidad)
+    if modo:
+        ejecuciones = ejecuciones.filter(modo=modo)
+    return ejecuciones
+
+
+# --------------------------------------------------------------------------------------------------
+# * Función: tendenciasPorDia
+# * Descripción: Agrupa las ejecuciones por entidad, modo y día
+#
+# ! Parámetros:
+#     - dias, entidad y modo, ver ejecucionesRecientes
+#
+# ? Returns:
+#     - Lista de { entidad, modo, dia, ejecuciones, errores, segundosPromedio, segundosMax, fases (promedio de cada
+#       fase), leidos, escritos, rechazados, dbConsultasPromedio, rssPicoKB (máximo de las ejecuciones que no se
+#       traslaparon con otra en el mismo proceso) } ordenada por entidad, modo y día
+# --------------------------------------------------------------------------------------------------
+def tendenciasPorDia(dias=30, entidad=None, modo=None):
+    promediosFases = {
+        f'fase_{fase}': Avg(Cast(KeyTextTransform(fase, 'fases'), FloatField()))
+        for fase in FASES
+    }
+    filas = (
+        ejecucionesRecientes(dias, entidad, modo)
+        .annotate(dia=TruncDate('fechaInicio'))
+        .values('entidad', 'modo', 'dia')
+        .annotate(
+            ejecuciones      = Count('id'),
+            errores          = Count('id', filter=Q(estado=EjecucionSync.ERROR)),
+            segundosPromedio = Avg('segundos'),
+            segundosMax      = Max('segundos'),
+            leidos           = Sum('leidos'),
+            escritos         = Sum('escritos'),
+            rechazados       = Sum('rechazados'),
+            dbConsultasPromedio = Avg('dbConsultas'),
+            rssPicoKB        = Max('rssPicoKB'),
+            **promediosFases,
+        )
+        .order_by('entidad', 'modo', 'dia')
+    )
+
+    tendencias = []
+    for fila in filas:
+        fases = {fase: _redondear(fila.pop(f'fase_{fase}')) for fase in FASES}
+        fila['segundosPromedio'] = _redondear(fila['segundosPromedio'])
+        fila['dbConsultasPromedio'] = _redondear(fila['dbConsultasPromedio'])
+        fila['fases'] = fases
+        tendencias.append(fila)
+    return tendencias
+
+
+# --------------------------------------------------------------------------------------------------
+# * Función: detectarRegresiones
+# * Descripción: Compara la última ejecución exitosa de cada entidad y modo con la mediana de las anteriores
+#
+# ! Parámetros:
+#     - dias, entidad y modo, ver ejecucionesRecientes
+#     - ventana (opcional), cuántas ejecuciones anteriores forman la referencia
+#     - umbral (opcional), veces la mediana a partir de las que el total o una fase se marca como regresión
+#
+# ? Returns:
+#     - Lista de { entidad, modo, ejecucion, fecha, segundos, mediana, fases: {fase: {ultima, mediana, veces}}, regresion,
+#       fasesLentas, dbConsultas: {ultima, mediana, veces}, masConsultas } de cada entidad y modo con al menos una
+#       ejecución anterior. masConsultas indica que la última hizo umbral veces más consultas a PostgreSQL
+# --------------------------------------------------------------------------------------------------
+def detectarRegresiones(dias=30, entidad=None, modo=None, ventana=10, umbral=1.5):
+    exitosas = ejecucionesRecientes(dias, entidad, modo).filter(estado=EjecucionSync.TERMINADO, segundos__isnull=False)
+    grupos = exitosas.values_list('entidad', 'modo').distinct()
+
+    regresiones = []
+    for entidadGrupo, modoGrupo in sorted(set(grupos)):
+        ultimas = list(exitosas.filter(entidad=entidadGrupo, modo=modoGrupo).order_by('-id')[:ventana + 1])
+        if len(ultimas) < 2:
+            continue
+        ultima, anteriores = ultimas[0], ultimas[1:]
+
+        medianaTotal = median(e.segundos for e in anteriores)
+        fases = {}
+        for fase in FASES:
+            valor = ultima.fases.get(fase)
+            referencia = median(e.fases.get(fase, 0) for e in anteriores)
+            fases[fase] = {'ultima': valor, 'mediana': _redondear(referencia), 'veces': _veces(valor, referencia)}
+
+        medianaConsultas = median(e.dbConsultas for e in anteriores)
+        vecesConsultas = round(ultima.dbConsultas / medianaConsultas, 2) if medianaConsultas else None
+
+        veces = _veces(ultima.segundos, medianaTotal)
+        fasesLentas = [fase for fase, datos in fases.items() if datos['veces'] and datos['veces'] >= umbral]
+        regresiones.append({
+            'entidad'     : entidadGrupo,
+            'modo'        : modoGrupo,
+            'ejecucion'   : ultima.id,
+            'fecha'       : ultima.fechaInicio,
+            'segundos'    : ultima.segundos,
+            'mediana'     : _redondear(medianaTotal),
+            'veces'       : veces,
+            'fases'       : fases,
+            'regresion'   : bool(veces and veces >= umbral),
+            'fasesLentas' : fasesLentas,
+            'dbConsultas' : {'ultima': ultima.dbConsultas, 'mediana': medianaConsultas, 'veces': vecesConsultas},
+            'masConsultas': bool(vecesConsultas and vecesConsultas >= umbral),
+        })
+    return regresiones
+
+
+def _redondear(valor):
+    return round(valor, 3) if valor is not None else None
+
+
+#Cuántas veces es el valor la referencia, None si la referencia es muy pequeña para compararse
+def _veces(valor, referencia):
+    if valor is None or not referencia or referencia < 0.01:
+        return None
+    return round(valor / referencia, 2)
@@ -0,0 +1,297 @@
+import inspect
+import json
+import os
+import sys
+import time
+from datetime import datetime, timedelta
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+
+from conexiones import metricas
+from unidades.sistema.sincronizacion.odooFalso import DatosOdoo, OdooFalso
+
+# --------------------------------------------------------------------------------------------------
+# * Comando: benchmark
+# * Descripción: Ejecuta todas las sincronizaciones (pull, después create con registros nuevos y update con
+# *              registros modificados) contra un Odoo falso en memoria (ver odooFalso) y una base de PostgreSQL
+# *              de prueba que se crea y se borra al terminar. Reporta por endpoint el tiempo, el throughput, las
+# *              fases y las llamadas a Odoo, para medir un cambio antes de desplegarlo sin tocar Odoo ni la base real.
+# *              Al final guarda el plan (EXPLAIN) de las consultas de los reportes para ver qué índices usan.
+#
+# ? Uso:
+#     py manage.py benchmark                                       (datos por default, 20 ms por llamada a Odoo)
+#     py manage.py benchmark --latencia 100 --facturas 50000       (red lenta y más ventas)
+#     py manage.py benchmark --salida antes.json                   (guarda el resultado)
+#     py manage.py benchmark --comparar antes.json                 (muestra la diferencia contra otra corrida)
+#     py manage.py benchmark --sin-async --mantener-bd             (enriquecimiento secuencial, deja la base de prueba)
+#
+# ! Nota: Debe ejecutarse en un proceso propio, las conexiones de Odoo de los controladores se crean al importarlos
+#         y aquí se apuntan al Odoo falso. El usuario de PostgreSQL necesita permiso para crear bases de datos.
+# --------------------------------------------------------------------------------------------------
+
+#? Modos en el orden en que se ejecutan y qué se cambia en el Odoo falso antes de cada uno
+ETAPAS = ('pull', 'create', 'update')
+
+#Copia de la latencia (suma, cuenta) y bytes recibidos de Odoo por (modelo, método)
+def fotoOdoo():
+    return {
+        llave: (suma, cuenta, metricas.ODOO_BYTES_RECIBIDOS.valores.get(llave, 0))
+        for llave, (cubetas, suma, cuenta) in dict(metricas.ODOO_LATENCIA.valores).items()
+    }
+
+
+#Llamadas a Odoo entre dos fotos, en total y por modelo/método
+def diferenciaOdoo(antes, despues):
+    porMetodo = {}
+    for llave, (suma, cuenta, recibidos) in despues.items():
+        sumaAntes, cuentaAntes, recibidosAntes = antes.get(llave, (0.0, 0, 0))
+        if cuenta > cuentaAntes:
+            porMetodo[' '.join(llave)] = {
+                'llamadas'       : cuenta - cuentaAntes,
+                'segundos'       : round(suma - sumaAntes, 3),
+                'bytesRecibidos' : recibidos - recibidosAntes,
+            }
+    llamadas = sum(d['llamadas'] for d in porMetodo.values())
+    segundos = sum(d['segundos'] for d in porMetodo.values())
+    return {
+        'llamadas'           : llamadas,
+        'segundos'           : round(segundos, 3),
+        'latenciaPromedioMs' : round(segundos / llamadas * 1000, 1) if llamadas else 0,
+        'bytesRecibidos'     : sum(d['bytesRecibidos'] for d in porMetodo.values()),
+        'porMetodo'          : porMetodo,
+    }
+
+
+#Consultas de los reportes cuyo plan se guarda, se importan aquí porque las vistas importan los controladores
+def consultasPlanes():
+    from unidades.produccionLogistica.maxMin.models import Productos
+    from unidades.produccionLogistica.maxMin.views.viewsInsumo import ventasPorProducto
+    from unidades.administracion.reporteVentas.models import Caducidades
+
+    hoy = datetime.now()
+    inicioAnio = datetime(hoy.year, 1, 1)
+    producto = Productos.objects.values('idProducto', 'sku').first() or {'idProducto': 0, 'sku': ''}
+    return {
+        'ventasPorProductoAnioPasado' : ventasPorProducto(datetime(hoy.year - 1, 1, 1), inicioAnio),
+        'ventasPorProductoAnioActual' : ventasPorProducto(inicioAnio),
+        'ventasPorProductoUltimoMes'  : ventasPorProducto(hoy - timedelta(days=30)),
+        'caducidadesPorVencer'        : Caducidades.objects.filter(fechaCaducidad__gte=hoy.date(), fechaCaducidad__lt=hoy.date() + timedelta(days=90)),
+        'productoPorIdProducto'       : Productos.objects.filter(idProducto=producto['idProducto']),
+        'productoPorSku'              : Productos.objects.filter(sku=producto['sku']),
+        'productosResurtibles'        : Productos.objects.filter(tipo='RESURTIBLE'),
+    }
+
+
+#Resume un EXPLAIN (FORMAT JSON): costo total, nodos del plan en orden, los índices que usa y las tablas que lee
+#(en ventas y ventaspvh, las particiones mensuales que quedan después de descartar las que no tienen el rango)
+def resumirPlan(explain):
+    nodos = []
+    indices = set()
+    tablas = set()
+
+    def recorrer(nodo):
+        texto = nodo['Node Type']
+        if 'Relation Name' in nodo:
+            tablas.add(nodo['Relation Name'])
+        if 'Index Name' in nodo:
+            texto += f' {nodo["Index Name"]}'
+            indices.add(nodo['Index Name'])
+        elif 'Relation Name' in nodo:
+            texto += f' {nodo["Relation Name"]}'
+        nodos.append(texto)
+        for hijo in nodo.get('Plans', []):
+            recorrer(hijo)
+
+    raiz = json.loads(explain)[0]['Plan']
+    recorrer(raiz)
+    return {'costo': raiz['Total Cost'], 'indices': sorted(indices), 'tablas': sorted(tablas), 'nodos': nodos}
+
+
+#Plan de cada consulta de consultasPlanes, antes se analizan las tablas para que el planificador conozca los datos
+def planes():
+    from unidades.produccionLogistica.maxMin.models import Productos
+    from unidades.administracion.reporteVentas.models import Ventas, VentasPVH, Caducidades
+
+    with connection.cursor() as cursor:
+        for modelo in (Productos, Ventas, VentasPVH, Caducidades):
+            cursor.execute(f'ANALYZE {modelo._meta.db_table}')
+    return {nombre: resumirPlan(consulta.explain(format='json')) for nombre, consulta in consultasPlanes().items()}
+
+
+class Command(BaseCommand):
+    help = "Mide todas las sincronizaciones contra un Odoo falso y una base de PostgreSQL de prueba"
+    #Las revisiones de Django cargan las urls y con ellas los controladores, que se conectarían al Odoo real
+    requires_system_checks = []
+
+    def add_arguments(self, parser):
+        parser.add_argument('--latencia', type=float, default=20, help='Milisegundos de cada llamada a Odoo')
+        parser.add_argument('--latencia-registro', type=float, default=0.02, help='Milisegundos extra por registro regresado')
+        parser.add_argument('--productos', type=int, default=500)
+        parser.add_argument('--insumos', type=int, default=300)
+        parser.add_argument('--clientes', type=int, default=1000)
+        parser.add_argument('--facturas', type=int, default=5000)
+        parser.add_argument('--lineas', type=int, default=3, help='Lineas por factura')
+        parser.add_argument('--lotes', type=int, default=2000)
+        parser.add_argument('--bom', type=int, default=1500, help='Lineas de lista de materiales')
+        parser.add_argument('--meses', type=int, default=24, help='Meses hacia atrás de las facturas')
+        parser.add_argument('--nuevos', type=float, default=0.05, help='Fracción de registros nuevos antes de los create')
+        parser.add_argument('--modificados', type=float, default=0.2, help='Fracción de registros modificados antes de los update')
+        parser.add_argument('--semilla', type=int, default=1)
+        parser.add_argument('--batch-size', type=int, help='Tamaño de lote de las sincronizaciones que lo aceptan')
+        parser.add_argument('--sin-async', action='store_true', help='Enriquecimiento secuencial (ODOO_ASYNC=0)')
+        parser.add_argument('--mantener-bd', action='store_true', help='No borra la base de prueba al terminar')
+        parser.add_argument('--salida', help='Archivo JSON donde se guarda el resultado')
+        parser.add_argument('--comparar', help='Archivo JSON de otra corrida (--salida) contra el que se compara')
+        parser.add_argument('--json', action='store_true', help='Imprime el resultado completo en JSON')
+
+    def handle(self, *args, **options):
+        if 'unidades.sistema.sincronizacion.sincronizaciones' in sys.modules:
+            raise CommandError('Los controladores ya se importaron con la conexión al Odoo real, ejecuta benchmark en un proceso propio')
+
+        anterior = None
+        if options['comparar']:
+            try:
+                with open(options['comparar'], encoding='utf-8') as archivo:
+                    anterior = json.load(archivo)
+            except (OSError, ValueError) as e:
+                raise CommandError(f'No se pudo leer {options["comparar"]}: {e}')
+
+        inicio = time.perf_counter()
+        datos = DatosOdoo(
+            productos=options['productos'], insumos=options['insumos'], clientes=options['clientes'],
+            facturas=options['facturas'], lineasPorFactura=options['lineas'], lotes=options['lotes'],
+            bom=options['bom'], meses=options['meses'], semilla=options['semilla'],
+        )
+        self.stdout.write(f'Datos generados en {time.perf_counter() - inicio:.1f} s: {datos.tamanos()}')
+
+        odoo = OdooFalso(datos, latencia=options['latencia'] / 1000, latenciaRegistro=options['latencia_registro'] / 1000)
+        #Antes de importar los controladores, crean su conexión a Odoo al importarse
+        os.environ.update({
+            'URL_ODOO'      : odoo.url,
+            'DATABASE_ODOO' : 'benchmark',
+            'USERNAME_ODOO' : 'benchmark',
+            'PASSWORD_ODOO' : 'benchmark',
+            'ODOO_ASYNC'    : '0' if options['sin_async'] else '1',
+        })
+
+        nombreOriginal = connection.settings_dict['NAME']
+        with odoo:
+            connection.creation.create_test_db(verbosity=0, autoclobber=True, serialize=False)
+            self.stdout.write(f'Base de prueba {connection.settings_dict["NAME"]}, Odoo falso en {odoo.url}')
+            try:
+                resultados = self.ejecutar(datos, options)
+                planesConsultas = planes()
+            finally:
+                if options['mantener_bd']:
+                    self.stdout.write(f'Se mantuvo la base de prueba {connection.settings_dict["NAME"]}')
+                    connection.close()
+                    connection.settings_dict['NAME'] = nombreOriginal
+                else:
+                    connection.creation.destroy_test_db(nombreOriginal, verbosity=0)
+
+        reporte = {
+            'fecha'         : datetime.now().isoformat(timespec='seconds'),
+            'configuracion' : {
+                'latenciaMs'         : options['latencia'],
+                'latenciaRegistroMs' : options['latencia_registro'],
+                'odooAsync'          : not options['sin_async'],
+                'batchSize'          : options['batch_size'],
+                'semilla'            : options['semilla'],
+                'tamanos'            : datos.tamanos(),
+            },
+            'total'         : round(sum(r['segundos'] for r in resultados), 3),
+            'endpoints'     : resultados,
+            'planes'        : planesConsultas,
+        }
+
+        if options['salida']:
+            with open(options['salida'], 'w', encoding='utf-8') as archivo:
+                json.dump(reporte, archivo, default=str, ensure_ascii=False, indent=2)
+        if options['json']:
+            self.stdout.write(json.dumps(reporte, default=str, ensure_ascii=False, indent=2))
+
+        self.imprimir(reporte, anterior)
+
+        errores = [r['endpoint'] for r in resultados if r['status'] != 'success']
+        if errores:
+            raise CommandError(f'Terminaron con error: {", ".join(errores)}')
+
+    #Ejecuta cada etapa con todas las entidades que tienen ese modo
+    def ejecutar(self, datos, options):
+        from unidades.sistema.sincronizacion import sincronizaciones
+
+        resultados = []
+        for modo in ETAPAS:
+            if modo == 'create':
+                datos.agregarNuevos(options['nuevos'], options['lineas'])
+            elif modo == 'update':
+                datos.modificar(options['modificados'])
+
+            for entidad, servicio in sincronizaciones.SINCRONIZACIONES.items():
+                if not hasattr(servicio, modo):
+                    continue
+                opciones = {}
+                if options['batch_size'] and 'tamanoLote' in inspect.signature(getattr(servicio, modo)).parameters:
+                    opciones['tamanoLote'] = options['batch_size']
+
+                antes = fotoOdoo()
+                inicio = time.perf_counter()
+                resultado = sincronizaciones.ejecutarSincronizacion(entidad, modo, concurrencia='esperar', **opciones)
+                segundos = time.perf_counter() - inicio
+
+                endpoint = {
+                    'endpoint'           : f'{entidad} {modo}',
+                    'status'             : resultado['status'],
+                    'segundos'           : round(segundos, 3),
+                    'leidos'             : resultado.get('leidos', 0),
+                    'escritos'           : resultado.get('escritos', 0),
+                    'leidosPorSegundo'   : resultado.get('leidosPorSegundo', 0),
+                    'escritosPorSegundo' : resultado.get('escritosPorSegundo', 0),
+                    'fases'              : resultado.get('fases', {}),
+                    'dbConsultas'        : resultado.get('dbConsultas', 0),
+                    'rechazados'         : resultado.get('rechazados', 0),
+                    'rssPicoKB'          : resultado.get('rssPicoKB'),
+                    'odoo'               : diferenciaOdoo(antes, fotoOdoo()),
+                }
+                if resultado['status'] != 'success':
+                    endpoint['message'] = str(resultado.get('message'))[:500]
+                resultados.append(endpoint)
+
+                estilo = self.style.SUCCESS if resultado['status'] == 'success' else self.style.ERROR
+                self.stdout.write(estilo(f'{endpoint["endpoint"]:<20} {resultado["status"]:<8} {segundos:>9.3f} s'))
+        return resultados
+
+    def imprimir(self, reporte, anterior):
+        previos = {r['endpoint']: r for r in (anterior or {}).get('endpoints', [])}
+        encabezado = (
+            f'\n{"endpoint":<20} {"segundos":>9} {"leídos/s":>10} {"escritos/s":>10} {"odoo":>6} {"ms/llam":>8} '
+            f'{"fetch":>7} {"enrich":>7} {"transf":>7} {"write":>7} {"consultas":>9}'
+        )
+        self.stdout.write(encabezado + (f' {"vs anterior":>12}' if anterior else ''))
+        for r in reporte['endpoints']:
+            fases = r['fases']
+            linea = (
+                f'{r["endpoint"]:<20} {r["segundos"]:>9.3f} {r["leidosPorSegundo"]:>10} {r["escritosPorSegundo"]:>10} '
+                f'{r["odoo"]["llamadas"]:>6} {r["odoo"]["latenciaPromedioMs"]:>8} '
+                f'{fases.get("fetch", 0):>7.3f} {fases.get("enrich", 0):>7.3f} {fases.get("transform", 0):>7.3f} '
+                f'{fases.get("write", 0):>7.3f} {r["dbConsultas"]:>9}'
+            )
+            previo = previos.get(r['endpoint'])
+            if previo and previo['segundos']:
+                linea += f' {(r["segundos"] / previo["segundos"] - 1) * 100:>+11.1f}%'
+            self.stdout.write(linea)
+
+        planesPrevios = (anterior or {}).get('planes', {})
+        self.stdout.write(f'\n{"consulta (EXPLAIN)":<30} {"costo":>10} {"tablas":>6}  índices')
+        for nombre, plan in reporte['planes'].items():
+            linea = f'{nombre:<30} {plan["costo"]:>10.2f} {len(plan["tablas"]):>6}  {", ".join(plan["indices"]) or "(sin índices)"}'
+            previo = planesPrevios.get(nombre)
+            if previo and previo['indices'] != plan['indices']:
+                linea += f'  antes: {", ".join(previo["indices"]) or "(sin índices)"}'
+            self.stdout.write(linea)
+
+        total = f'\nTotal: {reporte["total"]:.3f} s'
+        if anterior and anterior.get('total'):
+            total += f' (anterior {anterior["total"]:.3f} s, {(reporte["total"] / anterior["total"] - 1) * 100:+.1f}%)'
+        self.stdout.write(total)
@@ -0,0 +1,164 @@
+import importlib.util
+import json
+import statistics
+import time
+from urllib.parse import urlsplit
+from wsgiref.util import setup_testing_defaults
+
+from django.core.handlers.wsgi import WSGIHandler
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.db.backends.signals import connection_created
+
+# --------------------------------------------------------------------------------------------------
+# * Comando: latencia
+# * Descripción: Mide la latencia de peticiones a rutas de solo lectura con distintas configuraciones de conexión
+# *              a PostgreSQL, para comparar abrir una conexión por petición contra conexiones persistentes o el
+# *              pool de psycopg. Las peticiones pasan por el mismo WSGIHandler que usa gunicorn, así se cierran o
+# *              reutilizan las conexiones igual que en producción (request_started/request_finished).
+#
+# ? Modos:
+#     - antes, una conexión nueva por petición con el SET search_path en connection_created (como antes)
+#     - nueva, una conexión nueva por petición con el search_path en las opciones de conexión
+#     - persistente, CONN_MAX_AGE con revisión de la conexión (CONN_HEALTH_CHECKS)
+#     - pool, pool de psycopg (necesita psycopg-pool)
+#
+# ? Uso:
+#     py manage.py latencia                                      (todos los modos en /auto/ejecuciones/?limite=10)
+#     py manage.py latencia --modos antes,persistente --peticiones 500
+#     py manage.py latencia --ruta "/auto/ejecuciones/?entidad=ventas" --json
+#
+# ! Nota: Usa la base configurada en settings, las rutas deben ser de solo lectura.
+# --------------------------------------------------------------------------------------------------
+
+MODOS = ('antes', 'nueva', 'persistente', 'pool')
+
+#? Opciones del pool en el modo pool, una sola petición a la vez solo necesita una conexión
+POOL = {'min_size': 1, 'max_size': 2}
+
+
+#search_path por consulta, como lo hacía el handler de connection_created que se quitó
+def _searchPathPorConsulta(sender, connection, **kwargs):
+    if connection.alias == 'default':
+        with connection.cursor() as cursor:
+            cursor.execute("SET search_path TO django_reportes, public;")
+
+
+def _percentil(valores, percentil):
+    ordenados = sorted(valores)
+    return ordenados[min(len(ordenados) - 1, int(len(ordenados) * percentil / 100))]
+
+
+class Command(BaseCommand):
+    help = "Compara la latencia de peticiones con conexiones nuevas, persistentes o con pool de PostgreSQL"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--modos', default=','.join(MODOS), help=f'Modos separados por coma ({",".join(MODOS)})')
+        parser.add_argument('--ruta', action='append', help='Ruta a consultar, se puede repetir')
+        parser.add_argument('--peticiones', type=int, default=200, help='Peticiones por ruta y modo')
+        parser.add_argument('--calentamiento', type=int, default=5, help='Peticiones que no se miden al inicio de cada modo')
+        parser.add_argument('--json', action='store_true', help='Imprime el resultado completo en JSON')
+
+    def handle(self, *args, **options):
+        modos = [modo.strip() for modo in options['modos'].split(',') if modo.strip()]
+        desconocidos = [modo for modo in modos if modo not in MODOS]
+        if desconocidos:
+            raise CommandError(f'Los modos {desconocidos} no existen, las opciones son {list(MODOS)}')
+        if 'pool' in modos and importlib.util.find_spec('psycopg_pool') is None:
+            self.stdout.write(self.style.WARNING('Se omite el modo pool, psycopg-pool no está instalado'))
+            modos.remove('pool')
+        rutas = options['ruta'] or ['/auto/ejecuciones/?limite=10']
+
+        original = {
+            'CONN_MAX_AGE'       : connection.settings_dict['CONN_MAX_AGE'],
+            'CONN_HEALTH_CHECKS' : connection.settings_dict['CONN_HEALTH_CHECKS'],
+            'OPTIONS'            : dict(connection.settings_dict['OPTIONS']),
+        }
+        resultados = []
+        try:
+            for modo in modos:
+                self.configurar(modo, original)
+                for ruta in rutas:
+                    resultado = self.medir(ruta, options['peticiones'], options['calentamiento'])
+                    resultado['modo'] = modo
+                    resultados.append(resultado)
+        finally:
+            connection_created.disconnect(_searchPathPorConsulta)
+            connection.close()
+            connection.close_pool()
+            connection.settings_dict.update(original)
+
+        if options['json']:
+            self.stdout.write(json.dumps(resultados, ensure_ascii=False, indent=2))
+
+        self.stdout.write(f'\n{"modo":<12} {"ruta":<40} {"prom ms":>8} {"p50 ms":>8} {"p95 ms":>8} {"p99 ms":>8} {"conexiones":>10}')
+        for r in resultados:
+            self.stdout.write(
+                f'{r["modo"]:<12} {r["ruta"][:40]:<40} {r["promedioMs"]:>8} {r["p50Ms"]:>8} {r["p95Ms"]:>8} '
+                f'{r["p99Ms"]:>8} {r["conexiones"]:>10}'
+            )
+        self.stdout.write('Con pool, conexiones cuenta las que se toman del pool, no las que se abren en PostgreSQL')
+
+    #Cambia la configuración de la conexión default antes de abrir la siguiente
+    def configurar(self, modo, original):
+        connection.close()
+        connection.close_pool()
+        connection_created.disconnect(_searchPathPorConsulta)
+
+        opciones = dict(original['OPTIONS'])
+        opciones.pop('pool', None)
+        ajustes = {'CONN_MAX_AGE': 0, 'CONN_HEALTH_CHECKS': original['CONN_HEALTH_CHECKS'], 'OPTIONS': opciones}
+        if modo == 'antes':
+            opciones.pop('options', None)
+            ajustes['CONN_HEALTH_CHECKS'] = False
+            connection_created.connect(_searchPathPorConsulta)
+        elif modo == 'persistente':
+            ajustes['CONN_MAX_AGE'] = original['CONN_MAX_AGE'] or 60
+            ajustes['CONN_HEALTH_CHECKS'] = True
+        elif modo == 'pool':
+            opciones['pool'] = POOL
+        connection.settings_dict.update(ajustes)
+
+    #Una petición GET completa por el WSGIHandler, regresa el código de estado
+    def peticion(self, aplicacion, ruta):
+        partes = urlsplit(ruta)
+        entorno = {'REQUEST_METHOD': 'GET', 'PATH_INFO': partes.path, 'QUERY_STRING': partes.query}
+        setup_testing_defaults(entorno)
+        estado = []
+        respuesta = aplicacion(entorno, lambda status, headers, exc_info=None: estado.append(status))
+        try:
+            for _ in respuesta:
+                pass
+        finally:
+            #Al cerrar la respuesta se envía request_finished, ahí Django cierra o conserva la conexión
+            respuesta.close()
+        return int(estado[0].split()[0])
+
+    def medir(self, ruta, peticiones, calentamiento):
+        aplicacion = WSGIHandler()
+        conexiones = []
+        contar = lambda sender, connection, **kwargs: conexiones.append(connection.alias)
+        for _ in range(calentamiento):
+            self.peticion(aplicacion, ruta)
+
+        tiempos = []
+        connection_created.connect(contar, weak=False)
+        try:
+            for _ in range(peticiones):
+                inicio = time.perf_counter()
+                estado = self.peticion(aplicacion, ruta)
+                tiempos.append((time.perf_counter() - inicio) * 1000)
+                if estado != 200:
+                    raise CommandError(f'{ruta} respondió {estado}')
+        finally:
+            connection_created.disconnect(contar)
+
+        return {
+            'ruta'       : ruta,
+            'peticiones' : peticiones,
+            'promedioMs' : round(statistics.fmean(tiempos), 2),
+            'p50Ms'      : round(_percentil(tiempos, 50), 2),
+            'p95Ms'      : round(_percentil(tiempos, 95), 2),
+            'p99Ms'      : round(_percentil(tiempos, 99), 2),
+            'conexiones' : conexiones.count('default'),
+        }
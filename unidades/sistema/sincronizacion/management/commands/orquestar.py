@@ -0,0 +1,99 @@
+import json
+import signal
+import threading
+from datetime import datetime, timedelta
+
+from django.core.management.base import BaseCommand, CommandError
+
+from conexiones import metricas
+from unidades.sistema.sincronizacion import orquestador
+
+# --------------------------------------------------------------------------------------------------
+# * Comando: orquestar
+# * Descripción: Ejecuta la actualización completa desde Odoo respetando las dependencias entre
+# *              sincronizaciones (ver orquestador.NODOS) y reporta los tiempos y la ruta crítica.
+#
+# ? Uso:
+#     py manage.py orquestar                                (refresco con create/update de todos los nodos)
+#     py manage.py orquestar --modo pull                    (carga completa)
+#     py manage.py orquestar --nodos ventas,caducidades     (solo esos nodos y sus dependencias)
+#     py manage.py orquestar --nodos maxMin                 (todo el grafo incluyendo maxMin, que escribe en Odoo)
+#     py manage.py orquestar --hora 02:00                   (se queda corriendo y ejecuta todos los días a esa hora)
+#     py manage.py orquestar --plan                         (muestra el orden sin ejecutar nada)
+#     py manage.py orquestar --hora 02:00 --metricas 9101   (expone /metrics del proceso en ese puerto)
+# --------------------------------------------------------------------------------------------------
+class Command(BaseCommand):
+    help = "Ejecuta las sincronizaciones con Odoo como un grafo de dependencias con ramas en paralelo"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--modo', choices=orquestador.MODOS, default='actualizar')
+        parser.add_argument('--nodos', help=f'Nodos separados por coma ({",".join(orquestador.NODOS)})')
+        parser.add_argument('--hilos', type=int, default=3, help='Máximo de nodos ejecutándose al mismo tiempo')
+        parser.add_argument('--hora', help='HH:MM, ejecuta todos los días a esa hora hasta recibir SIGTERM')
+        parser.add_argument('--plan', action='store_true', help='Solo muestra los nodos y sus dependencias')
+        parser.add_argument('--json', action='store_true', help='Imprime el resultado completo en JSON')
+        parser.add_argument('--metricas', type=int, metavar='PUERTO', help='Expone las métricas en formato Prometheus en ese puerto')
+
+    def handle(self, *args, **options):
+        nombres = options['nodos'].split(',') if options['nodos'] else None
+        try:
+            orden = orquestador.seleccionarNodos(nombres)
+        except ValueError as e:
+            raise CommandError(str(e))
+
+        if options['plan']:
+            for nombre in orden:
+                nodo = orquestador.NODOS[nombre]
+                dependencias = [d for d in nodo['depende'] if d in orden]
+                self.stdout.write(f'{nombre:<12} depende de {dependencias or "-"}: {", ".join(nodo[options["modo"]])}')
+            return
+
+        if options['metricas']:
+            metricas.servirMetricas(options['metricas'])
+
+        if not options['hora']:
+            self.ejecutar(options, nombres)
+            return
+
+        try:
+            hora, minuto = (int(parte) for parte in options['hora'].split(':'))
+        except ValueError:
+            raise CommandError('--hora debe tener el formato HH:MM')
+
+        detener = threading.Event()
+        for senal in (signal.SIGTERM, signal.SIGINT):
+            signal.signal(senal, lambda *args: detener.set())
+
+        while not detener.is_set():
+            ahora = datetime.now()
+            siguiente = ahora.replace(hour=hora, minute=minuto, second=0, microsecond=0)
+            if siguiente <= ahora:
+                siguiente += timedelta(days=1)
+            self.stdout.write(f'Siguiente ejecución: {siguiente:%Y-%m-%d %H:%M}')
+            if detener.wait((siguiente - ahora).total_seconds()):
+                break
+            self.ejecutar(options, nombres)
+
+    def ejecutar(self, options, nombres):
+        def alTerminar(nombre, nodo):
+            estilo = self.style.SUCCESS if nodo['estado'] == 'success' else self.style.ERROR
+            self.stdout.write(estilo(f'{nombre:<12} {nodo["estado"]:<8} {nodo["duracion"]:>9.3f} s'))
+
+        resultado = orquestador.ejecutarGrafo(options['modo'], nombres, options['hilos'], alTerminar)
+
+        if options['json']:
+            self.stdout.write(json.dumps(resultado, default=str, ensure_ascii=False, indent=2))
+
+        self.stdout.write(f'\n{"nodo":<12} {"estado":<8} {"inicio":>9} {"fin":>9} {"duración":>9}')
+        for nombre, nodo in resultado['nodos'].items():
+            inicio = f'{nodo["inicio"]:>9.3f}' if nodo['inicio'] is not None else f'{"-":>9}'
+            fin = f'{nodo["fin"]:>9.3f}' if nodo['fin'] is not None else f'{"-":>9}'
+            self.stdout.write(f'{nombre:<12} {nodo["estado"]:<8} {inicio} {fin} {nodo["duracion"]:>9.3f}')
+
+        ruta = resultado['rutaCritica']
+        self.stdout.write(f'\nRuta crítica: {" -> ".join(ruta["nodos"])} ({ruta["duracion"]:.3f} s)')
+        self.stdout.write(f'Tiempo total: {resultado["total"]:.3f} s, secuencial: {resultado["secuencial"]:.3f} s')
+
+        for nombre, nodo in resultado['nodos'].items():
+            if nodo['estado'] == 'error':
+                self.stdout.write(self.style.ERROR(f'Error en {nombre}: {json.dumps(nodo["resultados"], default=str, ensure_ascii=False)[:500]}'))
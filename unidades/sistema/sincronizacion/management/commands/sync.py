@@ -0,0 +1,73 @@
+import json
+
+from django.core.management.base import BaseCommand, CommandError
+
+from unidades.sistema.sincronizacion import candados, sincronizaciones
+
+# --------------------------------------------------------------------------------------------------
+# * Comando: sync
+# * Descripción: Ejecuta una sincronización Odoo → PostgreSQL sin pasar por HTTP, con el mismo servicio que usan
+# *              las rutas auto/pull*, auto/create* y auto/update*. Útil para cron o para correr las cargas pesadas
+# *              en un servidor sin workers web.
+#
+# ? Uso:
+#     py manage.py sync productos --mode pull
+#     py manage.py sync clientes --mode update --since 2025-01-01
+#     py manage.py sync ventas --mode pull --since 2024-06-01 --batch-size 500
+#     py manage.py sync caducidades --mode create --dry-run     (consulta Odoo y revierte los cambios en PostgreSQL)
+#     py manage.py sync insumos --mode update --concurrencia omitir     (para cron, no espera si ya hay una en curso)
+#     py manage.py sync ventas --mode create --perfilar     (guarda cProfile y tracemalloc, ver perfilado)
+# --------------------------------------------------------------------------------------------------
+class Command(BaseCommand):
+    help = "Sincroniza una entidad de Odoo a PostgreSQL e imprime el throughput"
+
+    def add_arguments(self, parser):
+        parser.add_argument('entidad', choices=list(sincronizaciones.SINCRONIZACIONES))
+        parser.add_argument('--mode', choices=sincronizaciones.MODOS, default='pull')
+        parser.add_argument('--batch-size', type=int, help='Registros por lote de Odoo y por bulk_create/bulk_update')
+        parser.add_argument('--since', help='YYYY-MM-DD[ HH:MM], solo los registros creados/modificados desde esa fecha')
+        parser.add_argument('--dry-run', action='store_true', help='Ejecuta todo dentro de una transacción que se revierte')
+        parser.add_argument('--reiniciar', action='store_true', help='Solo ventas pull, vuelve a recorrer todos los meses')
+        parser.add_argument('--concurrencia', choices=candados.CONCURRENCIAS,
+                            help='Qué hacer si ya hay una sincronización de la entidad en curso (default settings.SYNC_CONCURRENCIA)')
+        parser.add_argument('--perfilar', action='store_true', help='Perfila la ejecución con cProfile y tracemalloc')
+        parser.add_argument('--json', action='store_true', help='Imprime el resultado completo en JSON')
+
+    def handle(self, *args, **options):
+        try:
+            resultado = sincronizaciones.ejecutarSincronizacion(
+                options['entidad'], options['mode'],
+                simular    = options['dry_run'],
+                tamanoLote = options['batch_size'],
+                desde      = sincronizaciones.parsearFecha(options['since']) if options['since'] else None,
+                reiniciar  = options['reiniciar'] or None,
+                concurrencia = options['concurrencia'],
+                perfilar   = options['perfilar'],
+            )
+        except ValueError as e:
+            raise CommandError(str(e))
+
+        if options['json']:
+            self.stdout.write(json.dumps(resultado, default=str, ensure_ascii=False, indent=2))
+
+        if resultado['status'] != 'success':
+            raise CommandError(resultado['message'])
+
+        if resultado.get('omitido'):
+            self.stdout.write(self.style.WARNING(resultado['message']))
+            return
+        if resultado.get('compartido'):
+            self.stdout.write(self.style.WARNING(f'Resultado compartido de la ejecución en curso {resultado["ejecucion"]}'))
+
+        prefijo = '[dry-run] ' if resultado['simulado'] else ''
+        self.stdout.write(self.style.SUCCESS(f'{prefijo}{resultado["message"]}'))
+        self.stdout.write(
+            f'{resultado["leidos"]} leídos de Odoo ({resultado["leidosPorSegundo"]}/s), '
+            f'{resultado["escritos"]} escritos en PostgreSQL ({resultado["escritosPorSegundo"]}/s) '
+            f'en {resultado["segundos"]:.3f} s'
+        )
+        if 'tiempos' in resultado:
+            tiempos = resultado['tiempos']
+            self.stdout.write(f'Lotes {tiempos["lotes"]}: fetch {tiempos["fetch"]:.3f} s, write {tiempos["write"]:.3f} s')
+        if 'perfil' in resultado:
+            self.stdout.write(f'Perfil guardado en {resultado["perfil"]["directorio"]}')
@@ -0,0 +1,52 @@
+import signal
+import threading
+
+from django.core.management.base import BaseCommand
+
+from conexiones import metricas
+from unidades.sistema.sincronizacion import trabajos
+
+# --------------------------------------------------------------------------------------------------
+# * Comando: trabajador
+# * Descripción: Ejecuta los trabajos en segundo plano encolados por las rutas auto/pull*, auto/create* y
+# *              auto/update*. Se pueden correr varios trabajadores a la vez, cada trabajo lo toma solo uno.
+#
+# ? Uso:
+#     py manage.py trabajador
+#     py manage.py trabajador --una-vez          (procesa lo pendiente y termina, útil en cron)
+#     py manage.py trabajador --metricas 9100    (expone /metrics del trabajador en ese puerto)
+#
+# ! Nota: Con SIGTERM/SIGINT termina el trabajo actual antes de salir. Si el trabajador muere, sus trabajos se vuelven
+#         a encolar cuando otro trabajador inicia o no tiene trabajos (ver trabajos.liberarHuerfanos).
+# --------------------------------------------------------------------------------------------------
+class Command(BaseCommand):
+    help = "Ejecuta los trabajos de sincronización encolados en PostgreSQL"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--intervalo', type=float, default=2.0, help='Segundos de espera cuando no hay trabajos')
+        parser.add_argument('--una-vez', action='store_true', help='Termina cuando ya no hay trabajos pendientes')
+        parser.add_argument('--metricas', type=int, metavar='PUERTO', help='Expone las métricas en formato Prometheus en ese puerto')
+
+    def handle(self, *args, **options):
+        #Las vistas se registran como tareas al importar las urls
+        trabajos.cargarTareas()
+
+        if options['metricas']:
+            metricas.servirMetricas(options['metricas'])
+
+        #Solo los trabajos cuyo trabajador ya no existe, los de otros trabajadores vivos siguen ejecutándose
+        liberados = trabajos.liberarHuerfanos()
+        if liberados:
+            self.stdout.write(self.style.WARNING(f'Se volvieron a encolar {liberados} trabajos huérfanos'))
+
+        detener = threading.Event()
+        for senal in (signal.SIGTERM, signal.SIGINT):
+            signal.signal(senal, lambda *args: detener.set())
+
+        self.stdout.write(f'Trabajador {trabajos.nombreTrabajador()} esperando trabajos ({len(trabajos.TAREAS)} tareas)')
+        trabajos.procesarCola(
+            detener,
+            intervalo=options['intervalo'],
+            unaVez=options['una_vez'],
+            alTerminar=lambda trabajo, estado: self.stdout.write(f'Trabajo {trabajo.id} {trabajo.tarea}: {estado}'),
+        )
@@ -0,0 +1,59 @@
+# Generated by Django 5.2.4 on 2026-10-19 11:19
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = []
+
+    operations = [
+        #El esquema también se crea en postgres-init, aquí se asegura para las bases de datos ya existentes
+        migrations.RunSQL(
+            "CREATE SCHEMA IF NOT EXISTS sistema;",
+            reverse_sql=migrations.RunSQL.noop,
+        ),
+        migrations.CreateModel(
+            name="Trabajo",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("tarea", models.CharField(max_length=100)),
+                ("parametros", models.JSONField(default=dict)),
+                (
+                    "estado",
+                    models.CharField(
+                        choices=[
+                            ("pendiente", "Pendiente"),
+                            ("ejecutando", "Ejecutando"),
+                            ("terminado", "Terminado"),
+                            ("error", "Error"),
+                        ],
+                        default="pendiente",
+                        max_length=20,
+                    ),
+                ),
+                ("progreso", models.JSONField(default=dict)),
+                ("resultado", models.JSONField(null=True)),
+                ("trabajador", models.CharField(default="", max_length=200)),
+                ("fechaCreacion", models.DateTimeField(auto_now_add=True)),
+                ("fechaInicio", models.DateTimeField(null=True)),
+                ("fechaFin", models.DateTimeField(null=True)),
+            ],
+            options={
+                "db_table": '"sistema"."trabajos"',
+                "indexes": [
+                    models.Index(fields=["estado", "id"], name="trabajos_estado_idx")
+                ],
+            },
+        ),
+    ]
@@ -0,0 +1,54 @@
+# Generated by Django 5.2.4 on 2026-10-19 11:30
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("sincronizacion", "0001_initial"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="EjecucionSync",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("entidad", models.CharField(max_length=50)),
+                ("modo", models.CharField(max_length=20)),
+                ("parametros", models.JSONField(default=dict)),
+                ("simulado", models.BooleanField(default=False)),
+                (
+                    "estado",
+                    models.CharField(
+                        choices=[
+                            ("ejecutando", "Ejecutando"),
+                            ("terminado", "Terminado"),
+                            ("error", "Error"),
+                        ],
+                        default="ejecutando",
+                        max_length=20,
+                    ),
+                ),
+                ("resultado", models.JSONField(null=True)),
+                ("fechaInicio", models.DateTimeField(auto_now_add=True)),
+                ("fechaFin", models.DateTimeField(null=True)),
+            ],
+            options={
+                "db_table": '"sistema"."ejecuciones"',
+                "indexes": [
+                    models.Index(
+                        fields=["entidad", "id"], name="ejecuciones_entidad_idx"
+                    )
+                ],
+            },
+        ),
+    ]
@@ -0,0 +1,53 @@
+# Generated by Django 5.2.4 on 2026-10-19 11:39
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("sincronizacion", "0002_ejecucionsync"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="ejecucionsync",
+            name="dbConsultas",
+            field=models.IntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name="ejecucionsync",
+            name="error",
+            field=models.TextField(blank=True, default=""),
+        ),
+        migrations.AddField(
+            model_name="ejecucionsync",
+            name="escritos",
+            field=models.IntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name="ejecucionsync",
+            name="fases",
+            field=models.JSONField(default=dict),
+        ),
+        migrations.AddField(
+            model_name="ejecucionsync",
+            name="leidos",
+            field=models.IntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name="ejecucionsync",
+            name="rechazados",
+            field=models.IntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name="ejecucionsync",
+            name="rssPicoKB",
+            field=models.BigIntegerField(null=True),
+        ),
+        migrations.AddField(
+            model_name="ejecucionsync",
+            name="segundos",
+            field=models.FloatField(null=True),
+        ),
+    ]
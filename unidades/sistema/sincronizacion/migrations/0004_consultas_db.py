@@ -0,0 +1,18 @@
+# Generated by Django 5.2.4 on 2026-10-19 11:49
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("sincronizacion", "0003_historial_ejecuciones"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="ejecucionsync",
+            name="consultasDB",
+            field=models.JSONField(default=dict),
+        ),
+    ]
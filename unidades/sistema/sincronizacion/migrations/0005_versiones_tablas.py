@@ -0,0 +1,27 @@
+# Generated by Django 5.2.4 on 2026-10-19 11:54
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("sincronizacion", "0004_consultas_db"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="VersionTabla",
+            fields=[
+                (
+                    "tabla",
+                    models.CharField(max_length=100, primary_key=True, serialize=False),
+                ),
+                ("version", models.BigIntegerField(default=0)),
+                ("fechaCambio", models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                "db_table": '"sistema"."versionestablas"',
+            },
+        ),
+    ]
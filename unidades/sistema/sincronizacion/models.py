@@ -0,0 +1,66 @@
+from django.db import models
+
+#? Cola de trabajos en segundo plano de las sincronizaciones en el esquema de sistema
+class Trabajo(models.Model):
+    PENDIENTE = 'pendiente'
+    EJECUTANDO = 'ejecutando'
+    TERMINADO = 'terminado'
+    ERROR = 'error'
+    ESTADOS = [(PENDIENTE, 'Pendiente'), (EJECUTANDO, 'Ejecutando'), (TERMINADO, 'Terminado'), (ERROR, 'Error')]
+
+    tarea = models.CharField(max_length=100)
+    parametros = models.JSONField(default=dict)
+    estado = models.CharField(max_length=20, choices=ESTADOS, default=PENDIENTE)
+    progreso = models.JSONField(default=dict)
+    resultado = models.JSONField(null=True)
+    trabajador = models.CharField(max_length=200, default='')
+    fechaCreacion = models.DateTimeField(auto_now_add=True)
+    fechaInicio = models.DateTimeField(null=True)
+    fechaFin = models.DateTimeField(null=True)
+    
+    class Meta:
+        db_table = '"sistema"."trabajos"'
+        indexes = [models.Index(fields=['estado', 'id'], name='trabajos_estado_idx')]
+
+
+#? Historial de ejecuciones de las sincronizaciones con sus tiempos por fase, registros y memoria. También lo usa el
+#? candado de cada entidad para compartir el resultado de la que está en curso
+class EjecucionSync(models.Model):
+    EJECUTANDO = 'ejecutando'
+    TERMINADO = 'terminado'
+    ERROR = 'error'
+    ESTADOS = [(EJECUTANDO, 'Ejecutando'), (TERMINADO, 'Terminado'), (ERROR, 'Error')]
+
+    entidad = models.CharField(max_length=50)
+    modo = models.CharField(max_length=20)
+    parametros = models.JSONField(default=dict)
+    simulado = models.BooleanField(default=False)
+    estado = models.CharField(max_length=20, choices=ESTADOS, default=EJECUTANDO)
+    resultado = models.JSONField(null=True)
+    segundos = models.FloatField(null=True)
+    fases = models.JSONField(default=dict)
+    leidos = models.IntegerField(default=0)
+    escritos = models.IntegerField(default=0)
+    rechazados = models.IntegerField(default=0)
+    dbConsultas = models.IntegerField(default=0)
+    consultasDB = models.JSONField(default=dict)
+    #Vacío si otra sincronización corrió al mismo tiempo en el proceso, el pico de memoria es de todo el proceso
+    rssPicoKB = models.BigIntegerField(null=True)
+    error = models.TextField(default='', blank=True)
+    fechaInicio = models.DateTimeField(auto_now_add=True)
+    fechaFin = models.DateTimeField(null=True)
+
+    class Meta:
+        db_table = '"sistema"."ejecuciones"'
+        indexes = [models.Index(fields=['entidad', 'id'], name='ejecuciones_entidad_idx')]
+
+
+#? Versión de cada tabla de referencia (productos, clientes, ...). Las sincronizaciones la incrementan al escribir y
+#? la cache de referencias (ver referencias) la compara para saber si sus llaves siguen vigentes
+class VersionTabla(models.Model):
+    tabla = models.CharField(max_length=100, primary_key=True)
+    version = models.BigIntegerField(default=0)
+    fechaCambio = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        db_table = '"sistema"."versionestablas"'
@@ -0,0 +1,525 @@
+import json
+import random
+import threading
+import time
+import xmlrpc.client
+from datetime import date, datetime, timedelta
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+# --------------------------------------------------------------------------------------------------
+# * Módulo: odooFalso
+# * Descripción: Servidor de Odoo falso en memoria (XML-RPC en /xmlrpc/2/common y /xmlrpc/2/object, JSON-RPC en
+# *              /jsonrpc) con datos sintéticos, para medir las sincronizaciones sin red ni una base de Odoo real
+# *              (ver el comando benchmark). Solo implementa lo que usan los controladores: search_read,
+# *              search_count, search, read, read_group, write y create, con dominios en notación polaca
+# *              ('|', '&', '!') y las comparaciones de Odoo.
+#
+# ? Uso:
+#     datos = DatosOdoo(productos=500, facturas=5000, semilla=1)
+#     with OdooFalso(datos, latencia=0.05) as odoo:
+#         os.environ['URL_ODOO'] = odoo.url
+#         ...
+#
+# ! Nota: Los campos con punto (ej. categ_id.parent_id) se guardan tal cual en el registro y no se regresan en
+#         search_read. Un campo que el registro no tiene no filtra nada.
+# --------------------------------------------------------------------------------------------------
+
+#? uid con el que responde authenticate
+UID = 2
+
+#? Equipos de venta que DOMINIO_VENTAS excluye, algunas facturas los usan para que el dominio filtre algo
+EQUIPOS_EXCLUIDOS = (8, 10, 12, 15, 16, 17, 21, 22)
+
+_SIN_CAMPO = object()
+
+
+#Valor con el que se compara un campo, los many2one ([id, nombre]) se comparan por id salvo en ilike
+def _valor(valor, texto=False):
+    if isinstance(valor, list) and len(valor) == 2 and isinstance(valor[0], int) and isinstance(valor[1], str):
+        return valor[1] if texto else valor[0]
+    return valor
+
+
+def _hoja(campo, operador, esperado):
+    if operador in ('in', 'not in'):
+        esperado = frozenset(_valor(v) for v in esperado)
+    elif operador in ('ilike', 'not ilike', 'like', 'not like', '=ilike'):
+        esperado = str(esperado).lower()
+    else:
+        esperado = _valor(esperado)
+
+    def cumple(registro):
+        valor = registro.get(campo, _SIN_CAMPO)
+        if valor is _SIN_CAMPO:
+            return True
+        if operador in ('ilike', 'like'):
+            return esperado in str(_valor(valor, texto=True) or '').lower()
+        if operador in ('not ilike', 'not like'):
+            return esperado not in str(_valor(valor, texto=True) or '').lower()
+        if operador == '=ilike':
+            return esperado == str(_valor(valor, texto=True) or '').lower()
+
+        valor = _valor(valor)
+        if operador == '=':
+            return (not valor) if esperado is False else valor == esperado
+        if operador == '!=':
+            return bool(valor) if esperado is False else valor != esperado
+        if operador == 'in':
+            return valor in esperado
+        if operador == 'not in':
+            return valor not in esperado
+        if valor is False or valor is None:
+            return False
+        if operador == '<':
+            return valor < esperado
+        if operador == '<=':
+            return valor <= esperado
+        if operador == '>':
+            return valor > esperado
+        if operador == '>=':
+            return valor >= esperado
+        raise ValueError(f'Operador {operador} no soportado')
+
+    return cumple
+
+
+# --------------------------------------------------------------------------------------------------
+# * Función: compilarDominio
+# * Descripción: Convierte un dominio de Odoo en una función registro → bool
+#
+# ! Parámetros:
+#     - dominio, lista de tuplas (campo, operador, valor) y operadores prefijos '&', '|' y '!'. Los términos
+#       sueltos se unen con '&' como en Odoo.
+# --------------------------------------------------------------------------------------------------
+def compilarDominio(dominio):
+    elementos = list(dominio or [])
+    posicion = 0
+
+    def siguiente():
+        nonlocal posicion
+        elemento = elementos[posicion]
+        posicion += 1
+        if elemento == '!':
+            negado = siguiente()
+            return lambda registro: not negado(registro)
+        if elemento in ('&', '|'):
+            izquierdo, derecho = siguiente(), siguiente()
+            if elemento == '&':
+                return lambda registro: izquierdo(registro) and derecho(registro)
+            return lambda registro: izquierdo(registro) or derecho(registro)
+        return _hoja(*elemento)
+
+    terminos = []
+    while posicion < len(elementos):
+        terminos.append(siguiente())
+    return lambda registro: all(termino(registro) for termino in terminos)
+
+
+#Llave para ordenar por un campo, los vacíos (False) van al final
+def _llaveOrden(campo):
+    def llave(registro):
+        valor = _valor(registro.get(campo, False))
+        return (valor is False or valor is None, valor if valor not in (False, None) else 0)
+    return llave
+
+
+def _ordenar(registros, orden):
+    for parte in reversed([parte.strip() for parte in (orden or 'id').split(',') if parte.strip()]):
+        campo, _, sentido = parte.partition(' ')
+        registros.sort(key=_llaveOrden(campo), reverse=sentido.strip().lower() == 'desc')
+    return registros
+
+
+def _fecha(dia, hora=8):
+    return datetime.combine(dia, datetime.min.time()).replace(hour=hora).strftime('%Y-%m-%d %H:%M:%S')
+
+
+# --------------------------------------------------------------------------------------------------
+# * Class: DatosOdoo
+# * Descripción: Modelos de Odoo en memoria con datos sintéticos reproducibles (misma semilla, mismos datos)
+#
+# ! Parámetros:
+#     - productos e insumos, product.template de cada tipo (5% archivados con su product.product)
+#     - clientes, res.partner
+#     - facturas, account.move repartidas en los últimos meses (10% notas de crédito, algunas excluidas por
+#       DOMINIO_VENTAS) con lineasPorFactura account.move.line cada una
+#     - lotes, stock.lot con la fecha de caducidad en el nombre (dd-mm-YYYY, 2% con un nombre inválido)
+#     - bom, mrp.bom.line (insumo de un producto)
+#     - semilla, semilla del generador aleatorio
+# --------------------------------------------------------------------------------------------------
+class DatosOdoo:
+    def __init__(self, productos=500, insumos=300, clientes=1000, facturas=5000, lineasPorFactura=3, lotes=2000,
+                 bom=1500, meses=24, semilla=1):
+        self.aleatorio = random.Random(semilla)
+        self.meses = meses
+        self.hoy = date.today()
+        self.modelos = {modelo: [] for modelo in (
+            'product.template', 'product.product', 'stock.warehouse.orderpoint', 'product.supplierinfo',
+            'purchase.order.line', 'mrp.bom.line', 'res.partner', 'account.move', 'account.move.line', 'stock.lot',
+        )}
+        self._ids = {modelo: 0 for modelo in self.modelos}
+        self._candado = threading.Lock()
+
+        self.agregarProductos(productos)
+        self.agregarInsumos(insumos)
+        self.agregarClientes(clientes)
+        self.agregarFacturas(facturas, lineasPorFactura)
+        self.agregarLotes(lotes)
+        self.agregarBom(bom)
+
+    def tamanos(self):
+        return {modelo: len(registros) for modelo, registros in self.modelos.items()}
+
+    def _nuevo(self, modelo, **valores):
+        self._ids[modelo] += 1
+        registro = {'id': self._ids[modelo], **valores}
+        self.modelos[modelo].append(registro)
+        return registro
+
+    def _diaAleatorio(self):
+        return self.hoy - timedelta(days=self.aleatorio.randrange(max(1, self.meses * 30)))
+
+    def _plantilla(self, prefijo, categoria, venta, compra):
+        numero = self._ids['product.template'] + 1
+        activo = self.aleatorio.random() >= 0.05
+        codigo = f'{prefijo}{numero:05d}' if self.aleatorio.random() >= 0.01 else f'STUDIO-{numero}'
+        plantilla = self._nuevo('product.template',
+            name               = f'{"Producto" if venta else "Insumo"} {numero}',
+            default_code       = codigo,
+            qty_available      = float(self.aleatorio.randint(0, 500)),
+            product_brand_id   = [self.aleatorio.randint(1, 5), f'Marca {self.aleatorio.randint(1, 5)}'],
+            categ_id           = categoria,
+            route_ids          = self.aleatorio.sample(range(1, 6), self.aleatorio.randint(0, 2)),
+            product_variant_id = False,
+            sale_ok            = venta,
+            purchase_ok        = compra,
+            create_date        = _fecha(self._diaAleatorio()),
+            write_date         = _fecha(self.hoy - timedelta(days=1)),
+            active             = activo,
+        )
+        plantilla['categ_id.parent_id'] = [1, 'All']
+        #Odoo no regresa la variante de las plantillas archivadas, se busca en product.product con active=False
+        variante = self._nuevo('product.product', product_tmpl_id=[plantilla['id'], plantilla['name']], active=activo)
+        if activo:
+            plantilla['product_variant_id'] = [variante['id'], plantilla['name']]
+        return plantilla, variante
+
+    def agregarProductos(self, cantidad):
+        for _ in range(cantidad):
+            categoria = self.aleatorio.choice([[10, 'PRODUCTO TERMINADO'], [11, 'PRODUCTO TERMINADO / CAPSULAS']])
+            self._plantilla('PT', categoria, True, False)
+
+    def agregarInsumos(self, cantidad):
+        for _ in range(cantidad):
+            categoria = self.aleatorio.choice([[20, 'INSUMO / ENVASE'], [21, 'INSUMO / ETIQUETA']])
+            plantilla, variante = self._plantilla('IN', categoria, False, True)
+            plantillaId = [plantilla['id'], plantilla['name']]
+            minimo = self.aleatorio.randint(10, 100)
+            self._nuevo('stock.warehouse.orderpoint', product_tmpl_id=plantillaId, product_min_qty=float(minimo), product_max_qty=float(minimo * 3))
+            self._nuevo('product.supplierinfo', product_tmpl_id=plantillaId, partner_id=[900, 'Proveedor'], delay=self.aleatorio.randint(1, 30))
+            if self.aleatorio.random() < 0.3:
+                linea = self._nuevo('purchase.order.line',
+                    product_id   = [variante['id'], plantilla['name']],
+                    product_qty  = float(self.aleatorio.randint(50, 500)),
+                    qty_received = 0.0,
+                    display_type = False,
+                    state        = 'purchase',
+                )
+                linea.update({'order_id.state': 'purchase', 'order_id.receipt_status': 'pending', 'order_id.user_id': [46, 'Compras']})
+
+    def _variantes(self, venta):
+        return [
+            plantilla['product_variant_id'] for plantilla in self.modelos['product.template']
+            if plantilla['sale_ok'] == venta and plantilla['product_variant_id']
+        ]
+
+    def agregarClientes(self, cantidad):
+        estados = [[1, 'Jalisco'], [2, 'Nuevo León'], [3, 'Ciudad de México'], False]
+        for _ in range(cantidad):
+            numero = self._ids['res.partner'] + 1
+            self._nuevo('res.partner',
+                name       = f'Cliente {numero}',
+                city       = self.aleatorio.choice(['Guadalajara', 'Monterrey', 'CDMX', False]),
+                state_id   = self.aleatorio.choice(estados),
+                country_id = [156, 'México'],
+                active     = self.aleatorio.random() >= 0.02,
+            )
+
+    #dias, rango de días hacia atrás de las facturas (por default los meses de los datos)
+    def agregarFacturas(self, cantidad, lineasPorFactura=3, dias=None):
+        clientes = self.modelos['res.partner']
+        variantes = self._variantes(True)
+        if not clientes or not variantes:
+            return
+        for _ in range(cantidad):
+            numero = self._ids['account.move'] + 1
+            dia = self.hoy - timedelta(days=self.aleatorio.randrange(dias or max(1, self.meses * 30)))
+            nota = self.aleatorio.random() < 0.1
+            prefijo = 'RINV' if nota else self.aleatorio.choices(['INV', 'MUEST', 'BONIF'], [0.9, 0.05, 0.05])[0]
+            cliente = self.aleatorio.choice(clientes)
+            nombre = f'{prefijo}/{dia.year}/{numero:06d}'
+            total = 0.0
+            factura = self._nuevo('account.move',
+                name                = nombre,
+                invoice_date        = dia.isoformat(),
+                partner_id          = [cliente['id'], cliente['name']],
+                invoice_user_id     = [self.aleatorio.randint(1, 20), f'Vendedor {self.aleatorio.randint(1, 20)}'],
+                partner_shipping_id = [cliente['id'], cliente['name']],
+                branch_id           = [1, 'DNA'] if self.aleatorio.random() >= 0.02 else [2, 'STUDIO'],
+                amount_total_signed = 0.0,
+                move_type           = 'out_refund' if nota else 'out_invoice',
+                team_id             = [self.aleatorio.choice(EQUIPOS_EXCLUIDOS), 'Excluido'] if self.aleatorio.random() < 0.03 else [1, 'Ventas'],
+                state               = 'posted' if self.aleatorio.random() >= 0.02 else 'draft',
+                create_date         = _fecha(dia),
+                write_date          = _fecha(dia, 9),
+            )
+            for _ in range(lineasPorFactura):
+                cantidadLinea = float(self.aleatorio.randint(1, 20))
+                precio = round(self.aleatorio.uniform(50, 900), 2)
+                total += cantidadLinea * precio
+                self._nuevo('account.move.line',
+                    name           = 'Línea',
+                    product_id     = self.aleatorio.choice(variantes),
+                    quantity       = cantidadLinea,
+                    price_unit     = precio,
+                    price_subtotal = round(cantidadLinea * precio, 2),
+                    move_id        = [factura['id'], nombre],
+                    move_name      = nombre,
+                    display_type   = 'product',
+                    account_type   = 'income',
+                )
+            factura['amount_total_signed'] = round(-total if nota else total, 2)
+
+    def agregarLotes(self, cantidad):
+        variantes = self._variantes(True) + self._variantes(False)
+        if not variantes:
+            return
+        for _ in range(cantidad):
+            caducidad = self.hoy + timedelta(days=self.aleatorio.randint(-60, 900))
+            dia = self._diaAleatorio()
+            self._nuevo('stock.lot',
+                name        = caducidad.strftime('%d-%m-%Y') if self.aleatorio.random() >= 0.02 else f'LOTE-{self._ids["stock.lot"]}',
+                product_id  = self.aleatorio.choice(variantes),
+                product_qty = float(self.aleatorio.randint(0, 300)),
+                create_date = _fecha(dia),
+                write_date  = _fecha(dia, 9),
+            )
+
+    def agregarBom(self, cantidad):
+        productos = [p for p in self.modelos['product.template'] if p['sale_ok']]
+        insumos = [p for p in self.modelos['product.template'] if not p['sale_ok']]
+        if not productos or not insumos:
+            return
+        for _ in range(cantidad):
+            producto, insumo = self.aleatorio.choice(productos), self.aleatorio.choice(insumos)
+            self._nuevo('mrp.bom.line',
+                product_tmpl_id        = [insumo['id'], insumo['name']],
+                parent_product_tmpl_id = [producto['id'], producto['name']],
+                product_qty            = float(self.aleatorio.randint(1, 5)),
+            )
+
+    # --------------------------------------------------------------------------------------------------
+    # * Función: agregarNuevos
+    # * Descripción: Agrega una fracción de registros nuevos de cada tipo (lo que traen los create). Las facturas
+    # *              nuevas son de los últimos 30 días.
+    # --------------------------------------------------------------------------------------------------
+    def agregarNuevos(self, fraccion=0.05, lineasPorFactura=3):
+        with self._candado:
+            cuantos = lambda modelo, filtro=None: max(1, int(len([r for r in self.modelos[modelo] if not filtro or filtro(r)]) * fraccion))
+            self.agregarProductos(cuantos('product.template', lambda r: r['sale_ok']))
+            self.agregarInsumos(cuantos('product.template', lambda r: not r['sale_ok']))
+            self.agregarClientes(cuantos('res.partner'))
+            self.agregarFacturas(cuantos('account.move'), lineasPorFactura, dias=30)
+            self.agregarLotes(cuantos('stock.lot'))
+
+    #Cambia existencias, cantidades y direcciones de una fracción de los registros (lo que traen los update)
+    def modificar(self, fraccion=0.2):
+        with self._candado:
+            modificado = _fecha(self.hoy, 12)
+            for modelo, campo, nuevo in (
+                ('product.template', 'qty_available', lambda: float(self.aleatorio.randint(0, 500))),
+                ('stock.lot', 'product_qty', lambda: float(self.aleatorio.randint(0, 300))),
+                ('res.partner', 'city', lambda: self.aleatorio.choice(['Guadalajara', 'Monterrey', 'CDMX', 'Puebla'])),
+            ):
+                registros = self.modelos[modelo]
+                for registro in self.aleatorio.sample(registros, int(len(registros) * fraccion)):
+                    registro[campo] = nuevo()
+                    registro['write_date'] = modificado
+
+    # --------------------------------------------------------------------------------------------------
+    # * Función: execute_kw
+    # * Descripción: Ejecuta un método de un modelo como lo haría models.execute_kw de Odoo
+    # --------------------------------------------------------------------------------------------------
+    def execute_kw(self, modelo, metodo, args, kwargs=None):
+        kwargs = dict(kwargs or {})
+        if modelo not in self.modelos:
+            raise xmlrpc.client.Fault(2, f"Object {modelo} doesn't exist")
+        args = list(args or [])
+
+        if metodo in ('search_read', 'search', 'search_count'):
+            dominio = args[0] if args else kwargs.pop('domain', [])
+            registros = self._buscar(modelo, dominio, kwargs.get('order'), kwargs.get('offset', 0), kwargs.get('limit'))
+            if metodo == 'search_count':
+                return len(registros)
+            if metodo == 'search':
+                return [registro['id'] for registro in registros]
+            campos = args[1] if len(args) > 1 else kwargs.get('fields')
+            return [self._leer(registro, campos) for registro in registros]
+
+        if metodo == 'read':
+            ids = set(args[0])
+            campos = args[1] if len(args) > 1 else kwargs.get('fields')
+            return [self._leer(registro, campos) for registro in self.modelos[modelo] if registro['id'] in ids]
+
+        if metodo == 'read_group':
+            dominio = args[0] if args else kwargs.get('domain', [])
+            agrupar = args[2] if len(args) > 2 else kwargs.get('groupby')
+            campo = agrupar[0] if isinstance(agrupar, list) else agrupar
+            cumple = compilarDominio(dominio)
+            grupos = {}
+            for registro in self.modelos[modelo]:
+                if cumple(registro) and registro.get(campo):
+                    valor = registro[campo]
+                    llave = _valor(valor)
+                    grupo = grupos.setdefault(llave, {campo: valor, f'{campo}_count': 0})
+                    grupo[f'{campo}_count'] += 1
+            return list(grupos.values())
+
+        if metodo == 'write':
+            ids, valores = set(args[0]), args[1]
+            with self._candado:
+                for registro in self.modelos[modelo]:
+                    if registro['id'] in ids:
+                        registro.update(valores)
+            return True
+
+        if metodo == 'create':
+            with self._candado:
+                return self._nuevo(modelo, **args[0])['id']
+
+        raise xmlrpc.client.Fault(2, f'El método {metodo} no está implementado en el Odoo falso')
+
+    def _buscar(self, modelo, dominio, orden=None, offset=0, limite=None):
+        cumple = compilarDominio(dominio)
+        registros = _ordenar([registro for registro in self.modelos[modelo] if cumple(registro)], orden)
+        return registros[offset:offset + limite] if limite else registros[offset:]
+
+    @staticmethod
+    def _leer(registro, campos):
+        if not campos:
+            return {campo: valor for campo, valor in registro.items() if '.' not in campo}
+        leido = {'id': registro['id']}
+        for campo in campos:
+            leido[campo] = registro.get(campo, False)
+        return leido
+
+
+class _Manejador(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+    disable_nagle_algorithm = True
+
+    def log_message(self, *args):
+        pass
+
+    def do_POST(self):
+        cuerpo = self.rfile.read(int(self.headers.get('Content-Length', 0)))
+        if self.path == '/jsonrpc':
+            respuesta, tipo = self._jsonrpc(cuerpo), 'application/json'
+        elif self.path in ('/xmlrpc/2/common', '/xmlrpc/2/object'):
+            respuesta, tipo = self._xmlrpc(self.path.rsplit('/', 1)[1], cuerpo), 'text/xml'
+        else:
+            self.send_error(404)
+            return
+        self.send_response(200)
+        self.send_header('Content-Type', tipo)
+        self.send_header('Content-Length', str(len(respuesta)))
+        self.end_headers()
+        self.wfile.write(respuesta)
+
+    def _xmlrpc(self, servicio, cuerpo):
+        try:
+            args, metodo = xmlrpc.client.loads(cuerpo, use_builtin_types=True)
+            resultado = (self.server.odoo.llamar(servicio, metodo, list(args)),)
+        except xmlrpc.client.Fault as fallo:
+            resultado = fallo
+        except Exception as e:
+            resultado = xmlrpc.client.Fault(1, f'{type(e).__name__}: {e}')
+        return xmlrpc.client.dumps(resultado, methodresponse=True, allow_none=True).encode()
+
+    def _jsonrpc(self, cuerpo):
+        peticion = json.loads(cuerpo)
+        parametros = peticion.get('params', {})
+        try:
+            respuesta = {'result': self.server.odoo.llamar(parametros['service'], parametros['method'], parametros.get('args', []))}
+        except Exception as e:
+            codigo, mensaje = (e.faultCode, e.faultString) if isinstance(e, xmlrpc.client.Fault) else (type(e).__name__, str(e))
+            respuesta = {'error': {'code': 200, 'message': 'Odoo Server Error', 'data': {'name': codigo, 'message': mensaje}}}
+        return json.dumps({'jsonrpc': '2.0', 'id': peticion.get('id'), **respuesta}).encode()
+
+
+# --------------------------------------------------------------------------------------------------
+# * Class: OdooFalso
+# * Descripción: Servidor HTTP en un hilo que atiende las llamadas de OdooAPI y OdooAPIAsync con DatosOdoo
+#
+# ! Parámetros:
+#     - datos, DatosOdoo
+#     - latencia (opcional), segundos que tarda cada llamada además de consultar los datos
+#     - latenciaRegistro (opcional), segundos extra por cada registro regresado (simula serializar en Odoo)
+#     - puerto (opcional), 0 toma uno libre
+#
+# ? Atributos:
+#     - url, http://127.0.0.1:<puerto> para URL_ODOO
+#     - llamadas, {(modelo, metodo): numero} de las llamadas atendidas
+# --------------------------------------------------------------------------------------------------
+class OdooFalso:
+    def __init__(self, datos, latencia=0.0, latenciaRegistro=0.0, puerto=0):
+        self.datos = datos
+        self.latencia = latencia
+        self.latenciaRegistro = latenciaRegistro
+        self.llamadas = {}
+        self._candado = threading.Lock()
+        self._servidor = ThreadingHTTPServer(('127.0.0.1', puerto), _Manejador)
+        self._servidor.daemon_threads = True
+        self._servidor.odoo = self
+        self.url = f'http://127.0.0.1:{self._servidor.server_address[1]}'
+        self._hilo = None
+
+    def __enter__(self):
+        self.iniciar()
+        return self
+
+    def __exit__(self, *excepcion):
+        self.detener()
+
+    def iniciar(self):
+        self._hilo = threading.Thread(target=self._servidor.serve_forever, name='odoo-falso', daemon=True)
+        self._hilo.start()
+
+    def detener(self):
+        self._servidor.shutdown()
+        self._servidor.server_close()
+
+    #Atiende una llamada de los servicios common u object de Odoo
+    def llamar(self, servicio, metodo, args):
+        if servicio == 'common':
+            if metodo == 'version':
+                return {'server_version': '17.0-falso'}
+            if metodo in ('authenticate', 'login'):
+                return UID
+            raise xmlrpc.client.Fault(1, f'El método common.{metodo} no existe')
+
+        if metodo == 'execute_kw':
+            modelo, metodoModelo, argumentos = args[3], args[4], args[5]
+            kwargs = args[6] if len(args) > 6 else {}
+        elif metodo == 'execute':
+            modelo, metodoModelo, argumentos, kwargs = args[3], args[4], args[5:], {}
+        else:
+            raise xmlrpc.client.Fault(1, f'El método object.{metodo} no existe')
+
+        with self._candado:
+            self.llamadas[(modelo, metodoModelo)] = self.llamadas.get((modelo, metodoModelo), 0) + 1
+        resultado = self.datos.execute_kw(modelo, metodoModelo, argumentos, kwargs)
+        espera = self.latencia + (self.latenciaRegistro * len(resultado) if isinstance(resultado, list) else 0)
+        if espera:
+            time.sleep(espera)
+        return resultado
@@ -0,0 +1,224 @@
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+
+from django.db import connections
+
+from unidades.sistema.sincronizacion.trabajos import cargarTareas, ejecutarVista
+
+# --------------------------------------------------------------------------------------------------
+# * Módulo: orquestador
+# * Descripción: Ejecuta la actualización completa (productos, insumos, clientes, materiales, caducidades y ventas)
+# *              respetando las dependencias entre sincronizaciones como un grafo (DAG). Las ramas independientes
+# *              corren al mismo tiempo en hilos, por ejemplo Clientes junto con Productos e Insumos y después
+# *              Caducidades junto con MaterialPI.
+#
+# ? Dependencias:
+#     - MaterialPI y Caducidades necesitan que existan los productos y los insumos
+#     - Las ventas necesitan a sus clientes y a los productos/insumos de sus lineas (VentasPVH)
+#     - MaxMin (opcional) necesita los materiales, las ventas y las existencias de los insumos
+#
+# ! Nota: Cada controlador tiene su propia conexión a Odoo, por eso dos nodos distintos no comparten el ServerProxy.
+# --------------------------------------------------------------------------------------------------
+
+#? Nodos del grafo {nombre: {depende, pull, actualizar}}
+#     - pull: vistas que cargan todo desde Odoo (carga inicial)
+#     - actualizar: vistas que solo traen los registros nuevos y los modificados (refresco nocturno)
+NODOS = {
+    'productos': {
+        'depende'    : [],
+        'pull'       : ['pullProductsOdoo'],
+        'actualizar' : ['createProductsOdoo', 'updateProductsOdoo'],
+    },
+    'insumos': {
+        'depende'    : [],
+        'pull'       : ['pullInsumosOdoo'],
+        'actualizar' : ['createInsumosOdoo', 'updateInsumosOdoo'],
+    },
+    'clientes': {
+        'depende'    : [],
+        'pull'       : ['pullClientesOdoo'],
+        'actualizar' : ['createClientesOdoo', 'updateClientesOdoo'],
+    },
+    'materialPI': {
+        'depende'    : ['productos', 'insumos'],
+        'pull'       : ['pullMaterialPIOdoo'],
+        'actualizar' : ['pullMaterialPIOdoo'],
+    },
+    'caducidades': {
+        'depende'    : ['productos', 'insumos'],
+        'pull'       : ['pullCaducidadesOdoo'],
+        'actualizar' : ['createCaducidadesOdoo', 'updateCaducidadesOdoo'],
+    },
+    'ventas': {
+        'depende'    : ['clientes', 'productos', 'insumos'],
+        'pull'       : ['pullVentasOdoo'],
+        'actualizar' : ['createVentasOdoo'],
+    },
+    'maxMin': {
+        'depende'    : ['materialPI', 'ventas', 'insumos'],
+        'pull'       : ['updateMaxMinOdoo'],
+        'actualizar' : ['updateMaxMinOdoo'],
+    },
+}
+
+#? MaxMin escribe en Odoo, solo se ejecuta si se pide explícitamente
+NODOS_OPCIONALES = {'maxMin'}
+
+MODOS = ('pull', 'actualizar')
+
+
+# --------------------------------------------------------------------------------------------------
+# * Función: seleccionarNodos
+# * Descripción: Regresa los nodos a ejecutar en orden topológico, incluyendo sus dependencias
+#
+# ! Parámetros:
+#     - nombres (opcional), lista de nodos pedidos. Por default todos menos los opcionales.
+#
+# ? Returns:
+#     - Lista de nombres de nodos, cada uno después de sus dependencias
+#     - Lanza ValueError si algún nodo no existe o si hay un ciclo en NODOS
+# --------------------------------------------------------------------------------------------------
+def seleccionarNodos(nombres=None):
+    if nombres is None:
+        nombres = [nombre for nombre in NODOS if nombre not in NODOS_OPCIONALES]
+
+    desconocidos = [nombre for nombre in nombres if nombre not in NODOS]
+    if desconocidos:
+        raise ValueError(f'No existen los nodos {desconocidos}, los nodos son {list(NODOS)}')
+
+    orden = []
+    visitando = set()
+
+    def visitar(nombre):
+        if nombre in orden:
+            return
+        if nombre in visitando:
+            raise ValueError(f'Hay un ciclo en las dependencias del nodo {nombre}')
+        visitando.add(nombre)
+        for dependencia in NODOS[nombre]['depende']:
+            visitar(dependencia)
+        visitando.discard(nombre)
+        orden.append(nombre)
+
+    for nombre in nombres:
+        visitar(nombre)
+    return orden
+
+
+#Ejecuta las vistas de un nodo una tras otra en el hilo del pool, el nodo falla en la primera vista con error
+def _ejecutarNodo(nombre, modo):
+    inicio = time.perf_counter()
+    resultados = {}
+    try:
+        for tarea in NODOS[nombre][modo]:
+            resultados[tarea] = ejecutarVista(tarea)
+            if resultados[tarea].get('status') != 'success':
+                return 'error', resultados, inicio, time.perf_counter()
+        return 'success', resultados, inicio, time.perf_counter()
+
+    except Exception as e:
+        resultados['excepcion'] = str(e)
+        return 'error', resultados, inicio, time.perf_counter()
+
+    finally:
+        #Las conexiones de Django son por hilo, se cierran para no dejarlas abiertas en el pool
+        connections.close_all()
+
+
+# --------------------------------------------------------------------------------------------------
+# * Función: ejecutarGrafo
+# * Descripción: Ejecuta los nodos en paralelo en cuanto terminan todas sus dependencias
+#
+# ! Parámetros:
+#     - modo, 'pull' o 'actualizar' (ver NODOS)
+#     - nombres (opcional), nodos a ejecutar (se agregan sus dependencias), por default todos menos los opcionales
+#     - hilos, máximo de nodos ejecutándose al mismo tiempo
+#     - alTerminar (opcional), función que recibe (nombre, nodo) cuando termina cada nodo
+#
+# ? Returns:
+#     - Diccionario con:
+#           status: 'success' si todos los nodos terminaron bien, si no 'error'
+#           nodos: {nombre: {estado, inicio, fin, duracion, resultados}} con los tiempos en segundos desde el inicio
+#           total: tiempo real de toda la ejecución
+#           rutaCritica: {nodos, duracion} cadena de dependencias que determinó el tiempo total
+#           secuencial: suma de las duraciones, lo que tardaría ejecutando un nodo tras otro
+#
+# ! Nota: Si un nodo falla, los nodos que dependen de él no se ejecutan y quedan como 'omitido'.
+# --------------------------------------------------------------------------------------------------
+def ejecutarGrafo(modo='actualizar', nombres=None, hilos=3, alTerminar=None):
+    if modo not in MODOS:
+        raise ValueError(f'El modo debe ser uno de {MODOS}')
+
+    cargarTareas()
+    orden = seleccionarNodos(nombres)
+    pendientes = list(orden)
+    nodos = {}
+    inicioTotal = time.perf_counter()
+
+    with ThreadPoolExecutor(max_workers=max(1, hilos), thread_name_prefix='orquestador') as pool:
+        enEjecucion = {}
+        while pendientes or enEjecucion:
+            for nombre in list(pendientes):
+                dependencias = [nodos.get(dependencia, {}).get('estado') for dependencia in NODOS[nombre]['depende'] if dependencia in orden]
+                if any(estado in ('error', 'omitido') for estado in dependencias):
+                    pendientes.remove(nombre)
+                    nodos[nombre] = {'estado': 'omitido', 'inicio': None, 'fin': None, 'duracion': 0.0, 'resultados': {}}
+                    if alTerminar:
+                        alTerminar(nombre, nodos[nombre])
+                elif all(estado == 'success' for estado in dependencias):
+                    pendientes.remove(nombre)
+                    enEjecucion[pool.submit(_ejecutarNodo, nombre, modo)] = nombre
+
+            if not enEjecucion:
+                continue
+
+            terminados, _ = wait(enEjecucion, return_when=FIRST_COMPLETED)
+            for futuro in terminados:
+                nombre = enEjecucion.pop(futuro)
+                estado, resultados, inicio, fin = futuro.result()
+                nodos[nombre] = {
+                    'estado'     : estado,
+                    'inicio'     : round(inicio - inicioTotal, 3),
+                    'fin'        : round(fin - inicioTotal, 3),
+                    'duracion'   : round(fin - inicio, 3),
+                    'resultados' : resultados,
+                }
+                if alTerminar:
+                    alTerminar(nombre, nodos[nombre])
+
+    return {
+        'status'      : 'success' if all(nodo['estado'] == 'success' for nodo in nodos.values()) else 'error',
+        'modo'        : modo,
+        'nodos'       : {nombre: nodos[nombre] for nombre in orden},
+        'total'       : round(time.perf_counter() - inicioTotal, 3),
+        'rutaCritica' : rutaCritica(orden, nodos),
+        'secuencial'  : round(sum(nodo['duracion'] for nodo in nodos.values()), 3),
+    }
+
+
+# --------------------------------------------------------------------------------------------------
+# * Función: rutaCritica
+# * Descripción: Calcula la cadena de dependencias más larga con las duraciones reales de cada nodo.
+# *              Es el mínimo que puede tardar la actualización aunque se tuvieran hilos ilimitados, para
+# *              reducir el tiempo total hay que acelerar alguno de estos nodos.
+#
+# ! Parámetros:
+#     - orden, nodos en orden topológico (ver seleccionarNodos)
+#     - nodos, diccionario {nombre: {duracion, ...}} con los nodos ya ejecutados
+# --------------------------------------------------------------------------------------------------
+def rutaCritica(orden, nodos):
+    acumulado = {}
+    anterior = {}
+    for nombre in orden:
+        dependencias = [dependencia for dependencia in NODOS[nombre]['depende'] if dependencia in acumulado]
+        previo = max(dependencias, key=lambda dependencia: acumulado[dependencia], default=None)
+        anterior[nombre] = previo
+        acumulado[nombre] = (acumulado[previo] if previo else 0.0) + nodos.get(nombre, {}).get('duracion', 0.0)
+
+    if not acumulado:
+        return {'nodos': [], 'duracion': 0.0}
+
+    ruta = [max(acumulado, key=acumulado.get)]
+    while anterior[ruta[-1]]:
+        ruta.append(anterior[ruta[-1]])
+    return {'nodos': ruta[::-1], 'duracion': round(acumulado[ruta[0]], 3)}
@@ -0,0 +1,138 @@
+import cProfile
+import io
+import pstats
+import sys
+import threading
+import tracemalloc
+from contextlib import contextmanager
+from pathlib import Path
+
+from django.conf import settings
+
+# --------------------------------------------------------------------------------------------------
+# * Módulo: perfilado
+# * Descripción: Perfilado bajo demanda de una sincronización (cProfile + tracemalloc) sin volver a desplegar.
+# *              Se activa con ?perfilar=1, con el header X-Perfilar: 1 o con sync --perfilar, y los archivos se
+# *              guardan en settings.SYNC_PERFILES_DIR/<id de EjecucionSync>/ para descargarlos desde
+# *              auto/ejecuciones/<id>/perfil/.
+#
+# ? Archivos de cada ejecución:
+#     - perfil.prof, estadísticas de cProfile (py -m pstats perfil.prof, snakeviz, ...)
+#     - perfil.txt, las funciones con más tiempo acumulado y con más tiempo propio
+#     - memoria.txt, pico de memoria de Python y las líneas con más memoria asignada al terminar (tracemalloc)
+#
+# ! Nota: Se perfilan el hilo de la sincronización y los hilos que crea mientras corre (pipeline, cliente
+#         asíncrono de Odoo). Perfilar hace la ejecución más lenta, sobre todo tracemalloc.
+# --------------------------------------------------------------------------------------------------
+
+ARCHIVOS = ('perfil.prof', 'perfil.txt', 'memoria.txt')
+
+#? Funciones y líneas que se escriben en perfil.txt y memoria.txt
+LIMITE_FUNCIONES = 60
+LIMITE_ASIGNACIONES = 30
+
+
+def directorioEjecucion(idEjecucion):
+    return Path(settings.SYNC_PERFILES_DIR) / str(int(idEjecucion))
+
+
+#Archivos de perfil que existen de una ejecución
+def archivosEjecucion(idEjecucion):
+    directorio = directorioEjecucion(idEjecucion)
+    return [nombre for nombre in ARCHIVOS if (directorio / nombre).exists()]
+
+
+# --------------------------------------------------------------------------------------------------
+# * Función: perfilar
+# * Descripción: Perfila el bloque y guarda los archivos de la ejecución al salir
+#
+# ! Parámetros:
+#     - idEjecucion, id de EjecucionSync con el que se nombra el directorio
+#
+# ? Returns (yield):
+#     - Diccionario que al terminar el bloque tiene { directorio, archivos, url, segundosPerfilados, picoMemoriaKB,
+#       hilosOmitidos }, se agrega al resultado de la sincronización
+# --------------------------------------------------------------------------------------------------
+@contextmanager
+def perfilar(idEjecucion):
+    resumen = {}
+    perfilesHilos = []
+
+    #Cada hilo que se crea mientras se perfila toma su propio cProfile en su primera llamada
+    def perfilarHilo(frame, evento, argumento):
+        sys.setprofile(None)
+        perfil = cProfile.Profile()
+        perfilesHilos.append((threading.current_thread(), perfil))
+        perfil.enable()
+
+    iniciarMemoria = not tracemalloc.is_tracing()
+    if iniciarMemoria:
+        tracemalloc.start()
+    tracemalloc.reset_peak()
+    threading.setprofile(perfilarHilo)
+    perfil = cProfile.Profile()
+    perfil.enable()
+    try:
+        yield resumen
+    finally:
+        perfil.disable()
+        threading.setprofile(None)
+        foto = tracemalloc.take_snapshot()
+        _, pico = tracemalloc.get_traced_memory()
+        if iniciarMemoria:
+            tracemalloc.stop()
+
+        estadisticas = pstats.Stats(perfil)
+        #Los hilos que siguen vivos todavía escriben en su perfil, no se pueden leer
+        omitidos = 0
+        for hilo, perfilHilo in perfilesHilos:
+            if hilo.is_alive():
+                omitidos += 1
+                continue
+            perfilHilo.create_stats()
+            estadisticas.add(perfilHilo)
+
+        directorio = directorioEjecucion(idEjecucion)
+        directorio.mkdir(parents=True, exist_ok=True)
+        estadisticas.dump_stats(directorio / 'perfil.prof')
+        (directorio / 'perfil.txt').write_text(_textoPerfil(estadisticas), encoding='utf-8')
+        (directorio / 'memoria.txt').write_text(_textoMemoria(foto, pico), encoding='utf-8')
+
+        resumen.update({
+            'directorio'         : str(directorio),
+            'archivos'           : list(ARCHIVOS),
+            'url'                : f'/auto/ejecuciones/{idEjecucion}/perfil/',
+            'segundosPerfilados' : round(estadisticas.total_tt, 3),
+            'picoMemoriaKB'      : pico // 1024,
+            'hilosOmitidos'      : omitidos,
+        })
+
+
+def _textoPerfil(estadisticas):
+    salida = io.StringIO()
+    estadisticas.stream = salida
+    salida.write('== Tiempo acumulado ==\n')
+    estadisticas.sort_stats('cumulative').print_stats(LIMITE_FUNCIONES)
+    salida.write('\n== Tiempo propio ==\n')
+    estadisticas.sort_stats('tottime').print_stats(LIMITE_FUNCIONES)
+    return salida.getvalue()
+
+
+def _textoMemoria(foto, pico):
+    foto = foto.filter_traces((
+        tracemalloc.Filter(False, tracemalloc.__file__),
+        tracemalloc.Filter(False, '<frozen importlib._bootstrap>'),
+        tracemalloc.Filter(False, '<frozen importlib._bootstrap_external>'),
+    ))
+    lineas = foto.statistics('lineno')
+    total = sum(linea.size for linea in lineas)
+    texto = [
+        f'Pico de memoria de Python durante la ejecución: {pico / 1024:.1f} KiB',
+        f'Memoria asignada al terminar: {total / 1024:.1f} KiB en {len(lineas)} líneas',
+        '',
+        f'== Top {LIMITE_ASIGNACIONES} líneas por memoria asignada al terminar ==',
+    ]
+    for linea in lineas[:LIMITE_ASIGNACIONES]:
+        origen = linea.traceback[0]
+        texto.append(f'{linea.size / 1024:>10.1f} KiB {linea.count:>8} bloques  {origen.filename}:{origen.lineno}')
+    return '\n'.join(texto) + '\n'
@@ -0,0 +1,102 @@
+import queue
+import threading
+import time
+
+from django.db import connections
+
+from conexiones import metricas
+from unidades.sistema.sincronizacion.trabajos import reportarProgreso
+
+#? Marca que envía el productor para indicar que ya no hay más lotes
+_FIN = object()
+
+# --------------------------------------------------------------------------------------------------
+# * Función: ejecutarPipeline
+# * Descripción: Traslapa la consulta a Odoo con la escritura en PostgreSQL. Un hilo productor recorre
+# *              los lotes que trae de Odoo y los coloca en una cola acotada, mientras el hilo que llama
+# *              a la función los va escribiendo en la base de datos.
+#
+# ! Parámetros:
+#     - productor, iterable (normalmente un generador del controlador) que genera los lotes de Odoo.
+#       !Nota: El productor corre en otro hilo, no debe hacer consultas a PostgreSQL.
+#     - consumidor, función que recibe un lote y lo escribe en PostgreSQL. Si regresa False se detiene el pipeline.
+#     - maxLotes, tamaño de la cola. Si el consumidor se atrasa el productor espera (backpressure), así
+#       nunca hay más de maxLotes + 2 lotes en memoria.
+#
+# ? Returns:
+#     - Diccionario con los tiempos por etapa en segundos:
+#       { lotes, fetch, write, esperaFetch, esperaWrite, total }
+#       esperaFetch es el tiempo que el productor estuvo detenido por la cola llena y esperaWrite el tiempo
+#       que el consumidor estuvo esperando un lote de Odoo.
+#     - Si el productor o el consumidor lanzan una excepción, se detienen ambos y se vuelve a lanzar.
+#
+# ? Nota: Si corre dentro de un trabajo en segundo plano, reporta como avance los lotes escritos.
+# --------------------------------------------------------------------------------------------------
+def ejecutarPipeline(productor, consumidor, maxLotes=2):
+    cola = queue.Queue(maxsize=maxLotes)
+    detener = threading.Event()
+    tiempos = {'lotes': 0, 'fetch': 0.0, 'write': 0.0, 'esperaFetch': 0.0, 'esperaWrite': 0.0, 'total': 0.0}
+    inicioTotal = time.perf_counter()
+    #El tiempo en Odoo del hilo productor cuenta para la sincronización que ejecuta el pipeline
+    medicion = metricas.medicionActual()
+
+    #Coloca un elemento en la cola revisando si el consumidor pidió detenerse
+    def colocar(elemento):
+        while not detener.is_set():
+            try:
+                cola.put(elemento, timeout=0.5)
+                return True
+            except queue.Full:
+                continue
+        return False
+
+    def producir():
+        try:
+            with metricas.asociarMedicion(medicion):
+                iterador = iter(productor)
+                while not detener.is_set():
+                    inicio = time.perf_counter()
+                    try:
+                        lote = next(iterador)
+                    except StopIteration:
+                        break
+                    tiempos['fetch'] += time.perf_counter() - inicio
+
+                    inicio = time.perf_counter()
+                    if not colocar(lote):
+                        return
+                    tiempos['esperaFetch'] += time.perf_counter() - inicio
+            colocar(_FIN)
+        except BaseException as e:
+            colocar(e)
+        finally:
+            connections.close_all()
+
+    hilo = threading.Thread(target=producir, name='pipeline-odoo', daemon=True)
+    hilo.start()
+
+    try:
+        while True:
+            inicio = time.perf_counter()
+            lote = cola.get()
+            tiempos['esperaWrite'] += time.perf_counter() - inicio
+
+            if lote is _FIN:
+                break
+            if isinstance(lote, BaseException):
+                raise lote
+
+            inicio = time.perf_counter()
+            continuar = consumidor(lote)
+            tiempos['write'] += time.perf_counter() - inicio
+            tiempos['lotes'] += 1
+            reportarProgreso(lotes=tiempos['lotes'], segundos=round(time.perf_counter() - inicioTotal, 1))
+
+            if continuar is False:
+                break
+    finally:
+        detener.set()
+        hilo.join()
+        tiempos['total'] = time.perf_counter() - inicioTotal
+
+    return {k: round(v, 3) if isinstance(v, float) else v for k, v in tiempos.items()}
@@ -0,0 +1,114 @@
+import threading
+import time
+
+from django.conf import settings
+from django.db import connection
+
+from unidades.sistema.sincronizacion.models import VersionTabla
+
+# --------------------------------------------------------------------------------------------------
+# * Módulo: referencias
+# * Descripción: Cache en el proceso de las llaves de las tablas de referencia (ids de productos, clientes,
+# *              ventas, ...) y de sus mapas de llaves (ej. idProducto -> idProductoTmp). Así las sincronizaciones
+# *              y vistas que se repiten en el mismo worker no vuelven a leer toda la tabla.
+#
+# ? Invalidación:
+#     - Cada tabla tiene un contador en VersionTabla. Las funciones que insertan en la tabla llaman a
+#       incrementarVersion después de escribir, y antes de usar la cache se lee la versión (una consulta pequeña);
+#       si cambió se vuelve a cargar. Funciona entre procesos porque la versión está en PostgreSQL.
+#     - Por seguridad (ej. cambios hechos fuera de las sincronizaciones) cada entrada vence a los
+#       settings.SYNC_CACHE_REFERENCIAS segundos. Con 0 no se usa la cache.
+#
+# ! Nota: Solo se guardan llaves, no los demás campos, así un update que no cambia llaves no necesita incrementar
+#         la versión.
+# --------------------------------------------------------------------------------------------------
+
+SQL_INCREMENTAR_VERSION = f"""
+    INSERT INTO {VersionTabla._meta.db_table} AS vt (tabla, version, "fechaCambio")
+    SELECT tabla, 1, clock_timestamp() FROM unnest(%(tablas)s::varchar[]) AS tabla
+    ON CONFLICT (tabla) DO UPDATE SET version = vt.version + 1, "fechaCambio" = EXCLUDED."fechaCambio"
+"""
+
+_cache = {}
+_candado = threading.Lock()
+
+
+def _tabla(modelo):
+    return modelo._meta.label_lower
+
+
+#Versión actual de la tabla, la fecha del cambio la distingue si el contador se reinicia (ej. un rollback)
+def _version(modelo):
+    return VersionTabla.objects.filter(tabla=_tabla(modelo)).values_list('version', 'fechaCambio').first()
+
+
+# --------------------------------------------------------------------------------------------------
+# * Función: incrementarVersion
+# * Descripción: Marca que cambiaron las llaves de las tablas, la cache de todos los procesos las vuelve a cargar
+#
+# ! Parámetros:
+#     - *modelos, modelos de Django en los que se insertó o borró
+# --------------------------------------------------------------------------------------------------
+def incrementarVersion(*modelos):
+    with connection.cursor() as cursor:
+        cursor.execute(SQL_INCREMENTAR_VERSION, {'tablas': [_tabla(modelo) for modelo in modelos]})
+
+
+#Regresa la entrada de la cache si su versión sigue vigente, si no la carga con cargar()
+def _obtener(llave, modelo, cargar):
+    vigencia = settings.SYNC_CACHE_REFERENCIAS
+    if not vigencia:
+        return cargar()
+
+    version = _version(modelo)
+    ahora = time.monotonic()
+    with _candado:
+        entrada = _cache.get(llave)
+    if entrada and entrada[0] == version and ahora - entrada[1] < vigencia:
+        return entrada[2]
+
+    datos = cargar()
+    with _candado:
+        _cache[llave] = (version, ahora, datos)
+    return datos
+
+
+# --------------------------------------------------------------------------------------------------
+# * Función: llavesTabla
+# * Descripción: Llaves primarias de toda la tabla, desde la cache si no ha cambiado
+#
+# ! Parámetros:
+#     - modelo, modelo de Django
+#
+# ? Returns:
+#     - frozenset con las llaves primarias (no se debe modificar, se comparte entre llamadas)
+# --------------------------------------------------------------------------------------------------
+def llavesTabla(modelo):
+    return _obtener(
+        (_tabla(modelo), 'llaves'), modelo,
+        lambda: frozenset(modelo.objects.values_list('pk', flat=True))
+    )
+
+
+# --------------------------------------------------------------------------------------------------
+# * Función: mapaTabla
+# * Descripción: Mapa { campo: llave primaria } de toda la tabla, desde la cache si no ha cambiado
+#
+# ! Parámetros:
+#     - modelo, modelo de Django
+#     - campo, campo por el que se busca (ej. 'idProducto')
+#
+# ? Returns:
+#     - Diccionario { valor del campo: llave primaria } (no se debe modificar, se comparte entre llamadas)
+# --------------------------------------------------------------------------------------------------
+def mapaTabla(modelo, campo):
+    return _obtener(
+        (_tabla(modelo), 'mapa', campo), modelo,
+        lambda: dict(modelo.objects.values_list(campo, 'pk'))
+    )
+
+
+#Vacía la cache del proceso
+def limpiarCache():
+    with _candado:
+        _cache.clear()
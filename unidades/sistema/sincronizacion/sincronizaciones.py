@@ -0,0 +1,182 @@
+import inspect
+import json
+import os
+import time
+from datetime import datetime
+
+from django.conf import settings
+from django.db import connection, transaction
+from django.http import JsonResponse
+
+from conexiones import metricas
+from unidades.administracion.reporteVentas.services import sincronizacionCaducidades, sincronizacionClientes, sincronizacionVentas
+from unidades.produccionLogistica.maxMin.services import sincronizacionInsumos, sincronizacionMaterialPI, sincronizacionProductos
+from unidades.sistema.sincronizacion import perfilado
+from unidades.sistema.sincronizacion.candados import ejecutarConCandado
+
+# --------------------------------------------------------------------------------------------------
+# * Módulo: sincronizaciones
+# * Descripción: Punto de entrada común de las sincronizaciones Odoo → PostgreSQL. Lo usan las vistas
+# *              (auto/pull*, auto/create*, auto/update*) y el comando "sync", así las cargas pesadas se pueden
+# *              correr desde cron o desde otro servidor sin pasar por gunicorn y su timeout. Cada ejecución toma el
+# *              candado de su entidad (ver candados), así dos disparos de la misma entidad nunca corren a la vez.
+# --------------------------------------------------------------------------------------------------
+
+#? Servicio de cada entidad, cada uno tiene las funciones pull, create y/o update
+SINCRONIZACIONES = {
+    'productos'   : sincronizacionProductos,
+    'insumos'     : sincronizacionInsumos,
+    'clientes'    : sincronizacionClientes,
+    'materialPI'  : sincronizacionMaterialPI,
+    'caducidades' : sincronizacionCaducidades,
+    'ventas'      : sincronizacionVentas,
+}
+
+MODOS = ('pull', 'create', 'update')
+
+
+#Regresa la función del servicio o lanza ValueError si la entidad no tiene ese modo
+def obtenerSincronizacion(entidad, modo):
+    servicio = SINCRONIZACIONES.get(entidad)
+    if servicio is None:
+        raise ValueError(f'No existe la sincronización {entidad}, las sincronizaciones son {list(SINCRONIZACIONES)}')
+    if modo not in MODOS or not hasattr(servicio, modo):
+        raise ValueError(f'La sincronización {entidad} no tiene el modo {modo}')
+    return getattr(servicio, modo)
+
+
+# --------------------------------------------------------------------------------------------------
+# * Función: ejecutarSincronizacion
+# * Descripción: Ejecuta la sincronización de una entidad con el candado de la entidad y agrega al resultado el
+# *              tiempo y el throughput
+#
+# ! Parámetros:
+#     - entidad, llave de SINCRONIZACIONES (ej. 'productos')
+#     - modo, 'pull', 'create' o 'update'
+#     - simular (opcional), si es True se ejecuta dentro de una transacción que se revierte al final (dry run),
+#       Odoo se consulta igual pero PostgreSQL queda sin cambios
+#     - concurrencia (opcional), 'esperar', 'omitir' o 'compartir' si ya hay una sincronización de la entidad en
+#       curso, por default settings.SYNC_CONCURRENCIA (ver candados)
+#     - perfilar (opcional), si es True perfila la ejecución con cProfile y tracemalloc (ver perfilado). Una ejecución
+#       perfilada no comparte el resultado de la que está en curso, espera y se ejecuta.
+#     - opciones, parámetros del servicio (tamanoLote, desde, reiniciar). Las opciones que no acepta el modo lanzan ValueError.
+#
+# ? Returns:
+#     - El diccionario del servicio más { segundos, leidosPorSegundo, escritosPorSegundo, simulado, fases, dbConsultas,
+#       consultasDB, rechazados, rssPicoKB, ejecucion } y { perfil } si se perfiló, o el de la ejecución en curso con compartido=True,
+#       o omitido=True
+# --------------------------------------------------------------------------------------------------
+def ejecutarSincronizacion(entidad, modo, simular=False, concurrencia=None, perfilar=False, **opciones):
+    funcion = obtenerSincronizacion(entidad, modo)
+
+    aceptadas = inspect.signature(funcion).parameters
+    opciones = {opcion: valor for opcion, valor in opciones.items() if valor is not None}
+    invalidas = [opcion for opcion in opciones if opcion not in aceptadas]
+    if invalidas:
+        raise ValueError(f'La sincronización {entidad} {modo} no acepta {invalidas}')
+
+    #Las opciones se guardan en EjecucionSync como JSON (las fechas como texto) para compararlas con la que está en curso
+    parametros = json.loads(json.dumps(opciones, default=str))
+    if perfilar and (concurrencia or settings.SYNC_CONCURRENCIA) == 'compartir':
+        concurrencia = 'esperar'
+
+    def ejecutar(ejecucion):
+        if not perfilar:
+            return _ejecutar(entidad, modo, funcion, opciones, simular)
+        with perfilado.perfilar(ejecucion.id) as perfil:
+            resultado = _ejecutar(entidad, modo, funcion, opciones, simular)
+        resultado['perfil'] = perfil
+        return resultado
+
+    return ejecutarConCandado(entidad, modo, parametros, simular, ejecutar, concurrencia=concurrencia)
+
+
+#Ejecuta la función del servicio, registra sus métricas (ver conexiones.metricas) y agrega el tiempo, el throughput,
+#las fases y el pico de memoria al resultado (se guardan en EjecucionSync)
+def _ejecutar(entidad, modo, funcion, opciones, simular):
+    consultas = metricas.TiempoConsultas()
+    inicio = time.perf_counter()
+    with metricas.medirPicoMemoria() as pico, metricas.medirSincronizacion(entidad, modo, consultas) as medicion, connection.execute_wrapper(consultas):
+        if simular:
+            with transaction.atomic():
+                resultado = funcion(**opciones)
+                transaction.set_rollback(True)
+        else:
+            resultado = funcion(**opciones)
+        medicion.resultado = resultado
+    segundos = time.perf_counter() - inicio
+
+    resultado['segundos'] = round(segundos, 3)
+    resultado['simulado'] = simular
+    if resultado['status'] == 'success':
+        resultado['leidosPorSegundo'] = round(resultado['leidos'] / segundos, 1) if segundos else 0
+        resultado['escritosPorSegundo'] = round(resultado['escritos'] / segundos, 1) if segundos else 0
+
+    #fetch: Odoo, enrich: completar con los modelos relacionados de Odoo, write: PostgreSQL, transform: el resto (Python).
+    #En los pull con pipeline el fetch se traslapa con el write, por eso transform puede quedar en 0
+    fases = {
+        'fetch'  : medicion.fases['fetch'],
+        'enrich' : medicion.fases['enrich'],
+        'write'  : consultas.segundos,
+    }
+    fases['transform'] = max(0.0, segundos - sum(fases.values()))
+    resultado['fases'] = {nombre: round(valor, 3) for nombre, valor in fases.items()}
+    resultado['dbConsultas'] = consultas.consultas
+    #Consultas y tiempo por fase y por tipo, y las más lentas (ver metricas.TiempoConsultas)
+    resultado['consultasDB'] = consultas.resumen()
+    resultado['rechazados'] = medicion.rechazados
+    #None si otra sincronización corrió al mismo tiempo en el proceso (ver metricas.medirPicoMemoria)
+    resultado['rssPicoKB'] = pico.kb
+    return resultado
+
+
+#Convierte una fecha de texto (YYYY-MM-DD o YYYY-MM-DD HH:MM) a datetime
+def parsearFecha(texto):
+    for formato in ('%Y-%m-%d %H:%M', '%Y-%m-%d'):
+        try:
+            return datetime.strptime(texto, formato)
+        except ValueError:
+            continue
+    raise ValueError(f'La fecha {texto} debe tener el formato YYYY-MM-DD o YYYY-MM-DD HH:MM')
+
+
+#Convierte el parámetro ?procesos= a un número de procesos entre 1 y los CPUs del servidor
+def parsearProcesos(texto, default=1):
+    maximo = os.cpu_count() or 1
+    if texto in (None, ''):
+        return max(1, min(default, maximo))
+    try:
+        procesos = int(texto)
+    except (TypeError, ValueError):
+        raise ValueError(f'procesos debe ser un número entero, se recibió {texto}')
+    return max(1, min(procesos, maximo))
+
+
+# --------------------------------------------------------------------------------------------------
+# * Función: sincronizarPeticion
+# * Descripción: Vista genérica de las rutas de sincronización, solo traduce la petición al servicio
+#
+# ! Parámetros:
+#     - entidad y modo, ver ejecutarSincronizacion
+#     - request.GET['lote'] (opcional), tamaño de lote
+#     - request.GET['desde'] (opcional), fecha YYYY-MM-DD para traer solo lo creado/modificado desde esa fecha
+#     - request.GET['reiniciar'] (opcional), si es "1" reinicia el avance por meses de pull ventas
+#     - request.GET['concurrencia'] (opcional), esperar, omitir o compartir
+#     - request.GET['perfilar'] o el header X-Perfilar (opcionales), si es "1" perfila la ejecución (ver perfilado)
+# --------------------------------------------------------------------------------------------------
+def sincronizarPeticion(entidad, modo, request):
+    try:
+        return JsonResponse(ejecutarSincronizacion(
+            entidad, modo,
+            tamanoLote = int(request.GET['lote']) if request.GET.get('lote') else None,
+            desde      = parsearFecha(request.GET['desde']) if request.GET.get('desde') else None,
+            reiniciar  = True if request.GET.get('reiniciar') == '1' else None,
+            concurrencia = request.GET.get('concurrencia'),
+            perfilar   = '1' in (request.GET.get('perfilar'), request.headers.get('X-Perfilar')),
+        ))
+
+    except ValueError as e:
+        return JsonResponse({
+            'status'  : 'error',
+            'message' : str(e)
+        }, status=400)
@@ -0,0 +1,267 @@
+import json
+import os
+import socket
+import threading
+import time
+from functools import wraps
+from importlib import import_module
+
+from django.conf import settings
+from django.db import close_old_connections, connection, transaction
+from django.http import HttpRequest, JsonResponse, QueryDict
+from django.utils import timezone
+
+from unidades.sistema.sincronizacion.models import Trabajo
+
+# --------------------------------------------------------------------------------------------------
+# * Módulo: trabajos
+# * Descripción: Cola de trabajos en PostgreSQL para ejecutar las sincronizaciones fuera de la petición HTTP.
+#
+# ? Flujo:
+#     1. Las rutas envueltas con enCola guardan un Trabajo pendiente y responden de inmediato con su id.
+#     2. El comando "trabajador" toma los trabajos pendientes con SELECT ... FOR UPDATE SKIP LOCKED, así varios
+#        trabajadores pueden correr al mismo tiempo sin tomar el mismo trabajo. Mientras lo ejecuta conserva un
+#        advisory lock de sesión con el id del trabajo, si el trabajador muere PostgreSQL lo libera solo.
+#     3. El trabajador ejecuta la misma vista de la ruta y guarda su JSON como resultado del trabajo.
+#     4. El avance se consulta en auto/trabajos/<id>/
+# --------------------------------------------------------------------------------------------------
+
+#? Vistas que se pueden ejecutar en segundo plano {nombre: vista}, se llena al importar las urls
+TAREAS = {}
+
+#? Trabajo que se está ejecutando en el hilo actual, lo usa reportarProgreso
+_actual = threading.local()
+
+#? Primera llave del advisory lock de los trabajos en ejecución, distinta de la de candados.ESPACIO_CANDADOS
+ESPACIO_TRABAJOS = 4039
+
+#? Segundos entre cada revisión de trabajos huérfanos mientras el trabajador no tiene trabajos
+INTERVALO_HUERFANOS = 60
+
+
+# --------------------------------------------------------------------------------------------------
+# * Función: enCola
+# * Descripción: Envuelve una vista para que por default se encole como trabajo en segundo plano
+#
+# ! Parámetros:
+#     - vista, función de la vista (recibe request y regresa JsonResponse)
+#
+# ? Returns:
+#     - Vista que guarda un trabajo con los parámetros GET y responde con status 202 y el id del trabajo.
+#       Con ?sincrono=1 ejecuta la vista original dentro de la petición como antes. El header X-Perfilar se
+#       guarda como el parámetro perfilar porque el trabajador no recibe los headers.
+# --------------------------------------------------------------------------------------------------
+def enCola(vista):
+    registrarTarea(vista)
+
+    @wraps(vista)
+    def encolarVista(request, *args, **kwargs):
+        if request.GET.get('sincrono') == '1':
+            return vista(request, *args, **kwargs)
+
+        parametros = request.GET.dict()
+        if request.headers.get('X-Perfilar'):
+            parametros.setdefault('perfilar', request.headers['X-Perfilar'])
+        return respuestaTrabajo(encolar(vista.__name__, parametros))
+
+    return encolarVista
+
+
+#Registra una vista como tarea sin ruta propia, la encola otra vista con encolar (ej. cargarArchivos)
+def registrarTarea(vista):
+    TAREAS[vista.__name__] = vista
+    return vista
+
+
+def encolar(tarea, parametros=None):
+    return Trabajo.objects.create(tarea=tarea, parametros=parametros or {})
+
+
+#Respuesta 202 con el id del trabajo encolado y la ruta para consultar su avance
+def respuestaTrabajo(trabajo):
+    return JsonResponse({
+        'status'  : 'success',
+        'message' : f'Se encoló el trabajo {trabajo.id} ({trabajo.tarea})',
+        'trabajo' : trabajo.id,
+        'url'     : f'/auto/trabajos/{trabajo.id}/'
+    }, status=202)
+
+
+# --------------------------------------------------------------------------------------------------
+# * Función: tomarTrabajo
+# * Descripción: Toma el trabajo pendiente más antiguo y lo marca como ejecutando
+#
+# ! Parámetros:
+#     - trabajador, nombre del trabajador que lo toma (host:pid)
+#
+# ? Returns:
+#     - El Trabajo tomado o None si no hay pendientes. Los trabajos bloqueados por otro trabajador se saltan.
+#
+# ! Nota: El advisory lock del trabajo se toma antes de marcarlo como ejecutando y se suelta en ejecutarTrabajo,
+#         así un trabajo en ejecución siempre tiene el candado de su trabajador (ver liberarHuerfanos).
+# --------------------------------------------------------------------------------------------------
+def tomarTrabajo(trabajador):
+    with transaction.atomic():
+        trabajo = (
+            Trabajo.objects
+            .select_for_update(skip_locked=True)
+            .filter(estado=Trabajo.PENDIENTE)
+            .order_by('id')
+            .first()
+        )
+        #Si otro trabajador tiene el candado es porque lo está regresando a pendientes, se toma en la siguiente vuelta
+        if trabajo is None or not candadoTrabajo('pg_try_advisory_lock', trabajo.id):
+            return None
+
+        trabajo.estado = Trabajo.EJECUTANDO
+        trabajo.trabajador = trabajador
+        trabajo.fechaInicio = timezone.now()
+        trabajo.save(update_fields=['estado', 'trabajador', 'fechaInicio'])
+        return trabajo
+
+
+# --------------------------------------------------------------------------------------------------
+# * Función: ejecutarTrabajo
+# * Descripción: Ejecuta la vista del trabajo con sus parámetros y guarda el JSON que regresa
+#
+# ! Parámetros:
+#     - trabajo, Trabajo ya tomado con tomarTrabajo
+#
+# ? Notas:
+#     - El trabajo termina en estado "terminado" si la vista regresa status success, si no en "error"
+#     - Si la vista lanza una excepción se guarda el mensaje como resultado
+# --------------------------------------------------------------------------------------------------
+def ejecutarTrabajo(trabajo):
+    _actual.trabajo = trabajo
+    _actual.ultimoReporte = 0
+    try:
+        resultado = ejecutarVista(trabajo.tarea, trabajo.parametros)
+        estado = Trabajo.TERMINADO if resultado.get('status') == 'success' else Trabajo.ERROR
+
+    except Exception as e:
+        resultado = {'status': 'error', 'message': f'Ha ocurrido un error en el trabajo {trabajo.id}: {e}'}
+        estado = Trabajo.ERROR
+
+    finally:
+        _actual.trabajo = None
+
+    try:
+        Trabajo.objects.filter(id=trabajo.id).update(estado=estado, resultado=resultado, fechaFin=timezone.now())
+    finally:
+        candadoTrabajo('pg_advisory_unlock', trabajo.id)
+    return estado
+
+
+# --------------------------------------------------------------------------------------------------
+# * Función: ejecutarVista
+# * Descripción: Ejecuta la vista de una tarea fuera de una petición HTTP y regresa su JSON
+#
+# ! Parámetros:
+#     - tarea, nombre de la vista registrada en TAREAS (ej. 'pullVentasOdoo')
+#     - parametros, diccionario con los parámetros GET que recibe la vista
+# --------------------------------------------------------------------------------------------------
+def ejecutarVista(tarea, parametros=None):
+    vista = TAREAS.get(tarea)
+    if vista is None:
+        raise LookupError(f'No existe la tarea {tarea}')
+
+    request = HttpRequest()
+    request.method = 'GET'
+    request.GET = QueryDict(mutable=True)
+    request.GET.update(parametros or {})
+
+    respuesta = vista(request)
+    if isinstance(respuesta, dict):
+        return respuesta
+    return json.loads(respuesta.content)
+
+
+#Registra las vistas como tareas importando las urls, lo usan los comandos que no pasan por una petición
+def cargarTareas():
+    import_module(settings.ROOT_URLCONF)
+    return TAREAS
+
+
+# --------------------------------------------------------------------------------------------------
+# * Función: reportarProgreso
+# * Descripción: Guarda el avance del trabajo que se está ejecutando en el hilo actual. Fuera de un trabajo
+# *              (por ejemplo con ?sincrono=1) no hace nada.
+#
+# ! Parámetros:
+#     - datos, valores del avance, ej. reportarProgreso(lotes=3, mensaje='Mes 2024-01')
+#     - cadaSegundos, para no escribir en cada lote solo se guarda si pasó este tiempo desde el último reporte
+# --------------------------------------------------------------------------------------------------
+def reportarProgreso(cadaSegundos=1.0, **datos):
+    trabajo = getattr(_actual, 'trabajo', None)
+    if trabajo is None:
+        return
+
+    ahora = time.monotonic()
+    if ahora - _actual.ultimoReporte < cadaSegundos:
+        return
+    _actual.ultimoReporte = ahora
+    Trabajo.objects.filter(id=trabajo.id).update(progreso=datos)
+
+
+#Toma (pg_try_advisory_lock) o suelta (pg_advisory_unlock) el advisory lock de sesión de un trabajo
+def candadoTrabajo(funcion, idTrabajo):
+    with connection.cursor() as cursor:
+        cursor.execute(f'SELECT {funcion}(%s, %s)', [ESPACIO_TRABAJOS, idTrabajo])
+        return cursor.fetchone()[0]
+
+
+# --------------------------------------------------------------------------------------------------
+# * Función: liberarHuerfanos
+# * Descripción: Regresa a pendientes los trabajos que se quedaron ejecutando porque su trabajador murió (ej. se
+# *              reinició su contenedor). Un trabajo es huérfano si se puede tomar su advisory lock, los que siguen
+# *              en otro trabajador vivo no se tocan sin importar cuánto tiempo lleven.
+#
+# ? Returns:
+#     - Número de trabajos que se volvieron a encolar
+# --------------------------------------------------------------------------------------------------
+def liberarHuerfanos():
+    liberados = 0
+    for idTrabajo in Trabajo.objects.filter(estado=Trabajo.EJECUTANDO).values_list('id', flat=True):
+        if not candadoTrabajo('pg_try_advisory_lock', idTrabajo):
+            continue
+        try:
+            liberados += Trabajo.objects.filter(id=idTrabajo, estado=Trabajo.EJECUTANDO).update(estado=Trabajo.PENDIENTE, trabajador='')
+        finally:
+            candadoTrabajo('pg_advisory_unlock', idTrabajo)
+    return liberados
+
+
+def nombreTrabajador():
+    return f'{socket.gethostname()}:{os.getpid()}'
+
+
+# --------------------------------------------------------------------------------------------------
+# * Función: procesarCola
+# * Descripción: Ciclo del trabajador, toma y ejecuta trabajos hasta que se le pida detenerse
+#
+# ! Parámetros:
+#     - detener, threading.Event para terminar después del trabajo actual
+#     - intervalo, segundos de espera cuando no hay trabajos pendientes
+#     - unaVez, si es True termina cuando ya no hay trabajos pendientes
+#     - alTerminar (opcional), función que recibe (trabajo, estado) al terminar cada trabajo
+#
+# ? Mientras no hay trabajos revisa cada INTERVALO_HUERFANOS segundos si algún trabajador murió con un trabajo
+# --------------------------------------------------------------------------------------------------
+def procesarCola(detener, intervalo=2.0, unaVez=False, alTerminar=None):
+    trabajador = nombreTrabajador()
+    ultimaRevision = time.monotonic()
+    while not detener.is_set():
+        close_old_connections()
+        trabajo = tomarTrabajo(trabajador)
+        if trabajo is None:
+            if unaVez:
+                return
+            if time.monotonic() - ultimaRevision >= INTERVALO_HUERFANOS:
+                liberarHuerfanos()
+                ultimaRevision = time.monotonic()
+            detener.wait(intervalo)
+            continue
+
+        estado = ejecutarTrabajo(trabajo)
+        if alTerminar:
+            alTerminar(trabajo, estado)
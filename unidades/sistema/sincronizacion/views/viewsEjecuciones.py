@@ -0,0 +1,83 @@
+from django.http import FileResponse, JsonResponse
+
+from unidades.sistema.sincronizacion import historial, perfilado
+
+
+# --------------------------------------------------------------------------------------------------
+# * Función: consultarEjecuciones
+# * Descripción: Regresa el historial de ejecuciones de las sincronizaciones, su tendencia por día y las regresiones
+# *              de la última ejecución contra las anteriores
+#
+# ! Parámetros:
+#     - request. Como se utiliza para URLS, recibe la información de la consulta
+#     - request.GET['entidad'] y request.GET['modo'] (opcionales), filtran las ejecuciones
+#     - request.GET['dias'] (opcional), días hacia atrás que se consideran, por default 30
+#     - request.GET['limite'] (opcional), cuántas ejecuciones recientes se envían, por default 50
+#
+# ? Returns:
+#     - Caso error:
+#           dias o limite no son números
+#     - Caso success:
+#           Envía las ejecuciones recientes (con fases, registros, consultas a PostgreSQL, memoria y error), las tendencias por día y las regresiones
+# --------------------------------------------------------------------------------------------------
+def consultarEjecuciones(request):
+    try:
+        dias = int(request.GET.get('dias', 30))
+        limite = int(request.GET.get('limite', 50))
+    except ValueError:
+        return JsonResponse({
+            'status'  : 'error',
+            'message' : 'dias y limite deben ser números enteros'
+        }, status=400)
+
+    entidad = request.GET.get('entidad')
+    modo = request.GET.get('modo')
+
+    ejecuciones = historial.ejecucionesRecientes(dias, entidad, modo).order_by('-id')[:limite].values(
+        'id', 'entidad', 'modo', 'parametros', 'estado', 'fechaInicio', 'fechaFin', 'segundos', 'fases',
+        'leidos', 'escritos', 'rechazados', 'dbConsultas', 'consultasDB', 'rssPicoKB', 'error'
+    )
+
+    return JsonResponse({
+        'status'      : 'success',
+        'ejecuciones' : list(ejecuciones),
+        'tendencias'  : historial.tendenciasPorDia(dias, entidad, modo),
+        'regresiones' : historial.detectarRegresiones(dias, entidad, modo),
+    })
+
+
+# --------------------------------------------------------------------------------------------------
+# * Función: descargarPerfil
+# * Descripción: Lista o descarga los archivos del perfil de una ejecución (ver perfilado)
+#
+# ! Parámetros:
+#     - request. Como se utiliza para URLS, recibe la información de la consulta
+#     - idEjecucion, id de EjecucionSync que regresó la sincronización perfilada
+#     - archivo (opcional), perfil.prof, perfil.txt o memoria.txt
+#
+# ? Returns:
+#     - Caso error:
+#           La ejecución no se perfiló o el archivo no existe
+#     - Caso success:
+#           Sin archivo envía la lista de archivos con su url, con archivo lo envía como descarga
+# --------------------------------------------------------------------------------------------------
+def descargarPerfil(request, idEjecucion, archivo=None):
+    archivos = perfilado.archivosEjecucion(idEjecucion)
+    if archivo is None and archivos:
+        return JsonResponse({
+            'status'    : 'success',
+            'ejecucion' : idEjecucion,
+            'archivos'  : {nombre: f'/auto/ejecuciones/{idEjecucion}/perfil/{nombre}' for nombre in archivos},
+        })
+
+    if archivo not in archivos:
+        return JsonResponse({
+            'status'  : 'error',
+            'message' : f'La ejecución {idEjecucion} no tiene el perfil {archivo or ""}'.strip()
+        }, status=404)
+
+    return FileResponse(
+        open(perfilado.directorioEjecucion(idEjecucion) / archivo, 'rb'),
+        as_attachment=True,
+        filename=f'ejecucion-{idEjecucion}-{archivo}',
+    )
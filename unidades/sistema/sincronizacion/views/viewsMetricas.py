@@ -0,0 +1,18 @@
+from django.http import HttpResponse
+
+from conexiones import metricas
+
+
+# --------------------------------------------------------------------------------------------------
+# * Función: consultarMetricas
+# * Descripción: Regresa las métricas del proceso (sincronizaciones, llamadas a Odoo y tiempo en PostgreSQL) en
+# *              formato de texto de Prometheus, para que las lea Prometheus o se consulten con curl
+#
+# ! Parámetros:
+#     - request. Como se utiliza para URLS, recibe la información de la consulta
+#
+# ? Returns:
+#     - Texto con los contadores e histogramas de conexiones.metricas
+# --------------------------------------------------------------------------------------------------
+def consultarMetricas(request):
+    return HttpResponse(metricas.formatoPrometheus(), content_type=metricas.TIPO_CONTENIDO)
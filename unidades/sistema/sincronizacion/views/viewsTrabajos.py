@@ -0,0 +1,39 @@
+from django.http import JsonResponse
+from unidades.sistema.sincronizacion.models import Trabajo
+
+
+# --------------------------------------------------------------------------------------------------
+# * Función: consultarTrabajo
+# * Descripción: Regresa el estado, avance y resultado de un trabajo en segundo plano
+#
+# ! Parámetros:
+#     - request. Como se utiliza para URLS, recibe la información de la consulta
+#     - idTrabajo, id del trabajo que regresó la ruta al encolarlo
+#
+# ? Returns:
+#     - Caso error:
+#           No existe el trabajo
+#     - Caso success:
+#           Envía la tarea, estado (pendiente, ejecutando, terminado o error), progreso, resultado y fechas del trabajo
+# --------------------------------------------------------------------------------------------------
+def consultarTrabajo(request, idTrabajo):
+    trabajo = Trabajo.objects.filter(id=idTrabajo).first()
+    if trabajo is None:
+        return JsonResponse({
+            'status'  : 'error',
+            'message' : f'No existe el trabajo {idTrabajo}'
+        }, status=404)
+
+    return JsonResponse({
+        'status'        : 'success',
+        'trabajo'       : trabajo.id,
+        'tarea'         : trabajo.tarea,
+        'parametros'    : trabajo.parametros,
+        'estado'        : trabajo.estado,
+        'progreso'      : trabajo.progreso,
+        'resultado'     : trabajo.resultado,
+        'trabajador'    : trabajo.trabajador,
+        'fechaCreacion' : trabajo.fechaCreacion,
+        'fechaInicio'   : trabajo.fechaInicio,
+        'fechaFin'      : trabajo.fechaFin,
+    })